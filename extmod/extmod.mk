@@ -21,9 +21,12 @@ SRC_EXTMOD_C += \
 	extmod/vfs_fat_diskio.c \
 	extmod/vfs_fat_file.c \
 	extmod/vfs_lfs.c \
+	extmod/vfs_mpy_cache.c \
 	extmod/vfs_posix.c \
 	extmod/vfs_posix_file.c \
 	extmod/vfs_reader.c \
+	extmod/vfs_rom.c \
+	extmod/vfs_rom_file.c \
 	shared/libc/abort_.c \
 	shared/libc/printf.c \
 
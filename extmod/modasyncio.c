@@ -28,6 +28,7 @@
 #include "py/smallint.h"
 #include "py/pairheap.h"
 #include "py/mphal.h"
+#include "py/stream.h"
 
 #if MICROPY_PY_ASYNCIO
 
@@ -97,6 +98,12 @@ static mp_int_t ticks_diff(mp_obj_t t1_in, mp_obj_t t0_in) {
     return diff;
 }
 
+#if MICROPY_PY_ASYNCIO_NATIVE_LOOP
+static mp_obj_t ticks_add(mp_obj_t t_in, mp_int_t delta) {
+    return MP_OBJ_NEW_SMALL_INT((MP_OBJ_SMALL_INT_VALUE(t_in) + delta) & _TICKS_MAX);
+}
+#endif
+
 static int task_lt(mp_pairheap_t *n1, mp_pairheap_t *n2) {
     mp_obj_task_t *t1 = (mp_obj_task_t *)n1;
     mp_obj_task_t *t2 = (mp_obj_task_t *)n2;
@@ -353,6 +360,424 @@ static MP_DEFINE_CONST_OBJ_TYPE(
     iter, &task_getiter_iternext
     );
 
+#if MICROPY_PY_ASYNCIO_NATIVE_LOOP
+
+/******************************************************************************/
+// Native versions of the core asyncio event loop, sleep_ms and IOQueue.  These
+// behave like their Python versions in asyncio/core.py, and use the same state
+// (cur_task, _task_queue, _io_queue and so on) from mp_asyncio_context.
+
+MP_DECLARE_CONST_FUN_OBJ_0(mp_select_poll_obj);
+
+static mp_obj_t asyncio_context_get(qstr name) {
+    if (mp_asyncio_context == MP_OBJ_NULL) {
+        mp_raise_msg(&mp_type_RuntimeError, MP_ERROR_TEXT("no running event loop"));
+    }
+    return mp_obj_dict_get(mp_asyncio_context, MP_OBJ_NEW_QSTR(name));
+}
+
+static mp_obj_task_queue_t *asyncio_get_task_queue(void) {
+    mp_obj_t task_queue = asyncio_context_get(MP_QSTR__task_queue);
+    if (!mp_obj_is_type(task_queue, &task_queue_type)) {
+        mp_raise_TypeError(NULL);
+    }
+    return MP_OBJ_TO_PTR(task_queue);
+}
+
+static void asyncio_push(mp_obj_task_queue_t *task_queue, mp_obj_t task, mp_obj_t ph_key) {
+    mp_obj_t args[3] = { MP_OBJ_FROM_PTR(task_queue), task, ph_key };
+    task_queue_push(ph_key == MP_OBJ_NULL ? 2 : 3, args);
+}
+
+// SingletonGenerator: an awaitable that yields once to the event loop.  Only one
+// task runs at a time and each task awaits it straight away, so a single
+// statically allocated instance is shared by all tasks, as in the Python version.
+// The state is MP_OBJ_NULL once it has yielded, mp_const_none to yield without
+// rescheduling the task, or the ticks value to reschedule the task at.
+
+typedef struct _mp_obj_singleton_gen_t {
+    mp_obj_base_t base;
+    mp_obj_t state;
+} mp_obj_singleton_gen_t;
+
+static const mp_obj_type_t singleton_gen_type;
+
+static mp_obj_singleton_gen_t singleton_gen = {{&singleton_gen_type}, MP_OBJ_NULL};
+
+static mp_obj_t singleton_gen_start(mp_obj_t state) {
+    if (singleton_gen.state != MP_OBJ_NULL) {
+        mp_raise_msg(&mp_type_AssertionError, MP_ERROR_TEXT("Check for a missing `await` in your code"));
+    }
+    singleton_gen.state = state;
+    return MP_OBJ_FROM_PTR(&singleton_gen);
+}
+
+static mp_obj_t singleton_gen_iternext(mp_obj_t self_in) {
+    mp_obj_singleton_gen_t *self = MP_OBJ_TO_PTR(self_in);
+    if (self->state == MP_OBJ_NULL) {
+        return MP_OBJ_STOP_ITERATION;
+    }
+    if (self->state != mp_const_none) {
+        asyncio_push(asyncio_get_task_queue(), asyncio_context_get(MP_QSTR_cur_task), self->state);
+    }
+    self->state = MP_OBJ_NULL;
+    return mp_const_none;
+}
+
+static mp_obj_t singleton_gen_await(mp_obj_t self_in) {
+    return self_in;
+}
+static MP_DEFINE_CONST_FUN_OBJ_1(singleton_gen_await_obj, singleton_gen_await);
+
+static const mp_rom_map_elem_t singleton_gen_locals_dict_table[] = {
+    { MP_ROM_QSTR(MP_QSTR___await__), MP_ROM_PTR(&singleton_gen_await_obj) },
+};
+static MP_DEFINE_CONST_DICT(singleton_gen_locals_dict, singleton_gen_locals_dict_table);
+
+static MP_DEFINE_CONST_OBJ_TYPE(
+    singleton_gen_type,
+    MP_QSTR_SingletonGenerator,
+    MP_TYPE_FLAG_ITER_IS_ITERNEXT,
+    iter, singleton_gen_iternext,
+    locals_dict, &singleton_gen_locals_dict
+    );
+
+// sleep_ms(t): pause the current task for t milliseconds.
+static mp_obj_t asyncio_sleep_ms(mp_obj_t t_in) {
+    mp_int_t t = mp_obj_get_int(t_in);
+    return singleton_gen_start(ticks_add(ticks(), MAX(0, t)));
+}
+static MP_DEFINE_CONST_FUN_OBJ_1(asyncio_sleep_ms_obj, asyncio_sleep_ms);
+
+/******************************************************************************/
+// IOQueue class
+
+typedef struct _mp_obj_io_queue_t {
+    mp_obj_base_t base;
+    mp_obj_t poller;
+    // Maps id(stream) to [task waiting to read, task waiting to write, stream].
+    mp_obj_t map;
+} mp_obj_io_queue_t;
+
+static const mp_obj_type_t io_queue_type;
+
+static mp_obj_t io_queue_make_new(const mp_obj_type_t *type, size_t n_args, size_t n_kw, const mp_obj_t *args) {
+    (void)args;
+    mp_arg_check_num(n_args, n_kw, 0, 0, false);
+    mp_obj_io_queue_t *self = mp_obj_malloc(mp_obj_io_queue_t, type);
+    self->poller = mp_call_function_0(MP_OBJ_FROM_PTR(&mp_select_poll_obj));
+    self->map = mp_obj_new_dict(0);
+    return MP_OBJ_FROM_PTR(self);
+}
+
+static void io_queue_poller_call(mp_obj_io_queue_t *self, qstr method, mp_obj_t s, mp_uint_t events) {
+    mp_obj_t dest[4];
+    mp_load_method(self->poller, method, dest);
+    dest[2] = s;
+    dest[3] = MP_OBJ_NEW_SMALL_INT(events);
+    mp_call_method_n_kw(method == MP_QSTR_unregister ? 1 : 2, 0, dest);
+}
+
+static mp_obj_t io_queue_enqueue(mp_obj_t self_in, mp_obj_t s, size_t idx) {
+    mp_obj_io_queue_t *self = MP_OBJ_TO_PTR(self_in);
+    mp_obj_t cur_task = asyncio_context_get(MP_QSTR_cur_task);
+    mp_map_elem_t *elem = mp_map_lookup(mp_obj_dict_get_map(self->map), mp_obj_id(s), MP_MAP_LOOKUP_ADD_IF_NOT_FOUND);
+    if (elem->value == MP_OBJ_NULL) {
+        mp_obj_t entry[3] = { mp_const_none, mp_const_none, s };
+        entry[idx] = cur_task;
+        elem->value = mp_obj_new_list(3, entry);
+        io_queue_poller_call(self, MP_QSTR_register, s, idx == 0 ? MP_STREAM_POLL_RD : MP_STREAM_POLL_WR);
+    } else {
+        mp_obj_list_t *sm = MP_OBJ_TO_PTR(elem->value);
+        assert(sm->items[idx] == mp_const_none);
+        assert(sm->items[1 - idx] != mp_const_none);
+        sm->items[idx] = cur_task;
+        io_queue_poller_call(self, MP_QSTR_modify, s, MP_STREAM_POLL_RD | MP_STREAM_POLL_WR);
+    }
+    // Link task to this IOQueue so it can be removed if needed.
+    ((mp_obj_task_t *)MP_OBJ_TO_PTR(cur_task))->data = self_in;
+    return singleton_gen_start(mp_const_none);
+}
+
+static void io_queue_dequeue(mp_obj_io_queue_t *self, mp_obj_t s) {
+    mp_map_lookup(mp_obj_dict_get_map(self->map), mp_obj_id(s), MP_MAP_LOOKUP_REMOVE_IF_FOUND);
+    io_queue_poller_call(self, MP_QSTR_unregister, s, 0);
+}
+
+static mp_obj_t io_queue_queue_read(mp_obj_t self_in, mp_obj_t s) {
+    return io_queue_enqueue(self_in, s, 0);
+}
+static MP_DEFINE_CONST_FUN_OBJ_2(io_queue_queue_read_obj, io_queue_queue_read);
+
+static mp_obj_t io_queue_queue_write(mp_obj_t self_in, mp_obj_t s) {
+    return io_queue_enqueue(self_in, s, 1);
+}
+static MP_DEFINE_CONST_FUN_OBJ_2(io_queue_queue_write_obj, io_queue_queue_write);
+
+static mp_obj_t io_queue_remove(mp_obj_t self_in, mp_obj_t task) {
+    mp_obj_io_queue_t *self = MP_OBJ_TO_PTR(self_in);
+    mp_map_t *map = mp_obj_dict_get_map(self->map);
+    for (;;) {
+        mp_obj_t del_s = MP_OBJ_NULL;
+        for (size_t i = 0; i < map->alloc; ++i) {
+            if (mp_map_slot_is_filled(map, i)) {
+                mp_obj_list_t *sm = MP_OBJ_TO_PTR(map->table[i].value);
+                if (sm->items[0] == task || sm->items[1] == task) {
+                    del_s = sm->items[2];
+                    break;
+                }
+            }
+        }
+        if (del_s == MP_OBJ_NULL) {
+            return mp_const_none;
+        }
+        io_queue_dequeue(self, del_s);
+    }
+}
+static MP_DEFINE_CONST_FUN_OBJ_2(io_queue_remove_obj, io_queue_remove);
+
+static void io_queue_wait_io_event_internal(mp_obj_io_queue_t *self, mp_int_t dt) {
+    if (dt == 0 && mp_obj_dict_len(self->map) == 0) {
+        // Nothing to poll and no time to wait, so only handle pending events, which
+        // is what polling would do.
+        mp_event_handle_nowait();
+        return;
+    }
+    mp_obj_task_queue_t *task_queue = asyncio_get_task_queue();
+    mp_obj_t dest[3];
+    mp_load_method(self->poller, MP_QSTR_ipoll, dest);
+    dest[2] = MP_OBJ_NEW_SMALL_INT(dt);
+    mp_obj_t iter = mp_getiter(mp_call_method_n_kw(1, 0, dest), NULL);
+    mp_obj_t item;
+    while ((item = mp_iternext(iter)) != MP_OBJ_STOP_ITERATION) {
+        mp_obj_t *s_ev;
+        mp_obj_get_array_fixed_n(item, 2, &s_ev);
+        mp_obj_t s = s_ev[0];
+        mp_uint_t ev = mp_obj_get_int(s_ev[1]);
+        mp_obj_list_t *sm = MP_OBJ_TO_PTR(mp_obj_dict_get(self->map, mp_obj_id(s)));
+        if ((ev & ~MP_STREAM_POLL_WR) && sm->items[0] != mp_const_none) {
+            // POLLIN or error
+            asyncio_push(task_queue, sm->items[0], MP_OBJ_NULL);
+            sm->items[0] = mp_const_none;
+        }
+        if ((ev & ~MP_STREAM_POLL_RD) && sm->items[1] != mp_const_none) {
+            // POLLOUT or error
+            asyncio_push(task_queue, sm->items[1], MP_OBJ_NULL);
+            sm->items[1] = mp_const_none;
+        }
+        if (sm->items[0] == mp_const_none && sm->items[1] == mp_const_none) {
+            io_queue_dequeue(self, s);
+        } else if (sm->items[0] == mp_const_none) {
+            io_queue_poller_call(self, MP_QSTR_modify, s, MP_STREAM_POLL_WR);
+        } else {
+            io_queue_poller_call(self, MP_QSTR_modify, s, MP_STREAM_POLL_RD);
+        }
+    }
+}
+
+static mp_obj_t io_queue_wait_io_event(mp_obj_t self_in, mp_obj_t dt_in) {
+    io_queue_wait_io_event_internal(MP_OBJ_TO_PTR(self_in), mp_obj_get_int(dt_in));
+    return mp_const_none;
+}
+static MP_DEFINE_CONST_FUN_OBJ_2(io_queue_wait_io_event_obj, io_queue_wait_io_event);
+
+static void io_queue_attr(mp_obj_t self_in, qstr attr, mp_obj_t *dest) {
+    mp_obj_io_queue_t *self = MP_OBJ_TO_PTR(self_in);
+    if (dest[0] == MP_OBJ_NULL) {
+        // Load
+        if (attr == MP_QSTR_map) {
+            dest[0] = self->map;
+        } else if (attr == MP_QSTR_poller) {
+            dest[0] = self->poller;
+        } else {
+            // Continue lookup in locals_dict.
+            dest[1] = MP_OBJ_SENTINEL;
+        }
+    }
+}
+
+static const mp_rom_map_elem_t io_queue_locals_dict_table[] = {
+    { MP_ROM_QSTR(MP_QSTR_queue_read), MP_ROM_PTR(&io_queue_queue_read_obj) },
+    { MP_ROM_QSTR(MP_QSTR_queue_write), MP_ROM_PTR(&io_queue_queue_write_obj) },
+    { MP_ROM_QSTR(MP_QSTR_remove), MP_ROM_PTR(&io_queue_remove_obj) },
+    { MP_ROM_QSTR(MP_QSTR_wait_io_event), MP_ROM_PTR(&io_queue_wait_io_event_obj) },
+};
+static MP_DEFINE_CONST_DICT(io_queue_locals_dict, io_queue_locals_dict_table);
+
+static MP_DEFINE_CONST_OBJ_TYPE(
+    io_queue_type,
+    MP_QSTR_IOQueue,
+    MP_TYPE_FLAG_NONE,
+    make_new, io_queue_make_new,
+    attr, io_queue_attr,
+    locals_dict, &io_queue_locals_dict
+    );
+
+/******************************************************************************/
+// run_until_complete
+
+static bool io_queue_has_waiting(mp_obj_t io_queue) {
+    if (mp_obj_is_type(io_queue, &io_queue_type)) {
+        mp_obj_io_queue_t *self = MP_OBJ_TO_PTR(io_queue);
+        return mp_obj_dict_len(self->map) != 0;
+    }
+    return mp_obj_is_true(mp_load_attr(io_queue, MP_QSTR_map));
+}
+
+static void io_queue_wait(mp_obj_t io_queue, mp_int_t dt) {
+    if (mp_obj_is_type(io_queue, &io_queue_type)) {
+        io_queue_wait_io_event_internal(MP_OBJ_TO_PTR(io_queue), dt);
+    } else {
+        mp_obj_t dest[3];
+        mp_load_method(io_queue, MP_QSTR_wait_io_event, dest);
+        dest[2] = MP_OBJ_NEW_SMALL_INT(dt);
+        mp_call_method_n_kw(1, 0, dest);
+    }
+}
+
+static inline bool is_instance(mp_obj_t obj, mp_obj_t type) {
+    return mp_obj_is_subclass_fast(MP_OBJ_FROM_PTR(mp_obj_get_type(obj)), type);
+}
+
+// run_until_complete(main_task=None): run the event loop until main_task has
+// finished, or until there is nothing left to run if main_task is None.
+static mp_obj_t asyncio_run_until_complete(size_t n_args, const mp_obj_t *args) {
+    mp_obj_t main_task = n_args > 0 ? args[0] : mp_const_none;
+    mp_obj_task_queue_t *task_queue = asyncio_get_task_queue();
+    mp_obj_t io_queue = asyncio_context_get(MP_QSTR__io_queue);
+    mp_obj_t cancelled_error = asyncio_context_get(MP_QSTR_CancelledError);
+    mp_obj_t cur_task_key = MP_OBJ_NEW_QSTR(MP_QSTR_cur_task);
+
+    // No task is running yet, so a state left over from an earlier run (eg one that
+    // was interrupted, or ended by a soft reset) is stale.
+    singleton_gen.state = MP_OBJ_NULL;
+
+    for (;;) {
+        // Wait until the head of _task_queue is ready to run.
+        mp_int_t dt = 1;
+        while (dt > 0) {
+            dt = -1;
+            if (task_queue->heap != NULL) {
+                // A task waiting on _task_queue; "ph_key" is time to schedule task at.
+                dt = ticks_diff(task_queue->heap->ph_key, ticks());
+                dt = MAX(0, dt);
+            } else if (!io_queue_has_waiting(io_queue)) {
+                // No tasks can be woken so finished running.
+                mp_obj_dict_store(mp_asyncio_context, cur_task_key, mp_const_none);
+                return mp_const_none;
+            }
+            io_queue_wait(io_queue, dt);
+        }
+
+        // Get next task to run and continue it.
+        mp_obj_t t_in = task_queue_pop(MP_OBJ_FROM_PTR(task_queue));
+        mp_obj_task_t *t = MP_OBJ_TO_PTR(t_in);
+        mp_obj_dict_store(mp_asyncio_context, cur_task_key, t_in);
+        mp_obj_t exc = t->data;
+        mp_obj_t ret;
+        mp_vm_return_kind_t kind;
+        nlr_buf_t nlr;
+        if (nlr_push(&nlr) == 0) {
+            // Continue running the coroutine, it's responsible for rescheduling itself.
+            if (!mp_obj_is_true(exc)) {
+                kind = mp_resume(t->coro, mp_const_none, MP_OBJ_NULL, &ret);
+            } else {
+                // If the task is finished and on the run queue and gets here, then it
+                // had an exception and was not await'ed on.  Throwing into it now will
+                // raise StopIteration and the code below will catch this and run the
+                // call_exception_handler function.
+                t->data = mp_const_none;
+                kind = mp_resume(t->coro, MP_OBJ_NULL, mp_make_raise_obj(exc), &ret);
+            }
+            nlr_pop();
+        } else {
+            kind = MP_VM_RETURN_EXCEPTION;
+            ret = MP_OBJ_FROM_PTR(nlr.ret_val);
+        }
+
+        if (kind == MP_VM_RETURN_YIELD) {
+            continue;
+        }
+
+        // The task is done, either with its return value or an exception.
+        mp_obj_t er;
+        if (kind == MP_VM_RETURN_NORMAL) {
+            if (t_in == main_task) {
+                mp_obj_dict_store(mp_asyncio_context, cur_task_key, mp_const_none);
+                return ret;
+            }
+            er = mp_obj_new_exception_arg1(&mp_type_StopIteration, ret);
+        } else {
+            er = ret;
+            if (!is_instance(er, MP_OBJ_FROM_PTR(&mp_type_Exception)) && !is_instance(er, cancelled_error)) {
+                // Eg KeyboardInterrupt or SystemExit, which stop the loop.
+                nlr_jump(MP_OBJ_TO_PTR(er));
+            }
+        }
+
+        // Check the task is not on any event queue.
+        assert(t->data == mp_const_none);
+
+        // This task is done, check if it's the main task and then loop should stop.
+        if (t_in == main_task) {
+            mp_obj_dict_store(mp_asyncio_context, cur_task_key, mp_const_none);
+            if (is_instance(er, MP_OBJ_FROM_PTR(&mp_type_StopIteration))) {
+                return mp_obj_exception_get_value(er);
+            }
+            nlr_raise(er);
+        }
+
+        if (mp_obj_is_true(t->state)) {
+            // Task was running but is now finished.
+            bool waiting = false;
+            if (t->state == TASK_STATE_RUNNING_NOT_WAITED_ON) {
+                // "None" indicates that the task is complete and not await'ed on (yet).
+                t->state = TASK_STATE_DONE_NOT_WAITED_ON;
+            } else if (mp_obj_is_callable(t->state)) {
+                // The task has a callback registered to be called on completion.
+                mp_call_function_2(t->state, t_in, er);
+                t->state = TASK_STATE_DONE_WAS_WAITED_ON;
+                waiting = true;
+            } else {
+                // Schedule any other tasks waiting on the completion of this task.
+                mp_obj_t waiters = t->state;
+                while (task_queue_peek(waiters) != mp_const_none) {
+                    asyncio_push(task_queue, task_queue_pop(waiters), MP_OBJ_NULL);
+                    waiting = true;
+                }
+                // "False" indicates that the task is complete and has been await'ed on.
+                t->state = TASK_STATE_DONE_WAS_WAITED_ON;
+            }
+            if (!waiting && !is_instance(er, cancelled_error) && !is_instance(er, MP_OBJ_FROM_PTR(&mp_type_StopIteration))) {
+                // An exception ended this detached task, so queue it for later
+                // execution to handle the uncaught exception if no other task retrieves
+                // the exception in the meantime (this is handled by Task.throw).
+                asyncio_push(task_queue, t_in, MP_OBJ_NULL);
+            }
+            // Save return value of coro to pass up to caller.
+            t->data = er;
+        } else if (t->state == TASK_STATE_DONE_NOT_WAITED_ON) {
+            // Task is already finished and nothing await'ed on the task,
+            // so call the exception handler.
+
+            // Save exception raised by the coro for later use.
+            t->data = exc;
+
+            // Create exception context and call the exception handler.
+            mp_obj_t exc_context = asyncio_context_get(MP_QSTR__exc_context);
+            mp_obj_dict_store(exc_context, MP_OBJ_NEW_QSTR(MP_QSTR_exception), exc);
+            mp_obj_dict_store(exc_context, MP_OBJ_NEW_QSTR(MP_QSTR_future), t_in);
+            mp_obj_t dest[3];
+            mp_load_method(asyncio_context_get(MP_QSTR_Loop), MP_QSTR_call_exception_handler, dest);
+            dest[2] = exc_context;
+            mp_call_method_n_kw(1, 0, dest);
+        }
+    }
+}
+static MP_DEFINE_CONST_FUN_OBJ_VAR_BETWEEN(asyncio_run_until_complete_obj, 0, 1, asyncio_run_until_complete);
+
+#endif // MICROPY_PY_ASYNCIO_NATIVE_LOOP
+
 /******************************************************************************/
 // C-level asyncio module
 
@@ -360,6 +785,11 @@ static const mp_rom_map_elem_t mp_module_asyncio_globals_table[] = {
     { MP_ROM_QSTR(MP_QSTR___name__), MP_ROM_QSTR(MP_QSTR__asyncio) },
     { MP_ROM_QSTR(MP_QSTR_TaskQueue), MP_ROM_PTR(&task_queue_type) },
     { MP_ROM_QSTR(MP_QSTR_Task), MP_ROM_PTR(&task_type) },
+    #if MICROPY_PY_ASYNCIO_NATIVE_LOOP
+    { MP_ROM_QSTR(MP_QSTR_IOQueue), MP_ROM_PTR(&io_queue_type) },
+    { MP_ROM_QSTR(MP_QSTR_sleep_ms), MP_ROM_PTR(&asyncio_sleep_ms_obj) },
+    { MP_ROM_QSTR(MP_QSTR_run_until_complete), MP_ROM_PTR(&asyncio_run_until_complete_obj) },
+    #endif
 };
 static MP_DEFINE_CONST_DICT(mp_module_asyncio_globals, mp_module_asyncio_globals_table);
 
@@ -25,18 +25,208 @@
  */
 
 #include <stdio.h>
+#include <string.h>
 
 // CIRCUITPY-CHANGE
 #include "py/binary.h"
+#include "py/cstack.h"
 #include "py/objarray.h"
 #include "py/objlist.h"
+#include "py/objstr.h"
 #include "py/objstringio.h"
 #include "py/parsenum.h"
 #include "py/runtime.h"
 #include "py/stream.h"
+#include "shared/runtime/interrupt_char.h"
 
 #if MICROPY_PY_JSON
 
+#if MICROPY_PY_JSON_FAST_DUMP
+
+// The serializer below writes dict, list, tuple, str, small int, bool and None
+// objects itself, instead of going through their print methods, and collects the
+// output in a buffer that is passed on to the destination in blocks.  Any other
+// object is printed into the same buffer by mp_obj_print_helper.
+
+#define JSON_DUMP_BUF_SIZE (256)
+
+typedef struct _json_dump_t {
+    // Must be first, as it is passed to mp_obj_print_helper.
+    mp_print_ext_t print_ext;
+    const mp_print_t *out;
+    size_t item_separator_len;
+    size_t key_separator_len;
+    size_t len;
+    char buf[JSON_DUMP_BUF_SIZE];
+} json_dump_t;
+
+static void json_dump_flush(json_dump_t *d) {
+    if (d->len != 0) {
+        d->out->print_strn(d->out->data, d->buf, d->len);
+        d->len = 0;
+    }
+}
+
+static void json_dump_strn(json_dump_t *d, const char *str, size_t len) {
+    if (d->len + len > sizeof(d->buf)) {
+        json_dump_flush(d);
+        if (len > sizeof(d->buf)) {
+            d->out->print_strn(d->out->data, str, len);
+            return;
+        }
+    }
+    memcpy(d->buf + d->len, str, len);
+    d->len += len;
+}
+
+static void json_dump_print_strn(void *data, const char *str, size_t len) {
+    json_dump_strn(data, str, len);
+}
+
+static void json_dump_str(json_dump_t *d, const byte *str, size_t len) {
+    static const char hex_digits[] = "0123456789abcdef";
+    json_dump_strn(d, "\"", 1);
+    const byte *run = str;
+    for (const byte *s = str, *top = str + len; s < top; s++) {
+        byte c = *s;
+        if (c >= 32 && c != '"' && c != '\\') {
+            // This includes utf-8 encoded chars.
+            continue;
+        }
+        json_dump_strn(d, (const char *)run, s - run);
+        run = s + 1;
+        char esc[6] = {'\\', c, '0', '0', hex_digits[c >> 4], hex_digits[c & 15]};
+        size_t esc_len = 2;
+        if (c == '\n') {
+            esc[1] = 'n';
+        } else if (c == '\r') {
+            esc[1] = 'r';
+        } else if (c == '\t') {
+            esc[1] = 't';
+        } else if (c < 32) {
+            esc[1] = 'u';
+            esc_len = 6;
+        }
+        json_dump_strn(d, esc, esc_len);
+    }
+    json_dump_strn(d, (const char *)run, str + len - run);
+    json_dump_strn(d, "\"", 1);
+}
+
+static void json_dump_small_int(json_dump_t *d, mp_int_t val) {
+    char buf[sizeof(mp_int_t) * 3 + 2];
+    char *p = buf + sizeof(buf);
+    mp_uint_t u = val < 0 ? -(mp_uint_t)val : (mp_uint_t)val;
+    do {
+        *--p = '0' + u % 10;
+        u /= 10;
+    } while (u != 0);
+    if (val < 0) {
+        *--p = '-';
+    }
+    json_dump_strn(d, p, buf + sizeof(buf) - p);
+}
+
+// Do the same checks as mp_obj_print_helper before printing a container.
+static bool json_dump_enter(void) {
+    mp_cstack_check();
+    #ifdef RUN_BACKGROUND_TASKS
+    RUN_BACKGROUND_TASKS;
+    #endif
+    #if MICROPY_KBD_EXCEPTION
+    if (mp_hal_is_interrupted()) {
+        return false;
+    }
+    #endif
+    return true;
+}
+
+static void json_dump_obj(json_dump_t *d, mp_obj_t obj) {
+    if (mp_obj_is_str(obj)) {
+        size_t len;
+        const char *str = mp_obj_str_get_data(obj, &len);
+        json_dump_str(d, (const byte *)str, len);
+    } else if (mp_obj_is_small_int(obj)) {
+        json_dump_small_int(d, MP_OBJ_SMALL_INT_VALUE(obj));
+    } else if (obj == mp_const_none) {
+        json_dump_strn(d, "null", 4);
+    } else if (obj == mp_const_true) {
+        json_dump_strn(d, "true", 4);
+    } else if (obj == mp_const_false) {
+        json_dump_strn(d, "false", 5);
+    } else if (mp_obj_is_exact_type(obj, &mp_type_list) || mp_obj_is_exact_type(obj, &mp_type_tuple)) {
+        if (!json_dump_enter()) {
+            return;
+        }
+        // Read the length and items on each pass, as a print method that is called
+        // for an item may run Python code that changes the list.
+        json_dump_strn(d, "[", 1);
+        for (size_t i = 0;; ++i) {
+            size_t len;
+            mp_obj_t *items;
+            mp_obj_get_array(obj, &len, &items);
+            if (i >= len) {
+                break;
+            }
+            if (i > 0) {
+                json_dump_strn(d, d->print_ext.item_separator, d->item_separator_len);
+            }
+            json_dump_obj(d, items[i]);
+        }
+        json_dump_strn(d, "]", 1);
+    } else if (mp_obj_is_exact_type(obj, &mp_type_dict)) {
+        if (!json_dump_enter()) {
+            return;
+        }
+        mp_map_t *map = mp_obj_dict_get_map(obj);
+        bool first = true;
+        json_dump_strn(d, "{", 1);
+        for (size_t i = 0; i < map->alloc; ++i) {
+            if (!mp_map_slot_is_filled(map, i)) {
+                continue;
+            }
+            mp_map_elem_t *elem = &map->table[i];
+            if (!first) {
+                json_dump_strn(d, d->print_ext.item_separator, d->item_separator_len);
+            }
+            first = false;
+            if (mp_obj_is_str_or_bytes(elem->key)) {
+                json_dump_obj(d, elem->key);
+            } else {
+                json_dump_strn(d, "\"", 1);
+                json_dump_obj(d, elem->key);
+                json_dump_strn(d, "\"", 1);
+            }
+            json_dump_strn(d, d->print_ext.key_separator, d->key_separator_len);
+            json_dump_obj(d, elem->value);
+        }
+        json_dump_strn(d, "}", 1);
+    } else {
+        mp_obj_print_helper(&d->print_ext.base, obj, PRINT_JSON);
+    }
+}
+
+#endif
+
+// Print obj as JSON to print, using its separators.
+static void mod_json_print(const mp_print_ext_t *print, mp_obj_t obj) {
+    #if MICROPY_PY_JSON_FAST_DUMP
+    json_dump_t d;
+    d.print_ext.base.data = &d;
+    d.print_ext.base.print_strn = json_dump_print_strn;
+    d.print_ext.item_separator = print->item_separator;
+    d.print_ext.key_separator = print->key_separator;
+    d.out = &print->base;
+    d.item_separator_len = strlen(print->item_separator);
+    d.key_separator_len = strlen(print->key_separator);
+    d.len = 0;
+    json_dump_obj(&d, obj);
+    json_dump_flush(&d);
+    #else
+    mp_obj_print_helper(&print->base, obj, PRINT_JSON);
+    #endif
+}
+
 #if MICROPY_PY_JSON_SEPARATORS
 
 enum {
@@ -69,14 +259,14 @@ static mp_obj_t mod_json_dump_helper(size_t n_args, const mp_obj_t *pos_args, mp
         // dumps(obj)
         vstr_t vstr;
         vstr_init_print(&vstr, 8, &print_ext.base);
-        mp_obj_print_helper(&print_ext.base, pos_args[0], PRINT_JSON);
+        mod_json_print(&print_ext, pos_args[0]);
         return mp_obj_new_str_from_utf8_vstr(&vstr);
     } else {
         // dump(obj, stream)
         print_ext.base.data = MP_OBJ_TO_PTR(pos_args[1]);
         print_ext.base.print_strn = mp_stream_write_adaptor;
         mp_get_stream_raise(pos_args[1], MP_STREAM_OP_WRITE);
-        mp_obj_print_helper(&print_ext.base, pos_args[0], PRINT_JSON);
+        mod_json_print(&print_ext, pos_args[0]);
         return mp_const_none;
     }
 }
@@ -95,17 +285,17 @@ static MP_DEFINE_CONST_FUN_OBJ_KW(mod_json_dumps_obj, 1, mod_json_dumps);
 
 static mp_obj_t mod_json_dump(mp_obj_t obj, mp_obj_t stream) {
     mp_get_stream_raise(stream, MP_STREAM_OP_WRITE);
-    mp_print_t print = {MP_OBJ_TO_PTR(stream), mp_stream_write_adaptor};
-    mp_obj_print_helper(&print, obj, PRINT_JSON);
+    mp_print_ext_t print = {{MP_OBJ_TO_PTR(stream), mp_stream_write_adaptor}, ", ", ": "};
+    mod_json_print(&print, obj);
     return mp_const_none;
 }
 static MP_DEFINE_CONST_FUN_OBJ_2(mod_json_dump_obj, mod_json_dump);
 
 static mp_obj_t mod_json_dumps(mp_obj_t obj) {
     vstr_t vstr;
-    mp_print_t print;
-    vstr_init_print(&vstr, 8, &print);
-    mp_obj_print_helper(&print, obj, PRINT_JSON);
+    mp_print_ext_t print = {{NULL, NULL}, ", ", ": "};
+    vstr_init_print(&vstr, 8, &print.base);
+    mod_json_print(&print, obj);
     return mp_obj_new_str_from_utf8_vstr(&vstr);
 }
 static MP_DEFINE_CONST_FUN_OBJ_1(mod_json_dumps_obj, mod_json_dumps);
@@ -190,49 +380,96 @@ static mp_uint_t json_python_readinto(mp_obj_t obj, void *buf, mp_uint_t size, i
     return 1;
 }
 
-static mp_obj_t _mod_json_load(mp_obj_t stream_obj, bool return_first_json) {
+static void json_stream_init(json_stream_t *s, mp_obj_t stream_obj, byte *buf) {
     const mp_stream_p_t *stream_p = mp_proto_get(0, stream_obj);
-    json_stream_t s;
-    uint8_t character_buffer[CIRCUITPY_JSON_READ_CHUNK_SIZE];
     if (stream_p == NULL) {
-        s.start = 0;
-        s.end = 0;
-        mp_load_method(stream_obj, MP_QSTR_readinto, s.python_readinto);
-        s.bytearray_obj.base.type = &mp_type_bytearray;
-        s.bytearray_obj.typecode = BYTEARRAY_TYPECODE;
-        s.bytearray_obj.len = CIRCUITPY_JSON_READ_CHUNK_SIZE;
-        s.bytearray_obj.free = 0;
-        s.bytearray_obj.items = character_buffer;
-        s.python_readinto[2] = MP_OBJ_FROM_PTR(&s.bytearray_obj);
-        s.stream_obj = &s;
-        s.read = json_python_readinto;
+        s->start = 0;
+        s->end = 0;
+        mp_load_method(stream_obj, MP_QSTR_readinto, s->python_readinto);
+        s->bytearray_obj.base.type = &mp_type_bytearray;
+        s->bytearray_obj.typecode = BYTEARRAY_TYPECODE;
+        s->bytearray_obj.len = CIRCUITPY_JSON_READ_CHUNK_SIZE;
+        s->bytearray_obj.free = 0;
+        s->bytearray_obj.items = buf;
+        s->python_readinto[2] = MP_OBJ_FROM_PTR(&s->bytearray_obj);
+        s->stream_obj = s;
+        s->read = json_python_readinto;
     } else {
         stream_p = mp_get_stream_raise(stream_obj, MP_STREAM_OP_READ);
-        s.stream_obj = stream_obj;
-        s.read = stream_p->read;
-        s.errcode = 0;
-        s.cur = 0;
+        s->stream_obj = stream_obj;
+        s->read = stream_p->read;
     }
+    s->errcode = 0;
+    s->cur = 0;
+}
 
-    JSON_DEBUG("got JSON stream\n");
-    vstr_t vstr;
-    vstr_init(&vstr, 8);
+// Read a string, the opening quote of which has been consumed, into vstr.
+// Returns false if the input ends first.
+static bool json_read_str(json_stream_t *s, vstr_t *vstr) {
+    vstr_reset(vstr);
+    for (; !S_END(*s) && S_CUR(*s) != '"';) {
+        byte c = S_CUR(*s);
+        if (c == '\\') {
+            c = S_NEXT(*s);
+            switch (c) {
+                case 'b':
+                    c = 0x08;
+                    break;
+                case 'f':
+                    c = 0x0c;
+                    break;
+                case 'n':
+                    c = 0x0a;
+                    break;
+                case 'r':
+                    c = 0x0d;
+                    break;
+                case 't':
+                    c = 0x09;
+                    break;
+                case 'u': {
+                    mp_uint_t num = 0;
+                    for (int i = 0; i < 4; i++) {
+                        c = (S_NEXT(*s) | 0x20) - '0';
+                        if (c > 9) {
+                            c -= ('a' - ('9' + 1));
+                        }
+                        num = (num << 4) | c;
+                    }
+                    vstr_add_char(vstr, num);
+                    goto str_cont;
+                }
+            }
+        }
+        vstr_add_byte(vstr, c);
+    str_cont:
+        S_NEXT(*s);
+    }
+    if (S_END(*s)) {
+        return false;
+    }
+    S_NEXT(*s);
+    return true;
+}
+
+// Parse one value, leaving the stream at the character just after it.
+// Returns MP_OBJ_NULL if the input isn't valid.
+static mp_obj_t json_load_value(json_stream_t *s, vstr_t *vstr) {
     mp_obj_list_t stack; // we use a list as a simple stack for nested JSON
     stack.len = 0;
     stack.items = NULL;
     mp_obj_t stack_top = MP_OBJ_NULL;
     const mp_obj_type_t *stack_top_type = NULL;
     mp_obj_t stack_key = MP_OBJ_NULL;
-    S_NEXT(s);
     for (;;) {
     cont:
-        if (S_END(s)) {
+        if (S_END(*s)) {
             break;
         }
         mp_obj_t next = MP_OBJ_NULL;
         bool enter = false;
-        byte cur = S_CUR(s);
-        S_NEXT(s);
+        byte cur = S_CUR(*s);
+        S_NEXT(*s);
         switch (cur) {
             case ',':
             case ':':
@@ -242,74 +479,34 @@ static mp_obj_t _mod_json_load(mp_obj_t stream_obj, bool return_first_json) {
             case '\r':
                 goto cont;
             case 'n':
-                if (S_CUR(s) == 'u' && S_NEXT(s) == 'l' && S_NEXT(s) == 'l') {
-                    S_NEXT(s);
+                if (S_CUR(*s) == 'u' && S_NEXT(*s) == 'l' && S_NEXT(*s) == 'l') {
+                    S_NEXT(*s);
                     next = mp_const_none;
                 } else {
-                    goto fail;
+                    return MP_OBJ_NULL;
                 }
                 break;
             case 'f':
-                if (S_CUR(s) == 'a' && S_NEXT(s) == 'l' && S_NEXT(s) == 's' && S_NEXT(s) == 'e') {
-                    S_NEXT(s);
+                if (S_CUR(*s) == 'a' && S_NEXT(*s) == 'l' && S_NEXT(*s) == 's' && S_NEXT(*s) == 'e') {
+                    S_NEXT(*s);
                     next = mp_const_false;
                 } else {
-                    goto fail;
+                    return MP_OBJ_NULL;
                 }
                 break;
             case 't':
-                if (S_CUR(s) == 'r' && S_NEXT(s) == 'u' && S_NEXT(s) == 'e') {
-                    S_NEXT(s);
+                if (S_CUR(*s) == 'r' && S_NEXT(*s) == 'u' && S_NEXT(*s) == 'e') {
+                    S_NEXT(*s);
                     next = mp_const_true;
                 } else {
-                    goto fail;
+                    return MP_OBJ_NULL;
                 }
                 break;
             case '"':
-                vstr_reset(&vstr);
-                for (; !S_END(s) && S_CUR(s) != '"';) {
-                    byte c = S_CUR(s);
-                    if (c == '\\') {
-                        c = S_NEXT(s);
-                        switch (c) {
-                            case 'b':
-                                c = 0x08;
-                                break;
-                            case 'f':
-                                c = 0x0c;
-                                break;
-                            case 'n':
-                                c = 0x0a;
-                                break;
-                            case 'r':
-                                c = 0x0d;
-                                break;
-                            case 't':
-                                c = 0x09;
-                                break;
-                            case 'u': {
-                                mp_uint_t num = 0;
-                                for (int i = 0; i < 4; i++) {
-                                    c = (S_NEXT(s) | 0x20) - '0';
-                                    if (c > 9) {
-                                        c -= ('a' - ('9' + 1));
-                                    }
-                                    num = (num << 4) | c;
-                                }
-                                vstr_add_char(&vstr, num);
-                                goto str_cont;
-                            }
-                        }
-                    }
-                    vstr_add_byte(&vstr, c);
-                str_cont:
-                    S_NEXT(s);
-                }
-                if (S_END(s)) {
-                    goto fail;
+                if (!json_read_str(s, vstr)) {
+                    return MP_OBJ_NULL;
                 }
-                S_NEXT(s);
-                next = mp_obj_new_str(vstr.buf, vstr.len);
+                next = mp_obj_new_str(vstr->buf, vstr->len);
                 break;
             case '-':
             case '0':
@@ -323,10 +520,10 @@ static mp_obj_t _mod_json_load(mp_obj_t stream_obj, bool return_first_json) {
             case '8':
             case '9': {
                 bool flt = false;
-                vstr_reset(&vstr);
+                vstr_reset(vstr);
                 for (;;) {
-                    vstr_add_byte(&vstr, cur);
-                    cur = S_CUR(s);
+                    vstr_add_byte(vstr, cur);
+                    cur = S_CUR(*s);
                     if (cur == '.' || cur == 'E' || cur == 'e') {
                         flt = true;
                     } else if (cur == '+' || cur == '-' || unichar_isdigit(cur)) {
@@ -334,12 +531,12 @@ static mp_obj_t _mod_json_load(mp_obj_t stream_obj, bool return_first_json) {
                     } else {
                         break;
                     }
-                    S_NEXT(s);
+                    S_NEXT(*s);
                 }
                 if (flt) {
-                    next = mp_parse_num_float(vstr.buf, vstr.len, false, NULL);
+                    next = mp_parse_num_float(vstr->buf, vstr->len, false, NULL);
                 } else {
-                    next = mp_parse_num_integer(vstr.buf, vstr.len, 10, NULL);
+                    next = mp_parse_num_integer(vstr->buf, vstr->len, 10, NULL);
                 }
                 break;
             }
@@ -355,11 +552,11 @@ static mp_obj_t _mod_json_load(mp_obj_t stream_obj, bool return_first_json) {
             case ']': {
                 if (stack_top == MP_OBJ_NULL) {
                     // no object at all
-                    goto fail;
+                    return MP_OBJ_NULL;
                 }
                 if (stack.len == 0) {
                     // finished; compound object
-                    goto success;
+                    return stack_top;
                 }
                 stack.len -= 1;
                 stack_top = stack.items[stack.len];
@@ -367,14 +564,14 @@ static mp_obj_t _mod_json_load(mp_obj_t stream_obj, bool return_first_json) {
                 goto cont;
             }
             default:
-                goto fail;
+                return MP_OBJ_NULL;
         }
         if (stack_top == MP_OBJ_NULL) {
             stack_top = next;
             stack_top_type = mp_obj_get_type(stack_top);
             if (!enter) {
                 // finished; single primitive only
-                goto success;
+                return stack_top;
             }
         } else {
             // append to list or dict
@@ -384,7 +581,7 @@ static mp_obj_t _mod_json_load(mp_obj_t stream_obj, bool return_first_json) {
                 if (stack_key == MP_OBJ_NULL) {
                     stack_key = next;
                     if (enter) {
-                        goto fail;
+                        return MP_OBJ_NULL;
                     }
                 } else {
                     mp_obj_dict_store(stack_top, stack_key, next);
@@ -403,7 +600,31 @@ static mp_obj_t _mod_json_load(mp_obj_t stream_obj, bool return_first_json) {
             }
         }
     }
-success:
+    if (stack.len != 0) {
+        // not exactly 1 object
+        return MP_OBJ_NULL;
+    }
+    return stack_top;
+}
+
+static NORETURN void json_syntax_error(void) {
+    mp_raise_ValueError(MP_ERROR_TEXT("syntax error in JSON"));
+}
+
+static mp_obj_t _mod_json_load(mp_obj_t stream_obj, bool return_first_json) {
+    json_stream_t s;
+    uint8_t character_buffer[CIRCUITPY_JSON_READ_CHUNK_SIZE];
+    json_stream_init(&s, stream_obj, character_buffer);
+
+    JSON_DEBUG("got JSON stream\n");
+    vstr_t vstr;
+    vstr_init(&vstr, 8);
+    S_NEXT(s);
+    mp_obj_t value = json_load_value(&s, &vstr);
+    if (value == MP_OBJ_NULL) {
+        json_syntax_error();
+    }
+
     // CIRCUITPY-CHANGE
 
     // It is legal for a stream to have contents after JSON.
@@ -416,20 +637,213 @@ success:
         }
         if (!S_END(s)) {
             // unexpected chars
-            goto fail;
+            json_syntax_error();
         }
     }
-    if (stack_top == MP_OBJ_NULL || stack.len != 0) {
-        // not exactly 1 object
-        goto fail;
-    }
     vstr_clear(&vstr);
-    return stack_top;
+    return value;
+}
 
-fail:
-    mp_raise_ValueError(MP_ERROR_TEXT("syntax error in JSON"));
+#if MICROPY_PY_JSON_ITERLOAD
+
+// iterload() parses the stream as it is iterated over, and only creates the
+// values at the given path.  Everything else is skipped over.  The containers
+// along the path are tracked in levels, and those at other paths are skipped
+// without being tracked, so only as many levels as the path is long are needed.
+
+typedef struct _json_iter_level_t {
+    size_t index; // of the next item in a list
+    bool is_dict;
+    bool want_key; // a dict is expecting a key next, rather than a value
+    bool key_match; // the key of the next value in a dict is on the path
+} json_iter_level_t;
+
+typedef struct _mp_obj_json_iter_t {
+    mp_obj_base_t base;
+    mp_fun_1_t iternext;
+    json_stream_t s;
+    vstr_t vstr;
+    size_t path_len;
+    mp_obj_t *path;
+    json_iter_level_t *levels;
+    size_t depth;
+    bool started;
+    byte buf[CIRCUITPY_JSON_READ_CHUNK_SIZE];
+} mp_obj_json_iter_t;
+
+// Skip over one value without creating it.  Returns false if the input isn't
+// valid (or at least, not in a way that would make the skipping go wrong).
+static bool json_skip_value(json_stream_t *s) {
+    size_t nest = 0;
+    do {
+        if (S_END(*s)) {
+            return false;
+        }
+        byte c = S_CUR(*s);
+        S_NEXT(*s);
+        if (c == '[' || c == '{') {
+            nest += 1;
+        } else if (c == ']' || c == '}') {
+            if (nest == 0) {
+                return false;
+            }
+            nest -= 1;
+        } else if (c == '"') {
+            while (!S_END(*s) && S_CUR(*s) != '"') {
+                if (S_CUR(*s) == '\\') {
+                    S_NEXT(*s);
+                }
+                S_NEXT(*s);
+            }
+            if (S_END(*s)) {
+                return false;
+            }
+            S_NEXT(*s);
+        } else if (unichar_isalnum(c) || c == '-') {
+            // a number or one of null, false and true
+            while (unichar_isalnum(S_CUR(*s)) || S_CUR(*s) == '+' || S_CUR(*s) == '-' || S_CUR(*s) == '.') {
+                S_NEXT(*s);
+            }
+        } else if (c != ',' && c != ':' && !unichar_isspace(c)) {
+            return false;
+        }
+    } while (nest > 0);
+    return true;
+}
+
+// A value in the innermost tracked container has been parsed or skipped.
+static void json_iter_value_done(mp_obj_json_iter_t *self) {
+    if (self->depth > 0) {
+        json_iter_level_t *level = &self->levels[self->depth - 1];
+        level->want_key = level->is_dict;
+        level->index += 1;
+    }
 }
 
+static mp_obj_t json_iter_iternext(mp_obj_t self_in) {
+    mp_obj_json_iter_t *self = MP_OBJ_TO_PTR(self_in);
+    json_stream_t *s = &self->s;
+    if (!self->started) {
+        self->started = true;
+        S_NEXT(*s);
+    } else if (self->depth == 0) {
+        // Done with the top-level value.  Anything after it is left unread, as
+        // for load().
+        return MP_OBJ_STOP_ITERATION;
+    }
+    for (;;) {
+        while (S_CUR(*s) == ',' || S_CUR(*s) == ':' || unichar_isspace(S_CUR(*s))) {
+            S_NEXT(*s);
+        }
+        byte c = S_CUR(*s);
+        if (S_END(*s)) {
+            json_syntax_error();
+        }
+        if (c == ']' || c == '}') {
+            if (self->depth == 0) {
+                json_syntax_error();
+            }
+            if (self->levels[self->depth - 1].is_dict && !self->levels[self->depth - 1].want_key) {
+                // a key without a value
+                json_syntax_error();
+            }
+            S_NEXT(*s);
+            self->depth -= 1;
+            if (self->depth == 0) {
+                return MP_OBJ_STOP_ITERATION;
+            }
+            json_iter_value_done(self);
+            continue;
+        }
+
+        // Work out whether the value that starts here is on the path.
+        bool match = true;
+        if (self->depth > 0) {
+            json_iter_level_t *level = &self->levels[self->depth - 1];
+            mp_obj_t want = self->path[self->depth - 1];
+            if (level->want_key) {
+                if (c != '"') {
+                    json_syntax_error();
+                }
+                S_NEXT(*s);
+                if (!json_read_str(s, &self->vstr)) {
+                    json_syntax_error();
+                }
+                level->want_key = false;
+                level->key_match = want == mp_const_none;
+                if (mp_obj_is_str(want)) {
+                    size_t len;
+                    const char *key = mp_obj_str_get_data(want, &len);
+                    level->key_match = len == self->vstr.len && memcmp(key, self->vstr.buf, len) == 0;
+                }
+                continue;
+            }
+            if (level->is_dict) {
+                match = level->key_match;
+            } else {
+                match = want == mp_const_none
+                    || (mp_obj_is_small_int(want) && MP_OBJ_SMALL_INT_VALUE(want) == (mp_int_t)level->index);
+            }
+        }
+
+        if (match && self->depth == self->path_len) {
+            mp_obj_t value = json_load_value(s, &self->vstr);
+            if (value == MP_OBJ_NULL) {
+                json_syntax_error();
+            }
+            json_iter_value_done(self);
+            return value;
+        } else if (match && (c == '[' || c == '{')) {
+            S_NEXT(*s);
+            json_iter_level_t *level = &self->levels[self->depth++];
+            level->index = 0;
+            level->is_dict = c == '{';
+            level->want_key = level->is_dict;
+        } else {
+            if (!json_skip_value(s)) {
+                json_syntax_error();
+            }
+            if (self->depth == 0) {
+                return MP_OBJ_STOP_ITERATION;
+            }
+            json_iter_value_done(self);
+        }
+    }
+}
+
+static mp_obj_t mod_json_iterload(size_t n_args, const mp_obj_t *pos_args, mp_map_t *kw_args) {
+    enum { ARG_stream, ARG_path };
+    static const mp_arg_t allowed_args[] = {
+        { MP_QSTR_stream, MP_ARG_REQUIRED | MP_ARG_OBJ, {.u_obj = MP_OBJ_NULL} },
+        { MP_QSTR_path, MP_ARG_OBJ, {.u_obj = mp_const_empty_tuple} },
+    };
+    mp_arg_val_t args[MP_ARRAY_SIZE(allowed_args)];
+    mp_arg_parse_all(n_args, pos_args, kw_args, MP_ARRAY_SIZE(allowed_args), allowed_args, args);
+
+    mp_obj_json_iter_t *self = mp_obj_malloc(mp_obj_json_iter_t, &mp_type_polymorph_iter);
+    self->iternext = json_iter_iternext;
+    json_stream_init(&self->s, args[ARG_stream].u_obj, self->buf);
+    vstr_init(&self->vstr, 8);
+    size_t path_len;
+    mp_obj_t *path;
+    mp_obj_get_array(args[ARG_path].u_obj, &path_len, &path);
+    for (size_t i = 0; i < path_len; i++) {
+        if (path[i] != mp_const_none && !mp_obj_is_str(path[i]) && !mp_obj_is_small_int(path[i])) {
+            mp_raise_TypeError(MP_ERROR_TEXT("path items must be str, int or None"));
+        }
+    }
+    self->path_len = path_len;
+    self->path = m_new(mp_obj_t, path_len);
+    memcpy(self->path, path, path_len * sizeof(mp_obj_t));
+    self->levels = m_new(json_iter_level_t, path_len);
+    self->depth = 0;
+    self->started = false;
+    return MP_OBJ_FROM_PTR(self);
+}
+static MP_DEFINE_CONST_FUN_OBJ_KW(mod_json_iterload_obj, 1, mod_json_iterload);
+
+#endif
+
 // CIRCUITPY-CHANGE
 static mp_obj_t mod_json_load(mp_obj_t stream_obj) {
     return _mod_json_load(stream_obj, true);
@@ -452,6 +866,9 @@ static const mp_rom_map_elem_t mp_module_json_globals_table[] = {
     { MP_ROM_QSTR(MP_QSTR_dumps), MP_ROM_PTR(&mod_json_dumps_obj) },
     { MP_ROM_QSTR(MP_QSTR_load), MP_ROM_PTR(&mod_json_load_obj) },
     { MP_ROM_QSTR(MP_QSTR_loads), MP_ROM_PTR(&mod_json_loads_obj) },
+    #if MICROPY_PY_JSON_ITERLOAD
+    { MP_ROM_QSTR(MP_QSTR_iterload), MP_ROM_PTR(&mod_json_iterload_obj) },
+    #endif
 };
 
 static MP_DEFINE_CONST_DICT(mp_module_json_globals, mp_module_json_globals_table);
@@ -49,6 +49,10 @@
 #include "extmod/vfs_posix.h"
 #endif
 
+#if MICROPY_VFS_ROM
+#include "extmod/vfs_rom.h"
+#endif
+
 #if MICROPY_MBFS
 #if MICROPY_VFS
 #error "MICROPY_MBFS requires MICROPY_VFS to be disabled"
@@ -214,6 +218,9 @@ static const mp_rom_map_elem_t os_module_globals_table[] = {
     #if MICROPY_VFS_POSIX
     { MP_ROM_QSTR(MP_QSTR_VfsPosix), MP_ROM_PTR(&mp_type_vfs_posix) },
     #endif
+    #if MICROPY_VFS_ROM
+    { MP_ROM_QSTR(MP_QSTR_VfsRom), MP_ROM_PTR(&mp_type_vfs_rom) },
+    #endif
     #endif
 
     #if MICROPY_MBFS
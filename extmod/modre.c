@@ -32,6 +32,7 @@
 #include "py/binary.h"
 #include "py/objstr.h"
 #include "py/cstack.h"
+#include "py/mphal.h"
 
 #if MICROPY_PY_BUILTINS_STR_UNICODE
 #include "py/unicode.h"
@@ -40,13 +41,19 @@
 #if MICROPY_PY_RE
 
 #define re1_5_stack_chk() mp_cstack_check()
+#define re1_5_alloc(n) m_malloc(n)
+#define re1_5_free(p, n) m_del(char, p, n)
 
 #include "lib/re1.5/re1.5.h"
 
 #define FLAG_DEBUG 0x1000
+#define FLAG_LINEAR 0x2000
 
 typedef struct _mp_obj_re_t {
     mp_obj_base_t base;
+    #if MICROPY_PY_RE_LINEAR
+    mp_uint_t flags;
+    #endif
     ByteProg re;
 } mp_obj_re_t;
 
@@ -194,6 +201,16 @@ static void re_print(const mp_print_t *print, mp_obj_t self_in, mp_print_kind_t
     mp_printf(print, "<re %p>", self);
 }
 
+// Run the compiled program, with the matcher selected by its flags.
+static int re_exec_prog(mp_obj_re_t *self, Subject *subj, const char **caps, int caps_num, bool is_anchored) {
+    #if MICROPY_PY_RE_LINEAR
+    if (self->flags & FLAG_LINEAR) {
+        return re1_5_pikevm(&self->re, subj, caps, caps_num, is_anchored);
+    }
+    #endif
+    return re1_5_recursiveloopprog(&self->re, subj, caps, caps_num, is_anchored);
+}
+
 // Note: this function can't be named re_exec because it may clash with system headers, eg on FreeBSD
 static mp_obj_t re_exec_helper(bool is_anchored, uint n_args, const mp_obj_t *args) {
     (void)n_args;
@@ -242,7 +259,7 @@ static mp_obj_t re_exec_helper(bool is_anchored, uint n_args, const mp_obj_t *ar
     mp_obj_match_t *match = m_new_obj_var(mp_obj_match_t, caps, char *, caps_num);
     // cast is a workaround for a bug in msvc: it treats const char** as a const pointer instead of a pointer to pointer to const char
     memset((char *)match->caps, 0, caps_num * sizeof(char *));
-    int res = re1_5_recursiveloopprog(&self->re, &subj, match->caps, caps_num, is_anchored);
+    int res = re_exec_prog(self, &subj, match->caps, caps_num, is_anchored);
     if (res == 0) {
         m_del_var(mp_obj_match_t, caps, char *, caps_num, match);
         return mp_const_none;
@@ -283,7 +300,7 @@ static mp_obj_t re_split(size_t n_args, const mp_obj_t *args) {
     while (true) {
         // cast is a workaround for a bug in msvc: it treats const char** as a const pointer instead of a pointer to pointer to const char
         memset((char **)caps, 0, caps_num * sizeof(char *));
-        int res = re1_5_recursiveloopprog(&self->re, &subj, caps, caps_num, false);
+        int res = re_exec_prog(self, &subj, caps, caps_num, false);
 
         // if we didn't have a match, or had an empty match, it's time to stop
         if (!res || caps[0] == caps[1]) {
@@ -343,7 +360,7 @@ static mp_obj_t re_sub_helper(size_t n_args, const mp_obj_t *args) {
     for (;;) {
         // cast is a workaround for a bug in msvc: it treats const char** as a const pointer instead of a pointer to pointer to const char
         memset((char *)match->caps, 0, caps_num * sizeof(char *));
-        int res = re1_5_recursiveloopprog(&self->re, &subj, match->caps, caps_num, false);
+        int res = re_exec_prog(self, &subj, match->caps, caps_num, false);
 
         // If we didn't have a match, or had an empty match, it's time to stop
         if (!res || match->caps[0] == match->caps[1]) {
@@ -453,19 +470,85 @@ static MP_DEFINE_CONST_OBJ_TYPE(
     );
 #endif
 
+#if MICROPY_PY_RE_CACHE_SIZE && !MICROPY_ENABLE_DYNRUNTIME
+
+// The most recently compiled patterns are kept in MP_STATE_VM(re_cache), as pairs
+// of the pattern string and the compiled object, most recently used first.  This
+// saves compiling a pattern on every call of the module-level functions.
+
+#if MICROPY_PY_THREAD && !MICROPY_PY_THREAD_GIL
+#define RE_CACHE_LOCK() mp_uint_t atomic_state = MICROPY_BEGIN_ATOMIC_SECTION()
+#define RE_CACHE_UNLOCK() MICROPY_END_ATOMIC_SECTION(atomic_state)
+#else
+#define RE_CACHE_LOCK()
+#define RE_CACHE_UNLOCK()
+#endif
+
+static mp_obj_t re_cache_lookup(mp_obj_t pattern, mp_uint_t flags) {
+    mp_obj_t *cache = MP_STATE_VM(re_cache);
+    mp_obj_t re = MP_OBJ_NULL;
+    RE_CACHE_LOCK();
+    for (size_t i = 0; i < 2 * MICROPY_PY_RE_CACHE_SIZE && cache[i] != MP_OBJ_NULL; i += 2) {
+        mp_obj_t key = cache[i];
+        #if MICROPY_PY_RE_LINEAR
+        if (((mp_obj_re_t *)MP_OBJ_TO_PTR(cache[i + 1]))->flags != flags) {
+            continue;
+        }
+        #else
+        (void)flags;
+        #endif
+        if (key == pattern || (mp_obj_is_str(key) == mp_obj_is_str(pattern) && mp_obj_equal(key, pattern))) {
+            re = cache[i + 1];
+            memmove(cache + 2, cache, i * sizeof(mp_obj_t));
+            cache[0] = key;
+            cache[1] = re;
+            break;
+        }
+    }
+    RE_CACHE_UNLOCK();
+    return re;
+}
+
+static void re_cache_insert(mp_obj_t pattern, mp_obj_t re) {
+    mp_obj_t *cache = MP_STATE_VM(re_cache);
+    RE_CACHE_LOCK();
+    memmove(cache + 2, cache, (2 * MICROPY_PY_RE_CACHE_SIZE - 2) * sizeof(mp_obj_t));
+    cache[0] = pattern;
+    cache[1] = re;
+    RE_CACHE_UNLOCK();
+}
+
+MP_REGISTER_ROOT_POINTER(mp_obj_t re_cache[2 * MICROPY_PY_RE_CACHE_SIZE]);
+
+#endif
+
 static mp_obj_t mod_re_compile(size_t n_args, const mp_obj_t *args) {
-    (void)n_args;
+    mp_uint_t flags = 0;
+    if (n_args > 1) {
+        flags = mp_obj_get_int(args[1]);
+    }
+    #if MICROPY_PY_RE_LINEAR
+    // Only keep the flags that change the compiled object.
+    flags &= FLAG_DEBUG | FLAG_LINEAR;
+    #else
+    flags &= FLAG_DEBUG;
+    #endif
+    #if MICROPY_PY_RE_CACHE_SIZE && !MICROPY_ENABLE_DYNRUNTIME
+    if (!(flags & FLAG_DEBUG)) {
+        mp_obj_t re = re_cache_lookup(args[0], flags);
+        if (re != MP_OBJ_NULL) {
+            return re;
+        }
+    }
+    #endif
     const char *re_str = mp_obj_str_get_str(args[0]);
     int size = re1_5_sizecode(re_str);
     if (size == -1) {
         goto error;
     }
     mp_obj_re_t *o = mp_obj_malloc_var(mp_obj_re_t, re.insts, char, size, (mp_obj_type_t *)&re_type);
-    #if MICROPY_PY_RE_DEBUG
-    int flags = 0;
-    if (n_args > 1) {
-        flags = mp_obj_get_int(args[1]);
-    }
+    #if MICROPY_PY_RE_LINEAR
+    o->flags = flags & FLAG_LINEAR;
     #endif
     int error = re1_5_compilecode(&o->re, re_str);
     if (error != 0) {
@@ -477,6 +560,11 @@ static mp_obj_t mod_re_compile(size_t n_args, const mp_obj_t *args) {
         re1_5_dumpcode(&o->re);
     }
     #endif
+    #if MICROPY_PY_RE_CACHE_SIZE && !MICROPY_ENABLE_DYNRUNTIME
+    if (!(flags & FLAG_DEBUG)) {
+        re_cache_insert(args[0], MP_OBJ_FROM_PTR(o));
+    }
+    #endif
     return MP_OBJ_FROM_PTR(o);
 }
 MP_DEFINE_CONST_FUN_OBJ_VAR_BETWEEN(mod_re_compile_obj, 1, 2, mod_re_compile);
@@ -493,6 +581,9 @@ static const mp_rom_map_elem_t mp_module_re_globals_table[] = {
     #if MICROPY_PY_RE_DEBUG
     { MP_ROM_QSTR(MP_QSTR_DEBUG), MP_ROM_INT(FLAG_DEBUG) },
     #endif
+    #if MICROPY_PY_RE_LINEAR
+    { MP_ROM_QSTR(MP_QSTR_LINEAR), MP_ROM_INT(FLAG_LINEAR) },
+    #endif
 };
 
 static MP_DEFINE_CONST_DICT(mp_module_re_globals, mp_module_re_globals_table);
@@ -512,6 +603,9 @@ MP_REGISTER_EXTENSIBLE_MODULE(MP_QSTR_re, mp_module_re);
 
 #include "lib/re1.5/compilecode.c"
 #include "lib/re1.5/recursiveloop.c"
+#if MICROPY_PY_RE_LINEAR
+#include "lib/re1.5/pike.c"
+#endif
 #include "lib/re1.5/charclass.c"
 
 #if MICROPY_PY_RE_DEBUG
@@ -29,6 +29,7 @@
 #include "py/runtime.h"
 #include "py/obj.h"
 #include "py/objlist.h"
+#include "py/objtype.h"
 #include "py/stream.h"
 #include "py/mperrno.h"
 #include "py/mphal.h"
@@ -41,6 +42,10 @@
 #error "select.select is not supported with MICROPY_PY_SELECT_POSIX_OPTIMISATIONS"
 #endif
 
+#if MICROPY_PY_SELECT_EPOLL && !MICROPY_PY_SELECT_POSIX_OPTIMISATIONS
+#error "MICROPY_PY_SELECT_EPOLL requires MICROPY_PY_SELECT_POSIX_OPTIMISATIONS"
+#endif
+
 #if MICROPY_PY_SELECT_POSIX_OPTIMISATIONS
 
 #include <string.h>
@@ -61,9 +66,36 @@
 
 #endif
 
+#if MICROPY_PY_SELECT_EPOLL
+
+#include <errno.h>
+#include <unistd.h>
+#include <sys/epoll.h>
+
+// The number of events read from epoll by each call to epoll_wait().
+#define POLL_SET_EPOLL_EVENTS (16)
+
+#endif
+
 // Flags for ipoll()
 #define FLAG_ONESHOT (1)
 
+// How the readiness of a pollable object is found.
+enum {
+    // Polled by each poll, with the system poll() if it has a file descriptor, or
+    // otherwise by calling its ioctl(MP_STREAM_POLL).
+    POLL_OBJ_KIND_SCAN,
+    #if MICROPY_PY_SELECT_EPOLL
+    // Its file descriptor is registered with the epoll instance of the poll set.
+    POLL_OBJ_KIND_EPOLL,
+    #endif
+    #if MICROPY_PY_SELECT_NOTIFY
+    // It accepted ioctl(MP_STREAM_POLL_NOTIFY), and calls mp_stream_poll_notify()
+    // when it may have become ready.
+    POLL_OBJ_KIND_NOTIFY,
+    #endif
+};
+
 // A single pollable object.
 typedef struct _poll_obj_t {
     mp_obj_t obj;
@@ -75,6 +107,7 @@ typedef struct _poll_obj_t {
     // Otherwise the object is a non-file-descriptor object and pollfd==NULL, and the events/
     // revents fields are stored in the nonfd_* members (which are named as such so that code
     // doesn't accidentally mix the use of these members when this optimisation is used).
+    // Objects registered with epoll also have pollfd==NULL and use the nonfd_* members.
     struct pollfd *pollfd;
     uint16_t nonfd_events;
     uint16_t nonfd_revents;
@@ -82,6 +115,17 @@ typedef struct _poll_obj_t {
     mp_uint_t events;
     mp_uint_t revents;
     #endif
+    // Next object on poll_set_t::ready, valid while on_ready_list is set (and left
+    // as it was when the object is removed, see poll_set_remove_ready()).
+    struct _poll_obj_t *next_ready;
+    #if MICROPY_PY_SELECT_EPOLL || MICROPY_PY_SELECT_NOTIFY
+    struct _poll_set_t *poll_set;
+    #endif
+    #if MICROPY_PY_SELECT_EPOLL
+    int fd;
+    #endif
+    uint8_t kind;
+    bool on_ready_list;
 } poll_obj_t;
 
 // A set of pollable objects.
@@ -89,6 +133,16 @@ typedef struct _poll_set_t {
     // Map containing a dict with key=object to poll, value=its corresponding poll_obj_t.
     mp_map_t map;
 
+    // List of the objects that the last poll found to be ready, plus those of kind
+    // POLL_OBJ_KIND_NOTIFY that notified they may be ready since then.  The results
+    // are read from this list, so they take time in proportion to the number of
+    // ready objects rather than the number of registered ones.
+    poll_obj_t *ready;
+
+    #if MICROPY_PY_SELECT_NOTIFY
+    unsigned short n_notify; // number of objects of kind POLL_OBJ_KIND_NOTIFY
+    #endif
+
     #if MICROPY_PY_SELECT_POSIX_OPTIMISATIONS
     // Array of pollfd entries for objects that have a file descriptor.
     unsigned short alloc; // memory allocated for pollfds
@@ -96,16 +150,33 @@ typedef struct _poll_set_t {
     unsigned short used; // actual number of used entries in pollfds
     struct pollfd *pollfds;
     #endif
+
+    #if MICROPY_PY_SELECT_EPOLL
+    // The epoll instance, created when the first object is registered with it, and
+    // its entry in pollfds (for when there are also objects that epoll can't take).
+    int epoll_fd;
+    unsigned short epoll_slot;
+    unsigned short n_epoll; // number of objects of kind POLL_OBJ_KIND_EPOLL
+    #endif
 } poll_set_t;
 
 static void poll_set_init(poll_set_t *poll_set, size_t n) {
     mp_map_init(&poll_set->map, n);
+    poll_set->ready = NULL;
+    #if MICROPY_PY_SELECT_NOTIFY
+    poll_set->n_notify = 0;
+    #endif
     #if MICROPY_PY_SELECT_POSIX_OPTIMISATIONS
     poll_set->alloc = 0;
     poll_set->max_used = 0;
     poll_set->used = 0;
     poll_set->pollfds = NULL;
     #endif
+    #if MICROPY_PY_SELECT_EPOLL
+    poll_set->epoll_fd = -1;
+    poll_set->epoll_slot = 0;
+    poll_set->n_epoll = 0;
+    #endif
 }
 
 #if MICROPY_PY_SELECT_SELECT
@@ -114,6 +185,44 @@ static void poll_set_deinit(poll_set_t *poll_set) {
 }
 #endif
 
+#if MICROPY_PY_SELECT_NOTIFY
+// mp_stream_poll_notify() adds to the ready list, possibly from an interrupt.
+#define READY_LIST_BEGIN_ATOMIC() MICROPY_BEGIN_ATOMIC_SECTION()
+#define READY_LIST_END_ATOMIC(state) MICROPY_END_ATOMIC_SECTION(state)
+#else
+#define READY_LIST_BEGIN_ATOMIC() (0)
+#define READY_LIST_END_ATOMIC(state) (void)(state)
+#endif
+
+// Add an object to the ready list.  Returns false if it was on the list already.
+static bool poll_set_push_ready(poll_set_t *poll_set, poll_obj_t *poll_obj) {
+    bool pushed = false;
+    mp_uint_t atomic_state = READY_LIST_BEGIN_ATOMIC();
+    if (!poll_obj->on_ready_list) {
+        poll_obj->on_ready_list = true;
+        poll_obj->next_ready = poll_set->ready;
+        poll_set->ready = poll_obj;
+        pushed = true;
+    }
+    READY_LIST_END_ATOMIC(atomic_state);
+    return pushed;
+}
+
+static void poll_set_remove_ready(poll_set_t *poll_set, poll_obj_t *poll_obj) {
+    mp_uint_t atomic_state = READY_LIST_BEGIN_ATOMIC();
+    if (poll_obj->on_ready_list) {
+        poll_obj_t **p = &poll_set->ready;
+        while (*p != poll_obj) {
+            p = &(*p)->next_ready;
+        }
+        // The next_ready field is left as is, so an ipoll() iterator that is on this
+        // object can still move on from it.
+        *p = poll_obj->next_ready;
+        poll_obj->on_ready_list = false;
+    }
+    READY_LIST_END_ATOMIC(atomic_state);
+}
+
 #if MICROPY_PY_SELECT_POSIX_OPTIMISATIONS
 
 static mp_uint_t poll_obj_get_events(poll_obj_t *poll_obj) {
@@ -126,6 +235,14 @@ static void poll_obj_set_events(poll_obj_t *poll_obj, mp_uint_t events) {
         poll_obj->pollfd->events = events;
     } else {
         poll_obj->nonfd_events = events;
+        #if MICROPY_PY_SELECT_EPOLL
+        if (poll_obj->kind == POLL_OBJ_KIND_EPOLL) {
+            struct epoll_event ev = { .events = events, .data.ptr = poll_obj };
+            if (epoll_ctl(poll_obj->poll_set->epoll_fd, EPOLL_CTL_MOD, poll_obj->fd, &ev) != 0) {
+                mp_raise_OSError(errno);
+            }
+        }
+        #endif
     }
 }
 
@@ -177,7 +294,9 @@ static struct pollfd *poll_set_add_fd(poll_set_t *poll_set, int fd) {
                         continue;
                     }
 
-                    poll_obj->pollfd = new_fds + (poll_obj->pollfd - poll_set->pollfds);
+                    if (poll_obj->pollfd != NULL) {
+                        poll_obj->pollfd = new_fds + (poll_obj->pollfd - poll_set->pollfds);
+                    }
                 }
 
                 // Delete the old allocation.
@@ -206,8 +325,16 @@ static struct pollfd *poll_set_add_fd(poll_set_t *poll_set, int fd) {
     return free_slot;
 }
 
+// Whether all objects are waited on by the system, rather than polled periodically.
 static inline bool poll_set_all_are_fds(poll_set_t *poll_set) {
-    return poll_set->map.used == poll_set->used;
+    size_t n_fds = poll_set->used;
+    #if MICROPY_PY_SELECT_EPOLL
+    if (poll_set->epoll_fd >= 0) {
+        // The epoll instance has an entry in pollfds and is not a registered object.
+        n_fds += poll_set->n_epoll - 1;
+    }
+    #endif
+    return poll_set->map.used == n_fds;
 }
 
 #else
@@ -230,6 +357,191 @@ static inline void poll_obj_set_revents(poll_obj_t *poll_obj, mp_uint_t revents)
 
 #endif
 
+// The number of objects of kind POLL_OBJ_KIND_SCAN.
+static inline size_t poll_set_num_scan(poll_set_t *poll_set) {
+    size_t n = poll_set->map.used;
+    #if MICROPY_PY_SELECT_NOTIFY
+    n -= poll_set->n_notify;
+    #endif
+    #if MICROPY_PY_SELECT_EPOLL
+    n -= poll_set->n_epoll;
+    #endif
+    return n;
+}
+
+#if MICROPY_PY_SELECT_EPOLL
+
+// Register an object's file descriptor with the epoll instance of the poll set,
+// creating that first if needed.  Returns false if epoll can't take it, in which
+// case it's polled as before.
+static bool poll_set_epoll_add(poll_set_t *poll_set, poll_obj_t *poll_obj, int fd, mp_uint_t events) {
+    // The events are passed to and from epoll as they are.
+    MP_STATIC_ASSERT(MP_STREAM_POLL_RD == EPOLLIN && MP_STREAM_POLL_WR == EPOLLOUT
+        && MP_STREAM_POLL_ERR == EPOLLERR && MP_STREAM_POLL_HUP == EPOLLHUP);
+
+    if (poll_set->epoll_fd < 0) {
+        struct pollfd *slot = poll_set_add_fd(poll_set, -1);
+        int epoll_fd = epoll_create1(EPOLL_CLOEXEC);
+        if (epoll_fd < 0) {
+            // Free the slot again.
+            --poll_set->used;
+            return false;
+        }
+        slot->fd = epoll_fd;
+        slot->events = POLLIN;
+        slot->revents = 0;
+        poll_set->epoll_fd = epoll_fd;
+        poll_set->epoll_slot = slot - poll_set->pollfds;
+    }
+
+    struct epoll_event ev = { .events = events, .data.ptr = poll_obj };
+    if (epoll_ctl(poll_set->epoll_fd, EPOLL_CTL_ADD, fd, &ev) != 0) {
+        // Eg a regular file or /dev/null, which epoll doesn't support (EPERM), or a
+        // file descriptor that is registered already through another object (EEXIST).
+        return false;
+    }
+    poll_obj->kind = POLL_OBJ_KIND_EPOLL;
+    poll_obj->poll_set = poll_set;
+    poll_obj->fd = fd;
+    poll_obj->pollfd = NULL;
+    poll_obj->nonfd_events = events;
+    ++poll_set->n_epoll;
+    return true;
+}
+
+// Add the objects that epoll returned events for to the ready list, and return
+// how many were added.
+static mp_uint_t poll_set_epoll_collect(poll_set_t *poll_set, struct epoll_event *events, int n) {
+    mp_uint_t n_ready = 0;
+    for (int i = 0; i < n; ++i) {
+        poll_obj_t *poll_obj = events[i].data.ptr;
+        // If the file was closed without being unregistered and its file descriptor
+        // was duplicated, epoll can still return events for it after it's
+        // unregistered, so check that it's still in the map.
+        mp_map_elem_t *elem = mp_map_lookup(&poll_set->map, mp_obj_id(poll_obj->obj), MP_MAP_LOOKUP);
+        if (elem == NULL || MP_OBJ_TO_PTR(elem->value) != poll_obj) {
+            continue;
+        }
+        poll_obj_set_revents(poll_obj, events[i].events);
+        if (poll_set_push_ready(poll_set, poll_obj)) {
+            ++n_ready;
+        }
+    }
+    return n_ready;
+}
+
+// Read all pending events from epoll, without waiting.
+static mp_uint_t poll_set_epoll_read(poll_set_t *poll_set) {
+    struct epoll_event events[POLL_SET_EPOLL_EVENTS];
+    mp_uint_t n_ready = 0;
+    for (;;) {
+        int n = epoll_wait(poll_set->epoll_fd, events, POLL_SET_EPOLL_EVENTS, 0);
+        if (n == -1) {
+            int err = errno;
+            if (err == EINTR) {
+                continue;
+            }
+            mp_raise_OSError(err);
+        }
+        mp_uint_t n_new = poll_set_epoll_collect(poll_set, events, n);
+        n_ready += n_new;
+        // epoll moves the entries it returns to the back of its list, so once a
+        // full buffer brings nothing new every ready object has been seen.
+        if (n < POLL_SET_EPOLL_EVENTS || n_new == 0) {
+            return n_ready;
+        }
+    }
+}
+
+#endif
+
+#if MICROPY_PY_SELECT_NOTIFY
+
+// Ask a stream to notify the poll set when it may have become ready, so that it
+// doesn't need to be polled.  A Python stream class is not asked, as its ioctl
+// method may return 0 for requests that it doesn't know.
+static void poll_set_subscribe(poll_set_t *poll_set, poll_obj_t *poll_obj) {
+    if (!mp_obj_is_native_type(mp_obj_get_type(poll_obj->obj))) {
+        return;
+    }
+    poll_obj->poll_set = poll_set;
+    int errcode;
+    if (poll_obj->ioctl(poll_obj->obj, MP_STREAM_POLL_NOTIFY, (uintptr_t)poll_obj, &errcode) == 0) {
+        poll_obj->kind = POLL_OBJ_KIND_NOTIFY;
+        ++poll_set->n_notify;
+        // It may be ready already, so have the next poll check it.
+        poll_set_push_ready(poll_set, poll_obj);
+    }
+}
+
+// Poll the objects of kind POLL_OBJ_KIND_NOTIFY that are on the ready list, and
+// keep those that are ready.  The others are dropped until they notify again.
+static mp_uint_t poll_set_check_notified(poll_set_t *poll_set) {
+    // Take the whole list first, so that a notification that comes while an object
+    // is being checked puts it back on the list.
+    mp_uint_t atomic_state = MICROPY_BEGIN_ATOMIC_SECTION();
+    poll_obj_t *list = poll_set->ready;
+    poll_set->ready = NULL;
+    for (poll_obj_t *poll_obj = list; poll_obj != NULL; poll_obj = poll_obj->next_ready) {
+        poll_obj->on_ready_list = false;
+    }
+    MICROPY_END_ATOMIC_SECTION(atomic_state);
+
+    mp_uint_t n_ready = 0;
+    while (list != NULL) {
+        poll_obj_t *poll_obj = list;
+        list = poll_obj->next_ready;
+        if (poll_obj->kind == POLL_OBJ_KIND_NOTIFY) {
+            int errcode;
+            mp_uint_t ret = poll_obj->ioctl(poll_obj->obj, MP_STREAM_POLL, poll_obj_get_events(poll_obj), &errcode);
+            if (ret == MP_STREAM_ERROR) {
+                // Put back this object and the ones that weren't checked yet.
+                poll_set_push_ready(poll_set, poll_obj);
+                while (list != NULL) {
+                    poll_obj = list;
+                    list = poll_obj->next_ready;
+                    poll_set_push_ready(poll_set, poll_obj);
+                }
+                mp_raise_OSError(errcode);
+            }
+            poll_obj_set_revents(poll_obj, ret);
+            if (ret == 0) {
+                continue;
+            }
+            ++n_ready;
+        }
+        poll_set_push_ready(poll_set, poll_obj);
+    }
+    return n_ready;
+}
+
+void mp_stream_poll_notify(uintptr_t notifier) {
+    poll_obj_t *poll_obj = (poll_obj_t *)notifier;
+    poll_set_push_ready(poll_obj->poll_set, poll_obj);
+}
+
+#endif
+
+// Forget the results of the last poll.  Objects that notified they may be ready
+// stay on the ready list, to be checked by the next poll.
+static void poll_set_clear_ready(poll_set_t *poll_set) {
+    mp_uint_t atomic_state = READY_LIST_BEGIN_ATOMIC();
+    poll_obj_t **p = &poll_set->ready;
+    while (*p != NULL) {
+        poll_obj_t *poll_obj = *p;
+        poll_obj_set_revents(poll_obj, 0);
+        #if MICROPY_PY_SELECT_NOTIFY
+        if (poll_obj->kind == POLL_OBJ_KIND_NOTIFY) {
+            p = &poll_obj->next_ready;
+            continue;
+        }
+        #endif
+        *p = poll_obj->next_ready;
+        poll_obj->on_ready_list = false;
+    }
+    READY_LIST_END_ATOMIC(atomic_state);
+}
+
 static void poll_set_add_obj(poll_set_t *poll_set, const mp_obj_t *obj, mp_uint_t obj_len, mp_uint_t events, bool or_events) {
     for (mp_uint_t i = 0; i < obj_len; i++) {
         mp_map_elem_t *elem = mp_map_lookup(&poll_set->map, mp_obj_id(obj[i]), MP_MAP_LOOKUP_ADD_IF_NOT_FOUND);
@@ -241,6 +553,8 @@ static void poll_set_add_obj(poll_set_t *poll_set, const mp_obj_t *obj, mp_uint_
 
             poll_obj_t *poll_obj = m_new_obj(poll_obj_t);
             poll_obj->obj = obj[i];
+            poll_obj->kind = POLL_OBJ_KIND_SCAN;
+            poll_obj->on_ready_list = false;
 
             #if MICROPY_PY_SELECT_POSIX_OPTIMISATIONS
             int fd = -1;
@@ -261,6 +575,11 @@ static void poll_set_add_obj(poll_set_t *poll_set, const mp_obj_t *obj, mp_uint_
                     fd = res;
                 }
             }
+            #if MICROPY_PY_SELECT_EPOLL
+            if (fd >= 0 && poll_set_epoll_add(poll_set, poll_obj, fd, events)) {
+                // Object has a file descriptor that epoll accepted.
+            } else
+            #endif
             if (fd >= 0) {
                 // Object has a file descriptor so add it to pollfds.
                 poll_obj->pollfd = poll_set_add_fd(poll_set, fd);
@@ -276,6 +595,17 @@ static void poll_set_add_obj(poll_set_t *poll_set, const mp_obj_t *obj, mp_uint_
             poll_obj_set_events(poll_obj, events);
             poll_obj_set_revents(poll_obj, 0);
             elem->value = MP_OBJ_FROM_PTR(poll_obj);
+
+            #if MICROPY_PY_SELECT_NOTIFY
+            // select.select() uses a temporary poll set, so doesn't subscribe.
+            if (!or_events && poll_obj->kind == POLL_OBJ_KIND_SCAN && poll_obj->ioctl != NULL
+                #if MICROPY_PY_SELECT_POSIX_OPTIMISATIONS
+                && poll_obj->pollfd == NULL
+                #endif
+                ) {
+                poll_set_subscribe(poll_set, poll_obj);
+            }
+            #endif
         } else {
             // object exists; update its events
             poll_obj_t *poll_obj = (poll_obj_t *)MP_OBJ_TO_PTR(elem->value);
@@ -291,7 +621,34 @@ static void poll_set_add_obj(poll_set_t *poll_set, const mp_obj_t *obj, mp_uint_
     }
 }
 
-// For each object in the poll set, poll it once.
+// Undo poll_set_add_obj() for an object that was removed from the map.
+static void poll_set_remove_obj(poll_set_t *poll_set, poll_obj_t *poll_obj) {
+    #if MICROPY_PY_SELECT_NOTIFY
+    if (poll_obj->kind == POLL_OBJ_KIND_NOTIFY) {
+        // Unsubscribe first, so it can't be put back on the ready list.
+        int errcode;
+        poll_obj->ioctl(poll_obj->obj, MP_STREAM_POLL_NOTIFY, 0, &errcode);
+        --poll_set->n_notify;
+    }
+    #endif
+    #if MICROPY_PY_SELECT_EPOLL
+    if (poll_obj->kind == POLL_OBJ_KIND_EPOLL) {
+        // This fails if the file descriptor was closed, which removed it from epoll.
+        epoll_ctl(poll_set->epoll_fd, EPOLL_CTL_DEL, poll_obj->fd, NULL);
+        --poll_set->n_epoll;
+    }
+    #endif
+    #if MICROPY_PY_SELECT_POSIX_OPTIMISATIONS
+    if (poll_obj->pollfd != NULL) {
+        poll_obj->pollfd->fd = -1;
+        --poll_set->used;
+    }
+    #endif
+    poll_set_remove_ready(poll_set, poll_obj);
+}
+
+// Poll each object of kind POLL_OBJ_KIND_SCAN once, and add those that are ready
+// to the ready list.
 static mp_uint_t poll_set_poll_once(poll_set_t *poll_set, size_t *rwx_num) {
     mp_uint_t n_ready = 0;
     for (mp_uint_t i = 0; i < poll_set->map.alloc; ++i) {
@@ -301,9 +658,17 @@ static mp_uint_t poll_set_poll_once(poll_set_t *poll_set, size_t *rwx_num) {
 
         poll_obj_t *poll_obj = MP_OBJ_TO_PTR(poll_set->map.table[i].value);
 
+        if (poll_obj->kind != POLL_OBJ_KIND_SCAN) {
+            continue;
+        }
+
         #if MICROPY_PY_SELECT_POSIX_OPTIMISATIONS
         if (poll_obj->pollfd != NULL) {
-            // Object has file descriptor so will be polled separately by poll().
+            // Object has file descriptor so was polled separately by poll().
+            if (poll_obj->pollfd->revents != 0) {
+                n_ready += 1;
+                poll_set_push_ready(poll_set, poll_obj);
+            }
             continue;
         }
         #endif
@@ -320,6 +685,7 @@ static mp_uint_t poll_set_poll_once(poll_set_t *poll_set, size_t *rwx_num) {
         if (ret != 0) {
             // object is ready
             n_ready += 1;
+            poll_set_push_ready(poll_set, poll_obj);
             #if MICROPY_PY_SELECT_SELECT
             if (rwx_num != NULL) {
                 if (ret & MP_STREAM_POLL_RD) {
@@ -344,11 +710,11 @@ static mp_uint_t poll_set_poll_until_ready_or_timeout(poll_set_t *poll_set, size
     mp_uint_t start_ticks = mp_hal_ticks_ms();
     bool has_timeout = timeout != (mp_uint_t)-1;
 
+    poll_set_clear_ready(poll_set);
+
     #if MICROPY_PY_SELECT_POSIX_OPTIMISATIONS
 
     for (;;) {
-        MP_THREAD_GIL_EXIT();
-
         // Compute the timeout.
         int t = MICROPY_PY_SELECT_IOCTL_CALL_PERIOD_MS;
         if (poll_set_all_are_fds(poll_set)) {
@@ -365,9 +731,26 @@ static mp_uint_t poll_set_poll_until_ready_or_timeout(poll_set_t *poll_set, size
                 }
             }
         }
+        #if MICROPY_PY_SELECT_NOTIFY
+        if (poll_set->ready != NULL) {
+            // Objects notified that they may be ready, so check them straight away.
+            t = 0;
+        }
+        #endif
 
+        MP_THREAD_GIL_EXIT();
+
+        #if MICROPY_PY_SELECT_EPOLL
+        // If epoll is the only file descriptor in pollfds then wait on it directly.
+        struct epoll_event events[POLL_SET_EPOLL_EVENTS];
+        bool only_epoll = poll_set->epoll_fd >= 0 && poll_set->used == 1;
+        int n_ready = only_epoll
+            ? epoll_wait(poll_set->epoll_fd, events, POLL_SET_EPOLL_EVENTS, t)
+            : poll(poll_set->pollfds, poll_set->max_used, t);
+        #else
         // Call system poll for those objects that have a file descriptor.
         int n_ready = poll(poll_set->pollfds, poll_set->max_used, t);
+        #endif
 
         MP_THREAD_GIL_ENTER();
 
@@ -381,11 +764,35 @@ static mp_uint_t poll_set_poll_until_ready_or_timeout(poll_set_t *poll_set, size
             n_ready = 0;
         }
 
-        // Explicitly poll any objects that do not have a file descriptor.
-        if (!poll_set_all_are_fds(poll_set)) {
+        // From here the ready objects are counted as they are added to the ready list.
+        #if MICROPY_PY_SELECT_EPOLL
+        int n_events = n_ready;
+        #endif
+        n_ready = 0;
+
+        #if MICROPY_PY_SELECT_EPOLL
+        if (only_epoll) {
+            n_ready += poll_set_epoll_collect(poll_set, events, n_events);
+            if (n_events == POLL_SET_EPOLL_EVENTS) {
+                n_ready += poll_set_epoll_read(poll_set);
+            }
+        } else if (poll_set->epoll_fd >= 0 && poll_set->pollfds[poll_set->epoll_slot].revents != 0) {
+            n_ready += poll_set_epoll_read(poll_set);
+        }
+        #endif
+
+        // Explicitly poll any objects that do not have a file descriptor, and collect
+        // the results of poll() for those that do.
+        if (poll_set_num_scan(poll_set) > 0) {
             n_ready += poll_set_poll_once(poll_set, rwx_num);
         }
 
+        #if MICROPY_PY_SELECT_NOTIFY
+        if (poll_set->n_notify > 0) {
+            n_ready += poll_set_check_notified(poll_set);
+        }
+        #endif
+
         // Return if an object is ready, or if the timeout expired.
         if (n_ready > 0 || (has_timeout && mp_hal_ticks_ms() - start_ticks >= timeout)) {
             return n_ready;
@@ -399,7 +806,15 @@ static mp_uint_t poll_set_poll_until_ready_or_timeout(poll_set_t *poll_set, size
 
     for (;;) {
         // poll the objects
-        mp_uint_t n_ready = poll_set_poll_once(poll_set, rwx_num);
+        mp_uint_t n_ready = 0;
+        if (poll_set_num_scan(poll_set) > 0) {
+            n_ready += poll_set_poll_once(poll_set, rwx_num);
+        }
+        #if MICROPY_PY_SELECT_NOTIFY
+        if (poll_set->n_notify > 0) {
+            n_ready += poll_set_check_notified(poll_set);
+        }
+        #endif
         uint32_t elapsed = mp_hal_ticks_ms() - start_ticks;
         if (n_ready > 0 || (has_timeout && elapsed >= timeout)) {
             return n_ready;
@@ -408,6 +823,12 @@ static mp_uint_t poll_set_poll_until_ready_or_timeout(poll_set_t *poll_set, size
         if (mp_hal_is_interrupted()) {
             return 0;
         }
+        #if MICROPY_PY_SELECT_NOTIFY
+        if (poll_set->ready != NULL) {
+            // Objects notified that they may be ready while the others were polled.
+            continue;
+        }
+        #endif
         // CIRCUITPY-CHANGE: mp_event_wait_ms() and mp_event_wait_indefinite() will do RUN_BACKGROUND_TASKS
         if (has_timeout) {
             mp_event_wait_ms(timeout - elapsed);
@@ -488,8 +909,8 @@ MP_DEFINE_CONST_FUN_OBJ_VAR_BETWEEN(mp_select_select_obj, 3, 4, select_select);
 typedef struct _mp_obj_poll_t {
     mp_obj_base_t base;
     poll_set_t poll_set;
-    short iter_cnt;
-    short iter_idx;
+    // Next object on the ready list for ipoll() to look at.
+    poll_obj_t *iter_next;
     int flags;
     // callee-owned tuple
     mp_obj_t ret_tuple;
@@ -514,18 +935,10 @@ static mp_obj_t poll_unregister(mp_obj_t self_in, mp_obj_t obj_in) {
     mp_obj_poll_t *self = MP_OBJ_TO_PTR(self_in);
     mp_map_elem_t *elem = mp_map_lookup(&self->poll_set.map, mp_obj_id(obj_in), MP_MAP_LOOKUP_REMOVE_IF_FOUND);
 
-    #if MICROPY_PY_SELECT_POSIX_OPTIMISATIONS
     if (elem != NULL) {
-        poll_obj_t *poll_obj = (poll_obj_t *)MP_OBJ_TO_PTR(elem->value);
-        if (poll_obj->pollfd != NULL) {
-            poll_obj->pollfd->fd = -1;
-            --self->poll_set.used;
-        }
+        poll_set_remove_obj(&self->poll_set, (poll_obj_t *)MP_OBJ_TO_PTR(elem->value));
         elem->value = MP_OBJ_NULL;
     }
-    #else
-    (void)elem;
-    #endif
 
     // TODO raise KeyError if obj didn't exist in map
     return mp_const_none;
@@ -574,11 +987,7 @@ static mp_obj_t poll_poll(size_t n_args, const mp_obj_t *args) {
     // one or more objects are ready, or we had a timeout
     mp_obj_list_t *ret_list = MP_OBJ_TO_PTR(mp_obj_new_list(n_ready, NULL));
     n_ready = 0;
-    for (mp_uint_t i = 0; i < self->poll_set.map.alloc; ++i) {
-        if (!mp_map_slot_is_filled(&self->poll_set.map, i)) {
-            continue;
-        }
-        poll_obj_t *poll_obj = MP_OBJ_TO_PTR(self->poll_set.map.table[i].value);
+    for (poll_obj_t *poll_obj = self->poll_set.ready; poll_obj != NULL && n_ready < ret_list->len; poll_obj = poll_obj->next_ready) {
         if (poll_obj_get_revents(poll_obj) != 0) {
             mp_obj_t tuple[2] = {poll_obj->obj, MP_OBJ_NEW_SMALL_INT(poll_obj_get_revents(poll_obj))};
             ret_list->items[n_ready++] = mp_obj_new_tuple(2, tuple);
@@ -595,9 +1004,8 @@ static mp_obj_t poll_ipoll(size_t n_args, const mp_obj_t *args) {
         self->ret_tuple = mp_obj_new_tuple(2, NULL);
     }
 
-    int n_ready = poll_poll_internal(n_args, args);
-    self->iter_cnt = n_ready;
-    self->iter_idx = 0;
+    poll_poll_internal(n_args, args);
+    self->iter_next = self->poll_set.ready;
 
     return args[0];
 }
@@ -606,19 +1014,12 @@ MP_DEFINE_CONST_FUN_OBJ_VAR_BETWEEN(poll_ipoll_obj, 1, 3, poll_ipoll);
 static mp_obj_t poll_iternext(mp_obj_t self_in) {
     mp_obj_poll_t *self = MP_OBJ_TO_PTR(self_in);
 
-    if (self->iter_cnt == 0) {
-        return MP_OBJ_STOP_ITERATION;
-    }
-
-    self->iter_cnt--;
-
-    for (mp_uint_t i = self->iter_idx; i < self->poll_set.map.alloc; ++i) {
-        self->iter_idx++;
-        if (!mp_map_slot_is_filled(&self->poll_set.map, i)) {
-            continue;
-        }
-        poll_obj_t *poll_obj = MP_OBJ_TO_PTR(self->poll_set.map.table[i].value);
-        if (poll_obj_get_revents(poll_obj) != 0) {
+    while (self->iter_next != NULL) {
+        poll_obj_t *poll_obj = self->iter_next;
+        self->iter_next = poll_obj->next_ready;
+        // Skip objects that were unregistered since the poll, and those that were
+        // added by a notification.
+        if (poll_obj->on_ready_list && poll_obj_get_revents(poll_obj) != 0) {
             mp_obj_tuple_t *t = MP_OBJ_TO_PTR(self->ret_tuple);
             t->items[0] = poll_obj->obj;
             t->items[1] = MP_OBJ_NEW_SMALL_INT(poll_obj_get_revents(poll_obj));
@@ -630,17 +1031,46 @@ static mp_obj_t poll_iternext(mp_obj_t self_in) {
         }
     }
 
-    assert(!"inconsistent number of poll active entries");
-    self->iter_cnt = 0;
     return MP_OBJ_STOP_ITERATION;
 }
 
+#if MICROPY_PY_SELECT_EPOLL || MICROPY_PY_SELECT_NOTIFY
+// Release the resources that the registered objects hold for the poll set.
+static mp_obj_t poll___del__(mp_obj_t self_in) {
+    mp_obj_poll_t *self = MP_OBJ_TO_PTR(self_in);
+    #if MICROPY_PY_SELECT_NOTIFY
+    for (mp_uint_t i = 0; self->poll_set.n_notify > 0 && i < self->poll_set.map.alloc; ++i) {
+        if (!mp_map_slot_is_filled(&self->poll_set.map, i)) {
+            continue;
+        }
+        poll_obj_t *poll_obj = MP_OBJ_TO_PTR(self->poll_set.map.table[i].value);
+        if (poll_obj->kind == POLL_OBJ_KIND_NOTIFY) {
+            int errcode;
+            poll_obj->ioctl(poll_obj->obj, MP_STREAM_POLL_NOTIFY, 0, &errcode);
+            --self->poll_set.n_notify;
+        }
+    }
+    #endif
+    #if MICROPY_PY_SELECT_EPOLL
+    if (self->poll_set.epoll_fd >= 0) {
+        close(self->poll_set.epoll_fd);
+        self->poll_set.epoll_fd = -1;
+    }
+    #endif
+    return mp_const_none;
+}
+static MP_DEFINE_CONST_FUN_OBJ_1(poll___del___obj, poll___del__);
+#endif
+
 static const mp_rom_map_elem_t poll_locals_dict_table[] = {
     { MP_ROM_QSTR(MP_QSTR_register), MP_ROM_PTR(&poll_register_obj) },
     { MP_ROM_QSTR(MP_QSTR_unregister), MP_ROM_PTR(&poll_unregister_obj) },
     { MP_ROM_QSTR(MP_QSTR_modify), MP_ROM_PTR(&poll_modify_obj) },
     { MP_ROM_QSTR(MP_QSTR_poll), MP_ROM_PTR(&poll_poll_obj) },
     { MP_ROM_QSTR(MP_QSTR_ipoll), MP_ROM_PTR(&poll_ipoll_obj) },
+    #if MICROPY_PY_SELECT_EPOLL || MICROPY_PY_SELECT_NOTIFY
+    { MP_ROM_QSTR(MP_QSTR___del__), MP_ROM_PTR(&poll___del___obj) },
+    #endif
 };
 static MP_DEFINE_CONST_DICT(poll_locals_dict, poll_locals_dict_table);
 
@@ -654,9 +1084,13 @@ static MP_DEFINE_CONST_OBJ_TYPE(
 
 // poll()
 static mp_obj_t select_poll(void) {
+    #if MICROPY_PY_SELECT_EPOLL || MICROPY_PY_SELECT_NOTIFY
+    mp_obj_poll_t *poll = mp_obj_malloc_with_finaliser(mp_obj_poll_t, &mp_type_poll);
+    #else
     mp_obj_poll_t *poll = mp_obj_malloc(mp_obj_poll_t, &mp_type_poll);
+    #endif
     poll_set_init(&poll->poll_set, 0);
-    poll->iter_cnt = 0;
+    poll->iter_next = NULL;
     poll->ret_tuple = MP_OBJ_NULL;
     return MP_OBJ_FROM_PTR(poll);
 }
@@ -133,13 +133,7 @@ static mp_obj_t mp_vfs_proxy_call(mp_vfs_mount_t *vfs, qstr meth_name, size_t n_
     return mp_call_method_n_kw(n_args, 0, meth);
 }
 
-mp_import_stat_t mp_vfs_import_stat(const char *path) {
-    const char *path_out;
-    mp_vfs_mount_t *vfs = mp_vfs_lookup_path(path, &path_out);
-    if (vfs == MP_VFS_NONE || vfs == MP_VFS_ROOT) {
-        return MP_IMPORT_STAT_NO_EXIST;
-    }
-
+static mp_import_stat_t mp_vfs_import_stat_uncached(mp_vfs_mount_t *vfs, const char *path_out) {
     // If the mounted object has the VFS protocol, call its import_stat helper
     const mp_obj_type_t *type = mp_obj_get_type(vfs->obj);
     if (MP_OBJ_TYPE_HAS_SLOT(type, protocol)) {
@@ -168,6 +162,153 @@ mp_import_stat_t mp_vfs_import_stat(const char *path) {
     }
 }
 
+#if MICROPY_VFS_IMPORT_CACHE
+
+// The import cache is a dict mapping a directory, as it appears in the paths
+// given to mp_vfs_import_stat, to a dict mapping the names in that directory to
+// their mp_import_stat_t.  When the directory could be listed the dict of names
+// is complete and also contains the empty name; otherwise it's filled in one
+// stat at a time.
+
+void mp_vfs_import_cache_clear(void) {
+    MP_STATE_VM(vfs_import_cache) = MP_OBJ_NULL;
+}
+
+static mp_obj_t mp_vfs_import_cache_list_dir(mp_vfs_mount_t *vfs, const char *dir, size_t dir_len) {
+    // strip trailing separators, but keep a lone "/" for the root directory
+    while (dir_len > 1 && dir[dir_len - 1] == '/') {
+        --dir_len;
+    }
+    mp_obj_t dir_o = mp_obj_new_str(dir, dir_len);
+    mp_obj_t names = mp_obj_new_dict(0);
+    nlr_buf_t nlr;
+    if (nlr_push(&nlr) == 0) {
+        mp_obj_t iter = mp_vfs_proxy_call(vfs, MP_QSTR_ilistdir, 1, &dir_o);
+        bool complete = true;
+        mp_obj_t next;
+        while ((next = mp_iternext(iter)) != MP_OBJ_STOP_ITERATION) {
+            size_t len;
+            mp_obj_t *items;
+            mp_obj_get_array(next, &len, &items);
+            mp_int_t st_mode = mp_obj_get_int(items[1]);
+            if (st_mode & MP_S_IFDIR) {
+                mp_obj_dict_store(names, items[0], MP_OBJ_NEW_SMALL_INT(MP_IMPORT_STAT_DIR));
+            } else if (st_mode & MP_S_IFREG) {
+                mp_obj_dict_store(names, items[0], MP_OBJ_NEW_SMALL_INT(MP_IMPORT_STAT_FILE));
+            } else {
+                // the filesystem didn't say what this entry is, stat it when needed
+                complete = false;
+            }
+        }
+        if (complete) {
+            mp_obj_dict_store(names, MP_OBJ_NEW_QSTR(MP_QSTR_), mp_const_none);
+        }
+        nlr_pop();
+    } else {
+        mp_obj_t exc = MP_OBJ_FROM_PTR(nlr.ret_val);
+        if (mp_obj_is_subclass_fast(MP_OBJ_FROM_PTR(mp_obj_get_type(exc)), MP_OBJ_FROM_PTR(&mp_type_OSError))) {
+            // the directory doesn't exist, so nothing in it does either
+            names = mp_obj_new_dict(0);
+            mp_obj_dict_store(names, MP_OBJ_NEW_QSTR(MP_QSTR_), mp_const_none);
+        } else if (!mp_obj_is_subclass_fast(MP_OBJ_FROM_PTR(mp_obj_get_type(exc)), MP_OBJ_FROM_PTR(&mp_type_Exception))) {
+            // don't swallow KeyboardInterrupt and the like
+            nlr_jump(nlr.ret_val);
+        } else {
+            // listing isn't supported, fall back to a stat for each name
+            names = mp_obj_new_dict(0);
+        }
+    }
+    return names;
+}
+
+// Whether the listing in names may have an entry that a case-insensitive
+// filesystem, like FAT, would find for name.  Only ASCII letters are compared
+// without case, so a name with other characters may always match.
+static bool mp_vfs_import_cache_may_match_case(mp_obj_dict_t *names, const char *name, size_t name_len) {
+    for (size_t i = 0; i < name_len; ++i) {
+        if ((byte)name[i] >= 0x80) {
+            return true;
+        }
+    }
+    mp_map_t *map = &names->map;
+    for (size_t i = 0; i < map->alloc; ++i) {
+        if (!mp_map_slot_is_filled(map, i) || !mp_obj_is_str(map->table[i].key)) {
+            continue;
+        }
+        GET_STR_DATA_LEN(map->table[i].key, entry, entry_len);
+        if (entry_len != name_len) {
+            continue;
+        }
+        size_t j = 0;
+        while (j < name_len && unichar_tolower(entry[j]) == unichar_tolower(name[j])) {
+            ++j;
+        }
+        if (j == name_len) {
+            return true;
+        }
+    }
+    return false;
+}
+
+static mp_import_stat_t mp_vfs_import_stat_cached(mp_vfs_mount_t *vfs, const char *path, const char *path_out, const char *name) {
+    if (MP_STATE_VM(vfs_import_cache) == MP_OBJ_NULL) {
+        MP_STATE_VM(vfs_import_cache) = mp_obj_new_dict(0);
+    }
+    mp_obj_dict_t *cache = MP_OBJ_TO_PTR(MP_STATE_VM(vfs_import_cache));
+
+    // Look up the directory and name using strings on the stack, they only
+    // need to be copied to the heap when they're added to the cache.  Note
+    // that name is a suffix of both path and path_out.
+    size_t name_len = strlen(name);
+    size_t dir_len = strlen(path) - name_len;
+    mp_obj_str_t dir_key = {{&mp_type_str}, qstr_compute_hash((const byte *)path, dir_len), dir_len, (const byte *)path};
+    mp_map_elem_t *elem = mp_map_lookup(&cache->map, MP_OBJ_FROM_PTR(&dir_key), MP_MAP_LOOKUP);
+    mp_obj_t names_o;
+    if (elem != NULL) {
+        names_o = elem->value;
+    } else {
+        names_o = mp_vfs_import_cache_list_dir(vfs, path_out, name - path_out);
+        mp_obj_dict_store(MP_OBJ_FROM_PTR(cache), mp_obj_new_str(path, dir_len), names_o);
+    }
+    mp_obj_dict_t *names = MP_OBJ_TO_PTR(names_o);
+
+    mp_obj_str_t name_key = {{&mp_type_str}, qstr_compute_hash((const byte *)name, name_len), name_len, (const byte *)name};
+    elem = mp_map_lookup(&names->map, MP_OBJ_FROM_PTR(&name_key), MP_MAP_LOOKUP);
+    if (elem != NULL) {
+        return MP_OBJ_SMALL_INT_VALUE(elem->value);
+    }
+    if (mp_map_lookup(&names->map, MP_OBJ_NEW_QSTR(MP_QSTR_), MP_MAP_LOOKUP) != NULL
+        && !mp_vfs_import_cache_may_match_case(names, name, name_len)) {
+        // the listing is complete and doesn't have this name in any case
+        return MP_IMPORT_STAT_NO_EXIST;
+    }
+    mp_import_stat_t stat = mp_vfs_import_stat_uncached(vfs, path_out);
+    mp_obj_dict_store(names_o, mp_obj_new_str(name, name_len), MP_OBJ_NEW_SMALL_INT(stat));
+    return stat;
+}
+
+#endif
+
+mp_import_stat_t mp_vfs_import_stat(const char *path) {
+    const char *path_out;
+    mp_vfs_mount_t *vfs = mp_vfs_lookup_path(path, &path_out);
+    if (vfs == MP_VFS_NONE || vfs == MP_VFS_ROOT) {
+        return MP_IMPORT_STAT_NO_EXIST;
+    }
+
+    #if MICROPY_VFS_IMPORT_CACHE
+    // Only cache paths with a name within a directory; a path that is a mount
+    // point has no name and must not be listed in its parent's directory.
+    const char *name = strrchr(path_out, '/');
+    name = name == NULL ? path_out : name + 1;
+    if (*name != '\0') {
+        return mp_vfs_import_stat_cached(vfs, path, path_out, name);
+    }
+    #endif
+
+    return mp_vfs_import_stat_uncached(vfs, path_out);
+}
+
 static mp_obj_t mp_vfs_autodetect(mp_obj_t bdev_obj) {
     #if MICROPY_VFS_LFS1 || MICROPY_VFS_LFS2
     nlr_buf_t nlr;
@@ -285,6 +426,8 @@ mp_obj_t mp_vfs_mount(size_t n_args, const mp_obj_t *pos_args, mp_map_t *kw_args
     }
     *vfsp = vfs;
 
+    mp_vfs_import_cache_clear();
+
     return mp_const_none;
 }
 MP_DEFINE_CONST_FUN_OBJ_KW(mp_vfs_mount_obj, 0, mp_vfs_mount);
@@ -317,6 +460,8 @@ mp_obj_t mp_vfs_umount(mp_obj_t mnt_in) {
     // call the underlying object to do any unmounting operation
     mp_vfs_proxy_call(vfs, MP_QSTR_umount, 0, NULL);
 
+    mp_vfs_import_cache_clear();
+
     return mp_const_none;
 }
 MP_DEFINE_CONST_FUN_OBJ_1(mp_vfs_umount_obj, mp_vfs_umount);
@@ -343,7 +488,14 @@ mp_obj_t mp_vfs_open(size_t n_args, const mp_obj_t *pos_args, mp_map_t *kw_args)
     #endif
 
     mp_vfs_mount_t *vfs = lookup_path(args[ARG_file].u_obj, &args[ARG_file].u_obj);
-    return mp_vfs_proxy_call(vfs, MP_QSTR_open, 2, (mp_obj_t *)&args);
+    mp_obj_t file = mp_vfs_proxy_call(vfs, MP_QSTR_open, 2, (mp_obj_t *)&args);
+    #if MICROPY_VFS_IMPORT_CACHE
+    if (strpbrk(mp_obj_str_get_str(args[ARG_mode].u_obj), "wax+") != NULL) {
+        // the file may have been created
+        mp_vfs_import_cache_clear();
+    }
+    #endif
+    return file;
 }
 MP_DEFINE_CONST_FUN_OBJ_KW(mp_vfs_open_obj, 0, mp_vfs_open);
 
@@ -366,6 +518,7 @@ mp_obj_t mp_vfs_chdir(mp_obj_t path_in) {
         mp_vfs_proxy_call(vfs, MP_QSTR_chdir, 1, &path_out);
     }
     MP_STATE_VM(vfs_cur) = vfs;
+    mp_vfs_import_cache_clear();
     return mp_const_none;
 }
 MP_DEFINE_CONST_FUN_OBJ_1(mp_vfs_chdir_obj, mp_vfs_chdir);
@@ -477,14 +630,18 @@ mp_obj_t mp_vfs_mkdir(mp_obj_t path_in) {
     if (vfs == MP_VFS_ROOT || (vfs != MP_VFS_NONE && !strcmp(mp_obj_str_get_str(path_out), "/"))) {
         mp_raise_OSError(MP_EEXIST);
     }
-    return mp_vfs_proxy_call(vfs, MP_QSTR_mkdir, 1, &path_out);
+    mp_obj_t ret = mp_vfs_proxy_call(vfs, MP_QSTR_mkdir, 1, &path_out);
+    mp_vfs_import_cache_clear();
+    return ret;
 }
 MP_DEFINE_CONST_FUN_OBJ_1(mp_vfs_mkdir_obj, mp_vfs_mkdir);
 
 mp_obj_t mp_vfs_remove(mp_obj_t path_in) {
     mp_obj_t path_out;
     mp_vfs_mount_t *vfs = lookup_path(path_in, &path_out);
-    return mp_vfs_proxy_call(vfs, MP_QSTR_remove, 1, &path_out);
+    mp_obj_t ret = mp_vfs_proxy_call(vfs, MP_QSTR_remove, 1, &path_out);
+    mp_vfs_import_cache_clear();
+    return ret;
 }
 MP_DEFINE_CONST_FUN_OBJ_1(mp_vfs_remove_obj, mp_vfs_remove);
 
@@ -496,14 +653,18 @@ mp_obj_t mp_vfs_rename(mp_obj_t old_path_in, mp_obj_t new_path_in) {
         // can't rename across filesystems
         mp_raise_OSError(MP_EPERM);
     }
-    return mp_vfs_proxy_call(old_vfs, MP_QSTR_rename, 2, args);
+    mp_obj_t ret = mp_vfs_proxy_call(old_vfs, MP_QSTR_rename, 2, args);
+    mp_vfs_import_cache_clear();
+    return ret;
 }
 MP_DEFINE_CONST_FUN_OBJ_2(mp_vfs_rename_obj, mp_vfs_rename);
 
 mp_obj_t mp_vfs_rmdir(mp_obj_t path_in) {
     mp_obj_t path_out;
     mp_vfs_mount_t *vfs = lookup_path(path_in, &path_out);
-    return mp_vfs_proxy_call(vfs, MP_QSTR_rmdir, 1, &path_out);
+    mp_obj_t ret = mp_vfs_proxy_call(vfs, MP_QSTR_rmdir, 1, &path_out);
+    mp_vfs_import_cache_clear();
+    return ret;
 }
 MP_DEFINE_CONST_FUN_OBJ_1(mp_vfs_rmdir_obj, mp_vfs_rmdir);
 
@@ -606,5 +767,8 @@ int mp_vfs_mount_romfs_protected(void) {
 
 MP_REGISTER_ROOT_POINTER(struct _mp_vfs_mount_t *vfs_cur);
 MP_REGISTER_ROOT_POINTER(struct _mp_vfs_mount_t *vfs_mount_table);
+#if MICROPY_VFS_IMPORT_CACHE
+MP_REGISTER_ROOT_POINTER(mp_obj_t vfs_import_cache);
+#endif
 
 #endif // MICROPY_VFS
@@ -26,6 +26,7 @@
 #ifndef MICROPY_INCLUDED_EXTMOD_VFS_H
 #define MICROPY_INCLUDED_EXTMOD_VFS_H
 
+#include "py/bc.h"
 #include "py/builtin.h"
 #include "py/obj.h"
 // CIRCUITPY-CHANGE
@@ -110,6 +111,17 @@ mp_obj_t mp_vfs_blockdev_ioctl(mp_vfs_blockdev_t *self, uintptr_t cmd, uintptr_t
 
 mp_vfs_mount_t *mp_vfs_lookup_path(const char *path, const char **path_out);
 mp_import_stat_t mp_vfs_import_stat(const char *path);
+#if MICROPY_VFS_IMPORT_CACHE
+void mp_vfs_import_cache_clear(void);
+#else
+static inline void mp_vfs_import_cache_clear(void) {
+}
+#endif
+#if MICROPY_VFS_MPY_CACHE
+// Get the compiled form of an imported .py file from the cache in MICROPY_VFS_MPY_CACHE_DIR,
+// or compile it and add it to the cache.  Returns false if that directory doesn't exist.
+bool mp_vfs_mpy_cache_compile(qstr src_file, mp_compiled_module_t *cm);
+#endif
 mp_obj_t mp_vfs_mount(size_t n_args, const mp_obj_t *pos_args, mp_map_t *kw_args);
 mp_obj_t mp_vfs_umount(mp_obj_t mnt_in);
 mp_obj_t mp_vfs_open(size_t n_args, const mp_obj_t *pos_args, mp_map_t *kw_args);
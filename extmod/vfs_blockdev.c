@@ -125,6 +125,10 @@ int mp_vfs_blockdev_write(mp_vfs_blockdev_t *self, size_t block_num, size_t num_
         return -MP_EROFS;
     }
 
+    // The filesystem may be being changed through its VFS object rather than
+    // the VFS functions, so forget any cached directory listings used by import.
+    mp_vfs_import_cache_clear();
+
     if (self->flags & MP_BLOCKDEV_FLAG_NATIVE) {
         // CIRCUITPY-CHANGE: Pass the blockdev object into native readblocks so
         // it has the corresponding state.
@@ -140,6 +144,7 @@ int mp_vfs_blockdev_write_ext(mp_vfs_blockdev_t *self, size_t block_num, size_t
         // read-only block device
         return -MP_EROFS;
     }
+    mp_vfs_import_cache_clear();
     return mp_vfs_blockdev_call_rw(self->writeblocks, block_num, block_off, len, (void *)buf, 3);
 }
 
@@ -0,0 +1,241 @@
+/*
+ * This file is part of the MicroPython project, http://micropython.org/
+ *
+ * The MIT License (MIT)
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining a copy
+ * of this software and associated documentation files (the "Software"), to deal
+ * in the Software without restriction, including without limitation the rights
+ * to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+ * copies of the Software, and to permit persons to whom the Software is
+ * furnished to do so, subject to the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be included in
+ * all copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+ * IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+ * FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+ * AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+ * LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+ * OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+ * THE SOFTWARE.
+ */
+
+#include <string.h>
+
+#include "py/builtin.h"
+#include "py/compile.h"
+#include "py/persistentcode.h"
+#include "py/runtime.h"
+#include "py/stream.h"
+#include "extmod/vfs.h"
+
+#if MICROPY_VFS_MPY_CACHE
+
+#if !MICROPY_PERSISTENT_CODE_LOAD || !MICROPY_PERSISTENT_CODE_SAVE
+#error "MICROPY_VFS_MPY_CACHE requires MICROPY_PERSISTENT_CODE_LOAD and MICROPY_PERSISTENT_CODE_SAVE"
+#endif
+
+// Each cache file is a .mpy file, followed by the path of the source file it was
+// compiled from and then this trailer.  The .mpy loader ignores anything after the
+// outer raw code, so the file can be loaded as is.  The trailer is written last,
+// so a cache file that was only partly written never has a valid one.
+typedef struct _mpy_cache_trailer_t {
+    uint32_t path_len;
+    uint32_t src_size;
+    uint32_t src_mtime;
+    uint32_t src_hash;
+    uint32_t magic;
+} mpy_cache_trailer_t;
+
+#define MPY_CACHE_MAGIC (0x6370796d) // "mpyc"
+
+// FNV-1a
+#define MPY_CACHE_HASH_INIT (2166136261u)
+
+static uint32_t mpy_cache_hash(uint32_t hash, const byte *data, size_t len) {
+    for (size_t i = 0; i < len; ++i) {
+        hash = (hash ^ data[i]) * 16777619u;
+    }
+    return hash;
+}
+
+static mp_obj_t mpy_cache_open(const char *path, qstr mode) {
+    mp_obj_t args[2] = {
+        mp_obj_new_str_from_cstr(path),
+        MP_OBJ_NEW_QSTR(mode),
+    };
+    return mp_builtin_open(MP_ARRAY_SIZE(args), args, (mp_map_t *)&mp_const_empty_map);
+}
+
+static void mpy_cache_read(mp_obj_t file, void *buf, size_t len) {
+    int errcode;
+    if (mp_stream_read_exactly(file, buf, len, &errcode) != len) {
+        mp_raise_OSError(errcode != 0 ? errcode : MP_EIO);
+    }
+}
+
+static void mpy_cache_seek(mp_obj_t file, mp_off_t offset, int whence) {
+    int errcode;
+    if (mp_stream_seek(file, offset, whence, &errcode) == (mp_off_t)-1) {
+        mp_raise_OSError(errcode);
+    }
+}
+
+// Hash the contents of the source file.  The size and mtime alone can't be trusted:
+// FAT only keeps the mtime to 2 seconds, and boards without an RTC restart their
+// clock on each boot, so an edit from the host may not change either of them.
+static uint32_t mpy_cache_hash_file(const char *path) {
+    mp_obj_t file = mpy_cache_open(path, MP_QSTR_rb);
+    uint32_t hash = MPY_CACHE_HASH_INIT;
+    byte buf[64];
+    for (;;) {
+        int errcode;
+        mp_uint_t n = mp_stream_rw(file, buf, sizeof(buf), &errcode, MP_STREAM_RW_READ);
+        if (errcode != 0) {
+            mp_stream_close(file);
+            mp_raise_OSError(errcode);
+        }
+        hash = mpy_cache_hash(hash, buf, n);
+        if (n < sizeof(buf)) {
+            break;
+        }
+    }
+    mp_stream_close(file);
+    return hash;
+}
+
+// Check whether the cache file holds the compiled form of the source file.  Any
+// error, such as the cache file not existing, means it doesn't.
+static bool mpy_cache_is_valid(const char *cache_path, const char *src_path, mpy_cache_trailer_t *key) {
+    bool valid = false;
+    nlr_buf_t nlr;
+    if (nlr_push(&nlr) == 0) {
+        mp_obj_t file = mpy_cache_open(cache_path, MP_QSTR_rb);
+        mpy_cache_trailer_t trailer;
+        bool match = false;
+        mpy_cache_seek(file, -(mp_off_t)sizeof(trailer), MP_SEEK_END);
+        mpy_cache_read(file, &trailer, sizeof(trailer));
+        if (trailer.magic == MPY_CACHE_MAGIC
+            && trailer.path_len == key->path_len
+            && trailer.src_size == key->src_size
+            && trailer.src_mtime == key->src_mtime) {
+            // Compare the path in pieces, to guard against two paths with the same hash.
+            mpy_cache_seek(file, -(mp_off_t)(sizeof(trailer) + trailer.path_len), MP_SEEK_END);
+            match = true;
+            for (size_t i = 0; match && i < trailer.path_len;) {
+                char buf[32];
+                size_t n = MIN(sizeof(buf), trailer.path_len - i);
+                mpy_cache_read(file, buf, n);
+                match = memcmp(buf, src_path + i, n) == 0;
+                i += n;
+            }
+        }
+        mp_stream_close(file);
+        if (match) {
+            key->src_hash = mpy_cache_hash_file(src_path);
+            match = trailer.src_hash == key->src_hash;
+        }
+        // Only set after everything that can raise, as it is read after a raise.
+        valid = match;
+        nlr_pop();
+    }
+    return valid;
+}
+
+static void mpy_cache_print_strn(void *env, const char *str, size_t len) {
+    int errcode;
+    if (mp_stream_write_exactly(MP_OBJ_FROM_PTR(env), str, len, &errcode) != len) {
+        mp_raise_OSError(errcode != 0 ? errcode : MP_ENOSPC);
+    }
+}
+
+// Write the cache file.  Failing to do so is not an error: the filesystem may be
+// read-only to the VM (eg while a USB host has it mounted) or full, and the module
+// has been compiled anyway.
+static void mpy_cache_save(const char *cache_path, const char *src_path, const mpy_cache_trailer_t *key, mp_compiled_module_t *cm) {
+    nlr_buf_t nlr;
+    mp_obj_t file;
+    if (nlr_push(&nlr) == 0) {
+        file = mpy_cache_open(cache_path, MP_QSTR_wb);
+        nlr_pop();
+    } else {
+        return;
+    }
+
+    bool saved = false;
+    if (nlr_push(&nlr) == 0) {
+        mp_print_t print = {MP_OBJ_TO_PTR(file), mpy_cache_print_strn};
+        mp_raw_code_save(cm, &print);
+        mpy_cache_print_strn(print.data, src_path, key->path_len);
+        mpy_cache_print_strn(print.data, (const char *)key, sizeof(*key));
+        mp_stream_close(file);
+        saved = true;
+        nlr_pop();
+    }
+
+    if (!saved && nlr_push(&nlr) == 0) {
+        mp_stream_close(file);
+        mp_vfs_remove(mp_obj_new_str_from_cstr(cache_path));
+        nlr_pop();
+    }
+}
+
+bool mp_vfs_mpy_cache_compile(qstr src_file, mp_compiled_module_t *cm) {
+    // The cache is only used if its directory exists.
+    if (mp_vfs_import_stat(MICROPY_VFS_MPY_CACHE_DIR) != MP_IMPORT_STAT_DIR) {
+        return false;
+    }
+
+    size_t src_len;
+    const char *src_path = (const char *)qstr_data(src_file, &src_len);
+
+    // The name of the cache file is a hash of the path of the source file.
+    vstr_t cache_path;
+    vstr_init(&cache_path, sizeof(MICROPY_VFS_MPY_CACHE_DIR) + 13);
+    vstr_printf(&cache_path, "%s/%08x.mpy", MICROPY_VFS_MPY_CACHE_DIR,
+        (unsigned int)mpy_cache_hash(MPY_CACHE_HASH_INIT, (const byte *)src_path, src_len));
+    const char *cache_path_str = vstr_null_terminated_str(&cache_path);
+
+    mpy_cache_trailer_t key;
+    key.path_len = src_len;
+    size_t len;
+    mp_obj_t *items;
+    mp_obj_tuple_get(mp_vfs_stat(MP_OBJ_NEW_QSTR(src_file)), &len, &items);
+    key.src_size = mp_obj_get_int_truncated(items[6]);
+    key.src_mtime = mp_obj_get_int_truncated(items[8]);
+    key.src_hash = 0;
+    key.magic = MPY_CACHE_MAGIC;
+
+    if (mpy_cache_is_valid(cache_path_str, src_path, &key)) {
+        // A cache file for an older firmware raises ValueError, and is then replaced.
+        nlr_buf_t nlr;
+        if (nlr_push(&nlr) == 0) {
+            mp_raw_code_load_file(qstr_from_str(cache_path_str), cm);
+            nlr_pop();
+            vstr_clear(&cache_path);
+            return true;
+        }
+    }
+    if (key.src_hash == 0) {
+        // Not computed yet by mpy_cache_is_valid.
+        key.src_hash = mpy_cache_hash_file(src_path);
+    }
+
+    // Compile the source file.  The hash was taken before reading it for the
+    // compiler, so if the file changes in between then the cache entry is stale
+    // from the start and will be replaced on the next import.
+    mp_lexer_t *lex = mp_lexer_new_from_file(src_file);
+    mp_parse_tree_t parse_tree = mp_parse(lex, MP_PARSE_FILE_INPUT);
+    mp_compile_to_raw_code(&parse_tree, src_file, false, cm);
+
+    // Native code can't be saved without relocation information.
+    if (!cm->has_native) {
+        mpy_cache_save(cache_path_str, src_path, &key, cm);
+    }
+    vstr_clear(&cache_path);
+    return true;
+}
+
+#endif // MICROPY_VFS_MPY_CACHE
@@ -85,6 +85,9 @@ static mp_obj_t vfs_posix_fun1_helper(mp_obj_t self_in, mp_obj_t path_in, int (*
     if (ret != 0) {
         mp_raise_OSError(errno);
     }
+    // This object may be used directly rather than through the VFS functions, so
+    // forget any cached directory listings used by import.
+    mp_vfs_import_cache_clear();
     return mp_const_none;
 }
 
@@ -167,6 +170,10 @@ static mp_obj_t vfs_posix_open(mp_obj_t self_in, mp_obj_t path_in, mp_obj_t mode
         && (strchr(mode, 'w') != NULL || strchr(mode, 'a') != NULL || strchr(mode, '+') != NULL)) {
         mp_raise_OSError(MP_EROFS);
     }
+    if (strpbrk(mode, "wax+") != NULL) {
+        // the file may be created
+        mp_vfs_import_cache_clear();
+    }
     if (!mp_obj_is_small_int(path_in)) {
         path_in = vfs_posix_get_path_obj(self, path_in);
     }
@@ -315,6 +322,7 @@ static mp_obj_t vfs_posix_mkdir(mp_obj_t self_in, mp_obj_t path_in) {
     if (ret != 0) {
         mp_raise_OSError(errno);
     }
+    mp_vfs_import_cache_clear();
     return mp_const_none;
 }
 static MP_DEFINE_CONST_FUN_OBJ_2(vfs_posix_mkdir_obj, vfs_posix_mkdir);
@@ -334,6 +342,7 @@ static mp_obj_t vfs_posix_rename(mp_obj_t self_in, mp_obj_t old_path_in, mp_obj_
     if (ret != 0) {
         mp_raise_OSError(errno);
     }
+    mp_vfs_import_cache_clear();
     return mp_const_none;
 }
 static MP_DEFINE_CONST_FUN_OBJ_3(vfs_posix_rename_obj, vfs_posix_rename);
@@ -86,8 +86,9 @@ void mp_reader_new_file(mp_reader_t *reader, qstr filename) {
     const mp_stream_p_t *stream_p = mp_get_stream(file);
     int errcode = 0;
 
-    #if MICROPY_VFS_ROM
-    // Check if the stream can be memory mapped.
+    #if MICROPY_PERSISTENT_CODE_LOAD_MEMMAP
+    // Check if the stream can be memory mapped.  If so, the data is referenced
+    // in place (see MICROPY_PERSISTENT_CODE_LOAD_MEMMAP) and must outlive the file object.
     mp_buffer_info_t bufinfo;
     if (mp_get_buffer(file, &bufinfo, MP_BUFFER_READ)) {
         mp_reader_new_mem(reader, bufinfo.buf, bufinfo.len, MP_READER_IS_ROM);
@@ -0,0 +1,160 @@
+// Use of this source code is governed by a BSD-style
+// license that can be found in the LICENSE file.
+
+#include "re1.5.h"
+
+// Pike VM: all threads of the program are run in lock step over the input, so
+// the time taken is linear in the length of the input and the recursion depth
+// only depends on the program.  Threads are kept in priority order, and the first
+// one to reach Match stops all the threads after it, which gives the same
+// submatches as the backtracking matchers.
+
+typedef struct ThreadList ThreadList;
+typedef struct PikeVM PikeVM;
+
+struct ThreadList
+{
+	int n;
+	// Each thread is its pc followed by its nsubp submatch pointers.
+	const char **t;
+};
+
+struct PikeVM
+{
+	char *insts;
+	Subject *input;
+	int nsubp;
+	// The position that each pc was last added to a list at.
+	const char **mark;
+};
+
+static void
+addthread(PikeVM *vm, ThreadList *l, char *pc, const char *sp, const char **subp)
+{
+	const char *old;
+	const char **t;
+	int off;
+
+	re1_5_stack_chk();
+
+	if(vm->mark[pc - vm->insts] == sp)
+		return;
+	vm->mark[pc - vm->insts] = sp;
+
+	switch(*pc) {
+	case Jmp:
+		off = (signed char)pc[1];
+		addthread(vm, l, pc + 2 + off, sp, subp);
+		return;
+	case Split:
+		off = (signed char)pc[1];
+		addthread(vm, l, pc + 2, sp, subp);
+		addthread(vm, l, pc + 2 + off, sp, subp);
+		return;
+	case RSplit:
+		off = (signed char)pc[1];
+		addthread(vm, l, pc + 2 + off, sp, subp);
+		addthread(vm, l, pc + 2, sp, subp);
+		return;
+	case Save:
+		off = (unsigned char)pc[1];
+		if(off >= vm->nsubp) {
+			addthread(vm, l, pc + 2, sp, subp);
+			return;
+		}
+		old = subp[off];
+		subp[off] = sp;
+		addthread(vm, l, pc + 2, sp, subp);
+		subp[off] = old;
+		return;
+	case Bol:
+		if(sp == vm->input->begin_line)
+			addthread(vm, l, pc + 1, sp, subp);
+		return;
+	case Eol:
+		if(sp == vm->input->end)
+			addthread(vm, l, pc + 1, sp, subp);
+		return;
+	}
+
+	// A consumer or Match, which runs on the next step.
+	t = l->t + l->n++ * (1 + vm->nsubp);
+	t[0] = pc;
+	memcpy(t + 1, subp, vm->nsubp * sizeof(*subp));
+}
+
+int
+re1_5_pikevm(ByteProg *prog, Subject *input, const char **subp, int nsubp, int is_anchored)
+{
+	PikeVM vm;
+	ThreadList clist, nlist, tmp;
+	const char **mem, **t;
+	const char *sp;
+	char *pc;
+	int i, matched, stride;
+	size_t size;
+
+	// Each pc is added to a list at most once, and prog->len counts the
+	// instructions, so it bounds the number of threads in a list.
+	stride = 1 + nsubp;
+	size = (prog->bytelen + 2 * prog->len * stride + nsubp) * sizeof(*mem);
+	mem = re1_5_alloc(size);
+	memset(mem, 0, size);
+	vm.insts = prog->insts;
+	vm.input = input;
+	vm.nsubp = nsubp;
+	vm.mark = mem;
+	clist.t = mem + prog->bytelen;
+	nlist.t = clist.t + prog->len * stride;
+
+	clist.n = 0;
+	addthread(&vm, &clist, HANDLE_ANCHORED(prog->insts, is_anchored), input->begin, nlist.t + prog->len * stride);
+
+	matched = 0;
+	for(sp = input->begin; clist.n > 0; sp++) {
+		nlist.n = 0;
+		for(i = 0; i < clist.n; i++) {
+			t = clist.t + i * stride;
+			pc = (char*)t[0];
+			if(inst_is_consumer(*pc)) {
+				// If we need to match a character, but there's none left, it's fail
+				if(sp >= input->end)
+					continue;
+			}
+			switch(*pc) {
+			case Char:
+				if(*sp != pc[1])
+					continue;
+				addthread(&vm, &nlist, pc + 2, sp + 1, t + 1);
+				continue;
+			case Any:
+				addthread(&vm, &nlist, pc + 1, sp + 1, t + 1);
+				continue;
+			case Class:
+			case ClassNot:
+				if(!_re1_5_classmatch(pc + 1, sp))
+					continue;
+				addthread(&vm, &nlist, pc + 2 + *(unsigned char*)(pc + 1) * 2, sp + 1, t + 1);
+				continue;
+			case NamedClass:
+				if(!_re1_5_namedclassmatch(pc + 1, sp))
+					continue;
+				addthread(&vm, &nlist, pc + 2, sp + 1, t + 1);
+				continue;
+			case Match:
+				memcpy(subp, t + 1, nsubp * sizeof(*subp));
+				matched = 1;
+				// Cut off the lower priority threads.
+				clist.n = i;
+				continue;
+			}
+			re1_5_fatal("pikevm");
+		}
+		tmp = clist;
+		clist = nlist;
+		nlist = tmp;
+	}
+
+	re1_5_free(mem, size);
+	return matched;
+}
@@ -53,6 +53,10 @@ void re1_5_fatal(char*);
 #ifndef re1_5_stack_chk
 #define re1_5_stack_chk()
 #endif
+#ifndef re1_5_alloc
+#define re1_5_alloc(n) malloc(n)
+#define re1_5_free(p, n) free(p)
+#endif
 void *mal(int);
 
 struct Prog
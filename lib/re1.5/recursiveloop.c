@@ -83,5 +83,43 @@ recursiveloop(char *pc, const char *sp, Subject *input, const char **subp, int n
 int
 re1_5_recursiveloopprog(ByteProg *prog, Subject *input, const char **subp, int nsubp, int is_anchored)
 {
-	return recursiveloop(HANDLE_ANCHORED(prog->insts, is_anchored), input->begin, input, subp, nsubp);
+	char *pc = HANDLE_ANCHORED(prog->insts, 1);
+	char *first = pc;
+	const char *sp = input->begin;
+
+	if(is_anchored)
+		return recursiveloop(pc, sp, input, subp, nsubp);
+
+	// Try each start position in turn, instead of running the non-anchored
+	// prefix code, which recurses once per position.  If the first instruction
+	// after the leading Saves is a consumer, only the positions that it matches
+	// at are tried.
+	while(*first == Save)
+		first += 2;
+	for(;; sp++) {
+		if(sp < input->end) {
+			switch(*first) {
+			case Char:
+				sp = memchr(sp, first[1], input->end - sp);
+				if(sp == nil)
+					return 0;
+				break;
+			case Class:
+			case ClassNot:
+				if(!_re1_5_classmatch(first + 1, sp))
+					continue;
+				break;
+			case NamedClass:
+				if(!_re1_5_namedclassmatch(first + 1, sp))
+					continue;
+				break;
+			}
+		} else if(inst_is_consumer(*first)) {
+			return 0;
+		}
+		if(recursiveloop(pc, sp, input, subp, nsubp))
+			return 1;
+		if(sp >= input->end)
+			return 0;
+	}
 }
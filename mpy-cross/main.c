@@ -132,6 +132,7 @@ static int usage(char **argv) {
         "-msmall-int-bits=number : set the maximum bits used to encode a small-int\n"
         "-march=<arch> : set architecture for native emitter;\n"
         "                x86, x64, armv6, armv6m, armv7m, armv7em, armv7emsp, armv7emdp, xtensa, xtensawin, rv32imc, debug\n"
+        "-msuperinstructions : emit bytecode superinstructions (target must enable them)\n"
         "\n"
         "Implementation specific options:\n", argv[0]
         );
@@ -237,6 +238,8 @@ MP_NOINLINE int main_(int argc, char **argv) {
     // don't support native emitter unless -march is specified
     mp_dynamic_compiler.native_arch = MP_NATIVE_ARCH_NONE;
     mp_dynamic_compiler.nlr_buf_num_regs = 0;
+    // superinstructions must be requested with -msuperinstructions
+    mp_dynamic_compiler.superinstructions = false;
 
     const char *input_file = NULL;
     const char *output_file = NULL;
@@ -283,6 +286,8 @@ MP_NOINLINE int main_(int argc, char **argv) {
                     return usage(argv);
                 }
                 // TODO check that small_int_bits is within range of host's capabilities
+            } else if (strcmp(argv[a], "-msuperinstructions") == 0) {
+                mp_dynamic_compiler.superinstructions = true;
             } else if (strncmp(argv[a], "-march=", sizeof("-march=") - 1) == 0) {
                 const char *arch = argv[a] + sizeof("-march=") - 1;
                 if (strcmp(arch, "x86") == 0) {
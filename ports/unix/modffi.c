@@ -30,6 +30,7 @@
 #include "py/mperrno.h"
 #include "py/objint.h"
 #include "py/gc.h"
+#include "py/persistentcode.h"
 
 #if MICROPY_PY_FFI
 
@@ -334,6 +335,13 @@ static mp_obj_t mod_ffi_callback(size_t n_args, const mp_obj_t *pos_args, mp_map
     mp_arg_parse_all(n_args - 3, pos_args + 3, kw_args, MP_ARRAY_SIZE(allowed_args), allowed_args, args);
     bool lock_in = args[ARG_lock].u_bool;
 
+    #if MICROPY_PERSISTENT_CODE_LOAD_LAZY
+    if (lock_in) {
+        // The callback runs with the heap locked, when bytecode can't be read in.
+        mp_raw_code_load_lazy_all();
+    }
+    #endif
+
     const char *rettype = mp_obj_str_get_str(rettype_in);
 
     mp_int_t nparams = MP_OBJ_SMALL_INT_VALUE(mp_obj_len_maybe(paramtypes_in));
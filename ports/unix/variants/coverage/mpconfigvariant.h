@@ -37,6 +37,71 @@
 #define MICROPY_GC_SPLIT_HEAP          (1)
 #define MICROPY_GC_SPLIT_HEAP_N_HEAPS  (4)
 
+// Enable testing of the GC free-run index.
+#define MICROPY_GC_FREE_RUN_INDEX      (1)
+
+// Enable testing of incremental sweeping.
+#define MICROPY_GC_INCREMENTAL_SWEEP   (1)
+
+// Enable testing of the GC stack in free blocks.
+#define MICROPY_GC_STACK_IN_FREE_BLOCKS (1)
+
+// Enable testing of heap compaction.
+#define MICROPY_GC_COMPACT             (1)
+
+// Enable testing of the float freelist.
+#define MICROPY_GC_FLOAT_FREELIST      (1)
+
+// Enable testing of the hash index for large ordered maps.
+#define MICROPY_OPT_MAP_ORDERED_INDEX  (1)
+
+// Enable testing of the VM inline caches.
+#define MICROPY_OPT_INLINE_CACHE       (1)
+
+// Enable testing of bytecode superinstructions.
+#define MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS (1)
+
+// Enable testing of storing float results in float temporaries.
+#define MICROPY_OPT_FLOAT_TEMPORARIES  (1)
+
+// Enable testing of str and bytes slices that refer to the original data.
+#define MICROPY_PY_BUILTINS_STR_SLICE_VIEW (1)
+#define MICROPY_PY_BUILTINS_STR_SLICE_VIEW_MIN_LEN (8)
+
+// Enable testing of the qstr pool hash index.
+#define MICROPY_OPT_QSTR_INDEX         (1)
+
+// Enable testing of recompiling hot functions with the native emitter.
+#define MICROPY_OPT_TIERED_NATIVE      (1)
+
+// Enable testing of the import directory listing cache.
+#define MICROPY_VFS_IMPORT_CACHE       (1)
+
+// Enable testing of the cache of .mpy files compiled from imported .py files.
+#define MICROPY_VFS_MPY_CACHE          (1)
+
+// Enable testing of lazily loading the bytecode of functions in .mpy files.
+#define MICROPY_PERSISTENT_CODE_LOAD_LAZY (1)
+
+// Enable testing of parsing and compiling files one statement at a time.
+#define MICROPY_PARSE_STREAMING        (1)
+
+// Enable testing of fixed instance layouts for classes with __slots__.
+#define MICROPY_PY_CLASS_SLOTS         (1)
+
+// Enable testing of the native asyncio event loop, sleep_ms and IOQueue.
+#define MICROPY_PY_ASYNCIO_NATIVE_LOOP (1)
+
+// Enable testing of json.iterload.
+#define MICROPY_PY_JSON_ITERLOAD       (1)
+
+// Enable testing of the buffered json.dump(s) serializer.
+#define MICROPY_PY_JSON_FAST_DUMP      (1)
+
+// Enable testing of the re pattern cache and the re.LINEAR flag.
+#define MICROPY_PY_RE_CACHE_SIZE       (8)
+#define MICROPY_PY_RE_LINEAR           (1)
+
 // Enable additional features.
 #define MICROPY_DEBUG_PARSE_RULE_NAME  (1)
 #define MICROPY_TRACKED_ALLOC          (1)
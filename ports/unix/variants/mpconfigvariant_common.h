@@ -113,6 +113,9 @@
 // The "select" module is enabled by default, but disable select.select().
 #define MICROPY_PY_SELECT_POSIX_OPTIMISATIONS (1)
 #define MICROPY_PY_SELECT_SELECT       (0)
+#if defined(__linux__)
+#define MICROPY_PY_SELECT_EPOLL        (1)
+#endif
 
 // Enable the "websocket" module.
 #define MICROPY_PY_WEBSOCKET           (1)
@@ -210,6 +210,9 @@ typedef struct _mp_module_constants_t {
     qstr source_file;
     #endif
     mp_obj_t *obj_table;
+    #if MICROPY_OPT_TIERED_NATIVE
+    struct _mp_tiered_native_source_t *tiered_native_source; // see mp_compile_tiered_native
+    #endif
 } mp_module_constants_t;
 
 // State associated with a module.
@@ -299,6 +302,9 @@ const byte *mp_bytecode_print_str(const mp_print_t *print, const byte *ip_start,
 #define MP_TAGPTR_MAKE(ptr, tag) ((void *)((uintptr_t)(ptr) | (tag)))
 
 static inline void mp_module_context_alloc_tables(mp_module_context_t *context, size_t n_qstr, size_t n_obj) {
+    #if MICROPY_OPT_TIERED_NATIVE
+    context->constants.tiered_native_source = NULL;
+    #endif
     #if MICROPY_EMIT_BYTECODE_USES_QSTR_TABLE
     size_t nq = (n_qstr * sizeof(qstr_short_t) + sizeof(mp_uint_t) - 1) / sizeof(mp_uint_t);
     size_t no = n_obj;
@@ -53,9 +53,9 @@
 
 // Load, Store, Delete, Import, Make, Build, Unpack, Call, Jump, Exception, For, sTack, Return, Yield, Op
 #define MP_BC_BASE_RESERVED                 (0x00) // ----------------
-#define MP_BC_BASE_QSTR_O                   (0x10) // LLLLLLSSSDDII---
+#define MP_BC_BASE_QSTR_O                   (0x10) // LLLLLLSSSDDIILLS
 #define MP_BC_BASE_VINT_E                   (0x20) // MMLLLLSSDDBBBBBB
-#define MP_BC_BASE_VINT_O                   (0x30) // UUMMCCCC--------
+#define MP_BC_BASE_VINT_O                   (0x30) // UUMMCCCCOOOOOOOS
 #define MP_BC_BASE_JUMP_E                   (0x40) // J-JJJJJEEEEF----
 #define MP_BC_BASE_BYTE_O                   (0x50) // LLLLSSDTTTTTEEFF
 #define MP_BC_BASE_BYTE_E                   (0x60) // --BREEEYYI------
@@ -159,4 +159,19 @@
 #define MP_BC_IMPORT_FROM                   (MP_BC_BASE_QSTR_O + 0x0c) // qstr
 #define MP_BC_IMPORT_STAR                   (MP_BC_BASE_BYTE_E + 0x09)
 
+// Superinstructions, see MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS
+#define MP_BC_LOAD_FAST0_ATTR               (MP_BC_BASE_QSTR_O + 0x0d) // qstr
+#define MP_BC_LOAD_FAST0_METHOD             (MP_BC_BASE_QSTR_O + 0x0e) // qstr
+#define MP_BC_STORE_FAST0_ATTR              (MP_BC_BASE_QSTR_O + 0x0f) // qstr
+#define MP_BC_BINARY_OP_SMALL_INT_MULTI     (MP_BC_BASE_VINT_O + 0x08) // uint; N=7 binary ops, see below
+#define MP_BC_LOAD_SUBSCR_SMALL_INT         (MP_BC_BASE_VINT_O + 0x0f) // uint
+
+#define MP_BC_BINARY_OP_SMALL_INT_MULTI_NUM (7)
+
+// The binary op that each of the BINARY_OP_SMALL_INT_MULTI opcodes applies
+// to the top of the stack and its small int argument: the first three
+// comparisons, then inplace add/subtract, then add/subtract.
+#define MP_BC_BINARY_OP_SMALL_INT_MULTI_OP(n) \
+    ((n) < 3 ? (n) : (n) < 5 ? MP_BINARY_OP_INPLACE_ADD + (n) - 3 : MP_BINARY_OP_ADD + (n) - 5)
+
 #endif // MICROPY_INCLUDED_PY_BC0_H
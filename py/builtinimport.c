@@ -39,6 +39,10 @@
 #include "py/builtin.h"
 #include "py/frozenmod.h"
 
+#if MICROPY_VFS_MPY_CACHE
+#include "extmod/vfs.h"
+#endif
+
 #if MICROPY_DEBUG_VERBOSE // print debugging info
 #define DEBUG_PRINT (1)
 #define DEBUG_printf DEBUG_printf
@@ -254,6 +258,19 @@ static void do_load(mp_module_context_t *module_obj, vstr_t *file) {
     }
     #endif
 
+    // If there is an on-device cache of compiled .py files then get the module
+    // from it, or compile the module and add it to the cache.
+    #if MICROPY_VFS_MPY_CACHE
+    {
+        mp_compiled_module_t cm;
+        cm.context = module_obj;
+        if (mp_vfs_mpy_cache_compile(file_qstr, &cm)) {
+            do_execute_proto_fun(cm.context, cm.rc, file_qstr);
+            return;
+        }
+    }
+    #endif
+
     // If we can compile scripts then load the file and compile and execute it.
     #if MICROPY_ENABLE_COMPILER
     {
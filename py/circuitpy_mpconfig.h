@@ -91,6 +91,8 @@ extern void common_hal_mcu_enable_interrupts(void);
 #define MICROPY_OPT_MAP_LOOKUP_CACHE  (CIRCUITPY_OPT_MAP_LOOKUP_CACHE)
 #define MICROPY_OPT_MPZ_BITWISE          (0)
 #define MICROPY_OPT_CACHE_MAP_LOOKUP_IN_BYTECODE (CIRCUITPY_OPT_CACHE_MAP_LOOKUP_IN_BYTECODE)
+#define MICROPY_OPT_TIERED_NATIVE        (CIRCUITPY_OPT_TIERED_NATIVE)
+#define MICROPY_PARSE_STREAMING          (CIRCUITPY_PARSE_STREAMING)
 #define MICROPY_PERSISTENT_CODE_LOAD     (1)
 
 #define MICROPY_PY_ARRAY                 (CIRCUITPY_ARRAY)
@@ -129,6 +131,8 @@ extern void common_hal_mcu_enable_interrupts(void);
 #define MICROPY_PY_IO_IOBASE             (CIRCUITPY_IO_IOBASE)
 // In extmod
 #define MICROPY_PY_JSON                 (CIRCUITPY_JSON)
+#define MICROPY_PY_JSON_ITERLOAD        (CIRCUITPY_JSON_ITERLOAD)
+#define MICROPY_PY_JSON_FAST_DUMP       (CIRCUITPY_JSON_FAST_DUMP)
 #define MICROPY_PY_MATH                  (0)
 #define MICROPY_PY_MICROPYTHON_MEM_INFO  (0)
 // Supplanted by shared-bindings/random
@@ -179,6 +183,9 @@ extern void common_hal_mcu_enable_interrupts(void);
 #define MICROPY_VFS                 (1)
 #define MICROPY_VFS_FAT             (MICROPY_VFS)
 #define MICROPY_READER_VFS          (MICROPY_VFS)
+#define MICROPY_VFS_IMPORT_CACHE    (CIRCUITPY_VFS_IMPORT_CACHE)
+#define MICROPY_VFS_MPY_CACHE       (CIRCUITPY_VFS_MPY_CACHE)
+#define MICROPY_PERSISTENT_CODE_LOAD_LAZY (CIRCUITPY_PERSISTENT_CODE_LOAD_LAZY)
 
 // type definitions for the specific machine
 
@@ -280,6 +287,8 @@ typedef long mp_off_t;
 #define MICROPY_PY_RE_MATCH_GROUPS           (CIRCUITPY_RE)
 #define MICROPY_PY_RE_MATCH_SPAN_START_END   (CIRCUITPY_RE)
 #define MICROPY_PY_RE_SUB                    (CIRCUITPY_RE)
+#define MICROPY_PY_RE_CACHE_SIZE             (CIRCUITPY_RE ? CIRCUITPY_RE_CACHE_SIZE : 0)
+#define MICROPY_PY_RE_LINEAR                 (CIRCUITPY_RE && CIRCUITPY_RE_LINEAR)
 
 #define CIRCUITPY_MICROPYTHON_ADVANCED        (0)
 
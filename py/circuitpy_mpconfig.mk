@@ -83,10 +83,19 @@ CFLAGS += -DMICROPY_PY_ASYNCIO=$(MICROPY_PY_ASYNCIO)
 MICROPY_PY_SELECT ?= $(MICROPY_PY_ASYNCIO)
 CFLAGS += -DMICROPY_PY_SELECT=$(MICROPY_PY_SELECT)
 
+# Native event loop, sleep_ms and IOQueue for asyncio. IOQueue uses select.poll.
+# Off until the asyncio library uses them.
+MICROPY_PY_ASYNCIO_NATIVE_LOOP ?= 0
+CFLAGS += -DMICROPY_PY_ASYNCIO_NATIVE_LOOP=$(MICROPY_PY_ASYNCIO_NATIVE_LOOP)
+
 # enable select.select if select is enabled.
 MICROPY_PY_SELECT_SELECT ?= $(MICROPY_PY_SELECT)
 CFLAGS += -DMICROPY_PY_SELECT_SELECT=$(MICROPY_PY_SELECT_SELECT)
 
+# Streams such as keypad.EventQueue notify select.poll when they may be ready, instead of being polled (experimental)
+MICROPY_PY_SELECT_NOTIFY ?= 0
+CFLAGS += -DMICROPY_PY_SELECT_NOTIFY=$(MICROPY_PY_SELECT_NOTIFY)
+
 CIRCUITPY_AESIO ?= $(CIRCUITPY_FULL_BUILD)
 CFLAGS += -DCIRCUITPY_AESIO=$(CIRCUITPY_AESIO)
 
@@ -355,6 +364,14 @@ CFLAGS += -DCIRCUITPY_JPEGIO=$(CIRCUITPY_JPEGIO)
 CIRCUITPY_JSON ?= $(CIRCUITPY_FULL_BUILD)
 CFLAGS += -DCIRCUITPY_JSON=$(CIRCUITPY_JSON)
 
+# Provide json.iterload (experimental)
+CIRCUITPY_JSON_ITERLOAD ?= 0
+CFLAGS += -DCIRCUITPY_JSON_ITERLOAD=$(CIRCUITPY_JSON_ITERLOAD)
+
+# Serialize json.dump(s) output through a buffer (experimental)
+CIRCUITPY_JSON_FAST_DUMP ?= 0
+CFLAGS += -DCIRCUITPY_JSON_FAST_DUMP=$(CIRCUITPY_JSON_FAST_DUMP)
+
 CIRCUITPY_KEYPAD ?= $(CIRCUITPY_FULL_BUILD)
 CFLAGS += -DCIRCUITPY_KEYPAD=$(CIRCUITPY_KEYPAD)
 
@@ -409,6 +426,26 @@ CFLAGS += -DCIRCUITPY_OPT_LOAD_ATTR_FAST_PATH=$(CIRCUITPY_OPT_LOAD_ATTR_FAST_PAT
 CIRCUITPY_OPT_MAP_LOOKUP_CACHE ?= $(CIRCUITPY_FULL_BUILD)
 CFLAGS += -DCIRCUITPY_OPT_MAP_LOOKUP_CACHE=$(CIRCUITPY_OPT_MAP_LOOKUP_CACHE)
 
+# Recompile hot functions with the native emitter (experimental, requires CIRCUITPY_ENABLE_MPY_NATIVE)
+CIRCUITPY_OPT_TIERED_NATIVE ?= 0
+CFLAGS += -DCIRCUITPY_OPT_TIERED_NATIVE=$(CIRCUITPY_OPT_TIERED_NATIVE)
+
+# Cache the directory listings used to find modules to import (experimental)
+CIRCUITPY_VFS_IMPORT_CACHE ?= 0
+CFLAGS += -DCIRCUITPY_VFS_IMPORT_CACHE=$(CIRCUITPY_VFS_IMPORT_CACHE)
+
+# Read the bytecode of functions in .mpy files when each is first used
+CIRCUITPY_PERSISTENT_CODE_LOAD_LAZY ?= 0
+CFLAGS += -DCIRCUITPY_PERSISTENT_CODE_LOAD_LAZY=$(CIRCUITPY_PERSISTENT_CODE_LOAD_LAZY)
+
+# Parse, compile and run .py files one top-level statement at a time
+CIRCUITPY_PARSE_STREAMING ?= 0
+CFLAGS += -DCIRCUITPY_PARSE_STREAMING=$(CIRCUITPY_PARSE_STREAMING)
+
+# Cache .mpy files compiled from imported .py files in /.mpy_cache, if it exists
+CIRCUITPY_VFS_MPY_CACHE ?= 0
+CFLAGS += -DCIRCUITPY_VFS_MPY_CACHE=$(CIRCUITPY_VFS_MPY_CACHE)
+
 CIRCUITPY_OS ?= 1
 CFLAGS += -DCIRCUITPY_OS=$(CIRCUITPY_OS)
 
@@ -460,6 +497,14 @@ CFLAGS += -DCIRCUITPY_RCLCPY=$(CIRCUITPY_RCLCPY)
 CIRCUITPY_RE ?= $(CIRCUITPY_FULL_BUILD)
 CFLAGS += -DCIRCUITPY_RE=$(CIRCUITPY_RE)
 
+# Number of compiled re patterns to keep for reuse (experimental)
+CIRCUITPY_RE_CACHE_SIZE ?= 0
+CFLAGS += -DCIRCUITPY_RE_CACHE_SIZE=$(CIRCUITPY_RE_CACHE_SIZE)
+
+# Provide the re.LINEAR flag (experimental)
+CIRCUITPY_RE_LINEAR ?= 0
+CFLAGS += -DCIRCUITPY_RE_LINEAR=$(CIRCUITPY_RE_LINEAR)
+
 # Should busio.I2C() check for pullups?
 # Some boards in combination with certain peripherals may not want this.
 CIRCUITPY_REQUIRE_I2C_PULLUPS ?= 1
@@ -35,7 +35,9 @@
 #include "py/compile.h"
 #include "py/runtime.h"
 #include "py/asmbase.h"
+#include "py/bc0.h"
 #include "py/nativeglue.h"
+#include "py/objfun.h"
 #include "py/persistentcode.h"
 #include "py/smallint.h"
 
@@ -175,6 +177,10 @@ typedef struct _compiler_t {
     uint8_t is_repl;
     uint8_t pass; // holds enum type pass_kind_t
     uint8_t have_star;
+    #if MICROPY_COMP_CONST_FOLDING_EXTENDED
+    uint8_t have_import_star;
+    uint8_t is_partial_module; // only some of the module's statements are being compiled
+    #endif
 
     // try to keep compiler clean from nlr
     mp_obj_t compile_error; // set to an exception object if there's an error
@@ -192,6 +198,9 @@ typedef struct _compiler_t {
 
     scope_t *scope_head;
     scope_t *scope_cur;
+    #if MICROPY_OPT_TIERED_NATIVE
+    scope_t *scope_tiered_native; // scope being recompiled by mp_compile_tiered_native
+    #endif
 
     emit_t *emit;                                   // current emitter
     #if NEED_METHOD_TABLE
@@ -294,6 +303,21 @@ static void reserve_labels_for_native(compiler_t *comp, int n) {
 #define reserve_labels_for_native(comp, n)
 #endif
 
+#if MICROPY_OPT_TIERED_NATIVE
+// Native code doesn't check for pending exceptions or run background tasks, so
+// when a hot function is recompiled each iteration of its loops calls out to
+// do that, to behave the same as the bytecode.
+static void compile_tiered_native_loop_check(compiler_t *comp) {
+    if (comp->scope_cur == comp->scope_tiered_native) {
+        EMIT_ARG(load_const_obj, MP_OBJ_FROM_PTR(&mp_native_tiered_loop_check_obj));
+        EMIT_ARG(call_function, 0, 0, 0);
+        EMIT(pop_top);
+    }
+}
+#else
+#define compile_tiered_native_loop_check(comp)
+#endif
+
 static void compile_increase_except_level(compiler_t *comp, uint label, int kind) {
     EMIT_ARG(setup_block, label, kind);
     comp->cur_except_level += 1;
@@ -1205,6 +1229,10 @@ static void compile_import_from(compiler_t *comp, mp_parse_node_struct_t *pns) {
         }
         #endif
 
+        #if MICROPY_COMP_CONST_FOLDING_EXTENDED
+        comp->have_import_star = true;
+        #endif
+
         EMIT_ARG(load_const_small_int, import_level);
 
         // build the "fromlist" tuple
@@ -1307,6 +1335,13 @@ static void compile_assert_stmt(compiler_t *comp, mp_parse_node_struct_t *pns) {
         return;
     }
 
+    #if MICROPY_COMP_CONST_FOLDING_EXTENDED
+    // optimisation: don't emit anything for an assertion that always holds
+    if (mp_parse_node_is_const_true(pns->nodes[0])) {
+        return;
+    }
+    #endif
+
     uint l_end = comp_next_label(comp);
     c_if_cond(comp, pns->nodes[0], true, l_end);
     EMIT_LOAD_GLOBAL(MP_QSTR_AssertionError); // we load_global instead of load_id, to be consistent with CPython
@@ -1398,6 +1433,7 @@ static void compile_while_stmt(compiler_t *comp, mp_parse_node_struct_t *pns) {
             EMIT_ARG(jump, continue_label);
         }
         EMIT_ARG(label_assign, top_label);
+        compile_tiered_native_loop_check(comp);
         compile_node(comp, pns->nodes[1]); // body
         EMIT_ARG(label_assign, continue_label);
         c_if_cond(comp, pns->nodes[0], true, top_label); // condition
@@ -1450,6 +1486,7 @@ static void compile_for_stmt_optimised_range(compiler_t *comp, mp_parse_node_t p
     c_assign(comp, pn_var, ASSIGN_STORE);
 
     // compile body
+    compile_tiered_native_loop_check(comp);
     compile_node(comp, pn_body);
 
     EMIT_ARG(label_assign, continue_label);
@@ -1576,6 +1613,7 @@ static void compile_for_stmt(compiler_t *comp, mp_parse_node_struct_t *pns) {
     EMIT_ARG(label_assign, continue_label);
     EMIT_ARG(for_iter, pop_label);
     c_assign(comp, pns->nodes[0], ASSIGN_STORE); // variable
+    compile_tiered_native_loop_check(comp);
     compile_node(comp, pns->nodes[2]); // body
     EMIT_ARG(jump, continue_label);
     EMIT_ARG(label_assign, pop_label);
@@ -2123,6 +2161,17 @@ static void compile_test_if_expr(compiler_t *comp, mp_parse_node_struct_t *pns)
     assert(MP_PARSE_NODE_IS_STRUCT_KIND(pns->nodes[1], PN_test_if_else));
     mp_parse_node_struct_t *pns_test_if_else = (mp_parse_node_struct_t *)pns->nodes[1];
 
+    #if MICROPY_COMP_CONST_FOLDING_EXTENDED
+    // optimisation: only compile the value that is chosen by a constant condition
+    if (mp_parse_node_is_const_true(pns_test_if_else->nodes[0])) {
+        compile_node(comp, pns->nodes[0]);
+        return;
+    } else if (mp_parse_node_is_const_false(pns_test_if_else->nodes[0])) {
+        compile_node(comp, pns_test_if_else->nodes[1]);
+        return;
+    }
+    #endif
+
     uint l_fail = comp_next_label(comp);
     uint l_end = comp_next_label(comp);
     c_if_cond(comp, pns_test_if_else->nodes[0], false, l_fail); // condition
@@ -2298,7 +2347,52 @@ static void compile_factor_2(compiler_t *comp, mp_parse_node_struct_t *pns) {
     EMIT_ARG(unary_op, op);
 }
 
+#if MICROPY_COMP_CONST_FOLDING_EXTENDED
+// If the node is a call of the builtin len() on a constant str, bytes or tuple
+// then get the length.  Only done when nothing in the module can rebind len,
+// which is only known once all scopes have been through MP_PASS_SCOPE.
+static bool compile_get_const_len(compiler_t *comp, mp_parse_node_struct_t *pns, size_t *len) {
+    if (comp->pass == MP_PASS_SCOPE
+        || comp->is_repl
+        || comp->is_partial_module
+        || comp->have_import_star
+        || !MP_PARSE_NODE_IS_ID(pns->nodes[0])
+        || MP_PARSE_NODE_LEAF_ARG(pns->nodes[0]) != MP_QSTR_len
+        || !MP_PARSE_NODE_IS_STRUCT_KIND(pns->nodes[1], PN_trailer_paren)) {
+        return false;
+    }
+    mp_parse_node_t pn_arg = ((mp_parse_node_struct_t *)pns->nodes[1])->nodes[0];
+    mp_obj_t arg;
+    if (MP_PARSE_NODE_IS_LEAF(pn_arg) && MP_PARSE_NODE_LEAF_KIND(pn_arg) == MP_PARSE_NODE_STRING) {
+        arg = MP_OBJ_NEW_QSTR(MP_PARSE_NODE_LEAF_ARG(pn_arg));
+    } else if (MP_PARSE_NODE_IS_STRUCT_KIND(pn_arg, PN_const_object)) {
+        arg = mp_parse_node_extract_const_object((mp_parse_node_struct_t *)pn_arg);
+        if (!(mp_obj_is_str(arg) || mp_obj_is_type(arg, &mp_type_bytes) || mp_obj_is_type(arg, &mp_type_tuple))) {
+            return false;
+        }
+    } else {
+        return false;
+    }
+    for (scope_t *s = comp->scope_head; s != NULL; s = s->next) {
+        id_info_t *id = scope_find(s, MP_QSTR_len);
+        if (id != NULL && id->kind != ID_INFO_KIND_GLOBAL_IMPLICIT) {
+            return false;
+        }
+    }
+    *len = MP_OBJ_SMALL_INT_VALUE(mp_obj_len(arg));
+    return true;
+}
+#endif
+
 static void compile_atom_expr_normal(compiler_t *comp, mp_parse_node_struct_t *pns) {
+    #if MICROPY_COMP_CONST_FOLDING_EXTENDED
+    size_t len;
+    if (compile_get_const_len(comp, pns, &len)) {
+        EMIT_ARG(load_const_small_int, len);
+        return;
+    }
+    #endif
+
     // compile the subject of the expression
     compile_node(comp, pns->nodes[0]);
 
@@ -3058,7 +3152,7 @@ static bool compile_scope(compiler_t *comp, scope_t *scope, pass_kind_t pass) {
     comp->next_label = 0;
     mp_emit_common_start_pass(&comp->emit_common, pass);
     EMIT_ARG(start_pass, pass, scope);
-    reserve_labels_for_native(comp, 6); // used by native's start_pass
+    reserve_labels_for_native(comp, 7); // used by native's start_pass
 
     if (comp->pass == MP_PASS_SCOPE) {
         // reset maximum stack sizes in scope
@@ -3485,15 +3579,21 @@ static void scope_compute_things(scope_t *scope) {
     }
 }
 
-#if !MICROPY_EXPOSE_MP_COMPILE_TO_RAW_CODE
-static
+#if MICROPY_OPT_TIERED_NATIVE
+static bool tiered_native_keep_source(compiler_t *comp, const mp_parse_tree_t *parse_tree, mp_module_context_t *context);
 #endif
-void mp_compile_to_raw_code(mp_parse_tree_t *parse_tree, qstr source_file, bool is_repl, mp_compiled_module_t *cm) {
+
+static void compile_to_raw_code(mp_parse_tree_t *parse_tree, qstr source_file, bool is_repl, bool is_partial_module, mp_compiled_module_t *cm) {
     // put compiler state on the stack, it's relatively small
     compiler_t comp_state = {0};
     compiler_t *comp = &comp_state;
 
     comp->is_repl = is_repl;
+    #if MICROPY_COMP_CONST_FOLDING_EXTENDED
+    comp->is_partial_module = is_partial_module;
+    #else
+    (void)is_partial_module;
+    #endif
     comp->break_label = INVALID_LABEL;
     comp->continue_label = INVALID_LABEL;
     mp_emit_common_init(&comp->emit_common, source_file);
@@ -3675,7 +3775,12 @@ void mp_compile_to_raw_code(mp_parse_tree_t *parse_tree, qstr source_file, bool
     }
     #endif
 
-    // free the parse tree
+    // free the parse tree, unless it's kept to recompile hot functions
+    #if MICROPY_OPT_TIERED_NATIVE
+    if (comp->compile_error == MP_OBJ_NULL && tiered_native_keep_source(comp, parse_tree, cm->context)) {
+        parse_tree->chunk = NULL;
+    }
+    #endif
     mp_parse_tree_clear(parse_tree);
 
     // free the scopes
@@ -3690,13 +3795,416 @@ void mp_compile_to_raw_code(mp_parse_tree_t *parse_tree, qstr source_file, bool
     }
 }
 
-mp_obj_t mp_compile(mp_parse_tree_t *parse_tree, qstr source_file, bool is_repl) {
+#if MICROPY_OPT_TIERED_NATIVE
+
+// The bytecode of a running function is compared with bytecode compiled again
+// from the source.  The two have different qstr and constant tables, so
+// operands that index those are compared by value, and as the indices may take
+// a different number of bytes, jumps and line numbers are compared by the
+// opcodes they refer to rather than by bytecode offset.
+typedef struct _tiered_native_match_t {
+    const mp_module_constants_t *constants; // of the running function
+    const mp_obj_list_t *const_obj_list;    // of the new bytecode
+    #if MICROPY_EMIT_BYTECODE_USES_QSTR_TABLE
+    qstr *qstr_table;                       // of the new bytecode, from the compiler's qstr map
+    #endif
+} tiered_native_match_t;
+
+typedef struct _tiered_native_code_t {
+    const byte *sig;
+    size_t sig_len;
+    const byte *names;
+    size_t n_names;
+    const byte *line_info;
+    const byte *line_info_top; // also the start of the cell info
+    const byte *code;
+} tiered_native_code_t;
+
+#define TIERED_NATIVE_HAS_SIGNED_OFFSET(opcode) (MP_BC_UNWIND_JUMP <= (opcode) && (opcode) <= MP_BC_POP_JUMP_IF_FALSE)
+
+static void tiered_native_decode_prelude(const byte *ip, tiered_native_code_t *code) {
+    code->sig = ip;
+    MP_BC_PRELUDE_SIG_DECODE(ip);
+    code->sig_len = ip - code->sig;
+    MP_BC_PRELUDE_SIZE_DECODE(ip);
+    code->names = ip;
+    code->n_names = 1 + n_pos_args + n_kwonly_args;
+    code->line_info_top = ip + n_info;
+    code->code = ip + n_info + n_cell;
+    for (size_t i = 0; i < code->n_names; ++i) {
+        ip = mp_decode_uint_skip(ip);
+    }
+    code->line_info = ip;
+}
+
+// Decode the argument of the opcode at ip and return a pointer to the next
+// opcode.  Jump arguments are made into offsets from the start of the code.
+static const byte *tiered_native_decode_op(const byte *code, const byte *ip, mp_int_t *arg) {
+    byte opcode = *ip++;
+    uint format = MP_BC_FORMAT(opcode);
+    *arg = 0;
+    if (format == MP_BC_FORMAT_QSTR || format == MP_BC_FORMAT_VAR_UINT) {
+        *arg = mp_decode_uint(&ip);
+    } else if (format == MP_BC_FORMAT_OFFSET) {
+        if ((*ip & 0x80) == 0) {
+            *arg = *ip++;
+            if (TIERED_NATIVE_HAS_SIGNED_OFFSET(opcode)) {
+                *arg -= 0x40;
+            }
+        } else {
+            *arg = (ip[0] & 0x7f) | (ip[1] << 7);
+            ip += 2;
+            if (TIERED_NATIVE_HAS_SIGNED_OFFSET(opcode)) {
+                *arg -= 0x4000;
+            }
+        }
+        *arg += ip - code;
+    }
+    if ((opcode & MP_BC_MASK_EXTRA_BYTE) == 0) {
+        ++ip;
+    }
+    return ip;
+}
+
+static bool tiered_native_qstr_equal(const tiered_native_match_t *m, mp_uint_t a, mp_uint_t b) {
+    #if MICROPY_EMIT_BYTECODE_USES_QSTR_TABLE
+    return m->constants->qstr_table[a] == m->qstr_table[b];
+    #else
+    (void)m;
+    return a == b;
+    #endif
+}
+
+static void tiered_native_add_pair(size_t **pairs, size_t *len, size_t *alloc, size_t a, size_t b) {
+    if (*len == *alloc) {
+        *pairs = m_renew(size_t, *pairs, 2 * *alloc, 4 * *alloc);
+        *alloc *= 2;
+    }
+    (*pairs)[2 * *len] = a;
+    (*pairs)[2 * *len + 1] = b;
+    ++*len;
+}
+
+static bool tiered_native_code_matches(const tiered_native_match_t *m, const byte *bytecode, mp_raw_code_t *const *child_table, const mp_raw_code_t *rc);
+
+// Compare a child of the running function with one of the new bytecode.
+static bool tiered_native_child_matches(const tiered_native_match_t *m, const mp_raw_code_t *child, const mp_raw_code_t *rc) {
+    if (rc->kind != MP_CODE_BYTECODE) {
+        return false;
+    }
+    if (mp_proto_fun_is_bytecode(child)) {
+        return tiered_native_code_matches(m, (const byte *)child, NULL, rc);
+    }
+    #if MICROPY_PERSISTENT_CODE_LOAD_LAZY
+    if (child->kind == MP_CODE_BYTECODE_LAZY) {
+        mp_raw_code_load_lazy((mp_raw_code_lazy_t *)child->fun_data);
+    }
+    #endif
+    return child->kind == MP_CODE_BYTECODE && tiered_native_code_matches(m, child->fun_data, child->children, rc);
+}
+
+// Compare the running bytecode with the new bytecode in rc, opcode by opcode,
+// including the functions they make.  The code after the last opcode that
+// doesn't fall through and isn't jumped past is left alone, as the bytecode
+// emitter doesn't emit any.
+static bool tiered_native_code_matches(const tiered_native_match_t *m, const byte *bytecode, mp_raw_code_t *const *child_table, const mp_raw_code_t *rc) {
+    tiered_native_code_t a, b;
+    tiered_native_decode_prelude(bytecode, &a);
+    tiered_native_decode_prelude(rc->fun_data, &b);
+    if (a.sig_len != b.sig_len || memcmp(a.sig, b.sig, a.sig_len) != 0
+        || a.code - a.line_info_top != b.code - b.line_info_top
+        || memcmp(a.line_info_top, b.line_info_top, a.code - a.line_info_top) != 0) {
+        return false;
+    }
+    for (size_t i = 0; i < a.n_names; ++i) {
+        mp_uint_t name_a = mp_decode_uint(&a.names);
+        mp_uint_t name_b = mp_decode_uint(&b.names);
+        if (!tiered_native_qstr_equal(m, name_a, name_b)) {
+            return false;
+        }
+    }
+
+    // offsets of each opcode, and of each jump target, in a and b
+    size_t ops_len = 0, ops_alloc = 16, jumps_len = 0, jumps_alloc = 4;
+    size_t *ops = m_new(size_t, 2 * ops_alloc);
+    size_t *jumps = m_new(size_t, 2 * jumps_alloc);
+
+    bool match = true;
+    const byte *ip_a = a.code;
+    const byte *ip_b = b.code;
+    mp_int_t max_jump_a = 0, max_jump_b = 0;
+    while (match) {
+        size_t off_a = ip_a - a.code;
+        size_t off_b = ip_b - b.code;
+        tiered_native_add_pair(&ops, &ops_len, &ops_alloc, off_a, off_b);
+        byte opcode = *ip_a;
+        if (*ip_b != opcode
+            || mp_bytecode_get_source_line(a.line_info, a.line_info_top, off_a)
+            != mp_bytecode_get_source_line(b.line_info, b.line_info_top, off_b)) {
+            match = false;
+            break;
+        }
+        mp_int_t arg_a, arg_b;
+        ip_a = tiered_native_decode_op(a.code, ip_a, &arg_a);
+        ip_b = tiered_native_decode_op(b.code, ip_b, &arg_b);
+        if ((opcode & MP_BC_MASK_EXTRA_BYTE) == 0 && ip_a[-1] != ip_b[-1]) {
+            match = false;
+        } else if (MP_BC_FORMAT(opcode) == MP_BC_FORMAT_QSTR) {
+            match = tiered_native_qstr_equal(m, arg_a, arg_b);
+        } else if (opcode == MP_BC_LOAD_CONST_OBJ) {
+            match = mp_emit_common_strictly_equal(m->constants->obj_table[arg_a], m->const_obj_list->items[arg_b]);
+        } else if (opcode == MP_BC_MAKE_FUNCTION || opcode == MP_BC_MAKE_FUNCTION_DEFARGS
+                   || opcode == MP_BC_MAKE_CLOSURE || opcode == MP_BC_MAKE_CLOSURE_DEFARGS) {
+            match = child_table != NULL && tiered_native_child_matches(m, child_table[arg_a], rc->children[arg_b]);
+        } else if (MP_BC_FORMAT(opcode) == MP_BC_FORMAT_OFFSET) {
+            tiered_native_add_pair(&jumps, &jumps_len, &jumps_alloc, arg_a, arg_b);
+            max_jump_a = MAX(max_jump_a, arg_a);
+            max_jump_b = MAX(max_jump_b, arg_b);
+        } else {
+            match = arg_a == arg_b;
+        }
+        if ((opcode == MP_BC_RETURN_VALUE || opcode == MP_BC_JUMP
+             || (MP_BC_RAISE_LAST <= opcode && opcode <= MP_BC_RAISE_FROM))
+            && (ip_a - a.code > max_jump_a || ip_b - b.code > max_jump_b)) {
+            break;
+        }
+    }
+
+    // each jump must go to the same opcode in a and b
+    for (size_t i = 0; match && i < jumps_len; ++i) {
+        size_t lo = 0, hi = ops_len;
+        while (lo < hi) {
+            size_t mid = (lo + hi) / 2;
+            if (ops[2 * mid] < jumps[2 * i]) {
+                lo = mid + 1;
+            } else {
+                hi = mid;
+            }
+        }
+        match = lo < ops_len && ops[2 * lo] == jumps[2 * i] && ops[2 * lo + 1] == jumps[2 * i + 1];
+    }
+
+    m_del(size_t, ops, 2 * ops_alloc);
+    m_del(size_t, jumps, 2 * jumps_alloc);
+    return match;
+}
+
+// Compare the running function with the bytecode of a scope.
+static bool tiered_native_matches(compiler_t *comp, scope_t *scope, const mp_obj_fun_bc_t *fun) {
+    tiered_native_match_t m;
+    m.constants = &fun->context->constants;
+    m.const_obj_list = &comp->emit_common.const_obj_list;
+    #if MICROPY_EMIT_BYTECODE_USES_QSTR_TABLE
+    mp_map_t *qstr_map = &comp->emit_common.qstr_map;
+    m.qstr_table = m_new(qstr, qstr_map->used);
+    for (size_t i = 0; i < qstr_map->alloc; ++i) {
+        if (mp_map_slot_is_filled(qstr_map, i)) {
+            m.qstr_table[MP_OBJ_SMALL_INT_VALUE(qstr_map->table[i].value)] = MP_OBJ_QSTR_VALUE(qstr_map->table[i].key);
+        }
+    }
+    #endif
+    bool match = tiered_native_code_matches(&m, fun->bytecode, fun->child_table, scope->raw_code);
+    #if MICROPY_EMIT_BYTECODE_USES_QSTR_TABLE
+    m_del(qstr, m.qstr_table, qstr_map->used);
+    #endif
+    return match;
+}
+
+static void tiered_native_compile_scope(compiler_t *comp, scope_t *scope) {
+    compile_scope(comp, scope, MP_PASS_STACK_SIZE);
+    if (comp->compile_error == MP_OBJ_NULL) {
+        compile_scope(comp, scope, MP_PASS_CODE_SIZE);
+    }
+    if (comp->compile_error == MP_OBJ_NULL) {
+        while (!compile_scope(comp, scope, MP_PASS_EMIT)) {
+        }
+    }
+}
+
+// Compile a scope and the scopes nested in it to bytecode, unless that's been
+// done already.  Returns false if a nested scope selects another emitter.
+static bool tiered_native_compile_nested(compiler_t *comp, scope_t *scope) {
+    for (scope_t *s = scope; s != NULL && comp->compile_error == MP_OBJ_NULL; s = s->next) {
+        scope_t *p = s;
+        while (p != NULL && p != scope) {
+            p = p->parent;
+        }
+        if (p == scope && s->raw_code->kind == MP_CODE_RESERVED) {
+            if (s->emit_options != MP_EMIT_OPT_NONE) {
+                return false;
+            }
+            tiered_native_compile_scope(comp, s);
+        }
+    }
+    return comp->compile_error == MP_OBJ_NULL;
+}
+
+// The parse tree of a module, kept after the module is compiled so that its hot
+// functions can be recompiled without reading and parsing the source again.
+typedef struct _mp_tiered_native_source_t {
+    mp_parse_tree_t parse_tree;
+    uint8_t is_repl;
+    uint8_t is_partial_module;
+} mp_tiered_native_source_t;
+
+static bool tiered_native_keep_source(compiler_t *comp, const mp_parse_tree_t *parse_tree, mp_module_context_t *context) {
+    // only keep it if it has a function that may be recompiled
+    scope_t *s = comp->scope_head;
+    while (s != NULL && !((s->kind == SCOPE_FUNCTION || s->kind == SCOPE_LAMBDA) && s->emit_options == MP_EMIT_OPT_NONE)) {
+        s = s->next;
+    }
+    if (s == NULL) {
+        return false;
+    }
+    mp_tiered_native_source_t *source = m_new_obj_maybe(mp_tiered_native_source_t);
+    if (source == NULL) {
+        return false;
+    }
+    source->parse_tree = *parse_tree;
+    source->is_repl = comp->is_repl;
+    #if MICROPY_COMP_CONST_FOLDING_EXTENDED
+    source->is_partial_module = comp->is_partial_module;
+    #else
+    source->is_partial_module = false;
+    #endif
+    context->constants.tiered_native_source = source;
+    return true;
+}
+
+mp_raw_code_t *mp_compile_tiered_native(mp_tiered_native_source_t *source, qstr source_file, qstr name, const mp_obj_fun_bc_t *fun, mp_module_context_t *context) {
+    // put compiler state on the stack, it's relatively small
+    compiler_t comp_state = {0};
+    compiler_t *comp = &comp_state;
+
+    // compile the module the same way as it was originally, so that the
+    // bytecode of the function being recompiled matches
+    mp_parse_tree_t *parse_tree = &source->parse_tree;
+    comp->is_repl = source->is_repl;
+    #if MICROPY_COMP_CONST_FOLDING_EXTENDED
+    comp->is_partial_module = source->is_partial_module;
+    #endif
+    comp->break_label = INVALID_LABEL;
+    comp->continue_label = INVALID_LABEL;
+    mp_emit_common_init(&comp->emit_common, source_file);
+
+    // create the module scope; with MP_EMIT_OPT_NONE labels are reserved for
+    // the native emitter in all scopes
+    scope_t *module_scope = scope_new_and_link(comp, SCOPE_MODULE, parse_tree->root, MP_EMIT_OPT_NONE);
+
+    emit_t *emit_bc = emit_bc_new(&comp->emit_common);
+    emit_t *emit_native = NULL;
+
+    // compile MP_PASS_SCOPE for all scopes, as identifiers may be closed over
+    comp->emit = emit_bc;
+    comp->emit_method_table = &emit_bc_method_table;
+    uint max_num_labels = 0;
+    for (scope_t *s = comp->scope_head; s != NULL && comp->compile_error == MP_OBJ_NULL; s = s->next) {
+        #if MICROPY_EMIT_INLINE_ASM
+        if (s->emit_options == MP_EMIT_OPT_ASM) {
+            compile_scope_inline_asm(comp, s, MP_PASS_SCOPE);
+        } else
+        #endif
+        {
+            compile_scope(comp, s, MP_PASS_SCOPE);
+            for (size_t i = 0; i < s->id_info_len; ++i) {
+                id_info_t *id = &s->id_info[i];
+                if (id->kind == ID_INFO_KIND_GLOBAL_IMPLICIT) {
+                    scope_check_to_close_over(s, id);
+                }
+            }
+        }
+        if (comp->next_label > max_num_labels) {
+            max_num_labels = comp->next_label;
+        }
+    }
+    for (scope_t *s = comp->scope_head; s != NULL && comp->compile_error == MP_OBJ_NULL; s = s->next) {
+        scope_compute_things(s);
+    }
+    emit_bc_set_max_num_labels(emit_bc, max_num_labels);
+
+    // find the function by compiling each one with the same name, along with
+    // the functions nested in it which stay as bytecode, and comparing that
+    // with the bytecode that's running; functions with a decorator that
+    // selects the emitter, or with such a function nested in them, are left
+    // alone
+    scope_t *target = NULL;
+    size_t num_matches = 0;
+    for (scope_t *s = comp->scope_head; s != NULL && comp->compile_error == MP_OBJ_NULL; s = s->next) {
+        if ((s->kind == SCOPE_FUNCTION || s->kind == SCOPE_LAMBDA)
+            && s->simple_name == name && s->emit_options == MP_EMIT_OPT_NONE
+            && tiered_native_compile_nested(comp, s) && tiered_native_matches(comp, s, fun)) {
+            target = s;
+            ++num_matches;
+        }
+    }
+
+    mp_raw_code_t *rc = NULL;
+    if (num_matches == 1 && comp->compile_error == MP_OBJ_NULL) {
+        target->emit_options = MP_EMIT_OPT_NATIVE_PYTHON;
+        comp->scope_tiered_native = target;
+        comp->emit_common.tiered_native = true;
+        emit_native = NATIVE_EMITTER(new)(&comp->emit_common, &comp->compile_error, &comp->next_label, max_num_labels);
+        comp->emit = emit_native;
+        comp->emit_method_table = NATIVE_EMITTER_TABLE;
+        tiered_native_compile_scope(comp, target);
+        rc = target->raw_code;
+    }
+
+    if (comp->compile_error == MP_OBJ_NULL && rc != NULL) {
+        mp_emit_common_populate_module_context(&comp->emit_common, source_file, context);
+    }
+
+    // free the emitters and scopes; the parse tree is kept for other functions
+    emit_bc_free(emit_bc);
+    if (emit_native != NULL) {
+        NATIVE_EMITTER(free)(emit_native);
+    }
+    for (scope_t *s = module_scope; s;) {
+        scope_t *next = s->next;
+        scope_free(s);
+        s = next;
+    }
+
+    if (comp->compile_error != MP_OBJ_NULL) {
+        nlr_raise(comp->compile_error);
+    }
+
+    return rc;
+}
+
+#endif // MICROPY_OPT_TIERED_NATIVE
+
+#if MICROPY_EXPOSE_MP_COMPILE_TO_RAW_CODE
+void mp_compile_to_raw_code(mp_parse_tree_t *parse_tree, qstr source_file, bool is_repl, mp_compiled_module_t *cm) {
+    compile_to_raw_code(parse_tree, source_file, is_repl, false, cm);
+}
+#endif
+
+static mp_obj_t compile_module(mp_parse_tree_t *parse_tree, qstr source_file, bool is_repl, bool is_partial_module) {
     mp_compiled_module_t cm;
     cm.context = m_new_obj(mp_module_context_t);
     cm.context->module.globals = mp_globals_get();
-    mp_compile_to_raw_code(parse_tree, source_file, is_repl, &cm);
+    compile_to_raw_code(parse_tree, source_file, is_repl, is_partial_module, &cm);
     // return function that executes the outer module
     return mp_make_function_from_proto_fun(cm.rc, cm.context, NULL);
 }
 
+mp_obj_t mp_compile(mp_parse_tree_t *parse_tree, qstr source_file, bool is_repl) {
+    return compile_module(parse_tree, source_file, is_repl, false);
+}
+
+#if MICROPY_PARSE_STREAMING
+
+static void compile_execute_stmt(mp_parse_tree_t *parse_tree, void *data) {
+    qstr *source_file = data;
+    mp_call_function_0(compile_module(parse_tree, *source_file, false, true));
+}
+
+void mp_compile_execute_file_streaming(mp_lexer_t *lex) {
+    qstr source_file = lex->source_name;
+    mp_parse_file_streaming(lex, compile_execute_stmt, &source_file);
+}
+
+#endif // MICROPY_PARSE_STREAMING
+
 #endif // MICROPY_ENABLE_COMPILER
@@ -43,11 +43,30 @@ extern bool mp_compile_allow_top_level_await;
 // mp_globals_get() will be used for the context
 mp_obj_t mp_compile(mp_parse_tree_t *parse_tree, qstr source_file, bool is_repl);
 
+#if MICROPY_PARSE_STREAMING
+// parse, compile and execute file input one top-level statement at a time, so
+// only the parse tree and bytecode of the current statement are held in memory
+// statements before a syntax error will already have been executed
+// the lexer will be freed before this returns
+// mp_globals_get() will be used for the context
+void mp_compile_execute_file_streaming(struct _mp_lexer_t *lex);
+#endif
+
 #if MICROPY_EXPOSE_MP_COMPILE_TO_RAW_CODE
 // this has the same semantics as mp_compile
 void mp_compile_to_raw_code(mp_parse_tree_t *parse_tree, qstr source_file, bool is_repl, mp_compiled_module_t *cm);
 #endif
 
+#if MICROPY_OPT_TIERED_NATIVE
+// compile the function called name whose bytecode, including that of the
+// functions it makes, is the same as that of fun with the native emitter,
+// returning NULL if no unique function matches
+// source is the parse tree kept in the constants of the module that fun is from
+// the constants for the new code are stored in context, which must be allocated
+struct _mp_obj_fun_bc_t;
+mp_raw_code_t *mp_compile_tiered_native(struct _mp_tiered_native_source_t *source, qstr source_file, qstr name, const struct _mp_obj_fun_bc_t *fun, mp_module_context_t *context);
+#endif
+
 // this is implemented in runtime.c
 mp_obj_t mp_parse_compile_execute(mp_lexer_t *lex, mp_parse_input_kind_t parse_input_kind, mp_obj_dict_t *globals, mp_obj_dict_t *locals);
 
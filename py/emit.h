@@ -100,6 +100,9 @@ typedef struct _mp_emit_common_t {
     mp_map_t qstr_map;
     #endif
     mp_obj_list_t const_obj_list;
+    #if MICROPY_OPT_TIERED_NATIVE
+    bool tiered_native; // native code is for a hot function, see mp_compile_tiered_native
+    #endif
 } mp_emit_common_t;
 
 typedef struct _mp_emit_method_table_id_ops_t {
@@ -181,6 +184,7 @@ static inline qstr_short_t mp_emit_common_use_qstr(mp_emit_common_t *emit, qstr
 }
 #endif
 
+bool mp_emit_common_strictly_equal(mp_obj_t a, mp_obj_t b);
 size_t mp_emit_common_use_const_obj(mp_emit_common_t *emit, mp_obj_t const_obj);
 
 static inline size_t mp_emit_common_alloc_const_child(mp_emit_common_t *emit, mp_raw_code_t *rc) {
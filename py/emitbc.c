@@ -40,6 +40,12 @@
 
 #define DUMMY_DATA_SIZE (MP_ENCODE_UINT_MAX_BYTES)
 
+#if MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS && MICROPY_DYNAMIC_COMPILER
+#define EMIT_SUPERINSTRUCTIONS (mp_dynamic_compiler.superinstructions)
+#else
+#define EMIT_SUPERINSTRUCTIONS (MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS)
+#endif
+
 struct _emit_t {
     // Accessed as mp_obj_t, so must be aligned as such, and we rely on the
     // memory allocator returning a suitably aligned pointer.
@@ -73,6 +79,16 @@ struct _emit_t {
 
     size_t n_info;
     size_t n_cell;
+
+    #if MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS
+    // The last opcode that can be fused with the one following it: where it
+    // starts and ends, its kind and its argument.  It can only be fused if it
+    // ends at the current offset and no label or line number was emitted since.
+    size_t fuse_start;
+    size_t fuse_end;
+    byte fuse_op;
+    mp_int_t fuse_arg;
+    #endif
 };
 
 emit_t *emit_bc_new(mp_emit_common_t *emit_common) {
@@ -281,6 +297,35 @@ static void emit_write_bytecode_byte_label(emit_t *emit, int stack_adj, byte b1,
     }
 }
 
+#if MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS
+// Record that the opcode just emitted, starting at the given offset, can be
+// fused with the next one.
+static void emit_fusable(emit_t *emit, size_t start, byte op, mp_int_t arg) {
+    if (emit->suppress) {
+        return;
+    }
+    emit->fuse_start = start;
+    emit->fuse_end = emit->bytecode_offset;
+    emit->fuse_op = op;
+    emit->fuse_arg = arg;
+}
+
+// If the last opcode emitted was the given fusable one then remove it, so the
+// caller can emit a superinstruction in its place, and return true.  This
+// makes the same decision on every pass, so code size stays consistent.
+static bool emit_fuse_with_last(emit_t *emit, byte op) {
+    if (!EMIT_SUPERINSTRUCTIONS
+        || emit->suppress
+        || emit->fuse_end != emit->bytecode_offset
+        || emit->fuse_op != op) {
+        return false;
+    }
+    emit->bytecode_offset = emit->fuse_start;
+    emit->fuse_end = (size_t)-1;
+    return true;
+}
+#endif
+
 void mp_emit_bc_start_pass(emit_t *emit, pass_kind_t pass, scope_t *scope) {
     emit->pass = pass;
     emit->stack_size = 0;
@@ -291,6 +336,9 @@ void mp_emit_bc_start_pass(emit_t *emit, pass_kind_t pass, scope_t *scope) {
     emit->bytecode_offset = 0;
     emit->code_info_offset = 0;
     emit->overflow = false;
+    #if MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS
+    emit->fuse_end = (size_t)-1;
+    #endif
 
     // Write local state size, exception stack size, scope flags and number of arguments
     {
@@ -438,6 +486,10 @@ void mp_emit_bc_set_source_line(emit_t *emit, mp_uint_t source_line) {
         emit_write_code_info_bytes_lines(emit, bytes_to_skip, lines_to_skip);
         emit->last_source_line_offset = emit->bytecode_offset;
         emit->last_source_line = source_line;
+        #if MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS
+        // Don't fuse opcodes across a line boundary.
+        emit->fuse_end = (size_t)-1;
+        #endif
     }
     #else
     (void)emit;
@@ -463,6 +515,11 @@ void mp_emit_bc_label_assign(emit_t *emit, mp_uint_t l) {
 
     // Assign label offset.
     emit->label_offsets[l] = emit->bytecode_offset;
+
+    #if MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS
+    // Don't fuse opcodes across a jump target.
+    emit->fuse_end = (size_t)-1;
+    #endif
 }
 
 void mp_emit_bc_import(emit_t *emit, qstr qst, int kind) {
@@ -488,6 +545,9 @@ void mp_emit_bc_load_const_tok(emit_t *emit, mp_token_kind_t tok) {
 
 void mp_emit_bc_load_const_small_int(emit_t *emit, mp_int_t arg) {
     assert(MP_SMALL_INT_FITS(arg));
+    #if MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS
+    size_t start = emit->bytecode_offset;
+    #endif
     if (-MP_BC_LOAD_CONST_SMALL_INT_MULTI_EXCESS <= arg
         && arg < MP_BC_LOAD_CONST_SMALL_INT_MULTI_NUM - MP_BC_LOAD_CONST_SMALL_INT_MULTI_EXCESS) {
         emit_write_bytecode_byte(emit, 1,
@@ -495,6 +555,9 @@ void mp_emit_bc_load_const_small_int(emit_t *emit, mp_int_t arg) {
     } else {
         emit_write_bytecode_byte_int(emit, 1, MP_BC_LOAD_CONST_SMALL_INT, arg);
     }
+    #if MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS
+    emit_fusable(emit, start, MP_BC_LOAD_CONST_SMALL_INT, arg);
+    #endif
 }
 
 void mp_emit_bc_load_const_str(emit_t *emit, qstr qst) {
@@ -514,7 +577,15 @@ void mp_emit_bc_load_local(emit_t *emit, qstr qst, mp_uint_t local_num, int kind
     MP_STATIC_ASSERT(MP_BC_LOAD_FAST_N + MP_EMIT_IDOP_LOCAL_DEREF == MP_BC_LOAD_DEREF);
     (void)qst;
     if (kind == MP_EMIT_IDOP_LOCAL_FAST && local_num <= 15) {
+        #if MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS
+        size_t start = emit->bytecode_offset;
+        #endif
         emit_write_bytecode_byte(emit, 1, MP_BC_LOAD_FAST_MULTI + local_num);
+        #if MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS
+        if (local_num == 0) {
+            emit_fusable(emit, start, MP_BC_LOAD_FAST_MULTI, 0);
+        }
+        #endif
     } else {
         emit_write_bytecode_byte_uint(emit, 1, MP_BC_LOAD_FAST_N + kind, local_num);
     }
@@ -529,6 +600,12 @@ void mp_emit_bc_load_global(emit_t *emit, qstr qst, int kind) {
 
 void mp_emit_bc_load_method(emit_t *emit, qstr qst, bool is_super) {
     int stack_adj = 1 - 2 * is_super;
+    #if MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS
+    if (!is_super && emit_fuse_with_last(emit, MP_BC_LOAD_FAST_MULTI)) {
+        emit_write_bytecode_byte_qstr(emit, stack_adj, MP_BC_LOAD_FAST0_METHOD, qst);
+        return;
+    }
+    #endif
     emit_write_bytecode_byte_qstr(emit, stack_adj, is_super ? MP_BC_LOAD_SUPER_METHOD : MP_BC_LOAD_METHOD, qst);
 }
 
@@ -538,6 +615,12 @@ void mp_emit_bc_load_build_class(emit_t *emit) {
 
 void mp_emit_bc_subscr(emit_t *emit, int kind) {
     if (kind == MP_EMIT_SUBSCR_LOAD) {
+        #if MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS
+        if (emit->fuse_arg >= 0 && emit_fuse_with_last(emit, MP_BC_LOAD_CONST_SMALL_INT)) {
+            emit_write_bytecode_byte_uint(emit, -1, MP_BC_LOAD_SUBSCR_SMALL_INT, emit->fuse_arg);
+            return;
+        }
+        #endif
         emit_write_bytecode_byte(emit, -1, MP_BC_LOAD_SUBSCR);
     } else {
         if (kind == MP_EMIT_SUBSCR_DELETE) {
@@ -550,12 +633,24 @@ void mp_emit_bc_subscr(emit_t *emit, int kind) {
 
 void mp_emit_bc_attr(emit_t *emit, qstr qst, int kind) {
     if (kind == MP_EMIT_ATTR_LOAD) {
+        #if MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS
+        if (emit_fuse_with_last(emit, MP_BC_LOAD_FAST_MULTI)) {
+            emit_write_bytecode_byte_qstr(emit, 0, MP_BC_LOAD_FAST0_ATTR, qst);
+            return;
+        }
+        #endif
         emit_write_bytecode_byte_qstr(emit, 0, MP_BC_LOAD_ATTR, qst);
     } else {
         if (kind == MP_EMIT_ATTR_DELETE) {
             mp_emit_bc_load_null(emit);
             mp_emit_bc_rot_two(emit);
         }
+        #if MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS
+        else if (emit_fuse_with_last(emit, MP_BC_LOAD_FAST_MULTI)) {
+            emit_write_bytecode_byte_qstr(emit, -2, MP_BC_STORE_FAST0_ATTR, qst);
+            return;
+        }
+        #endif
         emit_write_bytecode_byte_qstr(emit, -2, MP_BC_STORE_ATTR, qst);
     }
 }
@@ -725,6 +820,20 @@ void mp_emit_bc_binary_op(emit_t *emit, mp_binary_op_t op) {
         invert = true;
         op = MP_BINARY_OP_IS;
     }
+    #if MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS
+    // Fuse a non-negative small int constant with the common binary ops.
+    if (emit->fuse_arg >= 0) {
+        for (size_t n = 0; n < MP_BC_BINARY_OP_SMALL_INT_MULTI_NUM; ++n) {
+            if (MP_BC_BINARY_OP_SMALL_INT_MULTI_OP(n) == op) {
+                if (emit_fuse_with_last(emit, MP_BC_LOAD_CONST_SMALL_INT)) {
+                    emit_write_bytecode_byte_uint(emit, -1, MP_BC_BINARY_OP_SMALL_INT_MULTI + n, emit->fuse_arg);
+                    return;
+                }
+                break;
+            }
+        }
+    }
+    #endif
     emit_write_bytecode_byte(emit, -1, MP_BC_BINARY_OP_MULTI + op);
     if (invert) {
         emit_write_bytecode_byte(emit, 0, MP_BC_UNARY_OP_MULTI + MP_UNARY_OP_NOT);
@@ -25,6 +25,7 @@
  */
 
 #include <assert.h>
+#include <math.h>
 
 #include "py/emit.h"
 #include "py/nativeglue.h"
@@ -43,7 +44,7 @@ qstr_short_t mp_emit_common_use_qstr(mp_emit_common_t *emit, qstr qst) {
 
 // Compare two objects for strict equality, including equality of type.  This is
 // different to the semantics of mp_obj_equal which, eg, has (True,) == (1.0,).
-static bool strictly_equal(mp_obj_t a, mp_obj_t b) {
+bool mp_emit_common_strictly_equal(mp_obj_t a, mp_obj_t b) {
     if (a == b) {
         return true;
     }
@@ -66,11 +67,18 @@ static bool strictly_equal(mp_obj_t a, mp_obj_t b) {
             return false;
         }
         for (size_t i = 0; i < a_tuple->len; ++i) {
-            if (!strictly_equal(a_tuple->items[i], b_tuple->items[i])) {
+            if (!mp_emit_common_strictly_equal(a_tuple->items[i], b_tuple->items[i])) {
                 return false;
             }
         }
         return true;
+    #if MICROPY_PY_BUILTINS_FLOAT
+    } else if (a_type == &mp_type_float) {
+        // 0.0 and -0.0 are equal but must remain distinct constants.
+        mp_float_t a_val = mp_obj_float_get(a);
+        mp_float_t b_val = mp_obj_float_get(b);
+        return a_val == b_val && !signbit(a_val) == !signbit(b_val);
+    #endif
     } else {
         return mp_obj_equal(a, b);
     }
@@ -78,7 +86,7 @@ static bool strictly_equal(mp_obj_t a, mp_obj_t b) {
 
 size_t mp_emit_common_use_const_obj(mp_emit_common_t *emit, mp_obj_t const_obj) {
     for (size_t i = 0; i < emit->const_obj_list.len; ++i) {
-        if (strictly_equal(emit->const_obj_list.items[i], const_obj)) {
+        if (mp_emit_common_strictly_equal(emit->const_obj_list.items[i], const_obj)) {
             return i;
         }
     }
@@ -241,9 +241,17 @@ mp_obj_t mp_make_function_from_proto_fun(mp_proto_fun_t proto_fun, const mp_modu
             break;
         #endif
         default:
-            // rc->kind should always be set and BYTECODE is the only remaining case
-            assert(rc->kind == MP_CODE_BYTECODE);
-            fun = mp_obj_new_fun_bc(def_args, rc->fun_data, context, rc->children);
+            #if MICROPY_PERSISTENT_CODE_LOAD_LAZY
+            if (rc->kind == MP_CODE_BYTECODE_LAZY) {
+                // The bytecode is read in when the function is first used, see mp_obj_fun_bc_load().
+                fun = mp_obj_new_fun_bc(def_args, NULL, context, (struct _mp_raw_code_t *const *)rc->fun_data);
+            } else
+            #endif
+            {
+                // rc->kind should always be set and BYTECODE is the only remaining case
+                assert(rc->kind == MP_CODE_BYTECODE);
+                fun = mp_obj_new_fun_bc(def_args, rc->fun_data, context, rc->children);
+            }
             // check for generator functions and if so change the type of the object
             // CIRCUITPY-CHANGE: distinguish generators and async
             // For async, BOTH is_async and is_generator will be set,
@@ -52,6 +52,9 @@ typedef enum {
     MP_CODE_NATIVE_PY,
     MP_CODE_NATIVE_VIPER,
     MP_CODE_NATIVE_ASM,
+    #if MICROPY_PERSISTENT_CODE_LOAD_LAZY
+    MP_CODE_BYTECODE_LAZY, // fun_data points to an mp_raw_code_lazy_t
+    #endif
 } mp_raw_code_kind_t;
 
 // An mp_proto_fun_t points to static information about a non-instantiated function.
@@ -145,6 +145,9 @@
 #define OFFSETOF_OBJ_FUN_BC_CONTEXT (offsetof(mp_obj_fun_bc_t, context) / sizeof(uintptr_t))
 #define OFFSETOF_OBJ_FUN_BC_CHILD_TABLE (offsetof(mp_obj_fun_bc_t, child_table) / sizeof(uintptr_t))
 #define OFFSETOF_OBJ_FUN_BC_BYTECODE (offsetof(mp_obj_fun_bc_t, bytecode) / sizeof(uintptr_t))
+#if MICROPY_OPT_TIERED_NATIVE
+#define OFFSETOF_OBJ_FUN_BC_TIER_LINE (offsetof(mp_obj_fun_bc_t, tier.line) / sizeof(uintptr_t))
+#endif
 #define OFFSETOF_MODULE_CONTEXT_QSTR_TABLE (offsetof(mp_module_context_t, constants.qstr_table) / sizeof(uintptr_t))
 #define OFFSETOF_MODULE_CONTEXT_OBJ_TABLE (offsetof(mp_module_context_t, constants.obj_table) / sizeof(uintptr_t))
 #define OFFSETOF_MODULE_CONTEXT_GLOBALS (offsetof(mp_module_context_t, module.globals) / sizeof(uintptr_t))
@@ -300,6 +303,12 @@ struct _emit_t {
     mp_obj_t *error_slot;
     uint *label_slot;
     uint exit_label;
+    #if MICROPY_OPT_TIERED_NATIVE
+    uint unbound_local_label;
+    #if MICROPY_ENABLE_SOURCE_LINE
+    mp_uint_t last_source_line;
+    #endif
+    #endif
     int pass;
 
     bool do_viper_types;
@@ -339,6 +348,7 @@ static void emit_load_reg_with_object(emit_t *emit, int reg, mp_obj_t obj);
 static void emit_native_global_exc_entry(emit_t *emit);
 static void emit_native_global_exc_exit(emit_t *emit);
 static void emit_native_load_const_obj(emit_t *emit, mp_obj_t obj);
+static void emit_native_pop_top(emit_t *emit);
 
 emit_t *EXPORT_FUN(new)(mp_emit_common_t * emit_common, mp_obj_t *error_slot, uint *label_slot, mp_uint_t max_num_labels) {
     emit_t *emit = m_new0(emit_t, 1);
@@ -426,6 +436,9 @@ static void emit_native_start_pass(emit_t *emit, pass_kind_t pass, scope_t *scop
     emit->do_viper_types = scope->emit_options == MP_EMIT_OPT_VIPER;
     emit->stack_size = 0;
     emit->scope = scope;
+    #if MICROPY_OPT_TIERED_NATIVE && MICROPY_ENABLE_SOURCE_LINE
+    emit->last_source_line = 0;
+    #endif
 
     // allocate memory for keeping track of the types of locals
     if (emit->local_vtype_alloc < scope->num_locals) {
@@ -769,6 +782,12 @@ static bool emit_native_end_pass(emit_t *emit) {
             }
         }
 
+        #if MICROPY_OPT_TIERED_NATIVE
+        if (emit->emit_common->tiered_native) {
+            MP_STATE_VM(tiered_native_code_size) += f_len;
+        }
+        #endif
+
         mp_emit_glue_assign_native(emit->scope->raw_code,
             emit->do_viper_types ? MP_CODE_NATIVE_VIPER : MP_CODE_NATIVE_PY,
             f, f_len,
@@ -832,11 +851,6 @@ static void emit_native_adjust_stack_size(emit_t *emit, mp_int_t delta) {
     adjust_stack(emit, delta);
 }
 
-static void emit_native_set_source_line(emit_t *emit, mp_uint_t source_line) {
-    (void)emit;
-    (void)source_line;
-}
-
 // this must be called at start of emit functions
 static void emit_native_pre(emit_t *emit) {
     (void)emit;
@@ -885,6 +899,24 @@ static void need_reg_all(emit_t *emit) {
     }
 }
 
+static void emit_native_set_source_line(emit_t *emit, mp_uint_t source_line) {
+    #if MICROPY_OPT_TIERED_NATIVE && MICROPY_ENABLE_SOURCE_LINE
+    // A hot function recompiled from bytecode stores the line it's running in
+    // its function object, for tracebacks; see fun_bc_tier_call.
+    if (emit->emit_common->tiered_native && source_line != emit->last_source_line) {
+        emit->last_source_line = source_line;
+        need_reg_single(emit, REG_TEMP0, 0);
+        need_reg_single(emit, REG_TEMP1, 0);
+        emit_native_mov_reg_state(emit, REG_TEMP0, LOCAL_IDX_FUN_OBJ(emit));
+        ASM_MOV_REG_IMM(emit->as, REG_TEMP1, source_line);
+        ASM_STORE_REG_REG_OFFSET(emit->as, REG_TEMP1, REG_TEMP0, OFFSETOF_OBJ_FUN_BC_TIER_LINE);
+    }
+    #else
+    (void)emit;
+    (void)source_line;
+    #endif
+}
+
 static vtype_kind_t load_reg_stack_imm(emit_t *emit, int reg_dest, const stack_info_t *si, bool convert_to_pyobj) {
     if (!convert_to_pyobj && emit->do_viper_types) {
         ASM_MOV_REG_IMM(emit->as, reg_dest, si->data.u_imm);
@@ -1203,6 +1235,10 @@ static void emit_native_label_assign(emit_t *emit, mp_uint_t l) {
     need_stack_settled(emit);
     mp_asm_base_label_assign(&emit->as->base, l);
     emit_post(emit);
+    #if MICROPY_OPT_TIERED_NATIVE && MICROPY_ENABLE_SOURCE_LINE
+    // can get here from another line
+    emit->last_source_line = 0;
+    #endif
 
     if (is_finally) {
         // Label is at start of finally handler: pop exception stack
@@ -1214,6 +1250,9 @@ static void emit_native_global_exc_entry(emit_t *emit) {
     // Note: 4 labels are reserved for this function, starting at *emit->label_slot
 
     emit->exit_label = *emit->label_slot;
+    #if MICROPY_OPT_TIERED_NATIVE
+    emit->unbound_local_label = *emit->label_slot + 6;
+    #endif
 
     if (NEED_GLOBAL_EXC_HANDLER(emit)) {
         mp_uint_t nlr_label = *emit->label_slot + 1;
@@ -1351,6 +1390,17 @@ static void emit_native_global_exc_exit(emit_t *emit) {
     }
 
     ASM_EXIT(emit->as);
+
+    #if MICROPY_OPT_TIERED_NATIVE
+    if (emit->emit_common->tiered_native) {
+        // Loads of unbound locals jump here, to raise NameError
+        mp_asm_base_label_assign(&emit->as->base, emit->unbound_local_label);
+        emit_load_reg_with_object(emit, REG_ARG_1, MP_OBJ_FROM_PTR(&mp_native_tiered_unbound_local_obj));
+        ASM_MOV_REG_IMM(emit->as, REG_ARG_2, 0);
+        ASM_MOV_REG_IMM(emit->as, REG_ARG_3, 0);
+        emit_call(emit, MP_F_NATIVE_CALL_FUNCTION_N_KW);
+    }
+    #endif
 }
 
 static void emit_native_import_name(emit_t *emit, qstr qst) {
@@ -1457,13 +1507,20 @@ static void emit_native_load_fast(emit_t *emit, qstr qst, mp_uint_t local_num) {
         EMIT_NATIVE_VIPER_TYPE_ERROR(emit, MP_ERROR_TEXT("local '%q' used before type known"), qst);
     }
     emit_native_pre(emit);
+    int reg_local;
     if (local_num < MAX_REGS_FOR_LOCAL_VARS && CAN_USE_REGS_FOR_LOCALS(emit)) {
-        emit_post_push_reg(emit, vtype, reg_local_table[local_num]);
+        reg_local = reg_local_table[local_num];
     } else {
         need_reg_single(emit, REG_TEMP0, 0);
         emit_native_mov_reg_state(emit, REG_TEMP0, LOCAL_IDX_LOCAL_VAR(emit, local_num));
-        emit_post_push_reg(emit, vtype, REG_TEMP0);
+        reg_local = REG_TEMP0;
     }
+    #if MICROPY_OPT_TIERED_NATIVE
+    if (emit->emit_common->tiered_native) {
+        ASM_JUMP_IF_REG_ZERO(emit->as, reg_local, emit->unbound_local_label, false);
+    }
+    #endif
+    emit_post_push_reg(emit, vtype, reg_local);
 }
 
 static void emit_native_load_deref(emit_t *emit, qstr qst, mp_uint_t local_num) {
@@ -1474,6 +1531,11 @@ static void emit_native_load_deref(emit_t *emit, qstr qst, mp_uint_t local_num)
     int reg_base = REG_RET;
     emit_pre_pop_reg_flexible(emit, &vtype, &reg_base, -1, -1);
     ASM_LOAD_REG_REG_OFFSET(emit->as, REG_RET, reg_base, 1);
+    #if MICROPY_OPT_TIERED_NATIVE
+    if (emit->emit_common->tiered_native) {
+        ASM_JUMP_IF_REG_ZERO(emit->as, REG_RET, emit->unbound_local_label, false);
+    }
+    #endif
     // closed over vars are always Python objects
     emit_post_push_reg(emit, VTYPE_PYOBJ, REG_RET);
 }
@@ -2028,6 +2090,22 @@ static void emit_native_store_subscr(emit_t *emit) {
 }
 
 static void emit_native_delete_local(emit_t *emit, qstr qst, mp_uint_t local_num, int kind) {
+    #if MICROPY_OPT_TIERED_NATIVE
+    if (emit->emit_common->tiered_native) {
+        // Code for hot functions checks loads of locals, so can delete them
+        // properly: check the variable is bound, then unbind it.
+        if (kind == MP_EMIT_IDOP_LOCAL_FAST) {
+            emit_native_load_fast(emit, qst, local_num);
+            emit_native_pop_top(emit);
+            emit_post_push_imm(emit, VTYPE_PYOBJ, (mp_int_t)MP_OBJ_NULL);
+            emit_native_store_fast(emit, qst, local_num);
+        } else {
+            // Keep the function as bytecode.
+            *emit->error_slot = mp_obj_new_exception(&mp_type_NotImplementedError);
+        }
+        return;
+    }
+    #endif
     if (kind == MP_EMIT_IDOP_LOCAL_FAST) {
         // TODO: This is not compliant implementation. We could use MP_OBJ_SENTINEL
         // to mark deleted vars but then every var would need to be checked on
@@ -3048,6 +3126,13 @@ static void emit_native_return_value(emit_t *emit) {
 
 static void emit_native_raise_varargs(emit_t *emit, mp_uint_t n_args) {
     DEBUG_printf("raise_varargs(%d)\n", n_args);
+    #if MICROPY_OPT_TIERED_NATIVE
+    if (emit->emit_common->tiered_native && n_args != 1) {
+        // Re-raising and raise-from aren't supported, keep the function as bytecode.
+        *emit->error_slot = mp_obj_new_exception(&mp_type_NotImplementedError);
+        return;
+    }
+    #endif
     (void)n_args;
     assert(n_args == 1);
     vtype_kind_t vtype_exc;
@@ -32,6 +32,17 @@
 #include "py/gc.h"
 #include "py/runtime.h"
 
+#if MICROPY_GC_PAUSE_STATS
+#include "py/mphal.h"
+#endif
+
+#if MICROPY_GC_COMPACT
+#include "py/binary.h"
+#include "py/objarray.h"
+#include "py/objlist.h"
+#include "py/objstr.h"
+#endif
+
 #if MICROPY_DEBUG_VALGRIND
 #include <valgrind/memcheck.h>
 #endif
@@ -105,6 +116,14 @@
 #define ATB_HEAD_TO_MARK(area, block) do { area->gc_alloc_table_start[(block) / BLOCKS_PER_ATB] |= (AT_MARK << BLOCK_SHIFT(block)); } while (0)
 #define ATB_MARK_TO_HEAD(area, block) do { area->gc_alloc_table_start[(block) / BLOCKS_PER_ATB] &= (~(AT_TAIL << BLOCK_SHIFT(block))); } while (0)
 
+#if MICROPY_GC_INCREMENTAL_SWEEP
+// Live heads that the pending sweep hasn't reached yet are still marked.
+#define ATB_IS_ALLOCATED_HEAD(area, block) (ATB_GET_KIND(area, block) == AT_HEAD \
+    || (ATB_GET_KIND(area, block) == AT_MARK && (block) >= (area)->gc_sweep_block))
+#else
+#define ATB_IS_ALLOCATED_HEAD(area, block) (ATB_GET_KIND(area, block) == AT_HEAD)
+#endif
+
 #define BLOCK_FROM_PTR(area, ptr) (((byte *)(ptr) - area->gc_pool_start) / BYTES_PER_BLOCK)
 #define PTR_FROM_BLOCK(area, block) (((block) * BYTES_PER_BLOCK + (uintptr_t)area->gc_pool_start))
 
@@ -168,7 +187,130 @@ static void gc_mark_subtree(size_t block);
 #endif
 static void gc_deal_with_stack_overflow(void);
 static void gc_sweep_run_finalisers(void);
+#if !MICROPY_GC_INCREMENTAL_SWEEP
 static void gc_sweep_free_blocks(void);
+#endif
+
+#if MICROPY_GC_FREE_RUN_INDEX
+// Size class of a request for n_blocks blocks: floor(log2(n_blocks)), capped
+// at the largest tracked class.
+static inline size_t gc_free_run_class(size_t n_blocks) {
+    size_t cls = 0;
+    while (cls < MICROPY_GC_FREE_RUN_CLASSES - 1 && (n_blocks >> (cls + 1)) != 0) {
+        cls += 1;
+    }
+    return cls;
+}
+
+static void gc_free_run_reset(mp_state_mem_area_t *area, size_t atb_index) {
+    for (size_t k = 0; k < MICROPY_GC_FREE_RUN_CLASSES; k++) {
+        area->gc_free_run_atb_index[k] = atb_index;
+    }
+}
+
+// A search for n_blocks free blocks found no suitable run before atb_index,
+// so classes whose runs are at least that long can start later next time.
+static void gc_free_run_skip(mp_state_mem_area_t *area, size_t n_blocks, size_t atb_index) {
+    for (size_t k = 0; k < MICROPY_GC_FREE_RUN_CLASSES; k++) {
+        if (((size_t)1 << k) >= n_blocks && area->gc_free_run_atb_index[k] < atb_index) {
+            area->gc_free_run_atb_index[k] = atb_index;
+        }
+    }
+}
+
+// Blocks from the given block onwards have just been freed.  They may have
+// joined a preceding free run, so walk back to the start of that run.  If the
+// preceding run is already as long as the largest class then the index
+// covered it before this free, and there is no need to walk further.
+static void gc_free_run_add(mp_state_mem_area_t *area, size_t block) {
+    for (size_t n = (size_t)1 << (MICROPY_GC_FREE_RUN_CLASSES - 1);
+         n > 0 && block > 0 && ATB_GET_KIND(area, block - 1) == AT_FREE; n--) {
+        block -= 1;
+    }
+    size_t atb_index = block / BLOCKS_PER_ATB;
+    for (size_t k = 0; k < MICROPY_GC_FREE_RUN_CLASSES; k++) {
+        if (area->gc_free_run_atb_index[k] > atb_index) {
+            area->gc_free_run_atb_index[k] = atb_index;
+        }
+    }
+}
+#endif
+
+#if MICROPY_GC_INCREMENTAL_SWEEP
+static void gc_sweep_begin(void);
+static void gc_sweep_area_to(mp_state_mem_area_t *area, size_t end_block);
+#endif
+
+#if MICROPY_GC_COMPACT
+static void gc_compact_pin_roots(void **ptrs, size_t len);
+#endif
+
+#if MICROPY_GC_FLOAT_FREELIST
+
+#if !MICROPY_PY_BUILTINS_FLOAT
+#error "MICROPY_GC_FLOAT_FREELIST requires MICROPY_PY_BUILTINS_FLOAT"
+#endif
+
+// Floats on the freelist are chained through their second word, which for a
+// live float holds (at least part of) its value.
+#define FLOAT_FREELIST_NEXT(ptr) (((void **)(ptr))[1])
+
+static void gc_float_freelist_clear(void) {
+    MP_STATE_MEM(gc_float_freelist) = NULL;
+    MP_STATE_MEM(gc_float_freelist_len) = 0;
+}
+
+// Called by the sweep for each dead head.  If it is a float that fits in one
+// block then keep it allocated and put it on the freelist, returning true.
+static bool gc_float_freelist_keep(mp_state_mem_area_t *area, size_t block) {
+    if (block + 1 < area->gc_alloc_table_byte_len * BLOCKS_PER_ATB && ATB_GET_KIND(area, block + 1) == AT_TAIL) {
+        return false;
+    }
+    void *ptr = (void *)PTR_FROM_BLOCK(area, block);
+    if (((mp_obj_base_t *)ptr)->type != &mp_type_float) {
+        return false;
+    }
+    FLOAT_FREELIST_NEXT(ptr) = MP_STATE_MEM(gc_float_freelist);
+    MP_STATE_MEM(gc_float_freelist) = ptr;
+    MP_STATE_MEM(gc_float_freelist_len) += 1;
+    return true;
+}
+
+// Give the floats on the freelist back to the heap.  Returns false if there
+// were none.
+static bool gc_float_freelist_release(void) {
+    void *ptr = MP_STATE_MEM(gc_float_freelist);
+    if (ptr == NULL) {
+        return false;
+    }
+    gc_float_freelist_clear();
+    while (ptr != NULL) {
+        void *next = FLOAT_FREELIST_NEXT(ptr);
+        gc_free(ptr);
+        ptr = next;
+    }
+    return true;
+}
+
+void *gc_float_freelist_pop(void) {
+    if (MP_STATE_THREAD(gc_lock_depth) > 0) {
+        return NULL;
+    }
+    GC_ENTER();
+    void *ptr = MP_STATE_MEM(gc_float_freelist);
+    if (ptr != NULL) {
+        MP_STATE_MEM(gc_float_freelist) = FLOAT_FREELIST_NEXT(ptr);
+        MP_STATE_MEM(gc_float_freelist_len) -= 1;
+        FLOAT_FREELIST_NEXT(ptr) = NULL;
+        #if MICROPY_GC_ALLOC_THRESHOLD
+        MP_STATE_MEM(gc_alloc_amount) += 1;
+        #endif
+    }
+    GC_EXIT();
+    return ptr;
+}
+
+#endif
 
 // TODO waste less memory; currently requires that all entries in alloc_table have a corresponding block in pool
 static void gc_setup_area(mp_state_mem_area_t *area, void *start, void *end) {
@@ -232,6 +374,16 @@ static void gc_setup_area(mp_state_mem_area_t *area, void *start, void *end) {
 
     area->gc_last_free_atb_index = 0;
     area->gc_last_used_block = 0;
+    area->gc_mark_overflow_first = SIZE_MAX;
+    area->gc_mark_overflow_last = 0;
+
+    #if MICROPY_GC_FREE_RUN_INDEX
+    gc_free_run_reset(area, 0);
+    #endif
+
+    #if MICROPY_GC_INCREMENTAL_SWEEP
+    area->gc_sweep_block = SIZE_MAX;
+    #endif
 
     #if MICROPY_GC_SPLIT_HEAP
     area->next = NULL;
@@ -269,6 +421,8 @@ void gc_init(void *start, void *end) {
     // set last free ATB index to start of heap
     #if MICROPY_GC_SPLIT_HEAP
     MP_STATE_MEM(gc_last_free_area) = &MP_STATE_MEM(area);
+    MP_STATE_MEM(gc_pools_start) = MP_STATE_MEM(area).gc_pool_start;
+    MP_STATE_MEM(gc_pools_end) = MP_STATE_MEM(area).gc_pool_end;
     #endif
 
     // unlock the GC
@@ -283,6 +437,29 @@ void gc_init(void *start, void *end) {
     MP_STATE_MEM(gc_alloc_amount) = 0;
     #endif
 
+    #if MICROPY_GC_INCREMENTAL_SWEEP
+    MP_STATE_MEM(gc_sweep_pending) = false;
+    #endif
+
+    #if MICROPY_GC_FLOAT_FREELIST
+    gc_float_freelist_clear();
+    #endif
+
+    #if MICROPY_GC_COMPACT
+    MP_STATE_MEM(gc_compact_pins) = NULL;
+    #if MICROPY_PY_THREAD && !MICROPY_PY_THREAD_GIL
+    MP_STATE_MEM(gc_compact_threads) = 0;
+    #endif
+    MP_STATE_MEM(gc_compactions) = 0;
+    MP_STATE_MEM(gc_compact_max_free_before) = 0;
+    MP_STATE_MEM(gc_compact_max_free_after) = 0;
+    #endif
+
+    #if MICROPY_GC_PAUSE_STATS
+    MP_STATE_MEM(gc_last_pause_us) = 0;
+    MP_STATE_MEM(gc_max_pause_us) = 0;
+    #endif
+
     GC_MUTEX_INIT();
 }
 
@@ -306,6 +483,11 @@ void gc_add(void *start, void *end) {
 
     // Add this area to the linked list
     prev_area->next = area;
+
+    // The bounds aren't narrowed when an area is removed, as they only need to
+    // include all the pools.
+    MP_STATE_MEM(gc_pools_start) = MIN(MP_STATE_MEM(gc_pools_start), area->gc_pool_start);
+    MP_STATE_MEM(gc_pools_end) = MAX(MP_STATE_MEM(gc_pools_end), area->gc_pool_end);
 }
 
 #if MICROPY_GC_SPLIT_HEAP_AUTO
@@ -424,6 +606,9 @@ void gc_deinit(void) {
     // any additional heap areas (but not the first.)
     gc_sweep_all();
     memset(&MP_STATE_MEM(area), 0, sizeof(MP_STATE_MEM(area)));
+    #if MICROPY_GC_FLOAT_FREELIST
+    gc_float_freelist_clear();
+    #endif
 }
 
 void gc_lock(void) {
@@ -461,6 +646,9 @@ static inline mp_state_mem_area_t *gc_get_ptr_area(const void *ptr) {
     if (((uintptr_t)(ptr) & (BYTES_PER_BLOCK - 1)) != 0) {   // must be aligned on a block
         return NULL;
     }
+    if (ptr < (void *)MP_STATE_MEM(gc_pools_start) || ptr >= (void *)MP_STATE_MEM(gc_pools_end)) {
+        return NULL;
+    }
     for (mp_state_mem_area_t *area = &MP_STATE_MEM(area); area != NULL; area = NEXT_AREA(area)) {
         if (ptr >= (void *)area->gc_pool_start   // must be above start of pool
             && ptr < (void *)area->gc_pool_end) {   // must be below end of pool
@@ -509,12 +697,40 @@ void gc_collect_start(void) {
 
 static void gc_collect_start_common(void) {
     GC_ENTER();
+    #if MICROPY_GC_PAUSE_STATS
+    MP_STATE_MEM(gc_pause_start_us) = mp_hal_ticks_us();
+    #endif
+    #if MICROPY_GC_INCREMENTAL_SWEEP
+    // Marking relies on all live heads being unmarked, so the previous
+    // collection must be fully swept first.
+    gc_sweep_finish();
+    #endif
     assert((MP_STATE_THREAD(gc_lock_depth) & GC_COLLECT_FLAG) == 0);
     MP_STATE_THREAD(gc_lock_depth) |= GC_COLLECT_FLAG;
     MP_STATE_MEM(gc_stack_overflow) = 0;
+    for (mp_state_mem_area_t *area = &MP_STATE_MEM(area); area != NULL; area = NEXT_AREA(area)) {
+        area->gc_mark_overflow_first = SIZE_MAX;
+        area->gc_mark_overflow_last = 0;
+    }
+    #if MICROPY_GC_STACK_IN_FREE_BLOCKS
+    MP_STATE_MEM(gc_stack_ext_tried) = false;
+    MP_STATE_MEM(gc_stack_ext_len) = 0;
+    #endif
+    #if MICROPY_GC_FLOAT_FREELIST
+    // Nothing refers to the floats on the freelist, so this collection frees
+    // them and the sweep puts them (and any newly dead floats) back.
+    gc_float_freelist_clear();
+    #endif
 }
 
 void gc_collect_root(void **ptrs, size_t len) {
+    #if MICROPY_GC_COMPACT
+    if (MP_STATE_MEM(gc_compact_pins) != NULL) {
+        // Compacting the heap, which only needs to know what the roots pin.
+        gc_compact_pin_roots(ptrs, len);
+        return;
+    }
+    #endif
     #if !MICROPY_GC_SPLIT_HEAP
     mp_state_mem_area_t *area = &MP_STATE_MEM(area);
     #endif
@@ -544,6 +760,74 @@ void gc_collect_root(void **ptrs, size_t len) {
     }
 }
 
+#if MICROPY_GC_STACK_IN_FREE_BLOCKS || MICROPY_GC_COMPACT
+// Find the longest run of free blocks in the heap, returning its length (which
+// is 0 if there are no free blocks).
+static size_t gc_longest_free_run(mp_state_mem_area_t **area_out, size_t *start_out) {
+    size_t best_len = 0;
+    for (mp_state_mem_area_t *area = &MP_STATE_MEM(area); area != NULL; area = NEXT_AREA(area)) {
+        size_t n_blocks = area->gc_alloc_table_byte_len * BLOCKS_PER_ATB;
+        size_t len = 0;
+        for (size_t block = 0; block < n_blocks;) {
+            MICROPY_GC_HOOK_LOOP(block);
+            byte atb = area->gc_alloc_table_start[block / BLOCKS_PER_ATB];
+            if ((block & (BLOCKS_PER_ATB - 1)) == 0 && atb == 0) {
+                // A whole ATB byte of free blocks.
+                len += BLOCKS_PER_ATB;
+                block += BLOCKS_PER_ATB;
+            } else if ((block & (BLOCKS_PER_ATB - 1)) == 0 && !ATB_0_IS_FREE(atb) && !ATB_1_IS_FREE(atb)
+                       && !ATB_2_IS_FREE(atb) && !ATB_3_IS_FREE(atb)) {
+                // A whole ATB byte of blocks that aren't free.
+                len = 0;
+                block += BLOCKS_PER_ATB;
+                continue;
+            } else {
+                len = ATB_GET_KIND(area, block) == AT_FREE ? len + 1 : 0;
+                block += 1;
+            }
+            if (len > best_len) {
+                *area_out = area;
+                *start_out = block - len;
+                best_len = len;
+            }
+        }
+    }
+    return best_len;
+}
+#endif
+
+#if MICROPY_GC_STACK_IN_FREE_BLOCKS
+// Set up the continuation of the GC stack in the longest run of free blocks.
+// This is only tried once per collection, so once that is full (or if there
+// are no free blocks) the GC stack overflows as usual.
+static bool gc_stack_ext_setup(void) {
+    if (MP_STATE_MEM(gc_stack_ext_tried)) {
+        return false;
+    }
+    MP_STATE_MEM(gc_stack_ext_tried) = true;
+
+    mp_state_mem_area_t *best_area;
+    size_t best_start;
+    size_t best_len = gc_longest_free_run(&best_area, &best_start);
+    if (best_len == 0) {
+        return false;
+    }
+
+    byte *p = (byte *)PTR_FROM_BLOCK(best_area, best_start);
+    size_t n_bytes = best_len * BYTES_PER_BLOCK;
+    #if MICROPY_GC_SPLIT_HEAP
+    size_t len = n_bytes / (sizeof(mp_state_mem_area_t *) + sizeof(MICROPY_GC_STACK_ENTRY_TYPE));
+    MP_STATE_MEM(gc_area_stack_ext) = (mp_state_mem_area_t **)p;
+    p += len * sizeof(mp_state_mem_area_t *);
+    #else
+    size_t len = n_bytes / sizeof(MICROPY_GC_STACK_ENTRY_TYPE);
+    #endif
+    MP_STATE_MEM(gc_block_stack_ext) = (MICROPY_GC_STACK_ENTRY_TYPE *)p;
+    MP_STATE_MEM(gc_stack_ext_len) = len;
+    return true;
+}
+#endif
+
 // Take the given block as the topmost block on the stack. Check all it's
 // children: mark the unmarked child blocks and put those newly marked
 // blocks on the stack. When all children have been checked, pop off the
@@ -590,10 +874,15 @@ static void MP_NO_INSTRUMENT PLACE_IN_ITCM(gc_mark_subtree)(size_t block)
                 // If this is a heap pointer that hasn't been marked, mark it and push
                 // it's children to the stack.
                 #if MICROPY_GC_SPLIT_HEAP
-                mp_state_mem_area_t *ptr_area = gc_get_ptr_area(ptr);
-                if (!ptr_area) {
-                    // Not a heap-allocated pointer (might even be random data).
-                    continue;
+                // Most pointers are to the same area as the block they are in.
+                mp_state_mem_area_t *ptr_area = area;
+                if (ptr < (void *)area->gc_pool_start || ptr >= (void *)area->gc_pool_end
+                    || ((uintptr_t)ptr & (BYTES_PER_BLOCK - 1)) != 0) {
+                    ptr_area = gc_get_ptr_area(ptr);
+                    if (!ptr_area) {
+                        // Not a heap-allocated pointer (might even be random data).
+                        continue;
+                    }
                 }
                 #else
                 if (!VERIFY_PTR(ptr)) {
@@ -615,8 +904,20 @@ static void MP_NO_INSTRUMENT PLACE_IN_ITCM(gc_mark_subtree)(size_t block)
                     MP_STATE_MEM(gc_area_stack)[sp] = ptr_area;
                     #endif
                     sp += 1;
+                #if MICROPY_GC_STACK_IN_FREE_BLOCKS
+                } else if (sp - MICROPY_ALLOC_GC_STACK_SIZE < MP_STATE_MEM(gc_stack_ext_len) || gc_stack_ext_setup()) {
+                    MP_STATE_MEM(gc_block_stack_ext)[sp - MICROPY_ALLOC_GC_STACK_SIZE] = ptr_block;
+                    #if MICROPY_GC_SPLIT_HEAP
+                    MP_STATE_MEM(gc_area_stack_ext)[sp - MICROPY_ALLOC_GC_STACK_SIZE] = ptr_area;
+                    #endif
+                    sp += 1;
+                #endif
                 } else {
+                    // The children of this block are found later, by rescanning
+                    // the range of blocks that this happened to.
                     MP_STATE_MEM(gc_stack_overflow) = 1;
+                    ptr_area->gc_mark_overflow_first = MIN(ptr_area->gc_mark_overflow_first, ptr_block);
+                    ptr_area->gc_mark_overflow_last = MAX(ptr_area->gc_mark_overflow_last, ptr_block);
                 }
             }
         }
@@ -628,6 +929,15 @@ static void MP_NO_INSTRUMENT PLACE_IN_ITCM(gc_mark_subtree)(size_t block)
 
         // pop the next block off the stack
         sp -= 1;
+        #if MICROPY_GC_STACK_IN_FREE_BLOCKS
+        if (sp >= MICROPY_ALLOC_GC_STACK_SIZE) {
+            block = MP_STATE_MEM(gc_block_stack_ext)[sp - MICROPY_ALLOC_GC_STACK_SIZE];
+            #if MICROPY_GC_SPLIT_HEAP
+            area = MP_STATE_MEM(gc_area_stack_ext)[sp - MICROPY_ALLOC_GC_STACK_SIZE];
+            #endif
+            continue;
+        }
+        #endif
         block = MP_STATE_MEM(gc_block_stack)[sp];
         #if MICROPY_GC_SPLIT_HEAP
         area = MP_STATE_MEM(gc_area_stack)[sp];
@@ -638,12 +948,27 @@ static void MP_NO_INSTRUMENT PLACE_IN_ITCM(gc_mark_subtree)(size_t block)
 void gc_sweep_all(void) {
     gc_collect_start_common();
     gc_collect_end();
+    #if MICROPY_GC_INCREMENTAL_SWEEP
+    gc_sweep_finish();
+    #endif
 }
 
 void gc_collect_end(void) {
+    #if MICROPY_GC_COMPACT
+    if (MP_STATE_MEM(gc_compact_pins) != NULL) {
+        // Nothing was marked, see gc_compact_heap.
+        MP_STATE_THREAD(gc_lock_depth) &= ~GC_COLLECT_FLAG;
+        GC_EXIT();
+        return;
+    }
+    #endif
     gc_deal_with_stack_overflow();
     gc_sweep_run_finalisers();
+    #if MICROPY_GC_INCREMENTAL_SWEEP
+    gc_sweep_begin();
+    #else
     gc_sweep_free_blocks();
+    #endif
     #if MICROPY_GC_SPLIT_HEAP
     MP_STATE_MEM(gc_last_free_area) = &MP_STATE_MEM(area);
     #endif
@@ -651,6 +976,11 @@ void gc_collect_end(void) {
         area->gc_last_free_atb_index = 0;
     }
     MP_STATE_THREAD(gc_lock_depth) &= ~GC_COLLECT_FLAG;
+    #if MICROPY_GC_PAUSE_STATS
+    mp_uint_t pause = mp_hal_ticks_us() - MP_STATE_MEM(gc_pause_start_us);
+    MP_STATE_MEM(gc_last_pause_us) = pause;
+    MP_STATE_MEM(gc_max_pause_us) = MAX(MP_STATE_MEM(gc_max_pause_us), pause);
+    #endif
     GC_EXIT();
 }
 
@@ -658,9 +988,13 @@ static void gc_deal_with_stack_overflow(void) {
     while (MP_STATE_MEM(gc_stack_overflow)) {
         MP_STATE_MEM(gc_stack_overflow) = 0;
 
-        // scan entire memory looking for blocks which have been marked but not their children
+        // scan the blocks which may have been marked but not their children
         for (mp_state_mem_area_t *area = &MP_STATE_MEM(area); area != NULL; area = NEXT_AREA(area)) {
-            for (size_t block = 0; block < area->gc_alloc_table_byte_len * BLOCKS_PER_ATB; block++) {
+            size_t last = area->gc_mark_overflow_last;
+            size_t block = area->gc_mark_overflow_first;
+            area->gc_mark_overflow_first = SIZE_MAX;
+            area->gc_mark_overflow_last = 0;
+            for (; block <= last; block++) {
                 MICROPY_GC_HOOK_LOOP(block);
                 // trace (again) if mark bit set
                 if (ATB_GET_KIND(area, block) == AT_MARK) {
@@ -717,6 +1051,7 @@ static void gc_sweep_run_finalisers(void) {
     #endif // MICROPY_ENABLE_FINALISER
 }
 
+#if !MICROPY_GC_INCREMENTAL_SWEEP
 // Free unmarked heads and their tails
 static void gc_sweep_free_blocks(void) {
     #if MICROPY_PY_GC_COLLECT_RETVAL
@@ -731,6 +1066,16 @@ static void gc_sweep_free_blocks(void) {
         size_t last_used_block = 0;
         assert(area->gc_last_used_block <= area->gc_alloc_table_byte_len * BLOCKS_PER_ATB);
 
+        #if MICROPY_GC_FREE_RUN_INDEX
+        // Rebuild the free-run index while sweeping: class k starts at the
+        // first run of at least 2**k free blocks.  Classes are found in
+        // increasing order, so only the next unset class needs checking.
+        size_t run_start = 0;
+        size_t run_len = 0;
+        size_t next_class = 0;
+        gc_free_run_reset(area, area->gc_alloc_table_byte_len);
+        #endif
+
         for (size_t block = 0; block <= area->gc_last_used_block; block++) {
             MICROPY_GC_HOOK_LOOP(block);
             switch (ATB_GET_KIND(area, block)) {
@@ -740,6 +1085,13 @@ static void gc_sweep_free_blocks(void) {
                     #if MICROPY_PY_GC_COLLECT_RETVAL
                     MP_STATE_MEM(gc_collected)++;
                     #endif
+                    #if MICROPY_GC_FLOAT_FREELIST
+                    if (gc_float_freelist_keep(area, block)) {
+                        free_tail = 0;
+                        last_used_block = block;
+                        break;
+                    }
+                    #endif
                     // fall through to free the head
                     MP_FALLTHROUGH
 
@@ -760,7 +1112,34 @@ static void gc_sweep_free_blocks(void) {
                     last_used_block = block;
                     break;
             }
+
+            #if MICROPY_GC_FREE_RUN_INDEX
+            if (ATB_GET_KIND(area, block) != AT_FREE) {
+                run_len = 0;
+                continue;
+            }
+            if (run_len++ == 0) {
+                run_start = block;
+            }
+            while (next_class < MICROPY_GC_FREE_RUN_CLASSES && run_len >= ((size_t)1 << next_class)) {
+                area->gc_free_run_atb_index[next_class++] = run_start / BLOCKS_PER_ATB;
+            }
+            #endif
+        }
+
+        #if MICROPY_GC_FREE_RUN_INDEX
+        // Everything after the previous last used block was already free.
+        size_t n_blocks_total = area->gc_alloc_table_byte_len * BLOCKS_PER_ATB;
+        if (area->gc_last_used_block + 1 < n_blocks_total) {
+            if (run_len == 0) {
+                run_start = area->gc_last_used_block + 1;
+            }
+            run_len += n_blocks_total - (area->gc_last_used_block + 1);
+            while (next_class < MICROPY_GC_FREE_RUN_CLASSES && run_len >= ((size_t)1 << next_class)) {
+                area->gc_free_run_atb_index[next_class++] = run_start / BLOCKS_PER_ATB;
+            }
         }
+        #endif
 
         area->gc_last_used_block = last_used_block;
 
@@ -776,6 +1155,526 @@ static void gc_sweep_free_blocks(void) {
         #endif
     }
 }
+#endif
+
+#if MICROPY_GC_INCREMENTAL_SWEEP
+// Start a deferred sweep of all areas.  Until an area has been swept past a
+// block, live heads there are still marked and dead ones are still heads.
+static void gc_sweep_begin(void) {
+    #if MICROPY_PY_GC_COLLECT_RETVAL
+    MP_STATE_MEM(gc_collected) = 0;
+    #endif
+    for (mp_state_mem_area_t *area = &MP_STATE_MEM(area); area != NULL; area = NEXT_AREA(area)) {
+        area->gc_sweep_block = 0;
+        area->gc_sweep_last_used_block = 0;
+        area->gc_sweep_free_tail = false;
+        #if MICROPY_GC_FREE_RUN_INDEX
+        // Nothing is known about free runs until the area has been swept,
+        // so searches start from the beginning and the index is relearned.
+        gc_free_run_reset(area, 0);
+        #endif
+    }
+    MP_STATE_MEM(gc_sweep_pending) = true;
+}
+
+// Sweep the given area from its sweep cursor up to (but not including)
+// end_block, freeing unmarked heads and their tails.  A dead chain that
+// crosses end_block is freed to its end, because the blocks below the cursor
+// may be reused straight away and must not be followed by stale tails.
+static void gc_sweep_area_to(mp_state_mem_area_t *area, size_t end_block) {
+    size_t block = area->gc_sweep_block;
+    size_t first_freed = SIZE_MAX;
+    bool free_tail = area->gc_sweep_free_tail;
+    end_block = MIN(end_block, area->gc_last_used_block + 1);
+
+    for (; block < end_block
+         || (free_tail && block <= area->gc_last_used_block && ATB_GET_KIND(area, block) == AT_TAIL); block++) {
+        MICROPY_GC_HOOK_LOOP(block);
+        switch (ATB_GET_KIND(area, block)) {
+            case AT_HEAD:
+                free_tail = true;
+                DEBUG_printf("gc_sweep_area_to(%p)\n", (void *)PTR_FROM_BLOCK(area, block));
+                #if MICROPY_PY_GC_COLLECT_RETVAL
+                MP_STATE_MEM(gc_collected)++;
+                #endif
+                #if MICROPY_GC_FLOAT_FREELIST
+                if (gc_float_freelist_keep(area, block)) {
+                    free_tail = false;
+                    area->gc_sweep_last_used_block = block;
+                    break;
+                }
+                #endif
+                // fall through to free the head
+                MP_FALLTHROUGH
+
+            case AT_TAIL:
+                if (free_tail) {
+                    ATB_ANY_TO_FREE(area, block);
+                    #if CLEAR_ON_SWEEP
+                    memset((void *)PTR_FROM_BLOCK(area, block), 0, BYTES_PER_BLOCK);
+                    #endif
+                    if (first_freed == SIZE_MAX) {
+                        first_freed = block;
+                    }
+                } else {
+                    area->gc_sweep_last_used_block = block;
+                }
+                break;
+
+            case AT_MARK:
+                ATB_MARK_TO_HEAD(area, block);
+                free_tail = false;
+                area->gc_sweep_last_used_block = block;
+                break;
+        }
+    }
+
+    area->gc_sweep_free_tail = free_tail;
+    if (block > area->gc_last_used_block) {
+        // Reached the end of the used blocks, so this area is done.
+        area->gc_last_used_block = area->gc_sweep_last_used_block;
+        block = SIZE_MAX;
+    }
+    area->gc_sweep_block = block;
+
+    if (first_freed != SIZE_MAX) {
+        if (first_freed / BLOCKS_PER_ATB < area->gc_last_free_atb_index) {
+            area->gc_last_free_atb_index = first_freed / BLOCKS_PER_ATB;
+        }
+        #if MICROPY_GC_FREE_RUN_INDEX
+        gc_free_run_add(area, first_freed);
+        #endif
+    }
+}
+
+// Called once all areas have been swept.
+static void gc_sweep_done(void) {
+    MP_STATE_MEM(gc_sweep_pending) = false;
+
+    #if MICROPY_GC_SPLIT_HEAP_AUTO
+    // Free any empty area, aside from the first one
+    for (mp_state_mem_area_t *prev_area = &MP_STATE_MEM(area), *area = NEXT_AREA(prev_area);
+         area != NULL; area = NEXT_AREA(prev_area)) {
+        if (area->gc_last_used_block == 0) {
+            DEBUG_printf("gc_sweep_done free empty area %p\n", area);
+            NEXT_AREA(prev_area) = NEXT_AREA(area);
+            MP_PLAT_FREE_HEAP(area);
+            MP_STATE_MEM(gc_last_free_area) = &MP_STATE_MEM(area);
+        } else {
+            prev_area = area;
+        }
+    }
+    #endif
+}
+
+void gc_sweep_step(void) {
+    if (!MP_STATE_MEM(gc_sweep_pending) || MP_STATE_THREAD(gc_lock_depth) > 0) {
+        return;
+    }
+
+    GC_ENTER();
+
+    #if MICROPY_GC_PAUSE_STATS
+    mp_uint_t start = mp_hal_ticks_us();
+    #endif
+
+    // Sweep a slice of the first area that still needs it.
+    mp_state_mem_area_t *area = &MP_STATE_MEM(area);
+    while (area != NULL && area->gc_sweep_block == SIZE_MAX) {
+        area = NEXT_AREA(area);
+    }
+    if (area == NULL) {
+        gc_sweep_done();
+    } else {
+        gc_sweep_area_to(area, area->gc_sweep_block + MICROPY_GC_SWEEP_STEP_BLOCKS);
+    }
+
+    #if MICROPY_GC_PAUSE_STATS
+    mp_uint_t pause = mp_hal_ticks_us() - start;
+    MP_STATE_MEM(gc_max_pause_us) = MAX(MP_STATE_MEM(gc_max_pause_us), pause);
+    #endif
+
+    GC_EXIT();
+}
+
+void gc_sweep_finish(void) {
+    if (!MP_STATE_MEM(gc_sweep_pending)) {
+        return;
+    }
+    GC_ENTER();
+    for (mp_state_mem_area_t *area = &MP_STATE_MEM(area); area != NULL; area = NEXT_AREA(area)) {
+        if (area->gc_sweep_block != SIZE_MAX) {
+            gc_sweep_area_to(area, SIZE_MAX);
+        }
+    }
+    gc_sweep_done();
+    GC_EXIT();
+}
+#endif
+
+#if MICROPY_GC_COMPACT
+
+// Compacting the heap moves buffers down into the lowest free run that fits
+// them.  The heap is scanned conservatively, so a buffer can only be moved if
+// the one place that refers to it is known precisely, and can be updated:
+// the items of a list or bytearray, or the data of a str or bytes.  A buffer
+// that anything else refers to, even by an interior pointer, is pinned, as is
+// everything that the roots (including the C stack and registers) refer to.
+// Only buffers move, never the objects that own them.
+
+// Index of the given block in the pin bitmap, which covers the areas one
+// after the other.
+static size_t gc_compact_pin_index(mp_state_mem_area_t *area, size_t block) {
+    #if MICROPY_GC_SPLIT_HEAP
+    for (mp_state_mem_area_t *a = &MP_STATE_MEM(area); a != area; a = NEXT_AREA(a)) {
+        block += a->gc_alloc_table_byte_len * BLOCKS_PER_ATB;
+    }
+    #else
+    (void)area;
+    #endif
+    return block;
+}
+
+static void gc_compact_pin(mp_state_mem_area_t *area, size_t block) {
+    size_t i = gc_compact_pin_index(area, block);
+    if (i < MP_STATE_MEM(gc_compact_pins_len)) {
+        MP_STATE_MEM(gc_compact_pins)[i / 8] |= 1 << (i & 7);
+    }
+}
+
+// Blocks that the bitmap doesn't cover are always pinned.
+static bool gc_compact_is_pinned(mp_state_mem_area_t *area, size_t block, size_t n_blocks) {
+    size_t i = gc_compact_pin_index(area, block);
+    if (i + n_blocks > MP_STATE_MEM(gc_compact_pins_len)) {
+        return true;
+    }
+    for (; n_blocks > 0; i++, n_blocks--) {
+        if (MP_STATE_MEM(gc_compact_pins)[i / 8] & (1 << (i & 7))) {
+            return true;
+        }
+    }
+    return false;
+}
+
+// Pin the block that a pointer points into.  A pointer to the end of a buffer
+// may be all that is left of it (eg the end of a loop over it in C), so if the
+// pointer is on a block boundary then the block before it is pinned as well.
+static void gc_compact_pin_ptr(const void *ptr) {
+    for (mp_state_mem_area_t *area = &MP_STATE_MEM(area); area != NULL; area = NEXT_AREA(area)) {
+        if (ptr >= (void *)area->gc_pool_start && ptr <= (void *)area->gc_pool_end) {
+            size_t offset = (const byte *)ptr - area->gc_pool_start;
+            if (ptr < (void *)area->gc_pool_end) {
+                gc_compact_pin(area, offset / BYTES_PER_BLOCK);
+            }
+            if (offset % BYTES_PER_BLOCK == 0 && offset > 0) {
+                gc_compact_pin(area, offset / BYTES_PER_BLOCK - 1);
+            }
+            return;
+        }
+    }
+}
+
+static void gc_compact_pin_roots(void **ptrs, size_t len) {
+    for (size_t i = 0; i < len; i++) {
+        MICROPY_GC_HOOK_LOOP(i);
+        gc_compact_pin_ptr(gc_get_ptr(ptrs, i));
+    }
+}
+
+// Returns the area of the allocated head that ptr points to, or NULL.
+static mp_state_mem_area_t *gc_compact_head_area(const void *ptr) {
+    if (((uintptr_t)ptr & (BYTES_PER_BLOCK - 1)) != 0) {
+        return NULL;
+    }
+    for (mp_state_mem_area_t *area = &MP_STATE_MEM(area); area != NULL; area = NEXT_AREA(area)) {
+        if (ptr >= (void *)area->gc_pool_start && ptr < (void *)area->gc_pool_end) {
+            // Heads that are referenced precisely are marked during the census.
+            size_t kind = ATB_GET_KIND(area, BLOCK_FROM_PTR(area, ptr));
+            return kind == AT_HEAD || kind == AT_MARK ? area : NULL;
+        }
+    }
+    return NULL;
+}
+
+static size_t gc_compact_n_blocks(mp_state_mem_area_t *area, size_t block) {
+    size_t n_blocks = 1;
+    while (block + n_blocks < area->gc_alloc_table_byte_len * BLOCKS_PER_ATB
+           && ATB_GET_KIND(area, block + n_blocks) == AT_TAIL) {
+        n_blocks += 1;
+    }
+    return n_blocks;
+}
+
+// If the allocation at the given head is an object with a slot that refers
+// to a separate buffer, and the object and the buffer are consistent with
+// each other, then return that slot.  This guards against data that only
+// looks like such an object.
+static void **gc_compact_owner_slot(mp_state_mem_area_t *area, size_t block, size_t n_blocks) {
+    const mp_obj_base_t *o = (const mp_obj_base_t *)PTR_FROM_BLOCK(area, block);
+    size_t obj_size;
+    size_t min_bytes;
+    void **slot;
+    if (o->type == &mp_type_list) {
+        mp_obj_list_t *list = (mp_obj_list_t *)o;
+        if (list->len > list->alloc) {
+            return NULL;
+        }
+        obj_size = sizeof(mp_obj_list_t);
+        min_bytes = list->alloc * sizeof(mp_obj_t);
+        slot = (void **)&list->items;
+    #if MICROPY_PY_BUILTINS_BYTEARRAY
+    } else if (o->type == &mp_type_bytearray) {
+        mp_obj_array_t *array = (mp_obj_array_t *)o;
+        if (array->typecode != BYTEARRAY_TYPECODE) {
+            return NULL;
+        }
+        obj_size = sizeof(mp_obj_array_t);
+        min_bytes = array->len + array->free;
+        slot = &array->items;
+    #endif
+    } else if (o->type == &mp_type_str || o->type == &mp_type_bytes) {
+        mp_obj_str_t *str = (mp_obj_str_t *)o;
+        obj_size = sizeof(mp_obj_str_t);
+        min_bytes = str->len + 1;
+        slot = (void **)&str->data;
+    } else {
+        return NULL;
+    }
+    if (n_blocks != (obj_size + BYTES_PER_BLOCK - 1) / BYTES_PER_BLOCK) {
+        return NULL;
+    }
+    mp_state_mem_area_t *buf_area = gc_compact_head_area(*slot);
+    if (buf_area == NULL) {
+        return NULL;
+    }
+    size_t buf_block = BLOCK_FROM_PTR(buf_area, *slot);
+    if (gc_compact_n_blocks(buf_area, buf_block) * BYTES_PER_BLOCK < min_bytes) {
+        return NULL;
+    }
+    if (o->type != &mp_type_list && o->type != &mp_type_bytearray
+        && ((const byte *)*slot)[min_bytes - 1] != '\0') {
+        return NULL;
+    }
+    return slot;
+}
+
+// Go through all words in all live allocations.  The head that an owner's slot
+// refers to is marked the first time, and pinned if it is already marked.  Any
+// other word that points into the heap pins the block it points into.  So
+// afterwards, the heads that can be moved are those that are marked and not
+// pinned.
+static void gc_compact_census(void) {
+    for (mp_state_mem_area_t *area = &MP_STATE_MEM(area); area != NULL; area = NEXT_AREA(area)) {
+        for (size_t block = 0; block <= area->gc_last_used_block; block++) {
+            MICROPY_GC_HOOK_LOOP(block);
+            size_t kind = ATB_GET_KIND(area, block);
+            if (kind != AT_HEAD && kind != AT_MARK) {
+                continue;
+            }
+            void **ptrs = (void **)PTR_FROM_BLOCK(area, block);
+            if ((byte *)ptrs == MP_STATE_MEM(gc_compact_pins)) {
+                continue;
+            }
+            #if MICROPY_ENABLE_SELECTIVE_COLLECT
+            if (!CTB_GET(area, block)) {
+                // Holds no pointers.
+                continue;
+            }
+            #endif
+            size_t n_blocks = gc_compact_n_blocks(area, block);
+            void **slot = gc_compact_owner_slot(area, block, n_blocks);
+            for (size_t i = n_blocks * BYTES_PER_BLOCK / sizeof(void *); i > 0; i--, ptrs++) {
+                if (ptrs == slot) {
+                    mp_state_mem_area_t *buf_area = gc_compact_head_area(*ptrs);
+                    size_t buf_block = BLOCK_FROM_PTR(buf_area, *ptrs);
+                    if (ATB_GET_KIND(buf_area, buf_block) == AT_HEAD) {
+                        ATB_HEAD_TO_MARK(buf_area, buf_block);
+                    } else {
+                        gc_compact_pin(buf_area, buf_block);
+                    }
+                } else {
+                    gc_compact_pin_ptr(*ptrs);
+                }
+            }
+        }
+    }
+}
+
+// Find the lowest run of n_blocks free blocks that starts before the given
+// block.  The area's last free ATB index is moved past blocks that are in use,
+// as the search goes.
+static size_t gc_compact_find_free(mp_state_mem_area_t *area, size_t n_blocks, size_t end_block) {
+    size_t n_free = 0;
+    for (size_t i = area->gc_last_free_atb_index; i * BLOCKS_PER_ATB < end_block; i++) {
+        MICROPY_GC_HOOK_LOOP(i);
+        byte a = area->gc_alloc_table_start[i];
+        if (!ATB_0_IS_FREE(a) && !ATB_1_IS_FREE(a) && !ATB_2_IS_FREE(a) && !ATB_3_IS_FREE(a)) {
+            if (i == area->gc_last_free_atb_index) {
+                area->gc_last_free_atb_index = i + 1;
+            }
+            n_free = 0;
+            continue;
+        }
+        for (size_t block = i * BLOCKS_PER_ATB; block < (i + 1) * BLOCKS_PER_ATB; block++) {
+            if (ATB_GET_KIND(area, block) != AT_FREE) {
+                n_free = 0;
+            } else if (++n_free == n_blocks) {
+                return block + 1 - n_blocks;
+            }
+        }
+    }
+    return SIZE_MAX;
+}
+
+static void gc_compact_move(mp_state_mem_area_t *area, size_t from, size_t to, size_t n_blocks) {
+    DEBUG_printf("gc_compact: move %p -> %p (" UINT_FMT " blocks)\n",
+        (void *)PTR_FROM_BLOCK(area, from), (void *)PTR_FROM_BLOCK(area, to), n_blocks);
+    memcpy((void *)PTR_FROM_BLOCK(area, to), (void *)PTR_FROM_BLOCK(area, from), n_blocks * BYTES_PER_BLOCK);
+    ATB_FREE_TO_HEAD(area, to);
+    for (size_t bl = 0; bl < n_blocks; bl++) {
+        if (bl > 0) {
+            ATB_FREE_TO_TAIL(area, to + bl);
+        }
+        ATB_ANY_TO_FREE(area, from + bl);
+    }
+    #if MICROPY_ENABLE_FINALISER
+    if (FTB_GET(area, from)) {
+        FTB_CLEAR(area, from);
+        FTB_SET(area, to);
+    }
+    #endif
+    #if MICROPY_ENABLE_SELECTIVE_COLLECT
+    if (CTB_GET(area, from)) {
+        CTB_SET(area, to);
+    } else {
+        CTB_CLEAR(area, to);
+    }
+    #endif
+    #if CLEAR_ON_SWEEP
+    memset((void *)PTR_FROM_BLOCK(area, from), 0, n_blocks * BYTES_PER_BLOCK);
+    #endif
+}
+
+// Compact the heap, which must have just been collected.
+static void gc_compact_heap(void) {
+    #if MICROPY_GC_INCREMENTAL_SWEEP
+    gc_sweep_finish();
+    #endif
+    #if MICROPY_GC_FLOAT_FREELIST
+    gc_float_freelist_release();
+    #endif
+    GC_ENTER();
+
+    size_t n_blocks_total = 0;
+    for (mp_state_mem_area_t *area = &MP_STATE_MEM(area); area != NULL; area = NEXT_AREA(area)) {
+        n_blocks_total += area->gc_alloc_table_byte_len * BLOCKS_PER_ATB;
+    }
+
+    // Put the pin bitmap in the longest free run.  If that is too short then
+    // the blocks at the end of the heap that it doesn't cover are all pinned.
+    mp_state_mem_area_t *pins_area;
+    size_t pins_block;
+    size_t pins_n_blocks = gc_longest_free_run(&pins_area, &pins_block);
+    MP_STATE_MEM(gc_compact_max_free_before) = pins_n_blocks;
+    MP_STATE_MEM(gc_compact_max_free_after) = pins_n_blocks;
+    pins_n_blocks = MIN(pins_n_blocks, (n_blocks_total + 8 * BYTES_PER_BLOCK - 1) / (8 * BYTES_PER_BLOCK));
+    #if MICROPY_PY_THREAD && !MICROPY_PY_THREAD_GIL
+    if (MP_STATE_MEM(gc_compact_threads) != 0) {
+        // Other threads may be running, and using the buffers that would move.
+        pins_n_blocks = 0;
+    }
+    #endif
+    if (pins_n_blocks == 0) {
+        GC_EXIT();
+        return;
+    }
+    ATB_FREE_TO_HEAD(pins_area, pins_block);
+    for (size_t bl = 1; bl < pins_n_blocks; bl++) {
+        ATB_FREE_TO_TAIL(pins_area, pins_block + bl);
+    }
+    byte *pins = (byte *)PTR_FROM_BLOCK(pins_area, pins_block);
+    memset(pins, 0, pins_n_blocks * BYTES_PER_BLOCK);
+    MP_STATE_MEM(gc_compact_pins) = pins;
+    MP_STATE_MEM(gc_compact_pins_len) = MIN(pins_n_blocks * BYTES_PER_BLOCK * 8, n_blocks_total);
+
+    // With the bitmap set, a collection only pins what the roots refer to.
+    gc_collect();
+    gc_compact_pin(pins_area, pins_block);
+    gc_compact_census();
+
+    // Move the buffers that can be moved, in the order of their owners.
+    size_t n_moved = 0;
+    for (mp_state_mem_area_t *area = &MP_STATE_MEM(area); area != NULL; area = NEXT_AREA(area)) {
+        area->gc_last_free_atb_index = 0;
+    }
+    for (mp_state_mem_area_t *area = &MP_STATE_MEM(area); area != NULL; area = NEXT_AREA(area)) {
+        for (size_t block = 0; block <= area->gc_last_used_block; block++) {
+            MICROPY_GC_HOOK_LOOP(block);
+            size_t kind = ATB_GET_KIND(area, block);
+            if ((kind != AT_HEAD && kind != AT_MARK) || (byte *)PTR_FROM_BLOCK(area, block) == pins) {
+                continue;
+            }
+            void **slot = gc_compact_owner_slot(area, block, gc_compact_n_blocks(area, block));
+            if (slot == NULL) {
+                continue;
+            }
+            mp_state_mem_area_t *buf_area = gc_compact_head_area(*slot);
+            size_t buf_block = BLOCK_FROM_PTR(buf_area, *slot);
+            size_t buf_n_blocks = gc_compact_n_blocks(buf_area, buf_block);
+            if (ATB_GET_KIND(buf_area, buf_block) != AT_MARK
+                || gc_compact_is_pinned(buf_area, buf_block, buf_n_blocks)) {
+                continue;
+            }
+            size_t to = gc_compact_find_free(buf_area, buf_n_blocks, buf_block);
+            if (to != SIZE_MAX) {
+                gc_compact_move(buf_area, buf_block, to, buf_n_blocks);
+                *slot = (void *)PTR_FROM_BLOCK(buf_area, to);
+                n_moved += 1;
+            }
+        }
+    }
+    DEBUG_printf("gc_compact: moved " UINT_FMT " buffers\n", n_moved);
+    (void)n_moved;
+
+    // Unmark the buffers that weren't moved, and give back the pin bitmap.
+    for (mp_state_mem_area_t *area = &MP_STATE_MEM(area); area != NULL; area = NEXT_AREA(area)) {
+        for (size_t block = 0; block <= area->gc_last_used_block; block++) {
+            if (ATB_GET_KIND(area, block) == AT_MARK) {
+                ATB_MARK_TO_HEAD(area, block);
+            }
+        }
+    }
+    for (size_t bl = 0; bl < pins_n_blocks; bl++) {
+        ATB_ANY_TO_FREE(pins_area, pins_block + bl);
+    }
+    MP_STATE_MEM(gc_compact_pins) = NULL;
+
+    // Blocks have been freed all over the heap.
+    #if MICROPY_GC_SPLIT_HEAP
+    MP_STATE_MEM(gc_last_free_area) = &MP_STATE_MEM(area);
+    #endif
+    for (mp_state_mem_area_t *area = &MP_STATE_MEM(area); area != NULL; area = NEXT_AREA(area)) {
+        area->gc_last_free_atb_index = 0;
+        #if MICROPY_GC_FREE_RUN_INDEX
+        gc_free_run_reset(area, 0);
+        #endif
+    }
+
+    mp_state_mem_area_t *area;
+    size_t start;
+    MP_STATE_MEM(gc_compact_max_free_after) = gc_longest_free_run(&area, &start);
+    MP_STATE_MEM(gc_compactions) += 1;
+    GC_EXIT();
+}
+
+void gc_compact(size_t *free_before, size_t *free_after) {
+    gc_collect();
+    gc_compact_heap();
+    *free_before = MP_STATE_MEM(gc_compact_max_free_before) * BYTES_PER_BLOCK;
+    *free_after = MP_STATE_MEM(gc_compact_max_free_after) * BYTES_PER_BLOCK;
+}
+
+#endif // MICROPY_GC_COMPACT
 
 // CIRCUITPY-CHANGE: add function
 void gc_collect_ptr(void *ptr) {
@@ -801,6 +1700,9 @@ static void *MP_NO_INSTRUMENT PLACE_IN_ITCM(gc_get_ptr)(void **ptrs, int i) {
 
 void gc_info(gc_info_t *info) {
     GC_ENTER();
+    #if MICROPY_GC_INCREMENTAL_SWEEP
+    gc_sweep_finish();
+    #endif
     info->total = 0;
     info->used = 0;
     info->free = 0;
@@ -862,6 +1764,12 @@ void gc_info(gc_info_t *info) {
         }
     }
 
+    #if MICROPY_GC_FLOAT_FREELIST
+    // Floats on the freelist are free as far as the program is concerned.
+    info->used -= MP_STATE_MEM(gc_float_freelist_len);
+    info->free += MP_STATE_MEM(gc_float_freelist_len);
+    #endif
+
     info->used *= BYTES_PER_BLOCK;
     info->free *= BYTES_PER_BLOCK;
 
@@ -869,6 +1777,17 @@ void gc_info(gc_info_t *info) {
     info->max_new_split = gc_get_max_new_split();
     #endif
 
+    #if MICROPY_GC_COMPACT
+    info->compactions = MP_STATE_MEM(gc_compactions);
+    info->compact_max_free_before = MP_STATE_MEM(gc_compact_max_free_before);
+    info->compact_max_free_after = MP_STATE_MEM(gc_compact_max_free_after);
+    #endif
+
+    #if MICROPY_GC_PAUSE_STATS
+    info->last_pause_us = MP_STATE_MEM(gc_last_pause_us);
+    info->max_pause_us = MP_STATE_MEM(gc_max_pause_us);
+    #endif
+
     GC_EXIT();
 }
 
@@ -905,6 +1824,12 @@ void *gc_alloc(size_t n_bytes, unsigned int alloc_flags) {
     #if MICROPY_GC_SPLIT_HEAP_AUTO
     bool added = false;
     #endif
+    #if MICROPY_GC_COMPACT
+    bool compacted = false;
+    #endif
+    #if MICROPY_GC_FREE_RUN_INDEX
+    size_t free_run_class = gc_free_run_class(n_blocks);
+    #endif
 
     #if MICROPY_GC_ALLOC_THRESHOLD
     if (!collected && MP_STATE_MEM(gc_alloc_amount) >= MP_STATE_MEM(gc_alloc_threshold)) {
@@ -931,8 +1856,19 @@ void *gc_alloc(size_t n_bytes, unsigned int alloc_flags) {
         // look for a run of n_blocks available blocks
         for (; area != NULL; area = NEXT_AREA(area), i = 0) {
             n_free = 0;
-            for (i = area->gc_last_free_atb_index; i < area->gc_alloc_table_byte_len; i++) {
+            #if MICROPY_GC_FREE_RUN_INDEX
+            i = area->gc_free_run_atb_index[free_run_class];
+            #else
+            i = area->gc_last_free_atb_index;
+            #endif
+            for (; i < area->gc_alloc_table_byte_len; i++) {
                 MICROPY_GC_HOOK_LOOP(i);
+                #if MICROPY_GC_INCREMENTAL_SWEEP
+                // Sweep lazily just ahead of the search.
+                if (area->gc_sweep_block < (i + 1) * BLOCKS_PER_ATB) {
+                    gc_sweep_area_to(area, (i + 1) * BLOCKS_PER_ATB);
+                }
+                #endif
                 byte a = area->gc_alloc_table_start[i];
                 // *FORMAT-OFF*
                 if (ATB_0_IS_FREE(a)) { if (++n_free >= n_blocks) { i = i * BLOCKS_PER_ATB + 0; goto found; } } else { n_free = 0; }
@@ -945,6 +1881,9 @@ void *gc_alloc(size_t n_bytes, unsigned int alloc_flags) {
             // No free blocks found on this heap. Mark this heap as
             // filled, so we won't try to find free space here again until
             // space is freed.
+            #if MICROPY_GC_FREE_RUN_INDEX
+            gc_free_run_skip(area, n_blocks, area->gc_alloc_table_byte_len);
+            #endif
             #if MICROPY_GC_SPLIT_HEAP
             if (n_blocks == 1) {
                 area->gc_last_free_atb_index = (i + 1) / BLOCKS_PER_ATB; // or (size_t)-1
@@ -954,6 +1893,13 @@ void *gc_alloc(size_t n_bytes, unsigned int alloc_flags) {
 
         GC_EXIT();
         // nothing found!
+        #if MICROPY_GC_FLOAT_FREELIST
+        if (gc_float_freelist_release()) {
+            // try again with the floats that were kept for reuse
+            GC_ENTER();
+            continue;
+        }
+        #endif
         if (collected) {
             #if MICROPY_GC_SPLIT_HEAP_AUTO
             if (!added && gc_try_add_heap(n_bytes)) {
@@ -962,6 +1908,18 @@ void *gc_alloc(size_t n_bytes, unsigned int alloc_flags) {
             }
             #endif
 
+            #if MICROPY_GC_COMPACT
+            // The heap may have enough free blocks in total, just not together.
+            if (!compacted && MICROPY_GC_COMPACT_AUTO_MIN_BYTES != 0 && n_bytes >= MICROPY_GC_COMPACT_AUTO_MIN_BYTES
+                && MP_STATE_MEM(gc_auto_collect_enabled)) {
+                DEBUG_printf("gc_alloc(" UINT_FMT "): no free mem after GC, compacting\n", n_bytes);
+                compacted = true;
+                gc_compact_heap();
+                GC_ENTER();
+                continue;
+            }
+            #endif
+
             // CIRCUITPY-CHANGE
             #if CIRCUITPY_DEBUG
             gc_dump_alloc_table(&mp_plat_print);
@@ -992,6 +1950,12 @@ found:
         area->gc_last_free_atb_index = (i + 1) / BLOCKS_PER_ATB;
     }
 
+    #if MICROPY_GC_FREE_RUN_INDEX
+    // No run of n_blocks or more starts before this one, since the scan would
+    // have stopped there first.
+    gc_free_run_skip(area, n_blocks, start_block / BLOCKS_PER_ATB);
+    #endif
+
     // CIRCUITPY-CHANGE
     #ifdef LOG_HEAP_ACTIVITY
     gc_log_change(start_block, end_block - start_block + 1);
@@ -1002,6 +1966,20 @@ found:
     // mark first block as used head
     ATB_FREE_TO_HEAD(area, start_block);
 
+    #if MICROPY_GC_INCREMENTAL_SWEEP
+    area->gc_sweep_last_used_block = MAX(area->gc_sweep_last_used_block, end_block);
+    if (start_block >= area->gc_sweep_block) {
+        // Not swept yet, so mark the head for the pending sweep to keep it.
+        ATB_HEAD_TO_MARK(area, start_block);
+    } else if (end_block >= area->gc_sweep_block) {
+        // The chain straddles the sweep cursor.  The blocks were all free so
+        // there's nothing to sweep; move the cursor past the new tail so it
+        // isn't mistaken for the tail of a dead chain.
+        area->gc_sweep_block = end_block + 1;
+        area->gc_sweep_free_tail = false;
+    }
+    #endif
+
     // mark rest of blocks as used tail
     // TODO for a run of many blocks can make this more efficient
     for (size_t bl = start_block + 1; bl <= end_block; bl++) {
@@ -1109,7 +2087,7 @@ void gc_free(void *ptr) {
     #endif
 
     size_t block = BLOCK_FROM_PTR(area, ptr);
-    assert(ATB_GET_KIND(area, block) == AT_HEAD
+    assert(ATB_IS_ALLOCATED_HEAD(area, block)
         || (ATB_GET_KIND(area, block) == AT_MARK && (MP_STATE_THREAD(gc_lock_depth) & GC_COLLECT_FLAG)));
 
     #if MICROPY_ENABLE_FINALISER
@@ -1136,6 +2114,10 @@ void gc_free(void *ptr) {
         area->gc_last_free_atb_index = block / BLOCKS_PER_ATB;
     }
 
+    #if MICROPY_GC_FREE_RUN_INDEX
+    gc_free_run_add(area, block);
+    #endif
+
     // CIRCUITPY-CHANGE
     #ifdef LOG_HEAP_ACTIVITY
     gc_log_change(start_block, 0);
@@ -1170,7 +2152,7 @@ size_t gc_nbytes(const void *ptr) {
 
     if (area) {
         size_t block = BLOCK_FROM_PTR(area, ptr);
-        if (ATB_GET_KIND(area, block) == AT_HEAD) {
+        if (ATB_IS_ALLOCATED_HEAD(area, block)) {
             // work out number of consecutive blocks in the chain starting with this on
             size_t n_blocks = 0;
             do {
@@ -1186,6 +2168,26 @@ size_t gc_nbytes(const void *ptr) {
     return 0;
 }
 
+void *gc_alloc_head(const void *ptr) {
+    GC_ENTER();
+
+    for (mp_state_mem_area_t *area = &MP_STATE_MEM(area); area != NULL; area = NEXT_AREA(area)) {
+        if (ptr >= (void *)area->gc_pool_start && ptr < (void *)area->gc_pool_end) {
+            size_t block = BLOCK_FROM_PTR(area, ptr);
+            while (ATB_GET_KIND(area, block) == AT_TAIL) {
+                block -= 1;
+            }
+            // The head may be marked, during a collection or before it is swept.
+            void *head = ATB_GET_KIND(area, block) == AT_FREE ? NULL : (void *)PTR_FROM_BLOCK(area, block);
+            GC_EXIT();
+            return head;
+        }
+    }
+
+    GC_EXIT();
+    return NULL;
+}
+
 void *gc_realloc(void *ptr_in, size_t n_bytes, bool allow_move) {
     // check for pure allocation
     if (ptr_in == NULL) {
@@ -1217,7 +2219,7 @@ void *gc_realloc(void *ptr_in, size_t n_bytes, bool allow_move) {
     area = &MP_STATE_MEM(area);
     #endif
     size_t block = BLOCK_FROM_PTR(area, ptr);
-    assert(ATB_GET_KIND(area, block) == AT_HEAD);
+    assert(ATB_IS_ALLOCATED_HEAD(area, block));
 
     // compute number of new blocks that are requested
     size_t new_blocks = (n_bytes + BYTES_PER_BLOCK - 1) / BYTES_PER_BLOCK;
@@ -1273,6 +2275,10 @@ void *gc_realloc(void *ptr_in, size_t n_bytes, bool allow_move) {
             area->gc_last_free_atb_index = (block + new_blocks) / BLOCKS_PER_ATB;
         }
 
+        #if MICROPY_GC_FREE_RUN_INDEX
+        gc_free_run_add(area, block + new_blocks);
+        #endif
+
         GC_EXIT();
 
         #if EXTENSIVE_HEAP_PROFILING
@@ -1302,6 +2308,15 @@ void *gc_realloc(void *ptr_in, size_t n_bytes, bool allow_move) {
 
         area->gc_last_used_block = MAX(area->gc_last_used_block, end_block);
 
+        #if MICROPY_GC_INCREMENTAL_SWEEP
+        area->gc_sweep_last_used_block = MAX(area->gc_sweep_last_used_block, end_block);
+        if (block < area->gc_sweep_block && end_block > area->gc_sweep_block) {
+            // See comment in gc_alloc.
+            area->gc_sweep_block = end_block;
+            area->gc_sweep_free_tail = false;
+        }
+        #endif
+
         GC_EXIT();
 
         #if MICROPY_GC_CONSERVATIVE_CLEAR
@@ -1375,6 +2390,16 @@ void gc_dump_info(const mp_print_t *print) {
     #endif
     mp_printf(print, "\n No. of 1-blocks: %u, 2-blocks: %u, max blk sz: %u, max free sz: %u\n",
         (uint)info.num_1block, (uint)info.num_2block, (uint)info.max_block, (uint)info.max_free);
+    #if MICROPY_GC_COMPACT
+    if (info.compactions != 0) {
+        mp_printf(print, " Compactions: %u, max free sz before last: %u, after: %u\n",
+            (uint)info.compactions, (uint)info.compact_max_free_before, (uint)info.compact_max_free_after);
+    }
+    #endif
+    #if MICROPY_GC_PAUSE_STATS
+    mp_printf(print, " Pause: last: %u us, max: %u us\n",
+        (uint)info.last_pause_us, (uint)info.max_pause_us);
+    #endif
 }
 
 void gc_dump_alloc_table(const mp_print_t *print) {
@@ -71,6 +71,20 @@ bool gc_alloc_possible(void);
 // Use this function to sweep the whole heap and run all finalisers
 void gc_sweep_all(void);
 
+#if MICROPY_GC_INCREMENTAL_SWEEP
+// Do a bounded amount of the sweep left pending by the last collection.
+// Ports can call this regularly, eg from their background tasks.
+void gc_sweep_step(void);
+// Complete any pending sweep.
+void gc_sweep_finish(void);
+#endif
+
+#if MICROPY_GC_COMPACT
+// Collect and then compact the heap, returning the size in bytes of the largest
+// free block before and after compacting.
+void gc_compact(size_t *free_before, size_t *free_after);
+#endif
+
 enum {
     GC_ALLOC_FLAG_HAS_FINALISER = 1,
     // CIRCUITPY-CHANGE
@@ -81,7 +95,15 @@ enum {
 
 void *gc_alloc(size_t n_bytes, unsigned int alloc_flags);
 void gc_free(void *ptr); // does not call finaliser
+#if MICROPY_GC_FLOAT_FREELIST
+// Take a float freed by the last collection, with its type still set.
+// Returns NULL if there are none.
+void *gc_float_freelist_pop(void);
+#endif
 size_t gc_nbytes(const void *ptr);
+// Returns the start of the allocated block that ptr points into (anywhere within
+// it), or NULL if ptr doesn't point into an allocated block of the heap.
+void *gc_alloc_head(const void *ptr);
 void *gc_realloc(void *ptr, size_t n_bytes, bool allow_move);
 
 // CIRCUITPY-CHANGE
@@ -100,6 +122,15 @@ typedef struct _gc_info_t {
     #if MICROPY_GC_SPLIT_HEAP_AUTO
     size_t max_new_split;
     #endif
+    #if MICROPY_GC_COMPACT
+    size_t compactions;
+    size_t compact_max_free_before;
+    size_t compact_max_free_after;
+    #endif
+    #if MICROPY_GC_PAUSE_STATS
+    mp_uint_t last_pause_us;
+    mp_uint_t max_pause_us;
+    #endif
 } gc_info_t;
 
 void gc_info(gc_info_t *info);
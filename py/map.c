@@ -40,6 +40,10 @@
 #define DEBUG_printf(...) (void)0
 #endif
 
+#if MICROPY_OPT_MAP_ORDERED_INDEX && !MICROPY_PY_COLLECTIONS_ORDEREDDICT
+#error "MICROPY_OPT_MAP_ORDERED_INDEX requires MICROPY_PY_COLLECTIONS_ORDEREDDICT"
+#endif
+
 #if MICROPY_OPT_MAP_LOOKUP_CACHE
 // MP_STATE_VM(map_lookup_cache) provides a cache of index to the last known
 // position of that index in any map. On a cache hit, this allows
@@ -89,6 +93,66 @@ static size_t get_hash_alloc_greater_or_equal_to(size_t x) {
 // CIRCUITPY-CHANGE: Helper for allocating tables of elements
 #define malloc_table(num) m_new0(mp_map_elem_t, num)
 
+#if MICROPY_OPT_MAP_ORDERED_INDEX
+// An ordered map that grows past ORDERED_INDEX_MIN_ALLOC entries gets a hash
+// index, so that lookups no longer need a linear search.  The index lives in
+// the same allocation as the table, directly after its alloc entries, and is
+// an open-addressed (linear probing) array of 1 + the position of an entry in
+// the table, with 0 meaning a free slot.  The table itself stays a dense
+// array in insertion order.  Indexed tables have alloc = 3 * 2^k, so that the
+// index has alloc * 4 / 3 slots, a power of 2, and is at most 75% full.  Each
+// slot is 1, 2 or 4 bytes depending on alloc.
+#define ORDERED_INDEX_MIN_ALLOC (16)
+#define ORDERED_INDEX_FIRST_ALLOC (24)
+
+static inline size_t ordered_index_len(size_t alloc) {
+    return alloc + alloc / 3;
+}
+
+static inline size_t ordered_index_width(size_t alloc) {
+    return alloc < 0xff ? 1 : alloc < 0xffff ? 2 : 4;
+}
+
+static size_t ordered_table_bytes(size_t alloc, bool has_index) {
+    size_t n = alloc * sizeof(mp_map_elem_t);
+    if (has_index) {
+        n += ordered_index_len(alloc) * ordered_index_width(alloc);
+    }
+    return n;
+}
+
+static inline size_t ordered_index_get(const byte *idx, size_t width, size_t i) {
+    if (width == 1) {
+        return idx[i];
+    } else if (width == 2) {
+        return ((const uint16_t *)idx)[i];
+    } else {
+        return ((const uint32_t *)idx)[i];
+    }
+}
+
+static inline void ordered_index_set(byte *idx, size_t width, size_t i, size_t val) {
+    if (width == 1) {
+        idx[i] = val;
+    } else if (width == 2) {
+        ((uint16_t *)idx)[i] = val;
+    } else {
+        ((uint32_t *)idx)[i] = val;
+    }
+}
+#endif
+
+static void map_free_table(mp_map_t *map) {
+    #if MICROPY_OPT_MAP_ORDERED_INDEX
+    if (map->has_index) {
+        m_del(byte, map->table, ordered_table_bytes(map->alloc, true));
+        map->has_index = 0;
+        return;
+    }
+    #endif
+    m_del(mp_map_elem_t, map->table, map->alloc);
+}
+
 void mp_map_init(mp_map_t *map, size_t n) {
     if (n == 0) {
         map->alloc = 0;
@@ -102,6 +166,9 @@ void mp_map_init(mp_map_t *map, size_t n) {
     map->all_keys_are_qstrs = 1;
     map->is_fixed = 0;
     map->is_ordered = 0;
+    #if MICROPY_OPT_MAP_ORDERED_INDEX
+    map->has_index = 0;
+    #endif
 }
 
 void mp_map_init_fixed_table(mp_map_t *map, size_t n, const mp_obj_t *table) {
@@ -110,20 +177,23 @@ void mp_map_init_fixed_table(mp_map_t *map, size_t n, const mp_obj_t *table) {
     map->all_keys_are_qstrs = 1;
     map->is_fixed = 1;
     map->is_ordered = 1;
+    #if MICROPY_OPT_MAP_ORDERED_INDEX
+    map->has_index = 0;
+    #endif
     map->table = (mp_map_elem_t *)table;
 }
 
 // Differentiate from mp_map_clear() - semantics is different
 void mp_map_deinit(mp_map_t *map) {
     if (!map->is_fixed) {
-        m_del(mp_map_elem_t, map->table, map->alloc);
+        map_free_table(map);
     }
     map->used = map->alloc = 0;
 }
 
 void mp_map_clear(mp_map_t *map) {
     if (!map->is_fixed) {
-        m_del(mp_map_elem_t, map->table, map->alloc);
+        map_free_table(map);
     }
     map->alloc = 0;
     map->used = 0;
@@ -152,6 +222,128 @@ static void mp_map_rehash(mp_map_t *map) {
     m_del(mp_map_elem_t, old_table, old_alloc);
 }
 
+static inline mp_uint_t map_hash(mp_obj_t index) {
+    // fast path for common case of qstr
+    if (mp_obj_is_qstr(index)) {
+        return qstr_hash(MP_OBJ_QSTR_VALUE(index));
+    } else {
+        return MP_OBJ_SMALL_INT_VALUE(mp_unary_op(MP_UNARY_OP_HASH, index));
+    }
+}
+
+#if MICROPY_PY_COLLECTIONS_ORDEREDDICT
+
+#if MICROPY_OPT_MAP_ORDERED_INDEX
+// Reallocate the table of an ordered map to hold at least min_alloc entries
+// plus an index, and build the index.
+static void mp_map_ordered_alloc_index(mp_map_t *map, size_t min_alloc) {
+    size_t new_alloc = ORDERED_INDEX_FIRST_ALLOC;
+    while (new_alloc < min_alloc) {
+        new_alloc *= 2;
+    }
+    map->table = (mp_map_elem_t *)m_renew(byte, map->table,
+        ordered_table_bytes(map->alloc, map->has_index), ordered_table_bytes(new_alloc, true));
+    mp_seq_clear(map->table, map->used, new_alloc, sizeof(*map->table));
+    map->alloc = new_alloc;
+    map->has_index = 1;
+    mp_map_reindex(map);
+}
+
+void mp_map_reindex(mp_map_t *map) {
+    if (!map->has_index) {
+        if (map->is_ordered && !map->is_fixed && map->alloc >= ORDERED_INDEX_MIN_ALLOC) {
+            mp_map_ordered_alloc_index(map, map->alloc);
+        }
+        return;
+    }
+    byte *idx = (byte *)&map->table[map->alloc];
+    size_t width = ordered_index_width(map->alloc);
+    size_t mask = ordered_index_len(map->alloc) - 1;
+    memset(idx, 0, (mask + 1) * width);
+    for (size_t i = 0; i < map->used; i++) {
+        size_t pos = map_hash(map->table[i].key) & mask;
+        while (ordered_index_get(idx, width, pos) != 0) {
+            pos = (pos + 1) & mask;
+        }
+        ordered_index_set(idx, width, pos, i + 1);
+    }
+}
+#endif
+
+static void mp_map_ordered_grow(mp_map_t *map) {
+    #if MICROPY_OPT_MAP_ORDERED_INDEX
+    if (map->alloc + 4 >= ORDERED_INDEX_MIN_ALLOC) {
+        mp_map_ordered_alloc_index(map, map->alloc + 1);
+        return;
+    }
+    #endif
+    // TODO: Alloc policy
+    map->alloc += 4;
+    map->table = m_renew(mp_map_elem_t, map->table, map->used, map->alloc);
+    mp_seq_clear(map->table, map->used, map->alloc, sizeof(*map->table));
+}
+
+static mp_map_elem_t *mp_map_ordered_remove(mp_map_t *map, mp_map_elem_t *elem) {
+    // remove the found element by moving the rest of the array down
+    mp_obj_t value = elem->value;
+    --map->used;
+    memmove(elem, elem + 1, (&map->table[map->used] - elem) * sizeof(*elem));
+    // put the found element after the end so the caller can access it if needed
+    // note: caller must NULL the value so the GC can clean up (e.g. see dict_get_helper).
+    elem = &map->table[map->used];
+    elem->key = MP_OBJ_NULL;
+    elem->value = value;
+    #if MICROPY_OPT_MAP_ORDERED_INDEX
+    mp_map_reindex(map);
+    #endif
+    return elem;
+}
+
+static mp_map_elem_t *mp_map_ordered_append(mp_map_t *map, mp_obj_t index) {
+    mp_map_elem_t *elem = map->table + map->used++;
+    elem->key = index;
+    elem->value = MP_OBJ_NULL;
+    if (!mp_obj_is_qstr(index)) {
+        map->all_keys_are_qstrs = 0;
+    }
+    return elem;
+}
+
+#if MICROPY_OPT_MAP_ORDERED_INDEX
+static mp_map_elem_t *mp_map_ordered_index_lookup(mp_map_t *map, mp_obj_t index, mp_map_lookup_kind_t lookup_kind, bool compare_only_ptrs) {
+    mp_uint_t hash = map_hash(index);
+    for (;;) {
+        byte *idx = (byte *)&map->table[map->alloc];
+        size_t width = ordered_index_width(map->alloc);
+        size_t mask = ordered_index_len(map->alloc) - 1;
+        size_t pos = hash & mask;
+        size_t i;
+        while ((i = ordered_index_get(idx, width, pos)) != 0) {
+            mp_map_elem_t *elem = &map->table[i - 1];
+            if (elem->key == index || (!compare_only_ptrs && mp_obj_equal(elem->key, index))) {
+                if (MP_UNLIKELY(lookup_kind == MP_MAP_LOOKUP_REMOVE_IF_FOUND)) {
+                    return mp_map_ordered_remove(map, elem);
+                }
+                MAP_CACHE_SET(index, i - 1);
+                return elem;
+            }
+            pos = (pos + 1) & mask;
+        }
+        if (MP_LIKELY(lookup_kind != MP_MAP_LOOKUP_ADD_IF_NOT_FOUND)) {
+            return NULL;
+        }
+        if (map->used < map->alloc) {
+            ordered_index_set(idx, width, pos, map->used + 1);
+            return mp_map_ordered_append(map, index);
+        }
+        // table is full, grow it and search the new index for a free slot
+        mp_map_ordered_grow(map);
+    }
+}
+#endif
+
+#endif // MICROPY_PY_COLLECTIONS_ORDEREDDICT
+
 // MP_MAP_LOOKUP behaviour:
 //  - returns NULL if not found, else the slot it was found in with key,value non-null
 // MP_MAP_LOOKUP_ADD_IF_NOT_FOUND behaviour:
@@ -195,19 +387,17 @@ mp_map_elem_t *MICROPY_WRAP_MP_MAP_LOOKUP(mp_map_lookup)(mp_map_t * map, mp_obj_
 
     // if the map is an ordered array then we must do a brute force linear search
     if (map->is_ordered) {
+        #if MICROPY_OPT_MAP_ORDERED_INDEX
+        if (map->has_index) {
+            // unless it is big enough to have a hash index
+            return mp_map_ordered_index_lookup(map, index, lookup_kind, compare_only_ptrs);
+        }
+        #endif
         for (mp_map_elem_t *elem = &map->table[0], *top = &map->table[map->used]; elem < top; elem++) {
             if (elem->key == index || (!compare_only_ptrs && mp_obj_equal(elem->key, index))) {
                 #if MICROPY_PY_COLLECTIONS_ORDEREDDICT
                 if (MP_UNLIKELY(lookup_kind == MP_MAP_LOOKUP_REMOVE_IF_FOUND)) {
-                    // remove the found element by moving the rest of the array down
-                    mp_obj_t value = elem->value;
-                    --map->used;
-                    memmove(elem, elem + 1, (top - elem - 1) * sizeof(*elem));
-                    // put the found element after the end so the caller can access it if needed
-                    // note: caller must NULL the value so the GC can clean up (e.g. see dict_get_helper).
-                    elem = &map->table[map->used];
-                    elem->key = MP_OBJ_NULL;
-                    elem->value = value;
+                    return mp_map_ordered_remove(map, elem);
                 }
                 #endif
                 MAP_CACHE_SET(index, elem - map->table);
@@ -219,18 +409,14 @@ mp_map_elem_t *MICROPY_WRAP_MP_MAP_LOOKUP(mp_map_lookup)(mp_map_t * map, mp_obj_
             return NULL;
         }
         if (map->used == map->alloc) {
-            // TODO: Alloc policy
-            map->alloc += 4;
-            map->table = m_renew(mp_map_elem_t, map->table, map->used, map->alloc);
-            mp_seq_clear(map->table, map->used, map->alloc, sizeof(*map->table));
-        }
-        mp_map_elem_t *elem = map->table + map->used++;
-        elem->key = index;
-        elem->value = MP_OBJ_NULL;
-        if (!mp_obj_is_qstr(index)) {
-            map->all_keys_are_qstrs = 0;
+            mp_map_ordered_grow(map);
+            #if MICROPY_OPT_MAP_ORDERED_INDEX
+            if (map->has_index) {
+                return mp_map_ordered_index_lookup(map, index, lookup_kind, compare_only_ptrs);
+            }
+            #endif
         }
-        return elem;
+        return mp_map_ordered_append(map, index);
         #else
         return NULL;
         #endif
@@ -246,13 +432,7 @@ mp_map_elem_t *MICROPY_WRAP_MP_MAP_LOOKUP(mp_map_lookup)(mp_map_t * map, mp_obj_
         }
     }
 
-    // get hash of index, with fast path for common case of qstr
-    mp_uint_t hash;
-    if (mp_obj_is_qstr(index)) {
-        hash = qstr_hash(MP_OBJ_QSTR_VALUE(index));
-    } else {
-        hash = MP_OBJ_SMALL_INT_VALUE(mp_unary_op(MP_UNARY_OP_HASH, index));
-    }
+    mp_uint_t hash = map_hash(index);
 
     size_t pos = hash % map->alloc;
     size_t start_pos = pos;
@@ -326,6 +506,27 @@ mp_map_elem_t *MICROPY_WRAP_MP_MAP_LOOKUP(mp_map_lookup)(mp_map_t * map, mp_obj_
     }
 }
 
+#if MICROPY_OPT_INLINE_CACHE
+// Lookup-only variant of mp_map_lookup that first tries the position stored in
+// *cache, and on a miss records where the index was found.  Unlike the shared
+// map lookup cache, the caller owns the cache entry (see MP_BC_LOAD_ATTR in the
+// VM), so different call sites looking up the same name in different maps do
+// not evict each other.
+mp_map_elem_t *mp_map_lookup_cached(mp_map_t *map, mp_obj_t index, uint8_t *cache) {
+    if (map->alloc) {
+        mp_map_elem_t *slot = &map->table[*cache % map->alloc];
+        if (slot->key == index) {
+            return slot;
+        }
+    }
+    mp_map_elem_t *elem = mp_map_lookup(map, index, MP_MAP_LOOKUP);
+    if (elem != NULL) {
+        *cache = (elem - map->table) & 0xff;
+    }
+    return elem;
+}
+#endif
+
 /******************************************************************************/
 /* set                                                                        */
 
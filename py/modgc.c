@@ -33,6 +33,10 @@
 // collect(): run a garbage collection
 static mp_obj_t py_gc_collect(void) {
     gc_collect();
+    #if MICROPY_GC_INCREMENTAL_SWEEP
+    // An explicit collection frees everything it can straight away.
+    gc_sweep_finish();
+    #endif
     #if MICROPY_PY_GC_COLLECT_RETVAL
     return MP_OBJ_NEW_SMALL_INT(MP_STATE_MEM(gc_collected));
     #else
@@ -81,6 +85,22 @@ static mp_obj_t gc_mem_alloc(void) {
 }
 MP_DEFINE_CONST_FUN_OBJ_0(gc_mem_alloc_obj, gc_mem_alloc);
 
+#if MICROPY_GC_COMPACT
+// compact(): collect and then compact the heap, returning the size of the
+// largest free block before and after compacting
+static mp_obj_t py_gc_compact(void) {
+    size_t free_before;
+    size_t free_after;
+    gc_compact(&free_before, &free_after);
+    mp_obj_t items[2] = {
+        MP_OBJ_NEW_SMALL_INT(free_before),
+        MP_OBJ_NEW_SMALL_INT(free_after),
+    };
+    return mp_obj_new_tuple(2, items);
+}
+MP_DEFINE_CONST_FUN_OBJ_0(gc_compact_obj, py_gc_compact);
+#endif
+
 #if MICROPY_GC_ALLOC_THRESHOLD
 static mp_obj_t gc_threshold(size_t n_args, const mp_obj_t *args) {
     if (n_args == 0) {
@@ -108,6 +128,9 @@ static const mp_rom_map_elem_t mp_module_gc_globals_table[] = {
     { MP_ROM_QSTR(MP_QSTR_isenabled), MP_ROM_PTR(&gc_isenabled_obj) },
     { MP_ROM_QSTR(MP_QSTR_mem_free), MP_ROM_PTR(&gc_mem_free_obj) },
     { MP_ROM_QSTR(MP_QSTR_mem_alloc), MP_ROM_PTR(&gc_mem_alloc_obj) },
+    #if MICROPY_GC_COMPACT
+    { MP_ROM_QSTR(MP_QSTR_compact), MP_ROM_PTR(&gc_compact_obj) },
+    #endif
     #if MICROPY_GC_ALLOC_THRESHOLD
     { MP_ROM_QSTR(MP_QSTR_threshold), MP_ROM_PTR(&gc_threshold_obj) },
     #endif
@@ -31,6 +31,7 @@
 #include "py/runtime.h"
 #include "py/gc.h"
 #include "py/mphal.h"
+#include "py/persistentcode.h"
 
 #if MICROPY_PY_MICROPYTHON
 
@@ -129,6 +130,10 @@ static MP_DEFINE_CONST_FUN_OBJ_0(mp_micropython_pystack_use_obj, mp_micropython_
 // CIRCUITPY-CHANGE: avoid warning
 #if CIRCUITPY_MICROPYTHON_ADVANCED && MICROPY_ENABLE_GC
 static mp_obj_t mp_micropython_heap_lock(void) {
+    #if MICROPY_PERSISTENT_CODE_LOAD_LAZY
+    // Bytecode can't be read in while the heap is locked, so read it all in now.
+    mp_raw_code_load_lazy_all();
+    #endif
     gc_lock();
     return mp_const_none;
 }
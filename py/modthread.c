@@ -27,6 +27,7 @@
 #include <stdio.h>
 #include <string.h>
 
+#include "py/mphal.h"
 #include "py/runtime.h"
 
 #if MICROPY_PY_THREAD
@@ -212,6 +213,12 @@ static void *thread_entry(void *args_in) {
     // signal that we are finished
     mp_thread_finish();
 
+    #if MICROPY_GC_COMPACT && !MICROPY_PY_THREAD_GIL
+    mp_uint_t atomic_state = MICROPY_BEGIN_ATOMIC_SECTION();
+    MP_STATE_MEM(gc_compact_threads) -= 1;
+    MICROPY_END_ATOMIC_SECTION(atomic_state);
+    #endif
+
     MP_THREAD_GIL_EXIT();
 
     return NULL;
@@ -265,8 +272,27 @@ static mp_obj_t mod_thread_start_new_thread(size_t n_args, const mp_obj_t *args)
     // set the function for thread entry
     th_args->fun = args[0];
 
+    #if MICROPY_GC_COMPACT && !MICROPY_PY_THREAD_GIL
+    // Count the thread before it starts, so that the heap isn't compacted
+    // from then on.
+    mp_uint_t atomic_state = MICROPY_BEGIN_ATOMIC_SECTION();
+    MP_STATE_MEM(gc_compact_threads) += 1;
+    MICROPY_END_ATOMIC_SECTION(atomic_state);
+    nlr_buf_t nlr;
+    if (nlr_push(&nlr) == 0) {
+        mp_uint_t id = mp_thread_create(thread_entry, th_args, &th_args->stack_size);
+        nlr_pop();
+        return mp_obj_new_int_from_uint(id);
+    } else {
+        atomic_state = MICROPY_BEGIN_ATOMIC_SECTION();
+        MP_STATE_MEM(gc_compact_threads) -= 1;
+        MICROPY_END_ATOMIC_SECTION(atomic_state);
+        nlr_jump(nlr.ret_val);
+    }
+    #else
     // spawn the thread!
     return mp_obj_new_int_from_uint(mp_thread_create(thread_entry, th_args, &th_args->stack_size));
+    #endif
 }
 static MP_DEFINE_CONST_FUN_OBJ_VAR_BETWEEN(mod_thread_start_new_thread_obj, 2, 3, mod_thread_start_new_thread);
 
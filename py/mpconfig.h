@@ -342,11 +342,37 @@
 #define MICROPY_PERSISTENT_CODE_LOAD (0)
 #endif
 
+// Whether to load persistent code in place when the file it comes from can be
+// memory-mapped, ie its VFS file object exposes a read buffer (eg a file on
+// ROMFS).  Bytecode, qstr data and str/bytes constants are then referenced
+// directly from the buffer and only mutable state is allocated in RAM.  The
+// buffer must stay valid and unchanged at least until a soft reset.
+#ifndef MICROPY_PERSISTENT_CODE_LOAD_MEMMAP
+#define MICROPY_PERSISTENT_CODE_LOAD_MEMMAP (MICROPY_VFS_ROM)
+#endif
+
+// Whether to defer reading the bytecode of functions in an .mpy file until
+// each function is first used, so that functions which are never called take
+// no RAM for their bytecode.  Only functions with at least
+// MICROPY_PERSISTENT_CODE_LOAD_LAZY_THRESHOLD bytes of bytecode are deferred.
+// The file is opened again by its absolute path to read the bytecode, so it
+// must not be changed or moved while the module is in use.  Reading in the
+// bytecode allocates, so a function first called with the heap locked raises
+// MemoryError.  micropython.heap_lock() reads in all pending bytecode first, so
+// code run under it is not affected.
+#ifndef MICROPY_PERSISTENT_CODE_LOAD_LAZY
+#define MICROPY_PERSISTENT_CODE_LOAD_LAZY (0)
+#endif
+
+#ifndef MICROPY_PERSISTENT_CODE_LOAD_LAZY_THRESHOLD
+#define MICROPY_PERSISTENT_CODE_LOAD_LAZY_THRESHOLD (64)
+#endif
+
 // Whether to support saving of persistent code, i.e. for mpy-cross to
 // generate .mpy files. Enabling this enables additional metadata on raw code
 // objects which is also required for sys.settrace.
 #ifndef MICROPY_PERSISTENT_CODE_SAVE
-#define MICROPY_PERSISTENT_CODE_SAVE (MICROPY_PY_SYS_SETTRACE)
+#define MICROPY_PERSISTENT_CODE_SAVE (MICROPY_PY_SYS_SETTRACE || MICROPY_VFS_MPY_CACHE)
 #endif
 
 // Whether to support saving persistent code to a file via mp_raw_code_save_file
@@ -476,6 +502,13 @@
 #define MICROPY_COMP_CONST_FOLDING (MICROPY_CONFIG_ROM_LEVEL_AT_LEAST_CORE_FEATURES)
 #endif
 
+// Whether to also fold float arithmetic, operations on constant str/bytes/tuple
+// values, comparisons of constants and len() of constants, and to drop the
+// untaken side of constant conditional expressions and assertions
+#ifndef MICROPY_COMP_CONST_FOLDING_EXTENDED
+#define MICROPY_COMP_CONST_FOLDING_EXTENDED (MICROPY_CONFIG_ROM_LEVEL_AT_LEAST_EXTRA_FEATURES)
+#endif
+
 // Whether to compile constant tuples immediately to their respective objects; eg (1, True)
 // Otherwise the tuple will be built at runtime
 #ifndef MICROPY_COMP_CONST_TUPLE
@@ -515,6 +548,14 @@
 #define MICROPY_COMP_RETURN_IF_EXPR (MICROPY_CONFIG_ROM_LEVEL_AT_LEAST_EXTRA_FEATURES)
 #endif
 
+// Whether to parse and compile files one top-level statement at a time, so that
+// only the parse tree of the current statement is held in memory rather than
+// that of the whole file.  Each statement runs as soon as it's compiled, so
+// unlike CPython the statements before a syntax error in a file are executed.
+#ifndef MICROPY_PARSE_STREAMING
+#define MICROPY_PARSE_STREAMING (0)
+#endif
+
 /*****************************************************************************/
 /* Internal debugging stuff                                                  */
 
@@ -601,12 +642,96 @@
 #define MICROPY_OPT_MAP_LOOKUP_CACHE_SIZE (128)
 #endif
 
+// Give ordered maps (eg OrderedDict) a hash index once they grow past a few
+// entries, so lookups in them are no longer a linear search.  The index is
+// stored after the entries in the same allocation and costs 1-4 bytes per
+// entry.  Requires MICROPY_PY_COLLECTIONS_ORDEREDDICT.
+#ifndef MICROPY_OPT_MAP_ORDERED_INDEX
+#define MICROPY_OPT_MAP_ORDERED_INDEX (0)
+#endif
+
+// Use extra RAM for inline caches on the LOAD_GLOBAL, LOAD_ATTR and LOAD_METHOD
+// opcodes.  Each call site (identified by its address in the bytecode) gets its
+// own entry remembering where in the globals, instance members or class locals
+// map the name was last found, so polymorphic code using the same names on
+// different classes does not thrash the shared map lookup cache.
+#ifndef MICROPY_OPT_INLINE_CACHE
+#define MICROPY_OPT_INLINE_CACHE (0)
+#endif
+
+// How much RAM (in bytes) to use for the inline caches.
+#ifndef MICROPY_OPT_INLINE_CACHE_SIZE
+#define MICROPY_OPT_INLINE_CACHE_SIZE (256)
+#endif
+
+// Whether the bytecode emitter fuses common pairs of opcodes into single
+// superinstructions, and the VM executes them.  Fused pairs are a load of
+// local 0 (usually self) followed by LOAD_ATTR, LOAD_METHOD or STORE_ATTR,
+// and a load of a small non-negative int followed by a binary op.  .mpy files
+// using them are marked so that firmware without this option rejects them.
+#ifndef MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS
+#define MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS (0)
+#endif
+
+// Whether the VM does binary ops on floats (and small ints) directly, and
+// stores a float result in an operand that is a temporary, instead of in a
+// new float.  A temporary is the result of a float op that is still only on
+// the value stack: one that is consumed by the next opcode, or by the one
+// after a single load.  Requires floats to be heap objects.
+#ifndef MICROPY_OPT_FLOAT_TEMPORARIES
+#define MICROPY_OPT_FLOAT_TEMPORARIES (0)
+#endif
+
+// Give each qstr pool allocated at runtime a hash index, so that interning a
+// string no longer compares it against every dynamically created qstr.  The
+// index is stored after the pool's entries in the same allocation and costs
+// about 3 bytes per entry.
+#ifndef MICROPY_OPT_QSTR_INDEX
+#define MICROPY_OPT_QSTR_INDEX (0)
+#endif
+
+// Whether bytecode functions that become hot are recompiled at runtime with
+// the native emitter.  Each function counts its calls and loop iterations, and
+// once the count reaches MICROPY_OPT_TIERED_NATIVE_THRESHOLD the function is
+// compiled to machine code, which is then used for all subsequent calls.  This
+// is done from the parse tree of the function's module, which is kept in RAM
+// after the module is compiled, so only functions compiled from source are
+// recompiled.  Requires MICROPY_EMIT_NATIVE, and costs 2 words per function
+// object plus the parse trees.
+#ifndef MICROPY_OPT_TIERED_NATIVE
+#define MICROPY_OPT_TIERED_NATIVE (0)
+#endif
+
+// Number of calls plus loop iterations after which a function is recompiled.
+#ifndef MICROPY_OPT_TIERED_NATIVE_THRESHOLD
+#define MICROPY_OPT_TIERED_NATIVE_THRESHOLD (1000)
+#endif
+
+// Maximum amount of machine code (in bytes) generated by recompiling hot
+// functions; once it's reached no further functions are recompiled.
+#ifndef MICROPY_OPT_TIERED_NATIVE_BUDGET
+#define MICROPY_OPT_TIERED_NATIVE_BUDGET (32 * 1024)
+#endif
+
 // Whether to use fast versions of bitwise operations (and, or, xor) when the
 // arguments are both positive.  Increases Thumb2 code size by about 250 bytes.
 #ifndef MICROPY_OPT_MPZ_BITWISE
 #define MICROPY_OPT_MPZ_BITWISE (MICROPY_CONFIG_ROM_LEVEL_AT_LEAST_EXTRA_FEATURES)
 #endif
 
+// Whether to use Karatsuba multiplication for large integers, and Montgomery
+// reduction with a sliding window for pow(a, b, m) with an odd modulus.
+// Increases Thumb2 code size by about 1kiB.
+#ifndef MICROPY_OPT_MPZ_KARATSUBA
+#define MICROPY_OPT_MPZ_KARATSUBA (MICROPY_CONFIG_ROM_LEVEL_AT_LEAST_EXTRA_FEATURES)
+#endif
+
+// Number of digits both operands must have for Karatsuba multiplication to
+// be used instead of schoolbook multiplication.
+#ifndef MICROPY_OPT_MPZ_KARATSUBA_THRESHOLD
+#define MICROPY_OPT_MPZ_KARATSUBA_THRESHOLD (32)
+#endif
+
 
 // Whether math.factorial is large, fast and recursive (1) or small and slow (0).
 #ifndef MICROPY_OPT_MATH_FACTORIAL
@@ -687,6 +812,75 @@
 #define MICROPY_GC_SPLIT_HEAP_AUTO (0)
 #endif
 
+// Whether gc_alloc keeps, per heap area, an index of where free runs of
+// blocks of each size class start, so that allocations don't need to scan
+// from the start of the heap past runs that are too small.  The index is
+// rebuilt on each sweep and kept conservative between collections.
+#ifndef MICROPY_GC_FREE_RUN_INDEX
+#define MICROPY_GC_FREE_RUN_INDEX (0)
+#endif
+
+// Number of size classes tracked by the free-run index.  Class k holds runs
+// of at least 2**k blocks, so the default covers runs of 1 to 32+ blocks.
+#ifndef MICROPY_GC_FREE_RUN_CLASSES
+#define MICROPY_GC_FREE_RUN_CLASSES (6)
+#endif
+
+// Whether the sweep phase of a collection is deferred and done incrementally:
+// lazily by gc_alloc as it scans for free blocks, and in slices of
+// MICROPY_GC_SWEEP_STEP_BLOCKS blocks by gc_sweep_step(), which a port can
+// call from its background tasks.  This removes the sweep from the pause of
+// automatic collections.  The mark phase is still done in one go.
+#ifndef MICROPY_GC_INCREMENTAL_SWEEP
+#define MICROPY_GC_INCREMENTAL_SWEEP (0)
+#endif
+
+// Number of blocks swept by each call to gc_sweep_step().
+#ifndef MICROPY_GC_SWEEP_STEP_BLOCKS
+#define MICROPY_GC_SWEEP_STEP_BLOCKS (256)
+#endif
+
+// Whether the sweep keeps dead floats allocated on a freelist, from which
+// mp_obj_new_float takes them before falling back to gc_alloc.  The freelist
+// is emptied by each collection, and given back to the heap when gc_alloc
+// can't otherwise find enough free blocks.  Only useful if floats are heap
+// objects, ie with MICROPY_OBJ_REPR_A or MICROPY_OBJ_REPR_B.
+#ifndef MICROPY_GC_FLOAT_FREELIST
+#define MICROPY_GC_FLOAT_FREELIST (0)
+#endif
+
+// Whether the mark phase, when the GC stack fills up, carries on with its stack
+// in the longest run of free blocks in the heap, which nothing uses during a
+// collection.  Otherwise (and once that run is full too) blocks are marked
+// without their children, which are found later by rescanning those blocks.
+#ifndef MICROPY_GC_STACK_IN_FREE_BLOCKS
+#define MICROPY_GC_STACK_IN_FREE_BLOCKS (0)
+#endif
+
+// Whether to support compacting the heap, with gc.compact() and when a large
+// allocation fails even after a collection.  Compacting moves the buffers of
+// lists, bytearrays, str and bytes objects to close up the free space between
+// them, unless anything but their owner refers to them.  C code that keeps a
+// pointer to such a buffer must keep it in a root or in a heap object (as it
+// has to for any heap pointer), so that the buffer is pinned.  With threads
+// but no GIL, the heap is only compacted while no other threads are running.
+#ifndef MICROPY_GC_COMPACT
+#define MICROPY_GC_COMPACT (0)
+#endif
+
+// Allocations of at least this many bytes that fail after a collection
+// compact the heap and try again, with MICROPY_GC_COMPACT.  Set to 0 to only
+// compact with gc.compact().
+#ifndef MICROPY_GC_COMPACT_AUTO_MIN_BYTES
+#define MICROPY_GC_COMPACT_AUTO_MIN_BYTES (256)
+#endif
+
+// Whether to record the duration of the last and longest GC pause, as
+// reported by gc_info() and micropython.mem_info().  Requires mp_hal_ticks_us().
+#ifndef MICROPY_GC_PAUSE_STATS
+#define MICROPY_GC_PAUSE_STATS (0)
+#endif
+
 // Hook to run code during time consuming garbage collector operations
 // *i* is the loop index variable (e.g. can be used to run every x loops)
 #ifndef MICROPY_GC_HOOK_LOOP
@@ -1055,6 +1249,29 @@ typedef double mp_float_t;
 #define MICROPY_VFS_WRITABLE (1)
 #endif
 
+// Whether mp_vfs_import_stat caches the directory listings it uses, so that
+// repeated imports don't need to access the filesystem.  The cache is cleared
+// whenever the filesystem is changed through the VFS functions, the methods of a
+// VfsPosix object or a write to a block device (so also the methods of a VfsFat or
+// VfsLfs object).  Changes made by anything else, such as another process, or
+// the methods of a VFS object written in Python that has no block device, are
+// not seen by import until then.
+#ifndef MICROPY_VFS_IMPORT_CACHE
+#define MICROPY_VFS_IMPORT_CACHE (0)
+#endif
+
+// Whether to keep .mpy files compiled from imported .py files in the directory
+// MICROPY_VFS_MPY_CACHE_DIR, if it exists, and load them on later imports instead
+// of compiling again.  Entries are checked against the size, mtime and contents
+// of the source file.
+#ifndef MICROPY_VFS_MPY_CACHE
+#define MICROPY_VFS_MPY_CACHE (0)
+#endif
+
+#ifndef MICROPY_VFS_MPY_CACHE_DIR
+#define MICROPY_VFS_MPY_CACHE_DIR "/.mpy_cache"
+#endif
+
 // Whether to enable the mp_vfs_rom_ioctl C function, and vfs.rom_ioctl Python function
 #ifndef MICROPY_VFS_ROM_IOCTL
 #define MICROPY_VFS_ROM_IOCTL (MICROPY_VFS_ROM)
@@ -1119,6 +1336,14 @@ typedef double mp_float_t;
 #define MICROPY_PY_DELATTR_SETATTR (MICROPY_CONFIG_ROM_LEVEL_AT_LEAST_EXTRA_FEATURES)
 #endif
 
+// Whether classes declaring __slots__ get a fixed instance layout: the slot
+// values are stored inline in each instance and located through per-class
+// member descriptors, instead of in a per-instance members map.  Instances
+// still fall back to the members map for attributes that aren't slots.
+#ifndef MICROPY_PY_CLASS_SLOTS
+#define MICROPY_PY_CLASS_SLOTS (0)
+#endif
+
 // Support for async/await/async for/async with
 #ifndef MICROPY_PY_ASYNC_AWAIT
 #define MICROPY_PY_ASYNC_AWAIT (MICROPY_CONFIG_ROM_LEVEL_AT_LEAST_CORE_FEATURES)
@@ -1163,6 +1388,21 @@ typedef double mp_float_t;
 #define MICROPY_PY_BUILTINS_STR_UNICODE_CHECK (MICROPY_PY_BUILTINS_STR_UNICODE)
 #endif
 
+// Whether a slice of a str or bytes object refers to the data of the object it
+// was taken from, instead of to a copy of that data, when the slice is at least
+// MICROPY_PY_BUILTINS_STR_SLICE_VIEW_MIN_LEN bytes long and is followed by a null
+// byte, as a slice that runs to the end of the data is (eg data[i:]).  The whole
+// of the original data is then kept alive for as long as the slice is.  Since
+// only such slices refer to the data, all str and bytes data stays null terminated.
+#ifndef MICROPY_PY_BUILTINS_STR_SLICE_VIEW
+#define MICROPY_PY_BUILTINS_STR_SLICE_VIEW (0)
+#endif
+
+// Shortest slice that refers to the data of the object it was taken from.
+#ifndef MICROPY_PY_BUILTINS_STR_SLICE_VIEW_MIN_LEN
+#define MICROPY_PY_BUILTINS_STR_SLICE_VIEW_MIN_LEN (64)
+#endif
+
 // Whether str.center() method provided
 #ifndef MICROPY_PY_BUILTINS_STR_CENTER
 #define MICROPY_PY_BUILTINS_STR_CENTER (MICROPY_CONFIG_ROM_LEVEL_AT_LEAST_EXTRA_FEATURES)
@@ -1671,6 +1911,19 @@ typedef double mp_float_t;
 #define MICROPY_PY_SELECT_SELECT (1)
 #endif
 
+// Whether select.poll registers objects that have a file descriptor with epoll
+// (Linux), so that a poll takes time in proportion to the number of ready objects
+// (requires MICROPY_PY_SELECT_POSIX_OPTIMISATIONS)
+#ifndef MICROPY_PY_SELECT_EPOLL
+#define MICROPY_PY_SELECT_EPOLL (0)
+#endif
+
+// Whether select.poll asks streams to notify it of readiness changes with
+// ioctl(MP_STREAM_POLL_NOTIFY), instead of polling them on each call
+#ifndef MICROPY_PY_SELECT_NOTIFY
+#define MICROPY_PY_SELECT_NOTIFY (0)
+#endif
+
 // Whether to provide the "time" module
 #ifndef MICROPY_PY_TIME
 #define MICROPY_PY_TIME (MICROPY_CONFIG_ROM_LEVEL_AT_LEAST_BASIC_FEATURES)
@@ -1728,6 +1981,13 @@ typedef double mp_float_t;
 #define MICROPY_PY_ASYNCIO_TASK_QUEUE_PUSH_CALLBACK (0)
 #endif
 
+// Whether _asyncio provides native versions of the event loop (run_until_complete),
+// sleep_ms and IOQueue, for asyncio/core.py to use instead of its Python versions.
+// Off by default because the asyncio library does not use them yet; needs select.
+#ifndef MICROPY_PY_ASYNCIO_NATIVE_LOOP
+#define MICROPY_PY_ASYNCIO_NATIVE_LOOP (0)
+#endif
+
 #ifndef MICROPY_PY_UCTYPES
 #define MICROPY_PY_UCTYPES (MICROPY_CONFIG_ROM_LEVEL_AT_LEAST_EXTRA_FEATURES)
 #endif
@@ -1763,6 +2023,18 @@ typedef double mp_float_t;
 #define MICROPY_PY_JSON_SEPARATORS (1)
 #endif
 
+// Whether json.dump and json.dumps serialize the built-in types directly into a
+// buffer that is written out in blocks, instead of through the print methods
+#ifndef MICROPY_PY_JSON_FAST_DUMP
+#define MICROPY_PY_JSON_FAST_DUMP (0)
+#endif
+
+// Whether to provide json.iterload, which parses a stream as it is iterated
+// over and only creates the values at a given path
+#ifndef MICROPY_PY_JSON_ITERLOAD
+#define MICROPY_PY_JSON_ITERLOAD (0)
+#endif
+
 #ifndef MICROPY_PY_OS
 #define MICROPY_PY_OS (MICROPY_CONFIG_ROM_LEVEL_AT_LEAST_EXTRA_FEATURES)
 #endif
@@ -1791,6 +2063,18 @@ typedef double mp_float_t;
 #define MICROPY_PY_RE_SUB (MICROPY_CONFIG_ROM_LEVEL_AT_LEAST_EXTRA_FEATURES)
 #endif
 
+// Number of compiled patterns to keep, so that re.compile and the module-level
+// functions don't compile a recently used pattern again (0 to disable)
+#ifndef MICROPY_PY_RE_CACHE_SIZE
+#define MICROPY_PY_RE_CACHE_SIZE (0)
+#endif
+
+// Whether to provide the re.LINEAR flag, which matches a pattern with a Pike VM
+// that takes time linear in the length of the string, instead of backtracking
+#ifndef MICROPY_PY_RE_LINEAR
+#define MICROPY_PY_RE_LINEAR (0)
+#endif
+
 #ifndef MICROPY_PY_HEAPQ
 #define MICROPY_PY_HEAPQ (MICROPY_CONFIG_ROM_LEVEL_AT_LEAST_EXTRA_FEATURES)
 #endif
@@ -74,6 +74,9 @@ typedef struct mp_dynamic_compiler_t {
     uint8_t small_int_bits; // must be <= host small_int_bits
     uint8_t native_arch;
     uint8_t nlr_buf_num_regs;
+    #if MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS
+    bool superinstructions; // whether the target supports bytecode superinstructions
+    #endif
 } mp_dynamic_compiler_t;
 extern mp_dynamic_compiler_t mp_dynamic_compiler;
 #endif
@@ -121,6 +124,25 @@ typedef struct _mp_state_mem_area_t {
 
     size_t gc_last_free_atb_index;
     size_t gc_last_used_block; // The block ID of the highest block allocated in the area
+
+    // The lowest and highest blocks that were marked during a collection without
+    // their children being put on the GC stack, because it was full.
+    size_t gc_mark_overflow_first;
+    size_t gc_mark_overflow_last;
+
+    #if MICROPY_GC_FREE_RUN_INDEX
+    // For each size class k, no free run of at least 2**k blocks starts
+    // before this ATB index.
+    size_t gc_free_run_atb_index[MICROPY_GC_FREE_RUN_CLASSES];
+    #endif
+
+    #if MICROPY_GC_INCREMENTAL_SWEEP
+    // Next block to be swept, or SIZE_MAX if the area has been fully swept.
+    // Blocks from here on still carry the marks of the last collection.
+    size_t gc_sweep_block;
+    size_t gc_sweep_last_used_block;
+    bool gc_sweep_free_tail;
+    #endif
 } mp_state_mem_area_t;
 
 // This structure hold information about the memory allocation system.
@@ -139,6 +161,16 @@ typedef struct _mp_state_mem_t {
     // Array that tracks the area for each block on gc_block_stack.
     mp_state_mem_area_t *gc_area_stack[MICROPY_ALLOC_GC_STACK_SIZE];
     #endif
+    #if MICROPY_GC_STACK_IN_FREE_BLOCKS
+    // Continuation of the GC stack in free blocks of the heap, if it has been
+    // set up during the current collection.
+    bool gc_stack_ext_tried;
+    size_t gc_stack_ext_len;
+    MICROPY_GC_STACK_ENTRY_TYPE *gc_block_stack_ext;
+    #if MICROPY_GC_SPLIT_HEAP
+    mp_state_mem_area_t **gc_area_stack_ext;
+    #endif
+    #endif
 
     // This variable controls auto garbage collection.  If set to 0 then the
     // GC won't automatically run when gc_alloc can't find enough blocks.  But
@@ -152,12 +184,47 @@ typedef struct _mp_state_mem_t {
 
     #if MICROPY_GC_SPLIT_HEAP
     mp_state_mem_area_t *gc_last_free_area;
+    // Bounds of the pools of all areas, which most pointers that aren't to the
+    // heap fall outside of.
+    byte *gc_pools_start;
+    byte *gc_pools_end;
     #endif
 
     #if MICROPY_PY_GC_COLLECT_RETVAL
     size_t gc_collected;
     #endif
 
+    #if MICROPY_GC_INCREMENTAL_SWEEP
+    bool gc_sweep_pending;
+    #endif
+
+    #if MICROPY_GC_FLOAT_FREELIST
+    void *gc_float_freelist;
+    size_t gc_float_freelist_len;
+    #endif
+
+    #if MICROPY_GC_COMPACT
+    // Bitmap of the blocks that can't be moved, while compacting the heap.
+    byte *gc_compact_pins;
+    size_t gc_compact_pins_len;
+    #if MICROPY_PY_THREAD && !MICROPY_PY_THREAD_GIL
+    // Number of threads started by _thread that haven't finished.  Without a
+    // GIL they may be running at any time, so the heap isn't compacted.
+    size_t gc_compact_threads;
+    #endif
+    // Number of compactions, and the largest free run (in blocks) before and
+    // after the last one.
+    size_t gc_compactions;
+    size_t gc_compact_max_free_before;
+    size_t gc_compact_max_free_after;
+    #endif
+
+    #if MICROPY_GC_PAUSE_STATS
+    mp_uint_t gc_pause_start_us;
+    mp_uint_t gc_last_pause_us;
+    mp_uint_t gc_max_pause_us;
+    #endif
+
     #if MICROPY_PY_THREAD && !MICROPY_PY_THREAD_GIL
     // This is a global mutex used to make the GC thread-safe.
     mp_thread_recursive_mutex_t gc_mutex;
@@ -245,6 +312,14 @@ typedef struct _mp_state_vm_t {
     #if MICROPY_EMIT_NATIVE
     uint8_t default_emit_opt; // one of MP_EMIT_OPT_xxx
     #endif
+    #if MICROPY_OPT_TIERED_NATIVE
+    size_t tiered_native_code_size; // machine code generated for hot functions
+    #if MICROPY_PY_THREAD && !MICROPY_PY_THREAD_GIL
+    mp_thread_mutex_t tiered_native_mutex; // held while a hot function is recompiled
+    #else
+    bool tiered_native_compiling; // a hot function is being recompiled
+    #endif
+    #endif
     #endif
 
     // size of the emergency exception buf, if it's dynamically allocated
@@ -282,6 +357,11 @@ typedef struct _mp_state_vm_t {
     // See mp_map_lookup.
     uint8_t map_lookup_cache[MICROPY_OPT_MAP_LOOKUP_CACHE_SIZE];
     #endif
+
+    #if MICROPY_OPT_INLINE_CACHE
+    // See MP_BC_LOAD_ATTR in the VM.
+    uint8_t inline_cache[MICROPY_OPT_INLINE_CACHE_SIZE];
+    #endif
 } mp_state_vm_t;
 
 // This structure holds state that is specific to a given thread. Everything
@@ -461,6 +461,157 @@ static size_t mpn_mul(mpz_dig_t *idig, mpz_dig_t *jdig, size_t jlen, mpz_dig_t *
     return ilen;
 }
 
+#if MICROPY_OPT_MPZ_KARATSUBA
+
+/* computes i = i + j
+   returns the carry out of the top digit of i
+   assumes jlen <= ilen; i and j need not be normalised
+*/
+static mpz_dig_t mpn_add_inpl(mpz_dig_t *idig, size_t ilen, const mpz_dig_t *jdig, size_t jlen) {
+    mpz_dbl_dig_t carry = 0;
+
+    for (ilen -= jlen; jlen > 0; --jlen, ++idig, ++jdig) {
+        carry += (mpz_dbl_dig_t)*idig + (mpz_dbl_dig_t)*jdig;
+        *idig = carry & DIG_MASK;
+        carry >>= DIG_SIZE;
+    }
+
+    for (; carry != 0 && ilen > 0; --ilen, ++idig) {
+        carry += *idig;
+        *idig = carry & DIG_MASK;
+        carry >>= DIG_SIZE;
+    }
+
+    return carry;
+}
+
+/* computes i = i - j
+   assumes jlen <= ilen; assumes i >= j; i and j need not be normalised
+*/
+static void mpn_sub_inpl(mpz_dig_t *idig, size_t ilen, const mpz_dig_t *jdig, size_t jlen) {
+    mpz_dbl_dig_signed_t borrow = 0;
+
+    for (ilen -= jlen; jlen > 0; --jlen, ++idig, ++jdig) {
+        borrow += (mpz_dbl_dig_t)*idig - (mpz_dbl_dig_t)*jdig;
+        *idig = borrow & DIG_MASK;
+        borrow >>= DIG_SIZE;
+    }
+
+    for (; borrow != 0 && ilen > 0; --ilen, ++idig) {
+        borrow += *idig;
+        *idig = borrow & DIG_MASK;
+        borrow >>= DIG_SIZE;
+    }
+}
+
+/* computes i = j * k using Karatsuba's method, falling back to mpn_mul for
+   operands smaller than MICROPY_OPT_MPZ_KARATSUBA_THRESHOLD digits
+   returns number of digits in i
+   assumes enough memory in i (jlen + klen digits); assumes i is zeroed
+   j and k need not be normalised; can have j, k point to same memory
+*/
+static size_t mpn_mul_karatsuba(mpz_dig_t *idig, const mpz_dig_t *jdig, size_t jlen, const mpz_dig_t *kdig, size_t klen) {
+    while (jlen > 0 && jdig[jlen - 1] == 0) {
+        --jlen;
+    }
+    while (klen > 0 && kdig[klen - 1] == 0) {
+        --klen;
+    }
+
+    // make j the longer of the two
+    if (jlen < klen) {
+        const mpz_dig_t *d = jdig;
+        jdig = kdig;
+        kdig = d;
+        size_t l = jlen;
+        jlen = klen;
+        klen = l;
+    }
+
+    if (klen < MICROPY_OPT_MPZ_KARATSUBA_THRESHOLD) {
+        return mpn_mul(idig, (mpz_dig_t *)jdig, jlen, (mpz_dig_t *)kdig, klen);
+    }
+
+    size_t m = (jlen + 1) / 2;
+    size_t ilen = jlen + klen;
+
+    if (klen <= m) {
+        // unbalanced operands: multiply k by successive blocks of klen digits of j
+        mpz_dig_t *t = m_new(mpz_dig_t, 2 * klen);
+        for (size_t off = 0; off < jlen; off += klen) {
+            size_t n = MIN(klen, jlen - off);
+            memset(t, 0, (n + klen) * sizeof(mpz_dig_t));
+            size_t tlen = mpn_mul_karatsuba(t, jdig + off, n, kdig, klen);
+            mpn_add_inpl(idig + off, ilen - off, t, tlen);
+        }
+        m_del(mpz_dig_t, t, 2 * klen);
+    } else {
+        // split j = j1 * B^m + j0 and k = k1 * B^m + k0, then
+        // j * k = z2 * B^2m + (z1 - z2 - z0) * B^m + z0
+        // with z0 = j0 * k0, z2 = j1 * k1 and z1 = (j0 + j1) * (k0 + k1)
+        size_t h1 = jlen - m;
+        size_t h2 = klen - m;
+        mpn_mul_karatsuba(idig, jdig, m, kdig, m);
+        mpn_mul_karatsuba(idig + 2 * m, jdig + m, h1, kdig + m, h2);
+
+        mpz_dig_t *t = m_new(mpz_dig_t, 4 * m + 4);
+        mpz_dig_t *sj = t;
+        mpz_dig_t *sk = t + m + 1;
+        mpz_dig_t *z1 = t + 2 * m + 2;
+        memcpy(sj, jdig, m * sizeof(mpz_dig_t));
+        sj[m] = 0;
+        mpn_add_inpl(sj, m + 1, jdig + m, h1);
+        memcpy(sk, kdig, m * sizeof(mpz_dig_t));
+        sk[m] = 0;
+        mpn_add_inpl(sk, m + 1, kdig + m, h2);
+        memset(z1, 0, (2 * m + 2) * sizeof(mpz_dig_t));
+        mpn_mul_karatsuba(z1, sj, m + 1, sk, m + 1);
+        mpn_sub_inpl(z1, 2 * m + 2, idig, 2 * m);
+        mpn_sub_inpl(z1, 2 * m + 2, idig + 2 * m, h1 + h2);
+        size_t z1len = 2 * m + 2;
+        while (z1len > 0 && z1[z1len - 1] == 0) {
+            --z1len;
+        }
+        mpn_add_inpl(idig + m, ilen - m, z1, z1len);
+        m_del(mpz_dig_t, t, 4 * m + 4);
+    }
+
+    while (ilen > 0 && idig[ilen - 1] == 0) {
+        --ilen;
+    }
+
+    return ilen;
+}
+
+/* computes the Montgomery reduction t / B^n mod N, where n = nlen
+   the result is stored in the n digits starting at t + n
+   assumes t has 2n + 1 digits and t < N * B^n; assumes ninv = -1 / N mod B
+*/
+static void mpn_redc(mpz_dig_t *tdig, const mpz_dig_t *ndig, size_t nlen, mpz_dig_t ninv) {
+    for (size_t i = 0; i < nlen; ++i, ++tdig) {
+        // add a multiple of N that makes the lowest digit zero
+        mpz_dig_t u = ((mpz_dbl_dig_t)*tdig * ninv) & DIG_MASK;
+        mpz_dbl_dig_t carry = 0;
+        for (size_t j = 0; j < nlen; ++j) {
+            carry += (mpz_dbl_dig_t)tdig[j] + (mpz_dbl_dig_t)u * (mpz_dbl_dig_t)ndig[j];
+            tdig[j] = carry & DIG_MASK;
+            carry >>= DIG_SIZE;
+        }
+        for (mpz_dig_t *d = tdig + nlen; carry != 0; ++d) {
+            carry += *d;
+            *d = carry & DIG_MASK;
+            carry >>= DIG_SIZE;
+        }
+    }
+
+    // the result is now less than 2N, so at most one subtraction is needed
+    if (tdig[nlen] != 0 || mpn_cmp(tdig, nlen, ndig, nlen) >= 0) {
+        mpn_sub_inpl(tdig, nlen + 1, ndig, nlen);
+    }
+}
+
+#endif
+
 /* natural_div - quo * den + new_num = old_num (ie num is replaced with rem)
    assumes den != 0
    assumes num_dig has enough memory to be extended by 1 digit
@@ -833,6 +984,9 @@ size_t mpz_set_from_str(mpz_t *z, const char *str, size_t len, bool neg, unsigne
     }
 
     z->len = 0;
+    // accumulate as many characters as fit in a digit before multiplying them in
+    mpz_dig_t chunk = 0;
+    mpz_dig_t chunk_mul = 1;
     for (; cur < top; ++cur) { // XXX UTF8 next char
         // mp_uint_t v = char_to_numeric(cur#); // XXX UTF8 get char
         mp_uint_t v = *cur;
@@ -848,7 +1002,16 @@ size_t mpz_set_from_str(mpz_t *z, const char *str, size_t len, bool neg, unsigne
         if (v >= base) {
             break;
         }
-        z->len = mpn_mul_dig_add_dig(z->dig, z->len, base, v);
+        if ((mpz_dbl_dig_t)chunk_mul * base > DIG_MASK) {
+            z->len = mpn_mul_dig_add_dig(z->dig, z->len, chunk_mul, chunk);
+            chunk = 0;
+            chunk_mul = 1;
+        }
+        chunk = chunk * base + v;
+        chunk_mul *= base;
+    }
+    if (chunk_mul > 1) {
+        z->len = mpn_mul_dig_add_dig(z->dig, z->len, chunk_mul, chunk);
     }
 
     return cur - str;
@@ -1311,7 +1474,11 @@ void mpz_mul_inpl(mpz_t *dest, const mpz_t *lhs, const mpz_t *rhs) {
 
     mpz_need_dig(dest, lhs->len + rhs->len); // min mem l+r-1, max mem l+r
     memset(dest->dig, 0, dest->alloc * sizeof(mpz_dig_t));
+    #if MICROPY_OPT_MPZ_KARATSUBA
+    dest->len = mpn_mul_karatsuba(dest->dig, lhs->dig, lhs->len, rhs->dig, rhs->len);
+    #else
     dest->len = mpn_mul(dest->dig, lhs->dig, lhs->len, rhs->dig, rhs->len);
+    #endif
 
     if (lhs->neg == rhs->neg) {
         dest->neg = 0;
@@ -1356,6 +1523,115 @@ void mpz_pow_inpl(mpz_t *dest, const mpz_t *lhs, const mpz_t *rhs) {
     mpz_free(n);
 }
 
+#if MICROPY_OPT_MPZ_KARATSUBA
+
+/* computes o = a * b / B^n mod N, where n = nlen
+   t is scratch memory of 2n + 1 digits
+   can have o, a, b point to same memory
+*/
+static void mpn_mont_mul(mpz_dig_t *odig, const mpz_dig_t *adig, const mpz_dig_t *bdig, const mpz_dig_t *ndig, size_t nlen, mpz_dig_t ninv, mpz_dig_t *tdig) {
+    memset(tdig, 0, (2 * nlen + 1) * sizeof(mpz_dig_t));
+    mpn_mul_karatsuba(tdig, adig, nlen, bdig, nlen);
+    mpn_redc(tdig, ndig, nlen, ninv);
+    memcpy(odig, tdig + nlen, nlen * sizeof(mpz_dig_t));
+}
+
+/* computes dest = (lhs ** rhs) % mod using Montgomery multiplication and a
+   sliding window over the bits of rhs
+   assumes mod is positive and odd; assumes rhs > 0
+*/
+static void mpz_pow3_montgomery(mpz_t *dest, const mpz_t *lhs, const mpz_t *rhs, const mpz_t *mod) {
+    const mpz_dig_t *ndig = mod->dig;
+    size_t nlen = mod->len;
+
+    // compute -1 / N mod B with Newton's method, each step doubles the number
+    // of correct low bits, starting with 3 bits that are correct for any odd N
+    mpz_dbl_dig_t inv = ndig[0];
+    for (unsigned int bits = 3; bits < DIG_SIZE; bits *= 2) {
+        inv = (inv * (2 - (mpz_dbl_dig_t)ndig[0] * inv)) & DIG_MASK;
+    }
+    mpz_dig_t ninv = (DIG_BASE - inv) & DIG_MASK;
+
+    // convert lhs to Montgomery form, lhs * B^n mod N
+    mpz_t shifted, quo, x;
+    mpz_init_zero(&shifted);
+    mpz_init_zero(&quo);
+    mpz_init_zero(&x);
+    mpz_shl_inpl(&shifted, lhs, nlen * DIG_SIZE);
+    mpz_divmod_inpl(&quo, &x, &shifted, mod);
+    mpz_deinit(&shifted);
+
+    // wider windows need fewer multiplications but more precomputed powers
+    size_t nbits = mpz_max_num_bits(rhs);
+    unsigned int w = 1 + (nbits > 24) + (nbits > 80) + (nbits > 240) + (nbits > 672);
+    size_t ntab = 1 << (w - 1);
+
+    // memory for the odd powers x, x^3, x^5, ..., the accumulator and scratch
+    size_t mem_len = (ntab + 2) * nlen + 2 * nlen + 1;
+    mpz_dig_t *tab = m_new0(mpz_dig_t, mem_len);
+    mpz_dig_t *acc = tab + ntab * nlen;
+    mpz_dig_t *sq = acc + nlen;
+    mpz_dig_t *t = sq + nlen;
+
+    memcpy(tab, x.dig, x.len * sizeof(mpz_dig_t));
+    if (ntab > 1) {
+        mpn_mont_mul(sq, tab, tab, ndig, nlen, ninv, t);
+        for (size_t i = 1; i < ntab; ++i) {
+            mpn_mont_mul(tab + i * nlen, tab + (i - 1) * nlen, sq, ndig, nlen, ninv, t);
+        }
+    }
+
+    #define RHS_BIT(b) ((rhs->dig[(b) / DIG_SIZE] >> ((b) % DIG_SIZE)) & 1)
+    bool started = false;
+    for (size_t i = nbits; i > 0;) {
+        if (!RHS_BIT(i - 1)) {
+            if (started) {
+                mpn_mont_mul(acc, acc, acc, ndig, nlen, ninv, t);
+            }
+            --i;
+            continue;
+        }
+
+        // take the longest window of at most w bits that ends in a 1 bit
+        size_t l = i > w ? i - w : 0;
+        while (!RHS_BIT(l)) {
+            ++l;
+        }
+        size_t val = 0;
+        for (size_t b = i; b > l; --b) {
+            val = val << 1 | RHS_BIT(b - 1);
+        }
+
+        if (started) {
+            for (size_t b = l; b < i; ++b) {
+                mpn_mont_mul(acc, acc, acc, ndig, nlen, ninv, t);
+            }
+            mpn_mont_mul(acc, acc, tab + (val >> 1) * nlen, ndig, nlen, ninv, t);
+        } else {
+            memcpy(acc, tab + (val >> 1) * nlen, nlen * sizeof(mpz_dig_t));
+            started = true;
+        }
+        i = l;
+    }
+    #undef RHS_BIT
+
+    // convert the result out of Montgomery form
+    memset(t, 0, (2 * nlen + 1) * sizeof(mpz_dig_t));
+    memcpy(t, acc, nlen * sizeof(mpz_dig_t));
+    mpn_redc(t, ndig, nlen, ninv);
+
+    mpz_need_dig(dest, nlen);
+    memcpy(dest->dig, t + nlen, nlen * sizeof(mpz_dig_t));
+    dest->len = mpn_remove_trailing_zeros(dest->dig, dest->dig + nlen);
+    dest->neg = 0;
+
+    m_del(mpz_dig_t, tab, mem_len);
+    mpz_deinit(&x);
+    mpz_deinit(&quo);
+}
+
+#endif
+
 /* computes dest = (lhs ** rhs) % mod
    can have dest, lhs, rhs the same; mod can't be the same as dest
 */
@@ -1365,6 +1641,13 @@ void mpz_pow3_inpl(mpz_t *dest, const mpz_t *lhs, const mpz_t *rhs, const mpz_t
         return;
     }
 
+    #if MICROPY_OPT_MPZ_KARATSUBA
+    if (rhs->len != 0 && !mod->neg && (mod->dig[0] & 1) != 0) {
+        mpz_pow3_montgomery(dest, lhs, rhs, mod);
+        return;
+    }
+    #endif
+
     mpz_set_from_int(dest, 1);
 
     if (rhs->len == 0) {
@@ -1667,6 +1950,14 @@ char *mpz_as_str(const mpz_t *i, unsigned int base) {
 }
 #endif
 
+static char mpz_dig_to_char(mpz_dbl_dig_t a, char base_char) {
+    a += '0';
+    if (a > '9') {
+        a += base_char - '9' - 1;
+    }
+    return a;
+}
+
 // assumes enough space in str as calculated by mp_int_format_size
 // base must be between 2 and 32 inclusive
 // returns length of string, not including null byte
@@ -1688,48 +1979,83 @@ size_t mpz_as_str_inpl(const mpz_t *i, unsigned int base, const char *prefix, ch
         return s - str;
     }
 
-    // make a copy of mpz digits, so we can do the div/mod calculation
-    mpz_dig_t *dig = m_new(mpz_dig_t, ilen);
-    memcpy(dig, i->dig, ilen * sizeof(mpz_dig_t));
-
-    // convert
     char *last_comma = str;
-    bool done;
-    do {
-        mpz_dig_t *d = dig + ilen;
-        mpz_dbl_dig_t a = 0;
-
-        // compute next remainder
-        while (--d >= dig) {
-            a = (a << DIG_SIZE) | *d;
-            *d = a / base;
-            a %= base;
+    if ((base & (base - 1)) == 0) {
+        // base is a power of 2 so the bits of each character can be taken
+        // straight from the digits
+        unsigned int shift = 0;
+        while ((1U << shift) < base) {
+            ++shift;
         }
-
-        // convert to character
-        a += '0';
-        if (a > '9') {
-            a += base_char - '9' - 1;
+        size_t num_bits = (ilen - 1) * DIG_SIZE;
+        for (mpz_dig_t d = i->dig[ilen - 1]; d != 0; d >>= 1) {
+            ++num_bits;
         }
-        *s++ = a;
-
-        // check if number is zero
-        done = true;
-        for (d = dig; d < dig + ilen; ++d) {
-            if (*d != 0) {
-                done = false;
-                break;
+        for (size_t b = 0; b < num_bits;) {
+            size_t n = b / DIG_SIZE;
+            unsigned int n_part = b % DIG_SIZE;
+            mpz_dbl_dig_t a = i->dig[n] >> n_part;
+            if (n_part + shift > DIG_SIZE && n + 1 < ilen) {
+                a |= (mpz_dbl_dig_t)i->dig[n + 1] << (DIG_SIZE - n_part);
+            }
+            *s++ = mpz_dig_to_char(a & (base - 1), base_char);
+            b += shift;
+            if (b < num_bits && comma && (s - last_comma) == 3) {
+                *s++ = comma;
+                last_comma = s;
             }
         }
-        if (!done && comma && (s - last_comma) == 3) {
-            *s++ = comma;
-            last_comma = s;
+    } else {
+        // make a copy of mpz digits, so we can do the div/mod calculation
+        mpz_dig_t *dig = m_new(mpz_dig_t, ilen);
+        memcpy(dig, i->dig, ilen * sizeof(mpz_dig_t));
+
+        // divide by the largest power of base that fits in a digit, so that
+        // each pass over the digits produces several characters
+        mpz_dig_t chunk_base = base;
+        unsigned int chunk_len = 1;
+        while ((mpz_dbl_dig_t)chunk_base * base <= DIG_MASK) {
+            chunk_base *= base;
+            ++chunk_len;
         }
-    }
-    while (!done);
 
-    // free the copy of the digits array
-    m_del(mpz_dig_t, dig, ilen);
+        // convert
+        size_t dlen = ilen;
+        bool done;
+        do {
+            mpz_dig_t *d = dig + dlen;
+            mpz_dbl_dig_t a = 0;
+
+            // compute next remainder
+            while (--d >= dig) {
+                a = (a << DIG_SIZE) | *d;
+                *d = a / chunk_base;
+                a %= chunk_base;
+            }
+
+            // drop leading zero digits, the number is zero when none are left
+            while (dlen > 0 && dig[dlen - 1] == 0) {
+                --dlen;
+            }
+            done = dlen == 0;
+
+            // convert to characters, least significant first
+            for (unsigned int j = 0; j < chunk_len; ++j) {
+                *s++ = mpz_dig_to_char(a % base, base_char);
+                a /= base;
+                if (done && a == 0) {
+                    break;
+                }
+                if (comma && (s - last_comma) == 3) {
+                    *s++ = comma;
+                    last_comma = s;
+                }
+            }
+        } while (!done);
+
+        // free the copy of the digits array
+        m_del(mpz_dig_t, dig, ilen);
+    }
 
     if (prefix) {
         const char *p = &prefix[strlen(prefix)];
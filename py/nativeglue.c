@@ -232,6 +232,31 @@ static bool mp_native_yield_from(mp_obj_t gen, mp_obj_t send_value, mp_obj_t *re
     return false;
 }
 
+#if MICROPY_OPT_TIERED_NATIVE
+
+// Code generated for hot bytecode functions calls this at the top of each loop
+// iteration, to run background tasks and raise pending exceptions (eg
+// KeyboardInterrupt) like the VM does when it jumps.
+static mp_obj_t mp_native_tiered_loop_check(void) {
+    MICROPY_VM_HOOK_LOOP
+    mp_handle_pending(true);
+    #if MICROPY_PY_THREAD_GIL
+    MP_THREAD_GIL_EXIT();
+    MP_THREAD_GIL_ENTER();
+    #endif
+    return mp_const_none;
+}
+MP_DEFINE_CONST_FUN_OBJ_0(mp_native_tiered_loop_check_obj, mp_native_tiered_loop_check);
+
+// Code generated for hot bytecode functions calls this when it loads a local
+// variable that has no value.
+static mp_obj_t mp_native_tiered_unbound_local(void) {
+    mp_raise_msg(&mp_type_NameError, MP_ERROR_TEXT("local variable referenced before assignment"));
+}
+MP_DEFINE_CONST_FUN_OBJ_0(mp_native_tiered_unbound_local_obj, mp_native_tiered_unbound_local);
+
+#endif
+
 #if !MICROPY_PY_BUILTINS_FLOAT
 
 static mp_obj_t mp_obj_new_float_from_f(float f) {
@@ -184,6 +184,11 @@ typedef struct _mp_fun_table_t {
     const mp_obj_fun_builtin_var_t *stream_write_obj;
 } mp_fun_table_t;
 
+#if MICROPY_OPT_TIERED_NATIVE
+MP_DECLARE_CONST_FUN_OBJ_0(mp_native_tiered_loop_check_obj);
+MP_DECLARE_CONST_FUN_OBJ_0(mp_native_tiered_unbound_local_obj);
+#endif
+
 #if (MICROPY_EMIT_NATIVE && !MICROPY_DYNAMIC_COMPILER) || MICROPY_ENABLE_DYNRUNTIME
 extern const mp_fun_table_t mp_fun_table;
 #elif MICROPY_EMIT_NATIVE && MICROPY_DYNAMIC_COMPILER
@@ -496,7 +496,12 @@ typedef struct _mp_map_t {
     size_t all_keys_are_qstrs : 1;
     size_t is_fixed : 1;    // if set, table is fixed/read-only and can't be modified
     size_t is_ordered : 1;  // if set, table is an ordered array, not a hash map
+    #if MICROPY_OPT_MAP_ORDERED_INDEX
+    size_t has_index : 1;   // if set, an ordered table is followed by a hash index
+    size_t used : (8 * sizeof(size_t) - 4);
+    #else
     size_t used : (8 * sizeof(size_t) - 3);
+    #endif
     size_t alloc;
     mp_map_elem_t *table;
 } mp_map_t;
@@ -520,8 +525,15 @@ mp_map_t *mp_map_new(size_t n);
 void mp_map_deinit(mp_map_t *map);
 void mp_map_free(mp_map_t *map);
 mp_map_elem_t *mp_map_lookup(mp_map_t *map, mp_obj_t index, mp_map_lookup_kind_t lookup_kind);
+#if MICROPY_OPT_INLINE_CACHE
+mp_map_elem_t *mp_map_lookup_cached(mp_map_t *map, mp_obj_t index, uint8_t *cache);
+#endif
 void mp_map_clear(mp_map_t *map);
 void mp_map_dump(mp_map_t *map);
+#if MICROPY_OPT_MAP_ORDERED_INDEX
+// Must be called after modifying the table of an ordered map directly.
+void mp_map_reindex(mp_map_t *map);
+#endif
 
 // Underlying set implementation (not set object)
 
@@ -572,6 +584,8 @@ typedef mp_obj_t (*mp_fun_kw_t)(size_t n, const mp_obj_t *, mp_map_t *);
 // If MP_TYPE_FLAG_ITER_IS_STREAM is set then the type implicitly gets a "return self"
 //   getiter, and mp_stream_unbuffered_iter for iternext.
 // If MP_TYPE_FLAG_INSTANCE_TYPE is set then this is an instance type (i.e. defined in Python).
+// If MP_TYPE_FLAG_HAS_SLOTS is set then this is an instance type whose instances
+//   store __slots__ values after any native base in their subobj array.
 #define MP_TYPE_FLAG_NONE (0x0000)
 #define MP_TYPE_FLAG_IS_SUBCLASSED (0x0001)
 #define MP_TYPE_FLAG_HAS_SPECIAL_ACCESSORS (0x0002)
@@ -587,6 +601,7 @@ typedef mp_obj_t (*mp_fun_kw_t)(size_t n, const mp_obj_t *, mp_map_t *);
 #define MP_TYPE_FLAG_INSTANCE_TYPE (0x0200)
 // CIRCUITPY-CHANGE: check for valid types in json dumps
 #define MP_TYPE_FLAG_PRINT_JSON (0x0400)
+#define MP_TYPE_FLAG_HAS_SLOTS (0x0800)
 
 typedef enum {
     PRINT_STR = 0,
@@ -1226,6 +1241,9 @@ static inline mp_int_t mp_float_hash(mp_float_t val) {
 }
 #endif
 mp_obj_t mp_obj_float_binary_op(mp_binary_op_t op, mp_float_t lhs_val, mp_obj_t rhs); // can return MP_OBJ_NULL if op not supported
+#if MICROPY_OPT_FLOAT_TEMPORARIES
+mp_obj_t mp_obj_float_binary_op_tmp(mp_binary_op_t op, mp_float_t lhs_val, mp_obj_t rhs, mp_obj_t tmp);
+#endif
 
 // complex
 void mp_obj_complex_get(mp_obj_t self_in, mp_float_t *real, mp_float_t *imag);
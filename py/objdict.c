@@ -138,6 +138,9 @@ static mp_obj_t dict_new_typed(const mp_obj_type_t *type, const size_t n) {
     #if MICROPY_PY_COLLECTIONS_ORDEREDDICT
     if (type == &mp_type_ordereddict) {
         dict->map.is_ordered = 1;
+        #if MICROPY_OPT_MAP_ORDERED_INDEX
+        mp_map_reindex(&dict->map);
+        #endif
     }
     #endif
     return dict_out;
@@ -310,6 +313,9 @@ mp_obj_t mp_obj_dict_copy(mp_obj_t self_in) {
     other->map.is_fixed = 0;
     other->map.is_ordered = self->map.is_ordered;
     memcpy(other->map.table, self->map.table, self->map.alloc * sizeof(mp_map_elem_t));
+    #if MICROPY_OPT_MAP_ORDERED_INDEX
+    mp_map_reindex(&other->map);
+    #endif
     return other_out;
 }
 static MP_DEFINE_CONST_FUN_OBJ_1(dict_copy_obj, mp_obj_dict_copy);
@@ -416,6 +422,9 @@ static mp_obj_t dict_popitem(mp_obj_t self_in) {
     mp_obj_t items[] = {next->key, next->value};
     next->key = MP_OBJ_SENTINEL; // must mark key as sentinel to indicate that it was deleted
     next->value = MP_OBJ_NULL;
+    #if MICROPY_OPT_MAP_ORDERED_INDEX
+    mp_map_reindex(&self->map);
+    #endif
     mp_obj_t tuple = mp_obj_new_tuple(2, items);
 
     return tuple;
@@ -515,6 +524,9 @@ static mp_obj_t dict_move_to_end(size_t n_args, const mp_obj_t *pos_args, mp_map
     }
     memmove(move_dest, move_begin, move_count * sizeof(*elem));
     *dest = tmp;
+    #if MICROPY_OPT_MAP_ORDERED_INDEX
+    mp_map_reindex(&self->map);
+    #endif
 
     return mp_const_none;
 }
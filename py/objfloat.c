@@ -29,6 +29,7 @@
 #include <string.h>
 #include <assert.h>
 
+#include "py/gc.h"
 #include "py/parsenum.h"
 #include "py/runtime.h"
 
@@ -205,8 +206,16 @@ MP_DEFINE_CONST_OBJ_TYPE(
 #if MICROPY_OBJ_REPR != MICROPY_OBJ_REPR_C && MICROPY_OBJ_REPR != MICROPY_OBJ_REPR_D
 
 mp_obj_t mp_obj_new_float(mp_float_t value) {
+    #if MICROPY_GC_FLOAT_FREELIST
+    // A float freed by the last collection already has its type set.
+    mp_obj_float_t *o = gc_float_freelist_pop();
+    if (o == NULL) {
+        o = mp_obj_malloc(mp_obj_float_t, &mp_type_float);
+    }
+    #else
     // CIRCUITPY-CHANGE: Use mp_obj_malloc because it is a Python object
     mp_obj_float_t *o = mp_obj_malloc(mp_obj_float_t, &mp_type_float);
+    #endif
     o->value = value;
     return MP_OBJ_FROM_PTR(o);
 }
@@ -254,7 +263,17 @@ static void mp_obj_float_divmod(mp_float_t *x, mp_float_t *y) {
     *y = mod;
 }
 
+#if MICROPY_OPT_FLOAT_TEMPORARIES
 mp_obj_t mp_obj_float_binary_op(mp_binary_op_t op, mp_float_t lhs_val, mp_obj_t rhs_in) {
+    return mp_obj_float_binary_op_tmp(op, lhs_val, rhs_in, MP_OBJ_NULL);
+}
+
+// As mp_obj_float_binary_op, but if tmp is not MP_OBJ_NULL then it is a float
+// that nothing else refers to, and a float result is stored in it.
+mp_obj_t mp_obj_float_binary_op_tmp(mp_binary_op_t op, mp_float_t lhs_val, mp_obj_t rhs_in, mp_obj_t tmp) {
+#else
+mp_obj_t mp_obj_float_binary_op(mp_binary_op_t op, mp_float_t lhs_val, mp_obj_t rhs_in) {
+#endif
     mp_float_t rhs_val;
     if (!mp_obj_get_float_maybe(rhs_in, &rhs_val)) {
         return MP_OBJ_NULL; // op not supported
@@ -352,6 +371,13 @@ mp_obj_t mp_obj_float_binary_op(mp_binary_op_t op, mp_float_t lhs_val, mp_obj_t
         default:
             return MP_OBJ_NULL; // op not supported
     }
+    #if MICROPY_OPT_FLOAT_TEMPORARIES
+    if (tmp != MP_OBJ_NULL) {
+        mp_obj_float_t *o = MP_OBJ_TO_PTR(tmp);
+        o->value = lhs_val;
+        return tmp;
+    }
+    #endif
     return mp_obj_new_float(lhs_val);
 }
 
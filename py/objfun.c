@@ -35,6 +35,9 @@
 #include "py/runtime.h"
 #include "py/bc.h"
 #include "py/cstack.h"
+#include "py/compile.h"
+#include "py/gc.h"
+#include "py/persistentcode.h"
 
 #if MICROPY_DEBUG_VERBOSE // print debugging info
 #define DEBUG_PRINT (1)
@@ -136,7 +139,8 @@ MP_DEFINE_CONST_OBJ_TYPE(
 /* byte code functions                                                        */
 
 qstr mp_obj_fun_get_name(mp_const_obj_t fun_in) {
-    const mp_obj_fun_bc_t *fun = MP_OBJ_TO_PTR(fun_in);
+    mp_obj_fun_bc_t *fun = (mp_obj_fun_bc_t *)MP_OBJ_TO_PTR(fun_in);
+    mp_obj_fun_bc_load(fun);
     const byte *bc = fun->bytecode;
 
     #if MICROPY_EMIT_NATIVE
@@ -227,6 +231,7 @@ static void dump_args(const mp_obj_t *a, size_t sz) {
 mp_code_state_t *mp_obj_fun_bc_prepare_codestate(mp_obj_t self_in, size_t n_args, size_t n_kw, const mp_obj_t *args) {
     mp_cstack_check();
     mp_obj_fun_bc_t *self = MP_OBJ_TO_PTR(self_in);
+    mp_obj_fun_bc_load(self);
 
     size_t n_state, state_size;
     DECODE_CODESTATE_SIZE(self->bytecode, n_state, state_size);
@@ -255,6 +260,145 @@ mp_code_state_t *mp_obj_fun_bc_prepare_codestate(mp_obj_t self_in, size_t n_args
 }
 #endif
 
+#if MICROPY_OPT_TIERED_NATIVE
+
+#if !MICROPY_EMIT_NATIVE || !MICROPY_ENABLE_COMPILER
+#error "MICROPY_OPT_TIERED_NATIVE requires MICROPY_EMIT_NATIVE and MICROPY_ENABLE_COMPILER"
+#endif
+#if MICROPY_STACKLESS
+#error "MICROPY_OPT_TIERED_NATIVE is not compatible with MICROPY_STACKLESS"
+#endif
+
+// Recompiling uses the parse tree kept for the function's module, so only one
+// function is recompiled at a time.
+#if MICROPY_PY_THREAD && !MICROPY_PY_THREAD_GIL
+#define TIERED_NATIVE_TRY_ENTER() mp_thread_mutex_lock(&MP_STATE_VM(tiered_native_mutex), 0)
+#define TIERED_NATIVE_EXIT() mp_thread_mutex_unlock(&MP_STATE_VM(tiered_native_mutex))
+#else
+#define TIERED_NATIVE_TRY_ENTER() (!MP_STATE_VM(tiered_native_compiling) && (MP_STATE_VM(tiered_native_compiling) = true))
+#define TIERED_NATIVE_EXIT() (MP_STATE_VM(tiered_native_compiling) = false)
+#endif
+
+static qstr fun_bc_source_file(const mp_obj_fun_bc_t *self) {
+    #if MICROPY_EMIT_BYTECODE_USES_QSTR_TABLE
+    return self->context->constants.qstr_table[0];
+    #else
+    return self->context->constants.source_file;
+    #endif
+}
+
+// Recompile a hot function with the native emitter.  The parse tree that was
+// kept when the function's module was compiled is compiled again, and the scope
+// whose bytecode matches this function is emitted as native code and used for
+// later calls.  Functions that can't be recompiled (eg loaded from an .mpy file
+// or frozen) stay as bytecode.
+static void fun_bc_tier_native(mp_obj_fun_bc_t *self) {
+    #if MICROPY_ENABLE_GC
+    if (gc_is_locked()) {
+        // Compiling allocates, so try again on a later call.
+        return;
+    }
+    #endif
+
+    struct _mp_tiered_native_source_t *source = self->context->constants.tiered_native_source;
+    if (source == NULL || MP_STATE_VM(tiered_native_code_size) >= MICROPY_OPT_TIERED_NATIVE_BUDGET) {
+        self->tier_native = mp_const_none;
+        return;
+    }
+
+    #if MICROPY_PY_SYS_SETTRACE
+    // Native code doesn't produce trace events.
+    if (MP_STATE_THREAD(prof_trace_callback) != MP_OBJ_NULL) {
+        self->tier_native = mp_const_none;
+        return;
+    }
+    #endif
+
+    if (!TIERED_NATIVE_TRY_ENTER()) {
+        // Another function is being recompiled, eg by code run from a
+        // finaliser during a collection, so try again on a later call.
+        return;
+    }
+
+    // Mark as done before compiling so that failure doesn't try again.
+    self->tier_native = mp_const_none;
+
+    const byte *ip = self->bytecode;
+    MP_BC_PRELUDE_SIG_DECODE(ip);
+
+    nlr_buf_t nlr;
+    if (nlr_push(&nlr) == 0) {
+        mp_module_context_t *context = m_new_obj(mp_module_context_t);
+        context->module.globals = self->context->module.globals;
+        mp_raw_code_t *rc = mp_compile_tiered_native(source, fun_bc_source_file(self), mp_obj_fun_get_name(MP_OBJ_FROM_PTR(self)), self, context);
+        if (rc != NULL) {
+            // The new function shares the current values of the default args.
+            mp_obj_t def_args[2] = { MP_OBJ_NULL, MP_OBJ_NULL };
+            if (n_def_pos_args > 0) {
+                def_args[0] = mp_obj_new_tuple(n_def_pos_args, self->extra_args);
+            }
+            if (scope_flags & MP_SCOPE_FLAG_DEFKWARGS) {
+                def_args[1] = self->extra_args[n_def_pos_args];
+            }
+            self->tier_native = mp_make_function_from_proto_fun(rc, context, def_args);
+        }
+        nlr_pop();
+        TIERED_NATIVE_EXIT();
+    } else {
+        // The function stays as bytecode if it can't be compiled to native
+        // code, but other errors are raised.
+        TIERED_NATIVE_EXIT();
+        mp_obj_t exc = MP_OBJ_FROM_PTR(nlr.ret_val);
+        if (!mp_obj_exception_match(exc, MP_OBJ_FROM_PTR(&mp_type_SyntaxError))
+            && !mp_obj_exception_match(exc, MP_OBJ_FROM_PTR(&mp_type_ViperTypeError))
+            && !mp_obj_exception_match(exc, MP_OBJ_FROM_PTR(&mp_type_NotImplementedError))) {
+            nlr_jump(nlr.ret_val);
+        }
+    }
+}
+
+#if MICROPY_ENABLE_SOURCE_LINE
+
+typedef struct _fun_bc_tier_call_t {
+    nlr_jump_callback_node_t callback;
+    mp_obj_fun_bc_t *self;
+    mp_uint_t line;
+} fun_bc_tier_call_t;
+
+// The native version doesn't have a code state for the VM to put in tracebacks,
+// so an exception passing through it gets the line it last stored instead.
+static void fun_bc_tier_call_from_nlr_jump_callback(void *ctx_in) {
+    fun_bc_tier_call_t *ctx = ctx_in;
+    mp_obj_fun_bc_t *native = MP_OBJ_TO_PTR(ctx->self->tier_native);
+    mp_obj_t exc = MP_OBJ_FROM_PTR(MP_STATE_THREAD(nlr_top)->ret_val);
+    if (native->tier.line != 0 && exc != MP_OBJ_NULL && mp_obj_is_exception_instance(exc)) {
+        mp_obj_exception_add_traceback(exc, fun_bc_source_file(ctx->self), native->tier.line, mp_obj_fun_get_name(MP_OBJ_FROM_PTR(ctx->self)));
+    }
+    native->tier.line = ctx->line;
+}
+
+#endif
+
+static mp_obj_t fun_bc_tier_call(mp_obj_fun_bc_t *self, size_t n_args, size_t n_kw, const mp_obj_t *args) {
+    #if MICROPY_ENABLE_SOURCE_LINE
+    // Save the line of any outer call that's still running, for recursion.
+    mp_obj_fun_bc_t *native = MP_OBJ_TO_PTR(self->tier_native);
+    fun_bc_tier_call_t ctx;
+    ctx.self = self;
+    ctx.line = native->tier.line;
+    native->tier.line = 0;
+    nlr_push_jump_callback(&ctx.callback, fun_bc_tier_call_from_nlr_jump_callback);
+    mp_obj_t ret = mp_call_function_n_kw(self->tier_native, n_args, n_kw, args);
+    nlr_pop_jump_callback(false);
+    native->tier.line = ctx.line;
+    return ret;
+    #else
+    return mp_call_function_n_kw(self->tier_native, n_args, n_kw, args);
+    #endif
+}
+
+#endif
+
 // CIRCUITPY-CHANGE: PLACE_IN_ITCM
 static mp_obj_t PLACE_IN_ITCM(fun_bc_call)(mp_obj_t self_in, size_t n_args, size_t n_kw, const mp_obj_t *args) {
     mp_cstack_check();
@@ -266,6 +410,16 @@ static mp_obj_t PLACE_IN_ITCM(fun_bc_call)(mp_obj_t self_in, size_t n_args, size
     dump_args(args + n_args, n_kw * 2);
 
     mp_obj_fun_bc_t *self = MP_OBJ_TO_PTR(self_in);
+    mp_obj_fun_bc_load(self);
+
+    #if MICROPY_OPT_TIERED_NATIVE
+    if (self->tier_native == MP_OBJ_NULL && ++self->tier.count >= MICROPY_OPT_TIERED_NATIVE_THRESHOLD) {
+        fun_bc_tier_native(self);
+    }
+    if (self->tier_native != MP_OBJ_NULL && self->tier_native != mp_const_none) {
+        return fun_bc_tier_call(self, n_args, n_kw, args);
+    }
+    #endif
 
     size_t n_state, state_size;
     DECODE_CODESTATE_SIZE(self->bytecode, n_state, state_size);
@@ -372,7 +526,8 @@ void mp_obj_fun_bc_attr(mp_obj_t self_in, qstr attr, mp_obj_t *dest) {
     }
     #if MICROPY_PY_FUNCTION_ATTRS_CODE
     if (attr == MP_QSTR___code__) {
-        const mp_obj_fun_bc_t *self = MP_OBJ_TO_PTR(self_in);
+        mp_obj_fun_bc_t *self = MP_OBJ_TO_PTR(self_in);
+        mp_obj_fun_bc_load(self);
         if ((self->base.type == &mp_type_fun_bc
              || self->base.type == &mp_type_gen_wrap)
             && self->child_table == NULL) {
@@ -415,6 +570,15 @@ MP_DEFINE_CONST_OBJ_TYPE(
     call, fun_bc_call
     );
 
+#if MICROPY_PERSISTENT_CODE_LOAD_LAZY
+void mp_obj_fun_bc_load_lazy(mp_obj_fun_bc_t *self) {
+    mp_raw_code_lazy_t *lazy = (mp_raw_code_lazy_t *)self->child_table;
+    const byte *bytecode = mp_raw_code_load_lazy(lazy);
+    self->child_table = lazy->rc->children;
+    self->bytecode = bytecode;
+}
+#endif
+
 mp_obj_t mp_obj_new_fun_bc(const mp_obj_t *def_args, const byte *code, const mp_module_context_t *context, struct _mp_raw_code_t *const *child_table) {
     size_t n_def_args = 0;
     size_t n_extra_args = 0;
@@ -435,6 +599,10 @@ mp_obj_t mp_obj_new_fun_bc(const mp_obj_t *def_args, const byte *code, const mp_
     o->bytecode = code;
     o->context = context;
     o->child_table = child_table;
+    #if MICROPY_OPT_TIERED_NATIVE
+    o->tier.count = 0;
+    o->tier_native = MP_OBJ_NULL;
+    #endif
     if (def_pos_args != NULL) {
         memcpy(o->extra_args, def_pos_args->items, n_def_args * sizeof(mp_obj_t));
     }
@@ -37,6 +37,13 @@ typedef struct _mp_obj_fun_bc_t {
     #if MICROPY_PY_SYS_SETTRACE
     const struct _mp_raw_code_t *rc;
     #endif
+    #if MICROPY_OPT_TIERED_NATIVE
+    union {
+        mp_uint_t count;                        // calls plus loop iterations so far
+        mp_uint_t line;                         // in the native version, the line being run
+    } tier;
+    mp_obj_t tier_native;                       // native version, or None if it can't be made
+    #endif
     // the following extra_args array is allocated space to take (in order):
     //  - values of positional default args (if any)
     //  - a single slot for default kw args dict (if it has them)
@@ -53,6 +60,24 @@ typedef struct _mp_obj_fun_asm_t {
 mp_obj_t mp_obj_new_fun_bc(const mp_obj_t *def_args, const byte *code, const mp_module_context_t *cm, struct _mp_raw_code_t *const *raw_code_table);
 void mp_obj_fun_bc_attr(mp_obj_t self_in, qstr attr, mp_obj_t *dest);
 
+#if MICROPY_PERSISTENT_CODE_LOAD_LAZY
+// A bytecode function from an .mpy file whose bytecode has not been read in yet
+// has a NULL bytecode pointer, and its child_table points to the
+// mp_raw_code_lazy_t that says where to find the bytecode.
+void mp_obj_fun_bc_load_lazy(mp_obj_fun_bc_t *self);
+#endif
+
+// Make sure the bytecode of a function is loaded before it is used.
+static inline void mp_obj_fun_bc_load(mp_obj_fun_bc_t *self) {
+    #if MICROPY_PERSISTENT_CODE_LOAD_LAZY
+    if (self->bytecode == NULL) {
+        mp_obj_fun_bc_load_lazy(self);
+    }
+    #else
+    (void)self;
+    #endif
+}
+
 #if MICROPY_EMIT_NATIVE
 
 static inline mp_obj_t mp_obj_new_fun_native(const mp_obj_t *def_args, const void *fun_data, const mp_module_context_t *mc, struct _mp_raw_code_t *const *child_table) {
@@ -62,6 +62,7 @@ static mp_obj_t gen_wrap_call(mp_obj_t self_in, size_t n_args, size_t n_kw, cons
     // A generating or coroutine function is just a bytecode function
     // with type mp_type_gen_wrap or mp_type_coro_wrap.
     mp_obj_fun_bc_t *self_fun = MP_OBJ_TO_PTR(self_in);
+    mp_obj_fun_bc_load(self_fun);
 
     // bytecode prelude: get state size and exception stack size
     const uint8_t *ip = self_fun->bytecode;
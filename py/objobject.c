@@ -73,6 +73,13 @@ static mp_obj_t object___setattr__(mp_obj_t self_in, mp_obj_t attr, mp_obj_t val
     }
 
     mp_obj_instance_t *self = MP_OBJ_TO_PTR(self_in);
+    #if MICROPY_PY_CLASS_SLOTS
+    mp_obj_t *slot = mp_obj_instance_lookup_slot(self, mp_obj_str_get_qstr(attr));
+    if (slot != NULL) {
+        *slot = value;
+        return mp_const_none;
+    }
+    #endif
     mp_map_lookup(&self->members, attr, MP_MAP_LOOKUP_ADD_IF_NOT_FOUND)->value = value;
     return mp_const_none;
 }
@@ -88,6 +95,13 @@ static mp_obj_t object___delattr__(mp_obj_t self_in, mp_obj_t attr) {
     }
 
     mp_obj_instance_t *self = MP_OBJ_TO_PTR(self_in);
+    #if MICROPY_PY_CLASS_SLOTS
+    mp_obj_t *slot = mp_obj_instance_lookup_slot(self, mp_obj_str_get_qstr(attr));
+    if (slot != NULL && *slot != MP_OBJ_NULL) {
+        *slot = MP_OBJ_NULL;
+        return mp_const_none;
+    }
+    #endif
     if (mp_map_lookup(&self->members, attr, MP_MAP_LOOKUP_REMOVE_IF_FOUND) == NULL) {
         mp_raise_msg(&mp_type_AttributeError, MP_ERROR_TEXT("no such attribute"));
     }
@@ -33,6 +33,7 @@
 #include "py/objlist.h"
 #include "py/runtime.h"
 #include "py/cstack.h"
+#include "py/gc.h"
 
 // CIRCUITPY-CHANGE
 const char nibble_to_hex_upper[16] = {'0', '1', '2', '3', '4', '5', '6', '7', '8', '9',
@@ -41,6 +42,8 @@ const char nibble_to_hex_upper[16] = {'0', '1', '2', '3', '4', '5', '6', '7', '8
 const char nibble_to_hex_lower[16] = {'0', '1', '2', '3', '4', '5', '6', '7', '8', '9',
                                       'a', 'b', 'c', 'd', 'e', 'f'};
 
+static mp_obj_t mp_obj_new_str_ref(const mp_obj_type_t *type, mp_obj_t src, size_t start, size_t len, size_t hash);
+
 #if MICROPY_PY_BUILTINS_STR_OP_MODULO
 static mp_obj_t str_modulo_format(mp_obj_t pattern, size_t n_args, const mp_obj_t *args, mp_obj_t dict);
 #endif
@@ -226,10 +229,7 @@ mp_obj_t mp_obj_str_make_new(const mp_obj_type_t *type, size_t n_args, size_t n_
                     return MP_OBJ_NEW_QSTR(q);
                 }
 
-                mp_obj_str_t *o = MP_OBJ_TO_PTR(mp_obj_new_str_copy(type, NULL, str_len));
-                o->data = str_data;
-                o->hash = str_hash;
-                return MP_OBJ_FROM_PTR(o);
+                return mp_obj_new_str_ref(type, args[0], 0, str_len, str_hash);
             } else {
                 mp_buffer_info_t bufinfo;
                 mp_get_buffer_raise(args[0], &bufinfo, MP_BUFFER_READ);
@@ -271,10 +271,7 @@ static mp_obj_t bytes_make_new(const mp_obj_type_t *type_in, size_t n_args, size
         if (str_hash == 0) {
             str_hash = qstr_compute_hash(str_data, str_len);
         }
-        mp_obj_str_t *o = MP_OBJ_TO_PTR(mp_obj_new_str_copy(&mp_type_bytes, NULL, str_len));
-        o->data = str_data;
-        o->hash = str_hash;
-        return MP_OBJ_FROM_PTR(o);
+        return mp_obj_new_str_ref(&mp_type_bytes, args[0], 0, str_len, str_hash);
     }
 
     if (n_args > 1) {
@@ -506,7 +503,7 @@ static mp_obj_t bytes_subscr(mp_obj_t self_in, mp_obj_t index, mp_obj_t value) {
             if (!mp_seq_get_fast_slice_indexes(self_len, index, &slice)) {
                 mp_raise_NotImplementedError(MP_ERROR_TEXT("only slices with step=1 (aka None) are supported"));
             }
-            return mp_obj_new_str_of_type(type, self_data + slice.start, slice.stop - slice.start);
+            return mp_obj_new_str_slice(type, self_in, slice.start, slice.stop - slice.start);
         }
         #endif
         size_t index_val = mp_get_index(type, self_len, index, false);
@@ -2257,6 +2254,61 @@ mp_obj_t mp_obj_new_str_copy(const mp_obj_type_t *type, const byte *data, size_t
     return MP_OBJ_FROM_PTR(o);
 }
 
+#if MICROPY_PY_BUILTINS_STR_SLICE_VIEW
+// Return the start of the heap block that holds the data of the str/bytes object
+// src, or NULL if the data is not on the heap.  A view has this in its owner.  The
+// allocation of any other str/bytes object is either too small to have an owner,
+// or is zero after the end of the object.
+static const void *str_data_owner(mp_obj_t src, const byte *data) {
+    if (!mp_obj_is_qstr(src)) {
+        const mp_obj_str_view_t *v = MP_OBJ_TO_PTR(src);
+        if (gc_nbytes(v) >= sizeof(mp_obj_str_view_t) && v->owner != NULL) {
+            return v->owner;
+        }
+    }
+    return gc_alloc_head(data);
+}
+#endif
+
+// Create a str/bytes object that refers to the data of the str/bytes object src
+// from start, rather than to a copy of it.  The byte after the end of the new
+// object's data must be a null byte, so that its data is null terminated too.
+static mp_obj_t mp_obj_new_str_ref(const mp_obj_type_t *type, mp_obj_t src, size_t start, size_t len, size_t hash) {
+    GET_STR_DATA_LEN(src, data, data_len);
+    (void)data_len;
+    assert(data[start + len] == '\0');
+    #if MICROPY_PY_BUILTINS_STR_SLICE_VIEW
+    const void *owner = str_data_owner(src, data);
+    if (owner != NULL && owner != data + start) {
+        mp_obj_str_view_t *v = mp_obj_malloc(mp_obj_str_view_t, type);
+        v->base.hash = hash;
+        v->base.len = len;
+        v->base.data = data + start;
+        v->owner = owner;
+        return MP_OBJ_FROM_PTR(v);
+    }
+    #endif
+    mp_obj_str_t *o = MP_OBJ_TO_PTR(mp_obj_new_str_copy(type, NULL, len));
+    o->data = data + start;
+    o->hash = hash;
+    return MP_OBJ_FROM_PTR(o);
+}
+
+// Create a str/bytes object for a slice of the data of the str/bytes object src.
+// A long enough slice that is followed by a null byte (eg one that runs to the end
+// of the data) refers to that data, and so keeps all of it alive; any other slice
+// is a copy.  The hash of a slice that refers to the data is computed lazily.
+mp_obj_t mp_obj_new_str_slice(const mp_obj_type_t *type, mp_obj_t src, size_t start, size_t len) {
+    GET_STR_DATA_LEN(src, data, data_len);
+    (void)data_len;
+    #if MICROPY_PY_BUILTINS_STR_SLICE_VIEW
+    if (len >= MICROPY_PY_BUILTINS_STR_SLICE_VIEW_MIN_LEN && data[start + len] == '\0') {
+        return mp_obj_new_str_ref(type, src, start, len, 0);
+    }
+    #endif
+    return mp_obj_new_str_of_type(type, data + start, len);
+}
+
 // Create a str/bytes object using the given data.  If the type is str and the string
 // data is already interned, then a qstr object is returned.  Otherwise new memory is
 // allocated for the object and the data is copied across.
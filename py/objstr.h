@@ -41,6 +41,16 @@ typedef struct _mp_obj_str_t {
     const byte *data;
 } mp_obj_str_t;
 
+#if MICROPY_PY_BUILTINS_STR_SLICE_VIEW
+// A str/bytes object whose data is within an allocated block that it doesn't
+// point to the start of.  The GC only follows pointers to the start of a block,
+// so owner points there to keep the data alive.
+typedef struct _mp_obj_str_view_t {
+    mp_obj_str_t base;
+    const void *owner;
+} mp_obj_str_view_t;
+#endif
+
 // This static assert is used to ensure that mp_obj_str_t and mp_obj_array_t are compatible,
 // meaning that their len and data/items entries are at the same offsets in the struct.
 // This allows the same code to be used for str/bytes and bytearray.
@@ -94,6 +104,7 @@ mp_obj_t mp_obj_str_format(size_t n_args, const mp_obj_t *args, mp_map_t *kwargs
 mp_obj_t mp_obj_str_split(size_t n_args, const mp_obj_t *args);
 mp_obj_t mp_obj_new_str_copy(const mp_obj_type_t *type, const byte *data, size_t len); // for type=str, input data must be valid utf-8
 mp_obj_t mp_obj_new_str_of_type(const mp_obj_type_t *type, const byte *data, size_t len); // for type=str, will check utf-8 (raises UnicodeError)
+mp_obj_t mp_obj_new_str_slice(const mp_obj_type_t *type, mp_obj_t src, size_t start, size_t len); // src must be a str/bytes object
 
 mp_obj_t mp_obj_str_binary_op(mp_binary_op_t op, mp_obj_t lhs_in, mp_obj_t rhs_in);
 mp_int_t mp_obj_str_get_buffer(mp_obj_t self_in, mp_buffer_info_t *bufinfo, mp_uint_t flags);
@@ -219,7 +219,7 @@ static mp_obj_t str_subscr(mp_obj_t self_in, mp_obj_t index, mp_obj_t value) {
             if (pstop < pstart) {
                 return MP_OBJ_NEW_QSTR(MP_QSTR_);
             }
-            return mp_obj_new_str_of_type(type, (const byte *)pstart, pstop - pstart);
+            return mp_obj_new_str_slice(type, self_in, pstart - self_data, pstop - pstart);
         }
         #endif
         const byte *s = str_index_to_ptr(type, self_data, self_len, index, false);
@@ -113,14 +113,61 @@ static mp_obj_t native_base_init_wrapper(size_t n_args, const mp_obj_t *pos_args
 
 static MP_DEFINE_CONST_FUN_OBJ_KW(native_base_init_wrapper_obj, 1, native_base_init_wrapper);
 
+#if MICROPY_PY_CLASS_SLOTS
+// For each name in __slots__ a class gets a member descriptor in its locals
+// dict, giving the position of the value in the subobj array of instances.
+typedef struct _mp_obj_member_t {
+    mp_obj_base_t base;
+    const mp_obj_type_t *owner;
+    qstr name;
+    size_t index;
+} mp_obj_member_t;
+
+static void member_print(const mp_print_t *print, mp_obj_t self_in, mp_print_kind_t kind) {
+    (void)kind;
+    mp_obj_member_t *self = MP_OBJ_TO_PTR(self_in);
+    mp_printf(print, "<member '%q' of '%q' objects>", self->name, self->owner->name);
+}
+
+static MP_DEFINE_CONST_OBJ_TYPE(
+    mp_type_member,
+    MP_QSTR_member_descriptor,
+    MP_TYPE_FLAG_NONE,
+    print, member_print
+    );
+
+// A class with MP_TYPE_FLAG_HAS_SLOTS stores the length of its instances'
+// subobj array in an extra entry following its regular slots, see
+// mp_obj_new_type.
+static size_t instance_type_slots_extra_index(const mp_obj_type_t *type) {
+    return 10 + (MP_OBJ_TYPE_HAS_SLOT(type, parent) ? 1 : 0) + (MP_OBJ_TYPE_HAS_SLOT(type, protocol) ? 1 : 0);
+}
+
+static size_t instance_type_num_subobj(const mp_obj_type_t *type) {
+    return (uintptr_t)type->slots[instance_type_slots_extra_index(type)];
+}
+#endif
+
 #if !MICROPY_CPYTHON_COMPAT
 static
 #endif
 mp_obj_instance_t *mp_obj_new_instance(const mp_obj_type_t *class, const mp_obj_type_t **native_base) {
     size_t num_native_bases = instance_count_native_bases(class, native_base);
     assert(num_native_bases < 2);
-    mp_obj_instance_t *o = mp_obj_malloc_var(mp_obj_instance_t, subobj, mp_obj_t, num_native_bases, class);
+    size_t num_subobj = num_native_bases;
+    #if MICROPY_PY_CLASS_SLOTS
+    if (class->flags & MP_TYPE_FLAG_HAS_SLOTS) {
+        num_subobj = instance_type_num_subobj(class);
+    }
+    #endif
+    mp_obj_instance_t *o = mp_obj_malloc_var(mp_obj_instance_t, subobj, mp_obj_t, num_subobj, class);
     mp_map_init(&o->members, 0);
+    #if MICROPY_PY_CLASS_SLOTS
+    // All __slots__ values start off unset.
+    for (size_t i = num_native_bases; i < num_subobj; i++) {
+        o->subobj[i] = MP_OBJ_NULL;
+    }
+    #endif
     // Initialise the native base-class slot (should be 1 at most) with a valid
     // object.  It doesn't matter which object, so long as it can be uniquely
     // distinguished from a native class that is initialised.
@@ -609,6 +656,62 @@ static mp_obj_t instance_binary_op(mp_binary_op_t op, mp_obj_t lhs_in, mp_obj_t
     return res;
 }
 
+#if MICROPY_PY_CLASS_SLOTS
+// Returns where self stores the value for the given class member, or NULL if
+// the member isn't a member descriptor applying to self.
+static mp_obj_t *instance_get_slot(mp_obj_instance_t *self, mp_obj_t member_in) {
+    if (!mp_obj_is_type(member_in, &mp_type_member)) {
+        return NULL;
+    }
+    mp_obj_member_t *member = MP_OBJ_TO_PTR(member_in);
+    if (member->owner != self->base.type
+        && !mp_obj_is_subclass_fast(MP_OBJ_FROM_PTR(self->base.type), MP_OBJ_FROM_PTR(member->owner))) {
+        return NULL;
+    }
+    return &self->subobj[member->index];
+}
+
+mp_obj_t *mp_obj_instance_lookup_slot(mp_obj_instance_t *self, qstr attr) {
+    const mp_obj_type_t *type = self->base.type;
+    if (!(type->flags & MP_TYPE_FLAG_HAS_SLOTS)) {
+        return NULL;
+    }
+    // Try the class's own locals first, as mp_obj_class_lookup would.
+    mp_map_t *locals_map = &MP_OBJ_TYPE_GET_SLOT(type, locals_dict)->map;
+    mp_map_elem_t *elem = mp_map_lookup(locals_map, MP_OBJ_NEW_QSTR(attr), MP_MAP_LOOKUP);
+    if (elem != NULL) {
+        return instance_get_slot(self, elem->value);
+    }
+    mp_obj_t member[2] = {MP_OBJ_NULL};
+    struct class_lookup_data lookup = {
+        .obj = self,
+        .attr = attr,
+        .slot_offset = 0,
+        .dest = member,
+        .is_type = false,
+    };
+    mp_obj_class_lookup(&lookup, type);
+    if (member[0] == MP_OBJ_NULL) {
+        return NULL;
+    }
+    return instance_get_slot(self, member[0]);
+}
+
+mp_obj_t mp_obj_instance_load_slot(mp_obj_t self_in, qstr attr) {
+    mp_obj_instance_t *self = MP_OBJ_TO_PTR(self_in);
+    const mp_obj_type_t *type = self->base.type;
+    mp_map_t *locals_map = &MP_OBJ_TYPE_GET_SLOT(type, locals_dict)->map;
+    mp_map_elem_t *elem = mp_map_lookup(locals_map, MP_OBJ_NEW_QSTR(attr), MP_MAP_LOOKUP);
+    if (elem != NULL && mp_obj_is_type(elem->value, &mp_type_member)) {
+        mp_obj_member_t *member = MP_OBJ_TO_PTR(elem->value);
+        if (member->owner == type) {
+            return self->subobj[member->index];
+        }
+    }
+    return MP_OBJ_NULL;
+}
+#endif
+
 static void mp_obj_instance_load_attr(mp_obj_t self_in, qstr attr, mp_obj_t *dest) {
     // logic: look in instance members then class locals
     assert(mp_obj_is_instance_type(mp_obj_get_type(self_in)));
@@ -643,6 +746,18 @@ static void mp_obj_instance_load_attr(mp_obj_t self_in, qstr attr, mp_obj_t *des
     };
     mp_obj_class_lookup(&lookup, self->base.type);
     mp_obj_t member = dest[0];
+    #if MICROPY_PY_CLASS_SLOTS
+    if (member != MP_OBJ_NULL && (self->base.type->flags & MP_TYPE_FLAG_HAS_SLOTS)) {
+        mp_obj_t *slot = instance_get_slot(self, member);
+        if (slot != NULL) {
+            // An unset slot falls through to __getattr__.
+            member = dest[0] = *slot;
+            if (member != MP_OBJ_NULL) {
+                return;
+            }
+        }
+    }
+    #endif
     if (member != MP_OBJ_NULL) {
         if (!(self->base.type->flags & MP_TYPE_FLAG_HAS_SPECIAL_ACCESSORS)) {
             // Class doesn't have any special accessors to check so return straight away
@@ -830,6 +945,20 @@ static bool mp_obj_instance_store_attr(mp_obj_t self_in, qstr attr, mp_obj_t val
 
 skip_special_accessors:
 
+    #if MICROPY_PY_CLASS_SLOTS
+    {
+        mp_obj_t *slot = mp_obj_instance_lookup_slot(self, attr);
+        if (slot != NULL) {
+            if (value == MP_OBJ_NULL && *slot == MP_OBJ_NULL) {
+                // can't delete an unset slot
+                return false;
+            }
+            *slot = value;
+            return true;
+        }
+    }
+    #endif
+
     if (value == MP_OBJ_NULL) {
         // delete attribute
         mp_map_elem_t *elem = mp_map_lookup(&self->members, MP_OBJ_NEW_QSTR(attr), MP_MAP_LOOKUP_REMOVE_IF_FOUND);
@@ -1211,11 +1340,38 @@ mp_obj_t mp_obj_new_type(qstr name, mp_obj_t bases_tuple, mp_obj_t locals_dict)
         base_protocol = MP_OBJ_TYPE_GET_SLOT_OR_NULL(((mp_obj_type_t *)MP_OBJ_TO_PTR(bases_items[0])), protocol);
     }
 
+    #if MICROPY_PY_CLASS_SLOTS
+    // Find the base (at most one) whose instances carry __slots__ values, and
+    // whether this class declares __slots__ itself.
+    const mp_obj_type_t *slots_base = NULL;
+    for (size_t i = 0; i < bases_len; i++) {
+        const mp_obj_type_t *t = MP_OBJ_TO_PTR(bases_items[i]);
+        if (t->flags & MP_TYPE_FLAG_HAS_SLOTS) {
+            const mp_obj_type_t *t_native_base;
+            if (instance_type_num_subobj(t) > (size_t)instance_count_native_bases(t, &t_native_base)) {
+                if (slots_base != NULL) {
+                    mp_raise_TypeError(MP_ERROR_TEXT("multiple bases have instance lay-out conflict"));
+                }
+                slots_base = t;
+            }
+        }
+    }
+    mp_map_elem_t *slots_elem = mp_map_lookup(&((mp_obj_dict_t *)MP_OBJ_TO_PTR(locals_dict))->map, MP_OBJ_NEW_QSTR(MP_QSTR___slots__), MP_MAP_LOOKUP);
+    bool has_slots = slots_base != NULL || slots_elem != NULL;
+    #endif
+
     // Allocate a variable-sized mp_obj_type_t with as many slots as we need
     // (currently 10, plus 1 for base, plus 1 for base-protocol).
     // Note: mp_obj_type_t is (2 + 3 + #slots) words, so going from 11 to 12 slots
     // moves from 4 to 5 gc blocks.
-    mp_obj_type_t *o = m_new_obj_var0(mp_obj_type_t, slots, void *, 10 + (bases_len ? 1 : 0) + (base_protocol ? 1 : 0));
+    size_t num_type_slots = 10 + (bases_len ? 1 : 0) + (base_protocol ? 1 : 0);
+    #if MICROPY_PY_CLASS_SLOTS
+    if (has_slots) {
+        // Extra entry for the instance layout, see instance_type_num_subobj.
+        num_type_slots += 1;
+    }
+    #endif
+    mp_obj_type_t *o = m_new_obj_var0(mp_obj_type_t, slots, void *, num_type_slots);
     o->base.type = &mp_type_type;
     o->flags = base_flags;
     o->name = name;
@@ -1274,6 +1430,49 @@ mp_obj_t mp_obj_new_type(qstr name, mp_obj_t bases_tuple, mp_obj_t locals_dict)
     }
 
     mp_map_t *locals_map = &MP_OBJ_TYPE_GET_SLOT(o, locals_dict)->map;
+
+    #if MICROPY_PY_CLASS_SLOTS
+    if (has_slots) {
+        // Instances hold any native base object, then the slot values of the
+        // base classes, then those declared here.
+        size_t num_subobj = num_native_bases;
+        if (slots_base != NULL) {
+            const mp_obj_type_t *base_native_base;
+            if ((size_t)instance_count_native_bases(slots_base, &base_native_base) != num_native_bases) {
+                mp_raise_TypeError(MP_ERROR_TEXT("multiple bases have instance lay-out conflict"));
+            }
+            num_subobj = instance_type_num_subobj(slots_base);
+        }
+        if (slots_elem != NULL) {
+            mp_obj_t names = slots_elem->value;
+            if (mp_obj_is_str(names)) {
+                // A single name.
+                names = mp_obj_new_tuple(1, &names);
+            }
+            mp_obj_iter_buf_t iter_buf;
+            mp_obj_t iter = mp_getiter(names, &iter_buf);
+            mp_obj_t name;
+            while ((name = mp_iternext(iter)) != MP_OBJ_STOP_ITERATION) {
+                qstr attr = mp_obj_str_get_qstr(name);
+                // Instances always have a members map, so __dict__ needs no slot.
+                if (attr != MP_QSTR___dict__) {
+                    mp_map_elem_t *elem = mp_map_lookup(locals_map, MP_OBJ_NEW_QSTR(attr), MP_MAP_LOOKUP_ADD_IF_NOT_FOUND);
+                    if (elem->value != MP_OBJ_NULL) {
+                        mp_raise_msg_varg(&mp_type_ValueError, MP_ERROR_TEXT("'%q' in __slots__ conflicts with class variable"), attr);
+                    }
+                    mp_obj_member_t *member = mp_obj_malloc(mp_obj_member_t, &mp_type_member);
+                    member->owner = o;
+                    member->name = attr;
+                    member->index = num_subobj++;
+                    elem->value = MP_OBJ_FROM_PTR(member);
+                }
+            }
+        }
+        o->slots[instance_type_slots_extra_index(o)] = (void *)(uintptr_t)num_subobj;
+        o->flags |= MP_TYPE_FLAG_HAS_SLOTS;
+    }
+    #endif
+
     mp_map_elem_t *elem = mp_map_lookup(locals_map, MP_OBJ_NEW_QSTR(MP_QSTR___new__), MP_MAP_LOOKUP);
     if (elem != NULL) {
         // __new__ slot exists; check if it is a function
@@ -42,6 +42,15 @@ typedef struct _mp_obj_instance_t {
 mp_obj_instance_t *mp_obj_new_instance(const mp_obj_type_t *cls, const mp_obj_type_t **native_base);
 #endif
 
+#if MICROPY_PY_CLASS_SLOTS
+// Returns where self stores the value of attr if attr is one of its class's
+// __slots__, else NULL.  An unset slot holds MP_OBJ_NULL.
+mp_obj_t *mp_obj_instance_lookup_slot(mp_obj_instance_t *self, qstr attr);
+// Fast path for the VM: returns the value of attr if it is a __slots__ entry
+// declared by the class of self itself and is set, else MP_OBJ_NULL.
+mp_obj_t mp_obj_instance_load_slot(mp_obj_t self_in, qstr attr);
+#endif
+
 // these need to be exposed so mp_obj_is_callable can work correctly
 bool mp_obj_instance_is_callable(mp_obj_t self_in);
 mp_obj_t mp_obj_instance_call(mp_obj_t self_in, size_t n_args, size_t n_kw, const mp_obj_t *args);
@@ -354,7 +354,7 @@ bool mp_parse_node_get_int_maybe(mp_parse_node_t pn, mp_obj_t *o) {
     }
 }
 
-#if MICROPY_COMP_CONST_TUPLE || MICROPY_COMP_CONST
+#if MICROPY_COMP_CONST_TUPLE || MICROPY_COMP_CONST || MICROPY_COMP_CONST_FOLDING_EXTENDED
 static bool mp_parse_node_is_const(mp_parse_node_t pn) {
     if (MP_PARSE_NODE_IS_SMALL_INT(pn)) {
         // Small integer.
@@ -426,7 +426,7 @@ static mp_obj_t mp_parse_node_convert_to_obj(mp_parse_node_t pn) {
 
 static bool parse_node_is_const_bool(mp_parse_node_t pn, bool value) {
     // Returns true if 'pn' is a constant whose boolean value is equivalent to 'value'
-    #if MICROPY_COMP_CONST_TUPLE || MICROPY_COMP_CONST
+    #if MICROPY_COMP_CONST_TUPLE || MICROPY_COMP_CONST || MICROPY_COMP_CONST_FOLDING_EXTENDED
     return mp_parse_node_is_const(pn) && mp_obj_is_true(mp_parse_node_convert_to_obj(pn)) == value;
     #else
     return MP_PARSE_NODE_IS_TOKEN_KIND(pn, value ? MP_TOKEN_KW_TRUE : MP_TOKEN_KW_FALSE)
@@ -579,6 +579,22 @@ static mp_parse_node_t make_node_const_object_optimised(parser_t *parser, size_t
         }
         #endif
         return mp_parse_node_new_small_int(val);
+    #if MICROPY_COMP_CONST_FOLDING_EXTENDED
+    } else if (obj == mp_const_none) {
+        return mp_parse_node_new_leaf(MP_PARSE_NODE_TOKEN, MP_TOKEN_KW_NONE);
+    } else if (obj == mp_const_false) {
+        return mp_parse_node_new_leaf(MP_PARSE_NODE_TOKEN, MP_TOKEN_KW_FALSE);
+    } else if (obj == mp_const_true) {
+        return mp_parse_node_new_leaf(MP_PARSE_NODE_TOKEN, MP_TOKEN_KW_TRUE);
+    } else if (mp_obj_is_str(obj)) {
+        // Use a qstr leaf for short strings, like push_result_token does.
+        GET_STR_DATA_LEN(obj, str, len);
+        qstr qst = len <= MICROPY_ALLOC_PARSE_INTERN_STRING_LEN ? qstr_from_strn((const char *)str, len) : qstr_find_strn((const char *)str, len);
+        if (qst != MP_QSTRnull) {
+            return mp_parse_node_new_leaf(MP_PARSE_NODE_STRING, qst);
+        }
+        return make_node_const_object(parser, src_line, obj);
+    #endif
     } else {
         return make_node_const_object(parser, src_line, obj);
     }
@@ -891,6 +907,194 @@ static bool fold_constants(parser_t *parser, uint8_t rule_id, size_t num_args) {
     return true;
 }
 
+#if MICROPY_COMP_CONST_FOLDING_EXTENDED
+
+// Floats are only folded when compiling for the running system: a cross
+// compiler may have a different float precision to the target, and the repr
+// stored in a .mpy file does not round-trip every double.
+#define FOLD_FLOAT (MICROPY_PY_BUILTINS_FLOAT && !MICROPY_DYNAMIC_COMPILER)
+
+// Folding must not make a str, bytes or tuple longer than this.
+#define FOLD_MAX_SEQ_LEN (256)
+
+static bool fold_obj_is_number(mp_obj_t o) {
+    #if FOLD_FLOAT
+    if (mp_obj_is_float(o)) {
+        return true;
+    }
+    #endif
+    return mp_obj_is_int(o);
+}
+
+static bool fold_obj_is_seq(mp_obj_t o) {
+    return mp_obj_is_str(o) || mp_obj_is_type(o, &mp_type_bytes) || mp_obj_is_type(o, &mp_type_tuple);
+}
+
+static size_t fold_obj_len(mp_obj_t o) {
+    return MP_OBJ_SMALL_INT_VALUE(mp_obj_len(o));
+}
+
+// Get the constant value of a node, if it's of a type that folding supports.
+static bool fold_get_operand(mp_parse_node_t pn, mp_obj_t *o) {
+    if (!mp_parse_node_is_const(pn)) {
+        return false;
+    }
+    *o = mp_parse_node_convert_to_obj(pn);
+    return fold_obj_is_number(*o) || fold_obj_is_seq(*o);
+}
+
+// Get the constant value of a node for a comparison, which also supports
+// None, False and True.
+static bool fold_get_compare_operand(mp_parse_node_t pn, mp_obj_t *o) {
+    if (!mp_parse_node_is_const(pn)) {
+        return false;
+    }
+    *o = mp_parse_node_convert_to_obj(pn);
+    return fold_obj_is_number(*o) || fold_obj_is_seq(*o) || *o == mp_const_none || mp_obj_is_bool(*o);
+}
+
+// Whether the binary op can be done now: it must not raise an exception and
+// must not create an unreasonably large object.
+static bool fold_binary_op_allowed(mp_binary_op_t op, mp_obj_t lhs, mp_obj_t rhs) {
+    if (fold_obj_is_number(lhs) && fold_obj_is_number(rhs)) {
+        switch (op) {
+            case MP_BINARY_OP_ADD:
+            case MP_BINARY_OP_SUBTRACT:
+            case MP_BINARY_OP_MULTIPLY:
+                return true;
+            case MP_BINARY_OP_FLOOR_DIVIDE:
+            case MP_BINARY_OP_MODULO:
+                return mp_obj_is_true(rhs);
+            #if FOLD_FLOAT
+            // These are only folded if an operand is already a float, so that
+            // eg const(1 / 2) remains an error.
+            case MP_BINARY_OP_TRUE_DIVIDE:
+                return (mp_obj_is_float(lhs) || mp_obj_is_float(rhs)) && mp_obj_is_true(rhs);
+            case MP_BINARY_OP_POWER:
+                // A negative or zero base may give a complex result or raise.
+                return (mp_obj_is_float(lhs) || mp_obj_is_float(rhs)) && mp_obj_get_float(lhs) > 0;
+            #endif
+            default:
+                return false;
+        }
+    }
+    if (op == MP_BINARY_OP_ADD && fold_obj_is_seq(lhs) && mp_obj_get_type(lhs) == mp_obj_get_type(rhs)) {
+        return fold_obj_len(lhs) + fold_obj_len(rhs) <= FOLD_MAX_SEQ_LEN;
+    }
+    if (op == MP_BINARY_OP_MULTIPLY) {
+        if (mp_obj_is_small_int(lhs)) {
+            mp_obj_t temp = lhs;
+            lhs = rhs;
+            rhs = temp;
+        }
+        if (fold_obj_is_seq(lhs) && mp_obj_is_small_int(rhs)) {
+            mp_int_t n = MP_OBJ_SMALL_INT_VALUE(rhs);
+            return n <= 0 || (size_t)n <= FOLD_MAX_SEQ_LEN / MAX(fold_obj_len(lhs), 1);
+        }
+    }
+    return false;
+}
+
+// Whether the comparison can be done now without raising an exception.
+static bool fold_compare_allowed(mp_binary_op_t op, mp_obj_t lhs, mp_obj_t rhs) {
+    switch (op) {
+        case MP_BINARY_OP_EQUAL:
+        case MP_BINARY_OP_NOT_EQUAL:
+            return true;
+        case MP_BINARY_OP_IN:
+            return mp_obj_is_type(rhs, &mp_type_tuple) || (fold_obj_is_seq(rhs) && mp_obj_get_type(lhs) == mp_obj_get_type(rhs));
+        default:
+            return (fold_obj_is_number(lhs) && fold_obj_is_number(rhs))
+                   || (fold_obj_is_seq(lhs) && !mp_obj_is_type(lhs, &mp_type_tuple) && mp_obj_get_type(lhs) == mp_obj_get_type(rhs));
+    }
+}
+
+static bool fold_constants_extended(parser_t *parser, uint8_t rule_id, size_t num_args) {
+    // this code does folding of the constant expressions that fold_constants
+    // does not: floats, str/bytes/tuple operations and comparisons
+
+    mp_parse_node_t pn_result;
+    if (rule_id == RULE_arith_expr
+        || rule_id == RULE_term
+        || rule_id == RULE_power) {
+        // folding for binary ops: + - * / // % **
+        mp_obj_t arg0;
+        if (!fold_get_operand(peek_result(parser, num_args - 1), &arg0)) {
+            return false;
+        }
+        // the power rule has no operator tokens
+        size_t step = rule_id == RULE_power ? 1 : 2;
+        for (ssize_t i = num_args - 1 - step; i >= 0; i -= step) {
+            mp_obj_t arg1;
+            if (!fold_get_operand(peek_result(parser, i), &arg1)) {
+                return false;
+            }
+            mp_binary_op_t op = MP_BINARY_OP_POWER;
+            if (rule_id != RULE_power) {
+                mp_token_kind_t tok = MP_PARSE_NODE_LEAF_ARG(peek_result(parser, i + 1));
+                op = MP_BINARY_OP_LSHIFT + (tok - MP_TOKEN_OP_DBL_LESS);
+            }
+            if (!fold_binary_op_allowed(op, arg0, arg1)) {
+                return false;
+            }
+            arg0 = mp_binary_op(op, arg0, arg1);
+        }
+        pn_result = make_node_const_object_optimised(parser, 0, arg0);
+    #if FOLD_FLOAT
+    } else if (rule_id == RULE_factor_2) {
+        // folding for unary ops on floats: + -
+        mp_obj_t arg0;
+        mp_token_kind_t tok = MP_PARSE_NODE_LEAF_ARG(peek_result(parser, 1));
+        if (tok == MP_TOKEN_OP_TILDE
+            || !fold_get_operand(peek_result(parser, 0), &arg0)
+            || !mp_obj_is_float(arg0)) {
+            return false;
+        }
+        arg0 = mp_unary_op(MP_UNARY_OP_POSITIVE + (tok - MP_TOKEN_OP_PLUS), arg0);
+        pn_result = make_node_const_object(parser, 0, arg0);
+    #endif
+    } else if (rule_id == RULE_comparison) {
+        // folding for comparisons: < > == <= >= != in
+        mp_obj_t arg0;
+        if (!fold_get_compare_operand(peek_result(parser, num_args - 1), &arg0)) {
+            return false;
+        }
+        bool result = true;
+        for (ssize_t i = num_args - 2; i >= 1; i -= 2) {
+            mp_parse_node_t pn_op = peek_result(parser, i);
+            mp_obj_t arg1;
+            if (!MP_PARSE_NODE_IS_TOKEN(pn_op)
+                || !fold_get_compare_operand(peek_result(parser, i - 1), &arg1)) {
+                // "not in", "is" and "is not" are not folded
+                return false;
+            }
+            mp_token_kind_t tok = MP_PARSE_NODE_LEAF_ARG(pn_op);
+            mp_binary_op_t op = tok == MP_TOKEN_KW_IN ? MP_BINARY_OP_IN : MP_BINARY_OP_LESS + (tok - MP_TOKEN_OP_LESS);
+            if (!fold_compare_allowed(op, arg0, arg1)) {
+                return false;
+            }
+            if (result) {
+                result = mp_obj_is_true(mp_binary_op(op, arg0, arg1));
+            }
+            arg0 = arg1;
+        }
+        pn_result = mp_parse_node_new_leaf(MP_PARSE_NODE_TOKEN, result ? MP_TOKEN_KW_TRUE : MP_TOKEN_KW_FALSE);
+    } else {
+        return false;
+    }
+
+    // success folding this rule
+
+    for (size_t i = num_args; i > 0; i--) {
+        pop_result(parser);
+    }
+    push_result_node(parser, pn_result);
+
+    return true;
+}
+
+#endif // MICROPY_COMP_CONST_FOLDING_EXTENDED
+
 #endif // MICROPY_COMP_CONST_FOLDING
 
 #if MICROPY_COMP_CONST_TUPLE
@@ -1000,6 +1204,12 @@ static void push_result_rule(parser_t *parser, size_t src_line, uint8_t rule_id,
         // we folded this rule so return straight away
         return;
     }
+    #if MICROPY_COMP_CONST_FOLDING_EXTENDED
+    if (fold_constants_extended(parser, rule_id, num_args)) {
+        // we folded this rule so return straight away
+        return;
+    }
+    #endif
     #endif
 
     #if MICROPY_COMP_CONST_TUPLE
@@ -1022,89 +1232,32 @@ static void push_result_rule(parser_t *parser, size_t src_line, uint8_t rule_id,
     push_result_node(parser, (mp_parse_node_t)pn);
 }
 
-mp_parse_tree_t mp_parse(mp_lexer_t *lex, mp_parse_input_kind_t input_kind) {
-    // Set exception handler to free the lexer if an exception is raised.
-    MP_DEFINE_NLR_JUMP_CALLBACK_FUNCTION_1(ctx, mp_lexer_free, lex);
-    nlr_push_jump_callback(&ctx.callback, mp_call_function_1_from_nlr_jump_callback);
-
-    // initialise parser and allocate memory for its stacks
-
-    parser_t parser;
-
-    parser.rule_stack_alloc = MICROPY_ALLOC_PARSE_RULE_INIT;
-    parser.rule_stack_top = 0;
-    // CIRCUITPY-CHANGE: make parsing more memory flexible
-    // https://github.com/adafruit/circuitpython/pull/552
-    parser.rule_stack = NULL;
-    while (parser.rule_stack_alloc > 1) {
-        parser.rule_stack = m_new_maybe(rule_stack_t, parser.rule_stack_alloc);
-        if (parser.rule_stack != NULL) {
-            break;
-        } else {
-            parser.rule_stack_alloc /= 2;
-        }
-    }
-
-    parser.result_stack_alloc = MICROPY_ALLOC_PARSE_RESULT_INIT;
-    parser.result_stack_top = 0;
-    parser.result_stack = NULL;
-    while (parser.result_stack_alloc > 1) {
-        parser.result_stack = m_new_maybe(mp_parse_node_t, parser.result_stack_alloc);
-        if (parser.result_stack != NULL) {
-            break;
-        } else {
-            parser.result_stack_alloc /= 2;
-        }
-    }
-    if (parser.rule_stack == NULL || parser.result_stack == NULL) {
-        mp_raise_msg(&mp_type_MemoryError, MP_ERROR_TEXT("Unable to init parser"));
-    }
-
-    parser.lexer = lex;
-
-    parser.tree.chunk = NULL;
-    parser.cur_chunk = NULL;
-
-    #if MICROPY_COMP_CONST
-    mp_map_init(&parser.consts, 0);
-    #endif
-
-    // work out the top-level rule to use, and push it on the stack
-    size_t top_level_rule;
-    switch (input_kind) {
-        case MP_PARSE_SINGLE_INPUT:
-            top_level_rule = RULE_single_input;
-            break;
-        case MP_PARSE_EVAL_INPUT:
-            top_level_rule = RULE_eval_input;
-            break;
-        default:
-            top_level_rule = RULE_file_input;
-    }
-    push_rule(&parser, lex->tok_line, top_level_rule, 0);
-
-    // parse!
+// Parse the given rule, starting at the current token of the lexer, and leave
+// the resulting node on the result stack.  Returns false on a syntax error.
+static bool parse_rule(parser_t *parser, size_t top_level_rule, mp_parse_input_kind_t input_kind) {
+    mp_lexer_t *lex = parser->lexer;
+    push_rule(parser, lex->tok_line, top_level_rule, 0);
 
     bool backtrack = false;
 
     for (;;) {
     next_rule:
-        if (parser.rule_stack_top == 0) {
+        if (parser->rule_stack_top == 0) {
             break;
         }
 
         // Pop the next rule to process it
         size_t i; // state for the current rule
         size_t rule_src_line; // source line for the first token matched by the current rule
-        uint8_t rule_id = pop_rule(&parser, &i, &rule_src_line);
+        uint8_t rule_id = pop_rule(parser, &i, &rule_src_line);
         uint8_t rule_act = rule_act_table[rule_id];
         const uint16_t *rule_arg = get_rule_arg(rule_id);
         size_t n = rule_act & RULE_ACT_ARG_MASK;
 
         #if 0
         // debugging
-        printf("depth=" UINT_FMT " ", parser.rule_stack_top);
-        for (int j = 0; j < parser.rule_stack_top; ++j) {
+        printf("depth=" UINT_FMT " ", parser->rule_stack_top);
+        for (int j = 0; j < parser->rule_stack_top; ++j) {
             printf(" ");
         }
         printf("%s n=" UINT_FMT " i=" UINT_FMT " bt=%d\n", rule_name_table[rule_id], n, i, backtrack);
@@ -1121,16 +1274,16 @@ mp_parse_tree_t mp_parse(mp_lexer_t *lex, mp_parse_input_kind_t input_kind) {
                     uint16_t kind = rule_arg[i] & RULE_ARG_KIND_MASK;
                     if (kind == RULE_ARG_TOK) {
                         if (lex->tok_kind == (rule_arg[i] & RULE_ARG_ARG_MASK)) {
-                            push_result_token(&parser, rule_id);
+                            push_result_token(parser, rule_id);
                             mp_lexer_to_next(lex);
                             goto next_rule;
                         }
                     } else {
                         assert(kind == RULE_ARG_RULE);
                         if (i + 1 < n) {
-                            push_rule(&parser, rule_src_line, rule_id, i + 1); // save this or-rule
+                            push_rule(parser, rule_src_line, rule_id, i + 1); // save this or-rule
                         }
-                        push_rule_from_arg(&parser, rule_arg[i]); // push child of or-rule
+                        push_rule_from_arg(parser, rule_arg[i]); // push child of or-rule
                         goto next_rule;
                     }
                 }
@@ -1144,13 +1297,13 @@ mp_parse_tree_t mp_parse(mp_lexer_t *lex, mp_parse_input_kind_t input_kind) {
                     assert(i > 0);
                     if ((rule_arg[i - 1] & RULE_ARG_KIND_MASK) == RULE_ARG_OPT_RULE) {
                         // an optional rule that failed, so continue with next arg
-                        push_result_node(&parser, MP_PARSE_NODE_NULL);
+                        push_result_node(parser, MP_PARSE_NODE_NULL);
                         backtrack = false;
                     } else {
                         // a mandatory rule that failed, so propagate backtrack
                         if (i > 1) {
                             // already eaten tokens so can't backtrack
-                            goto syntax_error;
+                            return false;
                         } else {
                             goto next_rule;
                         }
@@ -1165,14 +1318,14 @@ mp_parse_tree_t mp_parse(mp_lexer_t *lex, mp_parse_input_kind_t input_kind) {
                         if (lex->tok_kind == tok_kind) {
                             // matched token
                             if (tok_kind == MP_TOKEN_NAME) {
-                                push_result_token(&parser, rule_id);
+                                push_result_token(parser, rule_id);
                             }
                             mp_lexer_to_next(lex);
                         } else {
                             // failed to match token
                             if (i > 0) {
                                 // already eaten tokens so can't backtrack
-                                goto syntax_error;
+                                return false;
                             } else {
                                 // this rule failed, so backtrack
                                 backtrack = true;
@@ -1180,8 +1333,8 @@ mp_parse_tree_t mp_parse(mp_lexer_t *lex, mp_parse_input_kind_t input_kind) {
                             }
                         }
                     } else {
-                        push_rule(&parser, rule_src_line, rule_id, i + 1); // save this and-rule
-                        push_rule_from_arg(&parser, rule_arg[i]); // push child of and-rule
+                        push_rule(parser, rule_src_line, rule_id, i + 1); // save this and-rule
+                        push_rule_from_arg(parser, rule_arg[i]); // push child of and-rule
                         goto next_rule;
                     }
                 }
@@ -1192,16 +1345,16 @@ mp_parse_tree_t mp_parse(mp_lexer_t *lex, mp_parse_input_kind_t input_kind) {
 
                 #if !MICROPY_ENABLE_DOC_STRING
                 // this code discards lonely statements, such as doc strings
-                if (input_kind != MP_PARSE_SINGLE_INPUT && rule_id == RULE_expr_stmt && peek_result(&parser, 0) == MP_PARSE_NODE_NULL) {
-                    mp_parse_node_t p = peek_result(&parser, 1);
+                if (input_kind != MP_PARSE_SINGLE_INPUT && rule_id == RULE_expr_stmt && peek_result(parser, 0) == MP_PARSE_NODE_NULL) {
+                    mp_parse_node_t p = peek_result(parser, 1);
                     if ((MP_PARSE_NODE_IS_LEAF(p) && !MP_PARSE_NODE_IS_ID(p))
                         || MP_PARSE_NODE_IS_STRUCT_KIND(p, RULE_const_object)) {
-                        pop_result(&parser); // MP_PARSE_NODE_NULL
-                        pop_result(&parser); // const expression (leaf or RULE_const_object)
+                        pop_result(parser); // MP_PARSE_NODE_NULL
+                        pop_result(parser); // const expression (leaf or RULE_const_object)
                         // Pushing the "pass" rule here will overwrite any RULE_const_object
                         // entry that was on the result stack, allowing the GC to reclaim
                         // the memory from the const object when needed.
-                        push_result_rule(&parser, rule_src_line, RULE_pass_stmt, 0);
+                        push_result_rule(parser, rule_src_line, RULE_pass_stmt, 0);
                         break;
                     }
                 }
@@ -1221,7 +1374,7 @@ mp_parse_tree_t mp_parse(mp_lexer_t *lex, mp_parse_input_kind_t input_kind) {
                         }
                     } else {
                         // rules are always pushed
-                        if (peek_result(&parser, i) != MP_PARSE_NODE_NULL) {
+                        if (peek_result(parser, i) != MP_PARSE_NODE_NULL) {
                             num_not_nil += 1;
                         }
                         i += 1;
@@ -1232,22 +1385,22 @@ mp_parse_tree_t mp_parse(mp_lexer_t *lex, mp_parse_input_kind_t input_kind) {
                     // this rule has only 1 argument and should not be emitted
                     mp_parse_node_t pn = MP_PARSE_NODE_NULL;
                     for (size_t x = 0; x < i; ++x) {
-                        mp_parse_node_t pn2 = pop_result(&parser);
+                        mp_parse_node_t pn2 = pop_result(parser);
                         if (pn2 != MP_PARSE_NODE_NULL) {
                             pn = pn2;
                         }
                     }
-                    push_result_node(&parser, pn);
+                    push_result_node(parser, pn);
                 } else {
                     // this rule must be emitted
 
                     if (rule_act & RULE_ACT_ADD_BLANK) {
                         // and add an extra blank node at the end (used by the compiler to store data)
-                        push_result_node(&parser, MP_PARSE_NODE_NULL);
+                        push_result_node(parser, MP_PARSE_NODE_NULL);
                         i += 1;
                     }
 
-                    push_result_rule(&parser, rule_src_line, rule_id, i);
+                    push_result_rule(parser, rule_src_line, rule_id, i);
                 }
                 break;
             }
@@ -1282,7 +1435,7 @@ mp_parse_tree_t mp_parse(mp_lexer_t *lex, mp_parse_input_kind_t input_kind) {
                                 backtrack = false;
                             } else {
                                 // list doesn't allowing trailing separator; fail
-                                goto syntax_error;
+                                return false;
                             }
                         } else {
                             // fail on separator; finish parsing list
@@ -1297,7 +1450,7 @@ mp_parse_tree_t mp_parse(mp_lexer_t *lex, mp_parse_input_kind_t input_kind) {
                                 if (i & 1 & n) {
                                     // separators which are tokens are not pushed to result stack
                                 } else {
-                                    push_result_token(&parser, rule_id);
+                                    push_result_token(parser, rule_id);
                                 }
                                 mp_lexer_to_next(lex);
                                 // got element of list, so continue parsing list
@@ -1310,8 +1463,8 @@ mp_parse_tree_t mp_parse(mp_lexer_t *lex, mp_parse_input_kind_t input_kind) {
                             }
                         } else {
                             assert((arg & RULE_ARG_KIND_MASK) == RULE_ARG_RULE);
-                            push_rule(&parser, rule_src_line, rule_id, i + 1); // save this list-rule
-                            push_rule_from_arg(&parser, arg); // push child of list-rule
+                            push_rule(parser, rule_src_line, rule_id, i + 1); // save this list-rule
+                            push_rule_from_arg(parser, arg); // push child of list-rule
                             goto next_rule;
                         }
                     }
@@ -1329,74 +1482,206 @@ mp_parse_tree_t mp_parse(mp_lexer_t *lex, mp_parse_input_kind_t input_kind) {
                     // list matched single item
                     if (had_trailing_sep) {
                         // if there was a trailing separator, make a list of a single item
-                        push_result_rule(&parser, rule_src_line, rule_id, i);
+                        push_result_rule(parser, rule_src_line, rule_id, i);
                     } else {
                         // just leave single item on stack (ie don't wrap in a list)
                     }
                 } else {
-                    push_result_rule(&parser, rule_src_line, rule_id, i);
+                    push_result_rule(parser, rule_src_line, rule_id, i);
                 }
                 break;
             }
         }
     }
 
+    return !backtrack;
+}
+
+static void parser_init(parser_t *parser, mp_lexer_t *lex) {
+    parser->rule_stack_alloc = MICROPY_ALLOC_PARSE_RULE_INIT;
+    parser->rule_stack_top = 0;
+    // CIRCUITPY-CHANGE: make parsing more memory flexible
+    // https://github.com/adafruit/circuitpython/pull/552
+    parser->rule_stack = NULL;
+    while (parser->rule_stack_alloc > 1) {
+        parser->rule_stack = m_new_maybe(rule_stack_t, parser->rule_stack_alloc);
+        if (parser->rule_stack != NULL) {
+            break;
+        } else {
+            parser->rule_stack_alloc /= 2;
+        }
+    }
+
+    parser->result_stack_alloc = MICROPY_ALLOC_PARSE_RESULT_INIT;
+    parser->result_stack_top = 0;
+    parser->result_stack = NULL;
+    while (parser->result_stack_alloc > 1) {
+        parser->result_stack = m_new_maybe(mp_parse_node_t, parser->result_stack_alloc);
+        if (parser->result_stack != NULL) {
+            break;
+        } else {
+            parser->result_stack_alloc /= 2;
+        }
+    }
+    if (parser->rule_stack == NULL || parser->result_stack == NULL) {
+        mp_raise_msg(&mp_type_MemoryError, MP_ERROR_TEXT("Unable to init parser"));
+    }
+
+    parser->lexer = lex;
+
+    parser->tree.chunk = NULL;
+    parser->cur_chunk = NULL;
+
     #if MICROPY_COMP_CONST
-    mp_map_deinit(&parser.consts);
+    mp_map_init(&parser->consts, 0);
     #endif
+}
 
-    // truncate final chunk and link into chain of chunks
-    if (parser.cur_chunk != NULL) {
-        (void)m_renew_maybe(byte, parser.cur_chunk,
-            sizeof(mp_parse_chunk_t) + parser.cur_chunk->alloc,
-            sizeof(mp_parse_chunk_t) + parser.cur_chunk->union_.used,
+static void parser_deinit(parser_t *parser) {
+    #if MICROPY_COMP_CONST
+    mp_map_deinit(&parser->consts);
+    #endif
+
+    // free the memory that we don't need anymore
+    m_del(rule_stack_t, parser->rule_stack, parser->rule_stack_alloc);
+    m_del(mp_parse_node_t, parser->result_stack, parser->result_stack_alloc);
+}
+
+// Truncate the final chunk, link it into the chain of chunks of the current
+// tree, and take the root node off the result stack.
+static mp_parse_tree_t parser_take_tree(parser_t *parser) {
+    if (parser->cur_chunk != NULL) {
+        (void)m_renew_maybe(byte, parser->cur_chunk,
+            sizeof(mp_parse_chunk_t) + parser->cur_chunk->alloc,
+            sizeof(mp_parse_chunk_t) + parser->cur_chunk->union_.used,
             false);
-        parser.cur_chunk->alloc = parser.cur_chunk->union_.used;
-        parser.cur_chunk->union_.next = parser.tree.chunk;
-        parser.tree.chunk = parser.cur_chunk;
+        parser->cur_chunk->alloc = parser->cur_chunk->union_.used;
+        parser->cur_chunk->union_.next = parser->tree.chunk;
+        parser->tree.chunk = parser->cur_chunk;
     }
 
-    if (
-        lex->tok_kind != MP_TOKEN_END // check we are at the end of the token stream
+    assert(parser->result_stack_top == 1);
+    parser->tree.root = pop_result(parser);
+
+    mp_parse_tree_t tree = parser->tree;
+    parser->tree.chunk = NULL;
+    parser->cur_chunk = NULL;
+    return tree;
+}
+
+static NORETURN void parser_raise_syntax_error(mp_lexer_t *lex) {
+    mp_obj_t exc;
+    if (lex->tok_kind == MP_TOKEN_INDENT) {
+        exc = mp_obj_new_exception_msg(&mp_type_IndentationError,
+            MP_ERROR_TEXT("unexpected indent"));
+    } else if (lex->tok_kind == MP_TOKEN_DEDENT_MISMATCH) {
+        exc = mp_obj_new_exception_msg(&mp_type_IndentationError,
+            MP_ERROR_TEXT("unindent doesn't match any outer indent level"));
+    #if MICROPY_PY_FSTRINGS
+    } else if (lex->tok_kind == MP_TOKEN_MALFORMED_FSTRING) {
+        exc = mp_obj_new_exception_msg(&mp_type_SyntaxError,
+            MP_ERROR_TEXT("malformed f-string"));
+    #endif
+    } else {
+        exc = mp_obj_new_exception_msg(&mp_type_SyntaxError,
+            MP_ERROR_TEXT("invalid syntax"));
+    }
+    // add traceback to give info about file name and location
+    // we don't have a 'block' name, so just pass the NULL qstr to indicate this
+    mp_obj_exception_add_traceback(exc, lex->source_name, lex->tok_line, MP_QSTRnull);
+    nlr_raise(exc);
+}
+
+mp_parse_tree_t mp_parse(mp_lexer_t *lex, mp_parse_input_kind_t input_kind) {
+    // Set exception handler to free the lexer if an exception is raised.
+    MP_DEFINE_NLR_JUMP_CALLBACK_FUNCTION_1(ctx, mp_lexer_free, lex);
+    nlr_push_jump_callback(&ctx.callback, mp_call_function_1_from_nlr_jump_callback);
+
+    // initialise parser and allocate memory for its stacks
+    parser_t parser;
+    parser_init(&parser, lex);
+
+    // work out the top-level rule to use
+    size_t top_level_rule;
+    switch (input_kind) {
+        case MP_PARSE_SINGLE_INPUT:
+            top_level_rule = RULE_single_input;
+            break;
+        case MP_PARSE_EVAL_INPUT:
+            top_level_rule = RULE_eval_input;
+            break;
+        default:
+            top_level_rule = RULE_file_input;
+    }
+
+    // parse!
+    if (!parse_rule(&parser, top_level_rule, input_kind)
+        || lex->tok_kind != MP_TOKEN_END // check we are at the end of the token stream
         || parser.result_stack_top == 0 // check that we got a node (can fail on empty input)
         ) {
-    syntax_error:;
-        mp_obj_t exc;
-        if (lex->tok_kind == MP_TOKEN_INDENT) {
-            exc = mp_obj_new_exception_msg(&mp_type_IndentationError,
-                MP_ERROR_TEXT("unexpected indent"));
-        } else if (lex->tok_kind == MP_TOKEN_DEDENT_MISMATCH) {
-            exc = mp_obj_new_exception_msg(&mp_type_IndentationError,
-                MP_ERROR_TEXT("unindent doesn't match any outer indent level"));
-        #if MICROPY_PY_FSTRINGS
-        } else if (lex->tok_kind == MP_TOKEN_MALFORMED_FSTRING) {
-            exc = mp_obj_new_exception_msg(&mp_type_SyntaxError,
-                MP_ERROR_TEXT("malformed f-string"));
-        #endif
-        } else {
-            exc = mp_obj_new_exception_msg(&mp_type_SyntaxError,
-                MP_ERROR_TEXT("invalid syntax"));
-        }
-        // add traceback to give info about file name and location
-        // we don't have a 'block' name, so just pass the NULL qstr to indicate this
-        mp_obj_exception_add_traceback(exc, lex->source_name, lex->tok_line, MP_QSTRnull);
-        nlr_raise(exc);
+        parser_raise_syntax_error(lex);
     }
 
     // get the root parse node that we created
-    assert(parser.result_stack_top == 1);
-    parser.tree.root = parser.result_stack[0];
-
-    // free the memory that we don't need anymore
-    m_del(rule_stack_t, parser.rule_stack, parser.rule_stack_alloc);
-    m_del(mp_parse_node_t, parser.result_stack, parser.result_stack_alloc);
+    mp_parse_tree_t tree = parser_take_tree(&parser);
+    parser_deinit(&parser);
 
     // Deregister exception handler and free the lexer.
     nlr_pop_jump_callback(true);
 
-    return parser.tree;
+    return tree;
+}
+
+#if MICROPY_PARSE_STREAMING
+
+void mp_parse_file_streaming(mp_lexer_t *lex, mp_parse_stmt_fun_t stmt_fun, void *data) {
+    // Set exception handler to free the lexer if an exception is raised.
+    MP_DEFINE_NLR_JUMP_CALLBACK_FUNCTION_1(ctx, mp_lexer_free, lex);
+    nlr_push_jump_callback(&ctx.callback, mp_call_function_1_from_nlr_jump_callback);
+
+    parser_t parser;
+    parser_init(&parser, lex);
+
+    // This follows the file_input rule, but hands each statement to the caller
+    // as soon as it is parsed.  Parser state such as constants defined with
+    // const() carries over from one statement to the next.
+    bool first_stmt = true;
+    for (;;) {
+        while (lex->tok_kind == MP_TOKEN_NEWLINE) {
+            mp_lexer_to_next(lex);
+        }
+        if (lex->tok_kind == MP_TOKEN_END) {
+            break;
+        }
+        if (!parse_rule(&parser, RULE_stmt, MP_PARSE_FILE_INPUT)) {
+            parser_raise_syntax_error(lex);
+        }
+        mp_parse_tree_t tree = parser_take_tree(&parser);
+
+        // A lone string after the first statement has no effect, and would
+        // otherwise be taken by the compiler as the module's doc string.
+        bool is_doc_string = false;
+        if (!first_stmt && MP_PARSE_NODE_IS_STRUCT_KIND(tree.root, RULE_expr_stmt)) {
+            mp_parse_node_struct_t *pns = (mp_parse_node_struct_t *)tree.root;
+            is_doc_string = pns->nodes[1] == MP_PARSE_NODE_NULL
+                && ((MP_PARSE_NODE_IS_LEAF(pns->nodes[0]) && !MP_PARSE_NODE_IS_ID(pns->nodes[0]))
+                    || MP_PARSE_NODE_IS_STRUCT_KIND(pns->nodes[0], RULE_const_object));
+        }
+        if (!is_doc_string) {
+            stmt_fun(&tree, data);
+        }
+        mp_parse_tree_clear(&tree);
+        first_stmt = false;
+    }
+
+    parser_deinit(&parser);
+
+    // Deregister exception handler and free the lexer.
+    nlr_pop_jump_callback(true);
 }
 
+#endif // MICROPY_PARSE_STREAMING
+
 void mp_parse_tree_clear(mp_parse_tree_t *tree) {
     mp_parse_chunk_t *chunk = tree->chunk;
     while (chunk != NULL) {
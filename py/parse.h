@@ -113,4 +113,13 @@ typedef struct _mp_parse_t {
 mp_parse_tree_t mp_parse(struct _mp_lexer_t *lex, mp_parse_input_kind_t input_kind);
 void mp_parse_tree_clear(mp_parse_tree_t *tree);
 
+#if MICROPY_PARSE_STREAMING
+typedef void (*mp_parse_stmt_fun_t)(mp_parse_tree_t *tree, void *data);
+
+// Parse file input one top-level statement at a time, passing the parse tree of
+// each statement to stmt_fun; the tree is freed once stmt_fun returns.
+// The parser will free the lexer before it returns.
+void mp_parse_file_streaming(struct _mp_lexer_t *lex, mp_parse_stmt_fun_t stmt_fun, void *data);
+#endif
+
 #endif // MICROPY_INCLUDED_PY_PARSE_H
@@ -53,6 +53,14 @@
 #define MPY_FEATURE_ARCH_DYNAMIC MPY_FEATURE_ARCH
 #endif
 
+#if MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS && MICROPY_DYNAMIC_COMPILER
+#define MPY_VERSION_DYNAMIC (MPY_VERSION | (mp_dynamic_compiler.superinstructions ? MPY_VERSION_FLAG_SUPERINSTRUCTIONS : 0))
+#elif MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS
+#define MPY_VERSION_DYNAMIC (MPY_VERSION | MPY_VERSION_FLAG_SUPERINSTRUCTIONS)
+#else
+#define MPY_VERSION_DYNAMIC (MPY_VERSION)
+#endif
+
 typedef struct _bytecode_prelude_t {
     uint n_state;
     uint n_exc_stack;
@@ -189,7 +197,7 @@ static qstr load_qstr(mp_reader_t *reader) {
     }
     len >>= 1;
 
-    #if MICROPY_VFS_ROM
+    #if MICROPY_PERSISTENT_CODE_LOAD_MEMMAP
     // If possible, create the qstr from the memory-mapped string data.
     const uint8_t *memmap = mp_reader_try_read_rom(reader, len + 1);
     if (memmap != NULL) {
@@ -205,7 +213,7 @@ static qstr load_qstr(mp_reader_t *reader) {
     return qst;
 }
 
-#if MICROPY_VFS_ROM
+#if MICROPY_PERSISTENT_CODE_LOAD_MEMMAP
 // Create a str/bytes object that can forever reference the given data.
 static mp_obj_t mp_obj_new_str_static(const mp_obj_type_t *type, const byte *data, size_t len) {
     if (type == &mp_type_str) {
@@ -256,7 +264,7 @@ static mp_obj_t load_obj(mp_reader_t *reader) {
         // Read in the object's data, either from ROM or into RAM.
         const uint8_t *memmap = NULL;
         vstr_t vstr;
-        #if MICROPY_VFS_ROM
+        #if MICROPY_PERSISTENT_CODE_LOAD_MEMMAP
         memmap = mp_reader_try_read_rom(reader, len);
         vstr.buf = (void *)memmap;
         vstr.len = len;
@@ -270,7 +278,7 @@ static mp_obj_t load_obj(mp_reader_t *reader) {
         // Create and return the object.
         if (obj_type == MP_PERSISTENT_OBJ_STR || obj_type == MP_PERSISTENT_OBJ_BYTES) {
             read_byte(reader); // skip null terminator (it needs to be there for ROM str objects)
-            #if MICROPY_VFS_ROM
+            #if MICROPY_PERSISTENT_CODE_LOAD_MEMMAP
             if (memmap != NULL) {
                 // Create a str/bytes that references the memory-mapped data.
                 const mp_obj_type_t *t = obj_type == MP_PERSISTENT_OBJ_STR ? &mp_type_str : &mp_type_bytes;
@@ -291,6 +299,150 @@ static mp_obj_t load_obj(mp_reader_t *reader) {
     }
 }
 
+#if MICROPY_PERSISTENT_CODE_LOAD_LAZY
+
+#include "py/builtin.h"
+#include "py/stream.h"
+#if MICROPY_VFS
+#include "extmod/vfs.h"
+#endif
+
+#if MICROPY_PY_SYS_SETTRACE
+#error "MICROPY_PERSISTENT_CODE_LOAD_LAZY is not compatible with MICROPY_PY_SYS_SETTRACE"
+#endif
+
+// A reader that wraps a file reader and keeps track of the offset into the file,
+// so that the bytecode of functions can be skipped and read in later.
+typedef struct _lazy_reader_t {
+    mp_reader_t reader;
+    qstr filename;
+    size_t pos;
+    bool allow_lazy;
+} lazy_reader_t;
+
+static mp_uint_t lazy_reader_readbyte(void *data) {
+    lazy_reader_t *lr = data;
+    ++lr->pos;
+    return lr->reader.readbyte(lr->reader.data);
+}
+
+static void lazy_reader_close(void *data) {
+    lazy_reader_t *lr = data;
+    lr->reader.close(lr->reader.data);
+}
+
+static uint32_t lazy_hash_update(uint32_t hash, byte b) {
+    return (hash * 33) ^ b;
+}
+
+// Skip over the bytecode of a function, returning a description of where to find
+// it later and the scope flags from its signature.
+static mp_raw_code_lazy_t *skip_bytecode(mp_reader_t *reader, size_t len, size_t *scope_flags_out) {
+    lazy_reader_t *lr = reader->data;
+    mp_raw_code_lazy_t *lazy = m_new_obj(mp_raw_code_lazy_t);
+    lazy->filename = lr->filename;
+    lazy->offset = lr->pos;
+    lazy->len = len;
+
+    // Read the prelude signature, which is at most a few bytes long.
+    byte sig[8];
+    size_t n_sig = 0;
+    do {
+        sig[n_sig] = read_byte(reader);
+    } while ((sig[n_sig++] & 0x80) && n_sig < MIN(len, sizeof(sig)));
+    const byte *ip = sig;
+    MP_BC_PRELUDE_SIG_DECODE(ip);
+    *scope_flags_out = scope_flags;
+
+    // Skip the rest of the bytecode, hashing it all to detect a changed file on load.
+    uint32_t hash = 5381;
+    for (size_t i = 0; i < len; ++i) {
+        hash = lazy_hash_update(hash, i < n_sig ? sig[i] : read_byte(reader));
+    }
+    lazy->hash = hash;
+
+    return lazy;
+}
+
+static const byte *lazy_load(mp_raw_code_lazy_t *lazy) {
+    mp_raw_code_t *rc = lazy->rc;
+    mp_obj_t args[2] = {
+        MP_OBJ_NEW_QSTR(lazy->filename),
+        MP_OBJ_NEW_QSTR(MP_QSTR_rb),
+    };
+    mp_obj_t file = mp_builtin_open(MP_ARRAY_SIZE(args), args, (mp_map_t *)&mp_const_empty_map);
+    byte *fun_data = m_new_maybe(byte, lazy->len);
+    if (fun_data == NULL) {
+        mp_stream_close(file);
+        m_malloc_fail(lazy->len);
+    }
+    int errcode = 0;
+    mp_uint_t n = 0;
+    if (mp_stream_seek(file, lazy->offset, MP_SEEK_SET, &errcode) != (mp_off_t)-1) {
+        n = mp_stream_read_exactly(file, fun_data, lazy->len, &errcode);
+    }
+    mp_stream_close(file);
+    if (errcode != 0) {
+        m_del(byte, fun_data, lazy->len);
+        mp_raise_OSError(errcode);
+    }
+
+    uint32_t hash = 5381;
+    for (size_t i = 0; i < n; ++i) {
+        hash = lazy_hash_update(hash, fun_data[i]);
+    }
+    if (n != lazy->len || hash != lazy->hash) {
+        // The file was changed since it was imported.
+        m_del(byte, fun_data, lazy->len);
+        mp_raise_ValueError(MP_ERROR_TEXT("incompatible .mpy file"));
+    }
+
+    rc->fun_data = fun_data;
+    rc->kind = MP_CODE_BYTECODE;
+    return fun_data;
+}
+
+const byte *mp_raw_code_load_lazy(mp_raw_code_lazy_t *lazy) {
+    if (lazy->rc->kind == MP_CODE_BYTECODE) {
+        // Already read in for another function object with the same code.
+        return lazy->rc->fun_data;
+    }
+    const byte *fun_data = lazy_load(lazy);
+    for (mp_raw_code_lazy_t **l = &MP_STATE_VM(persistent_code_lazy_pending); *l != NULL; l = &(*l)->next) {
+        if (*l == lazy) {
+            *l = lazy->next;
+            break;
+        }
+    }
+    return fun_data;
+}
+
+void mp_raw_code_load_lazy_all(void) {
+    mp_raw_code_lazy_t *lazy;
+    while ((lazy = MP_STATE_VM(persistent_code_lazy_pending)) != NULL) {
+        MP_STATE_VM(persistent_code_lazy_pending) = lazy->next;
+        if (lazy->rc->kind == MP_CODE_BYTECODE) {
+            continue;
+        }
+        nlr_buf_t nlr;
+        if (nlr_push(&nlr) == 0) {
+            lazy_load(lazy);
+            nlr_pop();
+        } else {
+            mp_obj_t exc = MP_OBJ_FROM_PTR(nlr.ret_val);
+            if (!mp_obj_is_subclass_fast(MP_OBJ_FROM_PTR(mp_obj_get_type(exc)), MP_OBJ_FROM_PTR(&mp_type_Exception))) {
+                // don't swallow KeyboardInterrupt and the like
+                nlr_jump(nlr.ret_val);
+            }
+            // otherwise the same error is raised when the function is used
+        }
+    }
+}
+
+MP_REGISTER_ROOT_POINTER(struct _mp_raw_code_lazy_t *persistent_code_lazy_pending);
+
+#endif
+
 static mp_raw_code_t *load_raw_code(mp_reader_t *reader, mp_module_context_t *context) {
     // Load function kind and data length
     size_t kind_len = read_uint(reader);
@@ -312,10 +464,27 @@ static mp_raw_code_t *load_raw_code(mp_reader_t *reader, mp_module_context_t *co
     mp_uint_t native_type_sig = 0;
     #endif
 
+    #if MICROPY_PERSISTENT_CODE_LOAD_LAZY
+    // Functions other than the top-level module code can have their bytecode
+    // read in when they are first used.
+    mp_raw_code_lazy_t *lazy = NULL;
+    size_t lazy_scope_flags = 0;
+    if (reader->readbyte == lazy_reader_readbyte) {
+        lazy_reader_t *lr = reader->data;
+        if (kind == MP_CODE_BYTECODE && lr->allow_lazy && fun_data_len >= MICROPY_PERSISTENT_CODE_LOAD_LAZY_THRESHOLD) {
+            lazy = skip_bytecode(reader, fun_data_len, &lazy_scope_flags);
+            fun_data = (uint8_t *)lazy;
+        }
+        lr->allow_lazy = true;
+    }
+    #endif
+
     if (kind == MP_CODE_BYTECODE) {
-        #if MICROPY_VFS_ROM
+        #if MICROPY_PERSISTENT_CODE_LOAD_MEMMAP
         // Try to reference memory-mapped data for the bytecode.
-        fun_data = (uint8_t *)mp_reader_try_read_rom(reader, fun_data_len);
+        if (fun_data == NULL) {
+            fun_data = (uint8_t *)mp_reader_try_read_rom(reader, fun_data_len);
+        }
         #endif
 
         if (fun_data == NULL) {
@@ -395,6 +564,21 @@ static mp_raw_code_t *load_raw_code(mp_reader_t *reader, mp_module_context_t *co
 
     // Create raw_code and return it
     mp_raw_code_t *rc = mp_emit_glue_new_raw_code();
+    #if MICROPY_PERSISTENT_CODE_LOAD_LAZY
+    if (lazy != NULL) {
+        lazy->rc = rc;
+        lazy->next = MP_STATE_VM(persistent_code_lazy_pending);
+        MP_STATE_VM(persistent_code_lazy_pending) = lazy;
+        mp_emit_glue_assign_bytecode(rc, fun_data,
+            children,
+            #if MICROPY_PERSISTENT_CODE_SAVE
+            fun_data_len,
+            n_children,
+            #endif
+            lazy_scope_flags);
+        rc->kind = MP_CODE_BYTECODE_LAZY;
+    } else
+    #endif
     if (kind == MP_CODE_BYTECODE) {
         const byte *ip = fun_data;
         MP_BC_PRELUDE_SIG_DECODE(ip);
@@ -472,7 +656,7 @@ void mp_raw_code_load(mp_reader_t *reader, mp_compiled_module_t *cm) {
     byte arch = MPY_FEATURE_DECODE_ARCH(header[2]);
     // CIRCUITPY-CHANGE: 'C', not 'M'
     if (header[0] != 'C'
-        || header[1] != MPY_VERSION
+        || !MPY_VERSION_IS_SUPPORTED(header[1])
         || (arch != MP_NATIVE_ARCH_NONE && MPY_FEATURE_DECODE_SUB_VERSION(header[2]) != MPY_SUB_VERSION)
         || header[3] > MP_SMALL_INT_BITS) {
         mp_raise_ValueError(MP_ERROR_TEXT("incompatible .mpy file"));
@@ -527,6 +711,34 @@ void mp_raw_code_load_mem(const byte *buf, size_t len, mp_compiled_module_t *con
 void mp_raw_code_load_file(qstr filename, mp_compiled_module_t *context) {
     mp_reader_t reader;
     mp_reader_new_file(&reader, filename);
+    #if MICROPY_PERSISTENT_CODE_LOAD_LAZY
+    // Memory-mapped files don't need their bytecode copied, so only load lazily from other files.
+    if (mp_reader_try_read_rom(&reader, 0) == NULL) {
+        #if MICROPY_VFS
+        // The bytecode is read in later, maybe after the current directory has
+        // changed, so keep the absolute path to the file.
+        const char *name = qstr_str(filename);
+        if (name[0] != '/') {
+            mp_obj_t cwd_o = mp_vfs_getcwd();
+            size_t cwd_len;
+            const char *cwd = mp_obj_str_get_data(cwd_o, &cwd_len);
+            vstr_t vstr;
+            vstr_init(&vstr, cwd_len + 1 + strlen(name));
+            vstr_add_strn(&vstr, cwd, cwd_len);
+            if (cwd_len == 0 || cwd[cwd_len - 1] != '/') {
+                vstr_add_char(&vstr, '/');
+            }
+            vstr_add_str(&vstr, name);
+            filename = qstr_from_strn(vstr.buf, vstr.len);
+            vstr_clear(&vstr);
+        }
+        #endif
+        lazy_reader_t lr = { reader, filename, 0, false };
+        mp_reader_t lazy_reader = { &lr, lazy_reader_readbyte, lazy_reader_close };
+        mp_raw_code_load(&lazy_reader, context);
+        return;
+    }
+    #endif
     mp_raw_code_load(&reader, context);
 }
 
@@ -678,7 +890,7 @@ void mp_raw_code_save(mp_compiled_module_t *cm, mp_print_t *print) {
     //  byte  number of bits in a small int
     byte header[4] = {
         'C',
-        MPY_VERSION,
+        MPY_VERSION_DYNAMIC,
         cm->has_native ? MPY_FEATURE_ENCODE_SUB_VERSION(MPY_SUB_VERSION) | MPY_FEATURE_ENCODE_ARCH(MPY_FEATURE_ARCH_DYNAMIC) : 0,
         #if MICROPY_DYNAMIC_COMPILER
         mp_dynamic_compiler.small_int_bits,
@@ -875,7 +1087,7 @@ mp_obj_t mp_raw_code_save_fun_to_bytes(const mp_module_constants_t *consts, cons
     vstr_init_print(&vstr, 64, &print);
 
     // Start with .mpy header.
-    const uint8_t header[4] = { 'M', MPY_VERSION, 0, MP_SMALL_INT_BITS };
+    const uint8_t header[4] = { 'M', MPY_VERSION_DYNAMIC, 0, MP_SMALL_INT_BITS };
     mp_print_bytes(&print, header, sizeof(header));
 
     // Number of entries in constant table.
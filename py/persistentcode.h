@@ -42,6 +42,17 @@
 #define MPY_VERSION 6
 #define MPY_SUB_VERSION 3
 
+// .mpy files whose bytecode may contain superinstructions (see
+// MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS) have this bit set in their version
+// byte, so that firmware which can't execute them rejects the file.
+#define MPY_VERSION_FLAG_SUPERINSTRUCTIONS (0x80)
+
+#if MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS
+#define MPY_VERSION_IS_SUPPORTED(version) (((version) & ~MPY_VERSION_FLAG_SUPERINSTRUCTIONS) == MPY_VERSION)
+#else
+#define MPY_VERSION_IS_SUPPORTED(version) ((version) == MPY_VERSION)
+#endif
+
 // Macros to encode/decode sub-version to/from the feature byte. This replaces
 // the bits previously used to encode the flags (map caching and unicode)
 // which are no longer used starting at .mpy version 6.
@@ -124,6 +135,25 @@ void mp_raw_code_load(mp_reader_t *reader, mp_compiled_module_t *ctx);
 void mp_raw_code_load_mem(const byte *buf, size_t len, mp_compiled_module_t *ctx);
 void mp_raw_code_load_file(qstr filename, mp_compiled_module_t *ctx);
 
+#if MICROPY_PERSISTENT_CODE_LOAD_LAZY
+// Location of the bytecode of a function that has not been read in yet.
+typedef struct _mp_raw_code_lazy_t {
+    struct _mp_raw_code_lazy_t *next;
+    mp_raw_code_t *rc;
+    qstr filename;
+    uint32_t offset;
+    uint32_t len;
+    uint32_t hash;
+} mp_raw_code_lazy_t;
+
+// Read in the bytecode of a lazily loaded function, if not already done, and return it.
+const byte *mp_raw_code_load_lazy(mp_raw_code_lazy_t *lazy);
+
+// Read in the bytecode of all lazily loaded functions not yet used.  This must be
+// called before running Python code with the heap locked.
+void mp_raw_code_load_lazy_all(void);
+#endif
+
 void mp_raw_code_save(mp_compiled_module_t *cm, mp_print_t *print);
 void mp_raw_code_save_file(mp_compiled_module_t *cm, qstr filename);
 mp_obj_t mp_raw_code_save_fun_to_bytes(const mp_module_constants_t *consts, const uint8_t *bytecode);
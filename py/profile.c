@@ -774,7 +774,46 @@ static const byte *mp_prof_opcode_decode(const byte *ip, const mp_uint_t *const_
             instruction->qstr_opname = MP_QSTR_IMPORT_STAR;
             break;
 
+        #if MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS
+        case MP_BC_LOAD_FAST0_ATTR:
+            DECODE_QSTR;
+            instruction->qstr_opname = MP_QSTR_LOAD_FAST0_ATTR;
+            instruction->arg = qst;
+            instruction->argobj = MP_OBJ_NEW_QSTR(qst);
+            break;
+
+        case MP_BC_LOAD_FAST0_METHOD:
+            DECODE_QSTR;
+            instruction->qstr_opname = MP_QSTR_LOAD_FAST0_METHOD;
+            instruction->arg = qst;
+            instruction->argobj = MP_OBJ_NEW_QSTR(qst);
+            break;
+
+        case MP_BC_STORE_FAST0_ATTR:
+            DECODE_QSTR;
+            instruction->qstr_opname = MP_QSTR_STORE_FAST0_ATTR;
+            instruction->arg = qst;
+            instruction->argobj = MP_OBJ_NEW_QSTR(qst);
+            break;
+
+        case MP_BC_LOAD_SUBSCR_SMALL_INT:
+            DECODE_UINT;
+            instruction->qstr_opname = MP_QSTR_LOAD_SUBSCR_SMALL_INT;
+            instruction->arg = unum;
+            break;
+        #endif
+
         default:
+            #if MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS
+            if (MP_BC_BINARY_OP_SMALL_INT_MULTI <= ip[-1]
+                && ip[-1] < MP_BC_BINARY_OP_SMALL_INT_MULTI + MP_BC_BINARY_OP_SMALL_INT_MULTI_NUM) {
+                instruction->qstr_opname = MP_QSTR_BINARY_OP_SMALL_INT;
+                instruction->arg = MP_BC_BINARY_OP_SMALL_INT_MULTI_OP(ip[-1] - MP_BC_BINARY_OP_SMALL_INT_MULTI);
+                DECODE_UINT;
+                instruction->argobj = MP_OBJ_NEW_SMALL_INT(unum);
+                break;
+            }
+            #endif
             if (ip[-1] < MP_BC_LOAD_CONST_SMALL_INT_MULTI + 64) {
                 instruction->qstr_opname = MP_QSTR_LOAD_CONST_SMALL_INT;
                 instruction->arg = (mp_int_t)ip[-1] - MP_BC_LOAD_CONST_SMALL_INT_MULTI - 16;
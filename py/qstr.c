@@ -60,13 +60,26 @@
 // allocated pool is twice this size.  The value here must be <= MP_QSTRnumber_of.
 #define MICROPY_ALLOC_QSTR_ENTRIES_INIT (10)
 
-// this must match the equivalent function in makeqstrdata.py
-size_t qstr_compute_hash(const byte *data, size_t len) {
+#if MICROPY_OPT_QSTR_INDEX
+// Runtime-allocated pools are followed by an open-addressed hash index over
+// their entries, probed linearly.  A slot holds the position of an entry in
+// the pool plus one; zero means the slot is free.  The slots are 16 bits so
+// the size of such pools is capped.
+typedef uint16_t qstr_index_slot_t;
+#define QSTR_INDEX_MAX_ALLOC (0xffff)
+#endif
+
+static size_t qstr_compute_hash_full(const byte *data, size_t len) {
     // djb2 algorithm; see http://www.cse.yorku.ca/~oz/hash.html
     size_t hash = 5381;
     for (const byte *top = data + len; data < top; data++) {
         hash = ((hash << 5) + hash) ^ (*data); // hash * 33 ^ data
     }
+    return hash;
+}
+
+// this must match the equivalent function in makeqstrdata.py
+static size_t qstr_hash_from_full(size_t hash) {
     hash &= Q_HASH_MASK;
     // Make sure that valid hash is never zero, zero means "hash not computed"
     if (hash == 0) {
@@ -75,6 +88,10 @@ size_t qstr_compute_hash(const byte *data, size_t len) {
     return hash;
 }
 
+size_t qstr_compute_hash(const byte *data, size_t len) {
+    return qstr_hash_from_full(qstr_compute_hash_full(data, len));
+}
+
 // The first pool is the static qstr table. The contents must remain stable as
 // it is part of the .mpy ABI. See the top of py/persistentcode.c and
 // static_qstr_list in makeqstrdata.py. This pool is unsorted (although in a
@@ -216,6 +233,46 @@ void qstr_init(void) {
     #endif
 }
 
+#if MICROPY_OPT_QSTR_INDEX
+static size_t qstr_index_len(size_t alloc) {
+    // keep the load factor at or below 2/3
+    size_t n = 16;
+    while (n < alloc + alloc / 2) {
+        n <<= 1;
+    }
+    return n;
+}
+
+static qstr_index_slot_t *qstr_pool_index(const qstr_pool_t *pool) {
+    return (qstr_index_slot_t *)(((uintptr_t)(pool->lengths + pool->alloc) + 1) & ~(uintptr_t)1);
+}
+
+// Returns the slot holding the given string, or the free slot where it would
+// go if it is not in the pool.  The index always has free slots.
+static qstr_index_slot_t *qstr_index_lookup(const qstr_pool_t *pool, size_t hash_full, const char *str, size_t str_len) {
+    qstr_index_slot_t *index = qstr_pool_index(pool);
+    size_t mask = qstr_index_len(pool->alloc) - 1;
+    #if MICROPY_QSTR_BYTES_IN_HASH
+    size_t str_hash = qstr_hash_from_full(hash_full);
+    #endif
+    for (size_t pos = hash_full & mask;; pos = (pos + 1) & mask) {
+        qstr_index_slot_t slot = index[pos];
+        if (slot == 0) {
+            return &index[pos];
+        }
+        size_t at = slot - 1;
+        if (
+            #if MICROPY_QSTR_BYTES_IN_HASH
+            pool->hashes[at] == str_hash &&
+            #endif
+            pool->lengths[at] == str_len
+            && memcmp(pool->qstrs[at], str, str_len) == 0) {
+            return &index[pos];
+        }
+    }
+}
+#endif
+
 static const qstr_pool_t *find_qstr(qstr *q) {
     // search pool for this qstr
     // total_prev_len==0 in the final pool, so the loop will always terminate
@@ -230,8 +287,15 @@ static const qstr_pool_t *find_qstr(qstr *q) {
 
 // qstr_mutex must be taken while in this function
 static qstr qstr_add(mp_uint_t len, const char *q_ptr) {
+    #if MICROPY_OPT_QSTR_INDEX
+    size_t hash_full = qstr_compute_hash_full((const byte *)q_ptr, len);
+    #endif
     #if MICROPY_QSTR_BYTES_IN_HASH
+    #if MICROPY_OPT_QSTR_INDEX
+    mp_uint_t hash = qstr_hash_from_full(hash_full);
+    #else
     mp_uint_t hash = qstr_compute_hash((const byte *)q_ptr, len);
+    #endif
     DEBUG_printf("QSTR: add hash=%d len=%d data=%.*s\n", hash, len, len, q_ptr);
     #else
     DEBUG_printf("QSTR: add len=%d data=%.*s\n", len, len, q_ptr);
@@ -244,12 +308,19 @@ static qstr qstr_add(mp_uint_t len, const char *q_ptr) {
         // Put a lower bound on the allocation size in case the extra qstr pool has few entries
         new_alloc = MAX(MICROPY_ALLOC_QSTR_ENTRIES_INIT, new_alloc);
         #endif
+        #if MICROPY_OPT_QSTR_INDEX
+        new_alloc = MIN(QSTR_INDEX_MAX_ALLOC, new_alloc);
+        #endif
         mp_uint_t pool_size = sizeof(qstr_pool_t)
             + (sizeof(const char *)
                 #if MICROPY_QSTR_BYTES_IN_HASH
                 + sizeof(qstr_hash_t)
                 #endif
                 + sizeof(qstr_len_t)) * new_alloc;
+        #if MICROPY_OPT_QSTR_INDEX
+        // room for the index, plus a byte to align it
+        pool_size += 1 + sizeof(qstr_index_slot_t) * qstr_index_len(new_alloc);
+        #endif
         qstr_pool_t *pool = (qstr_pool_t *)m_malloc_maybe(pool_size);
         if (pool == NULL) {
             // Keep qstr_last_chunk consistent with qstr_pool_t: qstr_last_chunk is not scanned
@@ -271,6 +342,9 @@ static qstr qstr_add(mp_uint_t len, const char *q_ptr) {
         pool->total_prev_len = MP_STATE_VM(last_pool)->total_prev_len + MP_STATE_VM(last_pool)->len;
         pool->alloc = new_alloc;
         pool->len = 0;
+        #if MICROPY_OPT_QSTR_INDEX
+        memset(qstr_pool_index(pool), 0, sizeof(qstr_index_slot_t) * qstr_index_len(new_alloc));
+        #endif
         MP_STATE_VM(last_pool) = pool;
         DEBUG_printf("QSTR: allocate new pool of size %d\n", MP_STATE_VM(last_pool)->alloc);
     }
@@ -283,6 +357,9 @@ static qstr qstr_add(mp_uint_t len, const char *q_ptr) {
     MP_STATE_VM(last_pool)->lengths[at] = len;
     MP_STATE_VM(last_pool)->qstrs[at] = q_ptr;
     MP_STATE_VM(last_pool)->len++;
+    #if MICROPY_OPT_QSTR_INDEX
+    *qstr_index_lookup(MP_STATE_VM(last_pool), hash_full, q_ptr, len) = at + 1;
+    #endif
 
     // return id for the newly-added qstr
     return MP_STATE_VM(last_pool)->total_prev_len + at;
@@ -294,13 +371,29 @@ qstr qstr_find_strn(const char *str, size_t str_len) {
         return MP_QSTR_;
     }
 
+    const qstr_pool_t *pool = MP_STATE_VM(last_pool);
+
+    #if MICROPY_OPT_QSTR_INDEX
+    // work out hash of str
+    size_t str_hash_full = qstr_compute_hash_full((const byte *)str, str_len);
     #if MICROPY_QSTR_BYTES_IN_HASH
+    size_t str_hash = qstr_hash_from_full(str_hash_full);
+    #endif
+
+    // search the index of each pool allocated at runtime
+    for (; pool != &CONST_POOL; pool = pool->prev) {
+        qstr_index_slot_t slot = *qstr_index_lookup(pool, str_hash_full, str, str_len);
+        if (slot != 0) {
+            return pool->total_prev_len + slot - 1;
+        }
+    }
+    #elif MICROPY_QSTR_BYTES_IN_HASH
     // work out hash of str
     size_t str_hash = qstr_compute_hash((const byte *)str, str_len);
     #endif
 
     // search pools for the data
-    for (const qstr_pool_t *pool = MP_STATE_VM(last_pool); pool != NULL; pool = pool->prev) {
+    for (; pool != NULL; pool = pool->prev) {
         size_t low = 0;
         size_t high = pool->len - 1;
 
@@ -413,7 +506,7 @@ qstr qstr_from_strn(const char *str, size_t len) {
     return qstr_from_strn_helper(str, len, false);
 }
 
-#if MICROPY_VFS_ROM
+#if MICROPY_PERSISTENT_CODE_LOAD_MEMMAP
 // Create a new qstr that can forever reference the given string data.
 qstr qstr_from_strn_static(const char *str, size_t len) {
     return qstr_from_strn_helper(str, len, true);
@@ -466,6 +559,9 @@ void qstr_pool_info(size_t *n_pool, size_t *n_qstr, size_t *n_str_data_bytes, si
                 + sizeof(qstr_hash_t)
                 #endif
                 + sizeof(qstr_len_t)) * pool->alloc;
+        #if MICROPY_OPT_QSTR_INDEX
+        *n_total_bytes += 1 + sizeof(qstr_index_slot_t) * qstr_index_len(pool->alloc);
+        #endif
         #endif
     }
     *n_total_bytes += *n_str_data_bytes;
@@ -107,7 +107,7 @@ qstr qstr_find_strn(const char *str, size_t str_len); // returns MP_QSTRnull if
 
 qstr qstr_from_str(const char *str);
 qstr qstr_from_strn(const char *str, size_t len);
-#if MICROPY_VFS_ROM
+#if MICROPY_PERSISTENT_CODE_LOAD_MEMMAP
 qstr qstr_from_strn_static(const char *str, size_t len);
 #endif
 
@@ -72,7 +72,8 @@ const uint8_t *mp_reader_try_read_rom(mp_reader_t *reader, size_t len) {
         return NULL;
     }
     mp_reader_mem_t *m = reader->data;
-    if (m->free_len != MP_READER_IS_ROM) {
+    if (m->free_len != MP_READER_IS_ROM || len > (size_t)(m->end - m->cur)) {
+        // Not in ROM, or truncated data which must be read byte-wise to hit EOF.
         return NULL;
     }
     const uint8_t *data = m->cur;
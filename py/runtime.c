@@ -116,6 +116,14 @@ void mp_init(void) {
     #if MICROPY_EMIT_NATIVE
     MP_STATE_VM(default_emit_opt) = MP_EMIT_OPT_NONE;
     #endif
+    #if MICROPY_OPT_TIERED_NATIVE
+    MP_STATE_VM(tiered_native_code_size) = 0;
+    #if MICROPY_PY_THREAD && !MICROPY_PY_THREAD_GIL
+    mp_thread_mutex_init(&MP_STATE_VM(tiered_native_mutex));
+    #else
+    MP_STATE_VM(tiered_native_compiling) = false;
+    #endif
+    #endif
     #endif
 
     // init global module dict
@@ -151,6 +159,20 @@ void mp_init(void) {
     MP_STATE_VM(vfs_mount_table) = NULL;
     #endif
 
+    #if MICROPY_VFS_IMPORT_CACHE
+    MP_STATE_VM(vfs_import_cache) = MP_OBJ_NULL;
+    #endif
+
+    #if MICROPY_PERSISTENT_CODE_LOAD_LAZY
+    MP_STATE_VM(persistent_code_lazy_pending) = NULL;
+    #endif
+
+    #if MICROPY_PY_RE && MICROPY_PY_RE_CACHE_SIZE
+    for (size_t i = 0; i < 2 * MICROPY_PY_RE_CACHE_SIZE; ++i) {
+        MP_STATE_VM(re_cache[i]) = MP_OBJ_NULL;
+    }
+    #endif
+
     #if MICROPY_PY_SYS_PATH_ARGV_DEFAULTS
     #if MICROPY_PY_SYS_PATH
     mp_sys_path = mp_obj_new_list(0, NULL);
@@ -241,32 +263,50 @@ mp_obj_t MICROPY_WRAP_MP_LOAD_NAME(mp_load_name)(qstr qst) {
     return mp_load_global(qst);
 }
 
+static mp_obj_t mp_load_builtin(qstr qst) {
+    mp_map_elem_t *elem;
+    #if MICROPY_CAN_OVERRIDE_BUILTINS
+    if (MP_STATE_VM(mp_module_builtins_override_dict) != NULL) {
+        // lookup in additional dynamic table of builtins first
+        elem = mp_map_lookup(&MP_STATE_VM(mp_module_builtins_override_dict)->map, MP_OBJ_NEW_QSTR(qst), MP_MAP_LOOKUP);
+        if (elem != NULL) {
+            return elem->value;
+        }
+    }
+    #endif
+    elem = mp_map_lookup((mp_map_t *)&mp_module_builtins_globals.map, MP_OBJ_NEW_QSTR(qst), MP_MAP_LOOKUP);
+    if (elem == NULL) {
+        #if MICROPY_ERROR_REPORTING <= MICROPY_ERROR_REPORTING_TERSE
+        mp_raise_msg(&mp_type_NameError, MP_ERROR_TEXT("name not defined"));
+        #else
+        mp_raise_msg_varg(&mp_type_NameError, MP_ERROR_TEXT("name '%q' isn't defined"), qst);
+        #endif
+    }
+    return elem->value;
+}
+
 mp_obj_t MICROPY_WRAP_MP_LOAD_GLOBAL(mp_load_global)(qstr qst) {
     // logic: search globals, builtins
     DEBUG_OP_printf("load global %s\n", qstr_str(qst));
     mp_map_elem_t *elem = mp_map_lookup(&mp_globals_get()->map, MP_OBJ_NEW_QSTR(qst), MP_MAP_LOOKUP);
     if (elem == NULL) {
-        #if MICROPY_CAN_OVERRIDE_BUILTINS
-        if (MP_STATE_VM(mp_module_builtins_override_dict) != NULL) {
-            // lookup in additional dynamic table of builtins first
-            elem = mp_map_lookup(&MP_STATE_VM(mp_module_builtins_override_dict)->map, MP_OBJ_NEW_QSTR(qst), MP_MAP_LOOKUP);
-            if (elem != NULL) {
-                return elem->value;
-            }
-        }
-        #endif
-        elem = mp_map_lookup((mp_map_t *)&mp_module_builtins_globals.map, MP_OBJ_NEW_QSTR(qst), MP_MAP_LOOKUP);
-        if (elem == NULL) {
-            #if MICROPY_ERROR_REPORTING <= MICROPY_ERROR_REPORTING_TERSE
-            mp_raise_msg(&mp_type_NameError, MP_ERROR_TEXT("name not defined"));
-            #else
-            mp_raise_msg_varg(&mp_type_NameError, MP_ERROR_TEXT("name '%q' isn't defined"), qst);
-            #endif
-        }
+        return mp_load_builtin(qst);
     }
     return elem->value;
 }
 
+#if MICROPY_OPT_INLINE_CACHE
+mp_obj_t mp_load_global_cached(qstr qst, uint8_t *cache) {
+    // as mp_load_global, but the globals lookup goes through the caller's cache entry
+    DEBUG_OP_printf("load global %s\n", qstr_str(qst));
+    mp_map_elem_t *elem = mp_map_lookup_cached(&mp_globals_get()->map, MP_OBJ_NEW_QSTR(qst), cache);
+    if (elem == NULL) {
+        return mp_load_builtin(qst);
+    }
+    return elem->value;
+}
+#endif
+
 // CIRCUITPY-CHANGE: noinline
 // https://github.com/adafruit/circuitpython/pull/8071
 mp_obj_t __attribute__((noinline)) mp_load_build_class(void) {
@@ -1721,20 +1761,29 @@ mp_obj_t mp_parse_compile_execute(mp_lexer_t *lex, mp_parse_input_kind_t parse_i
     // set exception handler to restore context if an exception is raised
     nlr_push_jump_callback(&ctx.callback, mp_globals_locals_set_from_nlr_jump_callback);
 
-    qstr source_name = lex->source_name;
-    mp_parse_tree_t parse_tree = mp_parse(lex, parse_input_kind);
-    mp_obj_t module_fun = mp_compile(&parse_tree, source_name, parse_input_kind == MP_PARSE_SINGLE_INPUT);
-
     mp_obj_t ret;
-    #if MICROPY_PY_BUILTINS_COMPILE && MICROPY_PY_BUILTINS_CODE == MICROPY_PY_BUILTINS_CODE_MINIMUM
-    if (globals == NULL) {
-        // for compile only, return value is the module function
-        ret = module_fun;
+    #if MICROPY_PARSE_STREAMING
+    if (parse_input_kind == MP_PARSE_FILE_INPUT && globals != NULL) {
+        // parse, compile and execute one top-level statement at a time
+        mp_compile_execute_file_streaming(lex);
+        ret = mp_const_none;
     } else
     #endif
     {
-        // execute module function and get return value
-        ret = mp_call_function_0(module_fun);
+        qstr source_name = lex->source_name;
+        mp_parse_tree_t parse_tree = mp_parse(lex, parse_input_kind);
+        mp_obj_t module_fun = mp_compile(&parse_tree, source_name, parse_input_kind == MP_PARSE_SINGLE_INPUT);
+
+        #if MICROPY_PY_BUILTINS_COMPILE && MICROPY_PY_BUILTINS_CODE == MICROPY_PY_BUILTINS_CODE_MINIMUM
+        if (globals == NULL) {
+            // for compile only, return value is the module function
+            ret = module_fun;
+        } else
+        #endif
+        {
+            // execute module function and get return value
+            ret = mp_call_function_0(module_fun);
+        }
     }
 
     // deregister exception handler and restore context
@@ -211,6 +211,9 @@ static inline void mp_thread_init_state(mp_state_thread_t *ts, size_t stack_size
 
 mp_obj_t mp_load_name(qstr qst);
 mp_obj_t mp_load_global(qstr qst);
+#if MICROPY_OPT_INLINE_CACHE
+mp_obj_t mp_load_global_cached(qstr qst, uint8_t *cache);
+#endif
 mp_obj_t mp_load_build_class(void);
 void mp_store_name(qstr qst, mp_obj_t obj);
 void mp_store_global(qstr qst, mp_obj_t obj);
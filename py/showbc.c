@@ -526,7 +526,39 @@ const byte *mp_bytecode_print_str(const mp_print_t *print, const byte *ip_start,
             mp_printf(print, "IMPORT_STAR");
             break;
 
+        #if MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS
+        case MP_BC_LOAD_FAST0_ATTR:
+            DECODE_QSTR;
+            mp_printf(print, "LOAD_FAST0_ATTR %s", qstr_str(qst));
+            break;
+
+        case MP_BC_LOAD_FAST0_METHOD:
+            DECODE_QSTR;
+            mp_printf(print, "LOAD_FAST0_METHOD %s", qstr_str(qst));
+            break;
+
+        case MP_BC_STORE_FAST0_ATTR:
+            DECODE_QSTR;
+            mp_printf(print, "STORE_FAST0_ATTR %s", qstr_str(qst));
+            break;
+
+        case MP_BC_LOAD_SUBSCR_SMALL_INT:
+            DECODE_UINT;
+            mp_printf(print, "LOAD_SUBSCR_SMALL_INT " UINT_FMT, unum);
+            break;
+
+        #endif
+
         default:
+            #if MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS
+            if (MP_BC_BINARY_OP_SMALL_INT_MULTI <= ip[-1]
+                && ip[-1] < MP_BC_BINARY_OP_SMALL_INT_MULTI + MP_BC_BINARY_OP_SMALL_INT_MULTI_NUM) {
+                mp_uint_t op = MP_BC_BINARY_OP_SMALL_INT_MULTI_OP(ip[-1] - MP_BC_BINARY_OP_SMALL_INT_MULTI);
+                DECODE_UINT;
+                mp_printf(print, "BINARY_OP_SMALL_INT " UINT_FMT " %s " UINT_FMT, op, qstr_str(mp_binary_op_method_name[op]), unum);
+                break;
+            }
+            #endif
             if (ip[-1] < MP_BC_LOAD_CONST_SMALL_INT_MULTI + 64) {
                 mp_printf(print, "LOAD_CONST_SMALL_INT " INT_FMT, (mp_int_t)ip[-1] - MP_BC_LOAD_CONST_SMALL_INT_MULTI - 16);
             } else if (ip[-1] < MP_BC_LOAD_FAST_MULTI + 16) {
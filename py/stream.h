@@ -46,6 +46,7 @@
 #define MP_STREAM_SET_DATA_OPTS (9)  // Set data/message options
 #define MP_STREAM_GET_FILENO    (10) // Get fileno of underlying file
 #define MP_STREAM_GET_BUFFER_SIZE (11) // Get preferred buffer size for file
+#define MP_STREAM_POLL_NOTIFY   (12) // Set (or clear, if arg is 0) the notifier for mp_stream_poll_notify()
 
 // These poll ioctl values are compatible with Linux
 #define MP_STREAM_POLL_RD       (0x0001)
@@ -112,6 +113,14 @@ static inline const mp_stream_p_t *mp_get_stream(mp_const_obj_t self) {
 const mp_stream_p_t *mp_get_stream_raise(mp_obj_t self_in, int flags);
 mp_obj_t mp_stream_close(mp_obj_t stream);
 
+#if MICROPY_PY_SELECT_NOTIFY
+// A stream that accepted ioctl(MP_STREAM_POLL_NOTIFY) calls this with the arg it was
+// given whenever it may have become ready for the poll events.  It holds only one
+// notifier, and fails the ioctl with MP_EBUSY if it has one already.  This may be
+// called from an interrupt.
+void mp_stream_poll_notify(uintptr_t notifier);
+#endif
+
 // Iterator which uses mp_stream_unbuffered_readline_obj
 mp_obj_t mp_stream_unbuffered_iter(mp_obj_t self);
 
@@ -32,7 +32,10 @@
 #include "py/emitglue.h"
 #include "py/objtype.h"
 #include "py/objfun.h"
+#include "py/objlist.h"
+#include "py/objtuple.h"
 #include "py/runtime.h"
+#include "py/smallint.h"
 #include "py/bc0.h"
 #include "py/profile.h"
 
@@ -86,6 +89,19 @@
         } \
     } while (0)
 
+#if MICROPY_OPT_TIERED_NATIVE
+// Backwards jumps are loop iterations, which count towards recompiling the
+// function with the native emitter (see fun_bc_call).
+#define TIERED_NATIVE_COUNT_JUMP() \
+    do { \
+        if ((mp_int_t)slab < 0) { \
+            code_state->fun_bc->tier.count += 1; \
+        } \
+    } while (0)
+#else
+#define TIERED_NATIVE_COUNT_JUMP()
+#endif
+
 #if MICROPY_EMIT_BYTECODE_USES_QSTR_TABLE
 
 #define DECODE_QSTR \
@@ -108,6 +124,13 @@
     DECODE_UINT; \
     mp_obj_t obj = (mp_obj_t)code_state->fun_bc->context->constants.obj_table[unum]
 
+#if MICROPY_OPT_INLINE_CACHE
+// Each LOAD_GLOBAL/LOAD_ATTR/LOAD_METHOD site is identified by the address of
+// the following opcode, which is distinct for every site.  Entries are only
+// hints (validated by mp_map_lookup_cached), so collisions are harmless.
+#define INLINE_CACHE_ENTRY(ip) (&MP_STATE_VM(inline_cache)[(uintptr_t)(ip) % MICROPY_OPT_INLINE_CACHE_SIZE])
+#endif
+
 #define PUSH(val) *++sp = (val)
 #define POP() (*sp--)
 #define TOP() (*sp)
@@ -205,6 +228,49 @@ static mp_obj_t get_active_exception(mp_exc_stack_t *exc_sp, mp_exc_stack_t *exc
     return MP_OBJ_NULL;
 }
 
+#if MICROPY_OPT_FLOAT_TEMPORARIES
+
+#if !MICROPY_PY_BUILTINS_FLOAT || MICROPY_OBJ_REPR == MICROPY_OBJ_REPR_C || MICROPY_OBJ_REPR == MICROPY_OBJ_REPR_D
+#error "MICROPY_OPT_FLOAT_TEMPORARIES requires floats to be heap objects"
+#endif
+
+// Do an arithmetic binary op whose operands are floats or small ints (but not
+// both small ints).  Returns MP_OBJ_NULL if the operands aren't like that, or
+// the op isn't supported for them, in which case mp_binary_op must be used.
+//
+// tmp_ip is where execution continued after the last float op that gave a
+// float (the temporary), or NULL.  The VM resets it on each jump, so that if it
+// points to op_ip then the temporary is the right operand of this op, and if it
+// points to a load just before op_ip then the temporary is the left operand.
+// Either way nothing else refers to it and it can hold the result.
+static mp_obj_t vm_float_binary_op(mp_binary_op_t op, mp_obj_t lhs, mp_obj_t rhs, const byte *op_ip, const byte *tmp_ip) {
+    mp_float_t lhs_val;
+    if (op < MP_BINARY_OP_INPLACE_OR) {
+        return MP_OBJ_NULL;
+    } else if (mp_obj_is_float(lhs) && (mp_obj_is_float(rhs) || mp_obj_is_small_int(rhs))) {
+        lhs_val = mp_obj_float_get(lhs);
+    } else if (mp_obj_is_small_int(lhs) && mp_obj_is_float(rhs)) {
+        lhs_val = (mp_float_t)MP_OBJ_SMALL_INT_VALUE(lhs);
+    } else {
+        return MP_OBJ_NULL;
+    }
+    mp_obj_t tmp = MP_OBJ_NULL;
+    if (tmp_ip == op_ip) {
+        tmp = rhs;
+    } else if (tmp_ip == op_ip - 1) {
+        byte load = *tmp_ip;
+        if ((load >= MP_BC_LOAD_FAST_MULTI && load < MP_BC_LOAD_FAST_MULTI + MP_BC_LOAD_FAST_MULTI_NUM)
+            || (load >= MP_BC_LOAD_CONST_SMALL_INT_MULTI && load < MP_BC_LOAD_CONST_SMALL_INT_MULTI + MP_BC_LOAD_CONST_SMALL_INT_MULTI_NUM)) {
+            tmp = lhs;
+        }
+    } else if (tmp_ip == op_ip - 2 && tmp_ip[0] == MP_BC_LOAD_CONST_OBJ && (tmp_ip[1] & 0x80) == 0) {
+        tmp = lhs;
+    }
+    return mp_obj_float_binary_op_tmp(op, lhs_val, rhs, tmp);
+}
+
+#endif
+
 // fastn has items in reverse order (fastn[0] is local[0], fastn[-1] is local[1], etc)
 // sp points to bottom of stack which grows up
 // returns:
@@ -311,6 +377,9 @@ outer_dispatch_loop:
             const qstr_short_t *qstr_table = code_state->fun_bc->context->constants.qstr_table;
             #endif
             mp_obj_t obj_shared;
+            #if MICROPY_OPT_FLOAT_TEMPORARIES
+            const byte *float_tmp_ip = NULL;
+            #endif
             MICROPY_VM_HOOK_INIT
 
             // If we have exception to inject, now that we finish setting up
@@ -410,11 +479,18 @@ dispatch_loop:
                 ENTRY(MP_BC_LOAD_GLOBAL): {
                     MARK_EXC_IP_SELECTIVE();
                     DECODE_QSTR;
+                    #if MICROPY_OPT_INLINE_CACHE
+                    PUSH(mp_load_global_cached(qst, INLINE_CACHE_ENTRY(ip)));
+                    #else
                     PUSH(mp_load_global(qst));
+                    #endif
                     DISPATCH();
                 }
 
                 ENTRY(MP_BC_LOAD_ATTR): {
+                    #if MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS
+                    load_attr:
+                    #endif
                     FRAME_UPDATE();
                     MARK_EXC_IP_SELECTIVE();
                     DECODE_QSTR;
@@ -426,9 +502,23 @@ dispatch_loop:
                     // types are extremely common, so avoid all the other checks and
                     // calls that normally happen first.
                     mp_map_elem_t *elem = NULL;
-                    if (mp_obj_is_instance_type(mp_obj_get_type(top))) {
+                    const mp_obj_type_t *type = mp_obj_get_type(top);
+                    if (mp_obj_is_instance_type(type)) {
                         mp_obj_instance_t *self = MP_OBJ_TO_PTR(top);
+                        #if MICROPY_PY_CLASS_SLOTS
+                        if (type->flags & MP_TYPE_FLAG_HAS_SLOTS) {
+                            obj = mp_obj_instance_load_slot(top, qst);
+                            if (obj != MP_OBJ_NULL) {
+                                SET_TOP(obj);
+                                DISPATCH();
+                            }
+                        }
+                        #endif
+                        #if MICROPY_OPT_INLINE_CACHE
+                        elem = mp_map_lookup_cached(&self->members, MP_OBJ_NEW_QSTR(qst), INLINE_CACHE_ENTRY(ip));
+                        #else
                         elem = mp_map_lookup(&self->members, MP_OBJ_NEW_QSTR(qst), MP_MAP_LOOKUP);
+                        #endif
                     }
                     if (elem) {
                         obj = elem->value;
@@ -442,8 +532,38 @@ dispatch_loop:
                 }
 
                 ENTRY(MP_BC_LOAD_METHOD): {
+                    #if MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS
+                    load_method:
+                    #endif
                     MARK_EXC_IP_SELECTIVE();
                     DECODE_QSTR;
+                    #if MICROPY_OPT_INLINE_CACHE
+                    // For an instance of a class without special accessors, a
+                    // plain function defined in the class itself is the method,
+                    // unless the instance shadows it with a member of the same
+                    // name.  Names given special treatment by mp_load_method
+                    // take the regular path.
+                    const mp_obj_type_t *type = mp_obj_get_type(*sp);
+                    if (mp_obj_is_instance_type(type)
+                        && !(type->flags & MP_TYPE_FLAG_HAS_SPECIAL_ACCESSORS)
+                        && MP_OBJ_TYPE_HAS_SLOT(type, locals_dict)
+                        #if MICROPY_CPYTHON_COMPAT
+                        && qst != MP_QSTR___class__ && qst != MP_QSTR___dict__
+                        #endif
+                        && qst != MP_QSTR___next__) {
+                        mp_map_elem_t *elem = mp_map_lookup_cached(&MP_OBJ_TYPE_GET_SLOT(type, locals_dict)->map, MP_OBJ_NEW_QSTR(qst), INLINE_CACHE_ENTRY(ip));
+                        if (elem != NULL && mp_obj_is_obj(elem->value)
+                            && (((mp_obj_base_t *)MP_OBJ_TO_PTR(elem->value))->type->flags & (MP_TYPE_FLAG_BINDS_SELF | MP_TYPE_FLAG_BUILTIN_FUN)) == MP_TYPE_FLAG_BINDS_SELF) {
+                            mp_obj_instance_t *self = MP_OBJ_TO_PTR(*sp);
+                            if (mp_map_lookup(&self->members, MP_OBJ_NEW_QSTR(qst), MP_MAP_LOOKUP) == NULL) {
+                                sp[1] = *sp;
+                                sp[0] = elem->value;
+                                sp += 1;
+                                DISPATCH();
+                            }
+                        }
+                    }
+                    #endif
                     mp_load_method(*sp, qst, sp);
                     sp += 1;
                     DISPATCH();
@@ -496,6 +616,9 @@ dispatch_loop:
                 }
 
                 ENTRY(MP_BC_STORE_ATTR): {
+                    #if MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS
+                    store_attr:
+                    #endif
                     FRAME_UPDATE();
                     MARK_EXC_IP_SELECTIVE();
                     DECODE_QSTR;
@@ -504,6 +627,31 @@ dispatch_loop:
                     DISPATCH();
                 }
 
+                #if MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS
+                // These push local 0 and then continue as the opcode they
+                // were fused with, which takes the same qstr argument.
+                ENTRY(MP_BC_LOAD_FAST0_ATTR):
+                    if (fastn[0] == MP_OBJ_NULL) {
+                        goto local_name_error;
+                    }
+                    PUSH(fastn[0]);
+                    goto load_attr;
+
+                ENTRY(MP_BC_LOAD_FAST0_METHOD):
+                    if (fastn[0] == MP_OBJ_NULL) {
+                        goto local_name_error;
+                    }
+                    PUSH(fastn[0]);
+                    goto load_method;
+
+                ENTRY(MP_BC_STORE_FAST0_ATTR):
+                    if (fastn[0] == MP_OBJ_NULL) {
+                        goto local_name_error;
+                    }
+                    PUSH(fastn[0]);
+                    goto store_attr;
+                #endif
+
                 ENTRY(MP_BC_STORE_SUBSCR):
                     MARK_EXC_IP_SELECTIVE();
                     mp_obj_subscr(sp[-1], sp[0], sp[-2]);
@@ -577,6 +725,7 @@ dispatch_loop:
 
                 ENTRY(MP_BC_JUMP): {
                     DECODE_SLABEL;
+                    TIERED_NATIVE_COUNT_JUMP();
                     ip += slab;
                     DISPATCH_WITH_PEND_EXC_CHECK();
                 }
@@ -584,6 +733,7 @@ dispatch_loop:
                 ENTRY(MP_BC_POP_JUMP_IF_TRUE): {
                     DECODE_SLABEL;
                     if (mp_obj_is_true(POP())) {
+                        TIERED_NATIVE_COUNT_JUMP();
                         ip += slab;
                     }
                     DISPATCH_WITH_PEND_EXC_CHECK();
@@ -592,6 +742,7 @@ dispatch_loop:
                 ENTRY(MP_BC_POP_JUMP_IF_FALSE): {
                     DECODE_SLABEL;
                     if (!mp_obj_is_true(POP())) {
+                        TIERED_NATIVE_COUNT_JUMP();
                         ip += slab;
                     }
                     DISPATCH_WITH_PEND_EXC_CHECK();
@@ -1288,6 +1439,91 @@ yield:
                 ENTRY(MP_BC_LOAD_CONST_SMALL_INT_MULTI):
                     PUSH(MP_OBJ_NEW_SMALL_INT((mp_int_t)ip[-1] - MP_BC_LOAD_CONST_SMALL_INT_MULTI - MP_BC_LOAD_CONST_SMALL_INT_MULTI_EXCESS));
                     DISPATCH();
+                #endif
+
+                #if MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS
+                ENTRY(MP_BC_BINARY_OP_SMALL_INT_MULTI):
+                #if !MICROPY_OPT_COMPUTED_GOTO
+                case MP_BC_BINARY_OP_SMALL_INT_MULTI + 1:
+                case MP_BC_BINARY_OP_SMALL_INT_MULTI + 2:
+                case MP_BC_BINARY_OP_SMALL_INT_MULTI + 3:
+                case MP_BC_BINARY_OP_SMALL_INT_MULTI + 4:
+                case MP_BC_BINARY_OP_SMALL_INT_MULTI + 5:
+                case MP_BC_BINARY_OP_SMALL_INT_MULTI + 6:
+                #endif
+                {
+                    MARK_EXC_IP_SELECTIVE();
+                    mp_binary_op_t op = MP_BC_BINARY_OP_SMALL_INT_MULTI_OP(ip[-1] - MP_BC_BINARY_OP_SMALL_INT_MULTI);
+                    #if MICROPY_OPT_FLOAT_TEMPORARIES
+                    const byte *op_ip = ip - 1;
+                    #endif
+                    DECODE_UINT;
+                    mp_obj_t lhs = TOP();
+                    if (mp_obj_is_small_int(lhs)) {
+                        // Both operands are small ints so none of these can
+                        // overflow an mp_int_t.
+                        mp_int_t lhs_val = MP_OBJ_SMALL_INT_VALUE(lhs);
+                        mp_int_t rhs_val = unum;
+                        switch (op) {
+                            case MP_BINARY_OP_LESS:
+                                SET_TOP(mp_obj_new_bool(lhs_val < rhs_val));
+                                DISPATCH();
+                            case MP_BINARY_OP_MORE:
+                                SET_TOP(mp_obj_new_bool(lhs_val > rhs_val));
+                                DISPATCH();
+                            case MP_BINARY_OP_EQUAL:
+                                SET_TOP(mp_obj_new_bool(lhs_val == rhs_val));
+                                DISPATCH();
+                            case MP_BINARY_OP_ADD:
+                            case MP_BINARY_OP_INPLACE_ADD:
+                                lhs_val += rhs_val;
+                                break;
+                            default: // MP_BINARY_OP_SUBTRACT, MP_BINARY_OP_INPLACE_SUBTRACT
+                                lhs_val -= rhs_val;
+                                break;
+                        }
+                        if (MP_SMALL_INT_FITS(lhs_val)) {
+                            SET_TOP(MP_OBJ_NEW_SMALL_INT(lhs_val));
+                            DISPATCH();
+                        }
+                    }
+                    #if MICROPY_OPT_FLOAT_TEMPORARIES
+                    else if (mp_obj_is_float(lhs) && op >= MP_BINARY_OP_INPLACE_OR) {
+                        // This opcode loads the small int itself, so the left
+                        // operand is a temporary if the float op was just before.
+                        SET_TOP(mp_obj_float_binary_op_tmp(op, mp_obj_float_get(lhs), MP_OBJ_NEW_SMALL_INT(unum),
+                            float_tmp_ip == op_ip ? lhs : MP_OBJ_NULL));
+                        float_tmp_ip = ip;
+                        DISPATCH();
+                    }
+                    #endif
+                    SET_TOP(mp_binary_op(op, lhs, MP_OBJ_NEW_SMALL_INT(unum)));
+                    DISPATCH();
+                }
+
+                ENTRY(MP_BC_LOAD_SUBSCR_SMALL_INT): {
+                    MARK_EXC_IP_SELECTIVE();
+                    DECODE_UINT;
+                    mp_obj_t obj = TOP();
+                    if (mp_obj_is_exact_type(obj, &mp_type_tuple)) {
+                        mp_obj_tuple_t *t = MP_OBJ_TO_PTR(obj);
+                        if (unum < t->len) {
+                            SET_TOP(t->items[unum]);
+                            DISPATCH();
+                        }
+                    } else if (mp_obj_is_exact_type(obj, &mp_type_list)) {
+                        mp_obj_list_t *l = MP_OBJ_TO_PTR(obj);
+                        if (unum < l->len) {
+                            SET_TOP(l->items[unum]);
+                            DISPATCH();
+                        }
+                    }
+                    SET_TOP(mp_obj_subscr(obj, MP_OBJ_NEW_SMALL_INT(unum), MP_OBJ_SENTINEL));
+                    DISPATCH();
+                }
+                #endif
+
+                #if MICROPY_OPT_COMPUTED_GOTO
 
                 ENTRY(MP_BC_LOAD_FAST_MULTI):
                     obj_shared = fastn[MP_BC_LOAD_FAST_MULTI - (mp_int_t)ip[-1]];
@@ -1306,6 +1542,14 @@ yield:
                     MARK_EXC_IP_SELECTIVE();
                     mp_obj_t rhs = POP();
                     mp_obj_t lhs = TOP();
+                    #if MICROPY_OPT_FLOAT_TEMPORARIES
+                    mp_obj_t res = vm_float_binary_op(ip[-1] - MP_BC_BINARY_OP_MULTI, lhs, rhs, ip - 1, float_tmp_ip);
+                    if (res != MP_OBJ_NULL) {
+                        SET_TOP(res);
+                        float_tmp_ip = mp_obj_is_float(res) ? ip : NULL;
+                        DISPATCH();
+                    }
+                    #endif
                     SET_TOP(mp_binary_op(ip[-1] - MP_BC_BINARY_OP_MULTI, lhs, rhs));
                     DISPATCH();
                 }
@@ -1329,6 +1573,14 @@ yield:
                     } else if (ip[-1] < MP_BC_BINARY_OP_MULTI + MP_BC_BINARY_OP_MULTI_NUM) {
                         mp_obj_t rhs = POP();
                         mp_obj_t lhs = TOP();
+                        #if MICROPY_OPT_FLOAT_TEMPORARIES
+                        mp_obj_t res = vm_float_binary_op(ip[-1] - MP_BC_BINARY_OP_MULTI, lhs, rhs, ip - 1, float_tmp_ip);
+                        if (res != MP_OBJ_NULL) {
+                            SET_TOP(res);
+                            float_tmp_ip = mp_obj_is_float(res) ? ip : NULL;
+                            DISPATCH();
+                        }
+                        #endif
                         SET_TOP(mp_binary_op(ip[-1] - MP_BC_BINARY_OP_MULTI, lhs, rhs));
                         DISPATCH();
                     } else
@@ -1350,6 +1602,11 @@ pending_exception_check:
                 // run periodic code/checks and/or bounce the GIL.. i.e.
                 // not _every_ instruction but on average a branch should
                 // occur every few instructions.
+                #if MICROPY_OPT_FLOAT_TEMPORARIES
+                // A jump may lead to an op that follows a float op, without
+                // the float op having been executed just before it.
+                float_tmp_ip = NULL;
+                #endif
                 MICROPY_VM_HOOK_LOOP
 
                 // Check for pending exceptions or scheduled tasks to run.
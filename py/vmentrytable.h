@@ -127,6 +127,13 @@ static entry_table_type const PLACE_IN_DTCM_DATA(entry_table[256]) = {
     [MP_BC_IMPORT_NAME] = COMPUTE_ENTRY(&& entry_MP_BC_IMPORT_NAME),
     [MP_BC_IMPORT_FROM] = COMPUTE_ENTRY(&& entry_MP_BC_IMPORT_FROM),
     [MP_BC_IMPORT_STAR] = COMPUTE_ENTRY(&& entry_MP_BC_IMPORT_STAR),
+    #if MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS
+    [MP_BC_LOAD_FAST0_ATTR] = COMPUTE_ENTRY(&& entry_MP_BC_LOAD_FAST0_ATTR),
+    [MP_BC_LOAD_FAST0_METHOD] = COMPUTE_ENTRY(&& entry_MP_BC_LOAD_FAST0_METHOD),
+    [MP_BC_STORE_FAST0_ATTR] = COMPUTE_ENTRY(&& entry_MP_BC_STORE_FAST0_ATTR),
+    [MP_BC_BINARY_OP_SMALL_INT_MULTI ... MP_BC_BINARY_OP_SMALL_INT_MULTI + MP_BC_BINARY_OP_SMALL_INT_MULTI_NUM - 1] = COMPUTE_ENTRY(&& entry_MP_BC_BINARY_OP_SMALL_INT_MULTI),
+    [MP_BC_LOAD_SUBSCR_SMALL_INT] = COMPUTE_ENTRY(&& entry_MP_BC_LOAD_SUBSCR_SMALL_INT),
+    #endif
     [MP_BC_LOAD_CONST_SMALL_INT_MULTI ... MP_BC_LOAD_CONST_SMALL_INT_MULTI + MP_BC_LOAD_CONST_SMALL_INT_MULTI_NUM - 1] = COMPUTE_ENTRY(&& entry_MP_BC_LOAD_CONST_SMALL_INT_MULTI),
     [MP_BC_LOAD_FAST_MULTI ... MP_BC_LOAD_FAST_MULTI + MP_BC_LOAD_FAST_MULTI_NUM - 1] = COMPUTE_ENTRY(&& entry_MP_BC_LOAD_FAST_MULTI),
     [MP_BC_STORE_FAST_MULTI ... MP_BC_STORE_FAST_MULTI + MP_BC_LOAD_FAST_MULTI_NUM - 1] = COMPUTE_ENTRY(&& entry_MP_BC_STORE_FAST_MULTI),
@@ -140,6 +140,14 @@ static mp_uint_t eventqueue_ioctl(mp_obj_t self_in, mp_uint_t request, uintptr_t
             }
             return ret;
         }
+        #if MICROPY_PY_SELECT_NOTIFY
+        case MP_STREAM_POLL_NOTIFY:
+            if (!keypad_eventqueue_set_poll_notifier(self, arg)) {
+                *errcode = MP_EBUSY;
+                return MP_STREAM_ERROR;
+            }
+            return 0;
+        #endif
         default:
             *errcode = MP_EINVAL;
             return MP_STREAM_ERROR;
@@ -8,6 +8,7 @@
 #include "shared-bindings/keypad/EventQueue.h"
 #include "shared-bindings/supervisor/__init__.h"
 #include "shared-module/keypad/EventQueue.h"
+#include "py/stream.h"
 
 // Key number is lower 15 bits of a 16-bit value.
 #define EVENT_PRESSED (1 << 15)
@@ -20,6 +21,9 @@ void common_hal_keypad_eventqueue_construct(keypad_eventqueue_obj_t *self, size_
     ringbuf_alloc(&self->encoded_events, max_events * EVENT_SIZE_BYTES);
     self->overflowed = false;
     self->event_handler = NULL;
+    #if MICROPY_PY_SELECT_NOTIFY
+    self->poll_notifier = 0;
+    #endif
 }
 
 bool common_hal_keypad_eventqueue_get_into(keypad_eventqueue_obj_t *self, keypad_event_obj_t *event) {
@@ -90,5 +94,22 @@ bool keypad_eventqueue_record(keypad_eventqueue_obj_t *self, mp_uint_t key_numbe
         self->event_handler(self);
     }
 
+    #if MICROPY_PY_SELECT_NOTIFY
+    if (self->poll_notifier) {
+        mp_stream_poll_notify(self->poll_notifier);
+    }
+    #endif
+
+    return true;
+}
+
+#if MICROPY_PY_SELECT_NOTIFY
+// Returns false if a poller is already being notified.
+bool keypad_eventqueue_set_poll_notifier(keypad_eventqueue_obj_t *self, uintptr_t notifier) {
+    if (notifier != 0 && self->poll_notifier != 0) {
+        return false;
+    }
+    self->poll_notifier = notifier;
     return true;
 }
+#endif
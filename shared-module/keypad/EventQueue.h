@@ -16,6 +16,12 @@ struct _keypad_eventqueue_obj_t {
     ringbuf_t encoded_events;
     bool overflowed;
     void (*event_handler)(keypad_eventqueue_obj_t *);
+    #if MICROPY_PY_SELECT_NOTIFY
+    uintptr_t poll_notifier;
+    #endif
 };
 
 bool keypad_eventqueue_record(keypad_eventqueue_obj_t *self, mp_uint_t key_number, bool pressed, mp_obj_t timestamp);
+#if MICROPY_PY_SELECT_NOTIFY
+bool keypad_eventqueue_set_poll_notifier(keypad_eventqueue_obj_t *self, uintptr_t notifier);
+#endif
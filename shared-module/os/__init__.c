@@ -153,6 +153,7 @@ void common_hal_os_chdir(const char *path) {
     } else {
         mp_vfs_proxy_call(vfs, MP_QSTR_chdir, 1, &path_out);
     }
+    mp_vfs_import_cache_clear();
 }
 
 mp_obj_t common_hal_os_getcwd(void) {
@@ -198,6 +199,7 @@ void common_hal_os_mkdir(const char *path) {
         mp_raise_OSError(MP_EEXIST);
     }
     mp_vfs_proxy_call(vfs, MP_QSTR_mkdir, 1, &path_out);
+    mp_vfs_import_cache_clear();
 }
 
 void common_hal_os_remove(const char *path) {
@@ -205,6 +207,7 @@ void common_hal_os_remove(const char *path) {
     mp_obj_t path_out;
     mp_vfs_mount_t *vfs = lookup_path(abspath, &path_out);
     mp_vfs_proxy_call(vfs, MP_QSTR_remove, 1, &path_out);
+    mp_vfs_import_cache_clear();
 }
 
 void common_hal_os_rename(const char *old_path, const char *new_path) {
@@ -216,6 +219,7 @@ void common_hal_os_rename(const char *old_path, const char *new_path) {
         mp_raise_OSError(MP_EPERM);
     }
     mp_vfs_proxy_call(old_vfs, MP_QSTR_rename, 2, args);
+    mp_vfs_import_cache_clear();
 }
 
 void common_hal_os_rmdir(const char *path) {
@@ -223,6 +227,7 @@ void common_hal_os_rmdir(const char *path) {
     mp_obj_t path_out;
     mp_vfs_mount_t *vfs = lookup_dir_path(abspath, &path_out);
     mp_vfs_proxy_call(vfs, MP_QSTR_rmdir, 1, &path_out);
+    mp_vfs_import_cache_clear();
 }
 
 mp_obj_t common_hal_os_stat(const char *path) {
@@ -131,6 +131,8 @@ void common_hal_storage_mount(mp_obj_t vfs_obj, const char *mount_path, bool rea
     mp_vfs_mount_t **vfsp = &MP_STATE_VM(vfs_mount_table);
     vfs->next = *vfsp;
     *vfsp = vfs;
+
+    mp_vfs_import_cache_clear();
 }
 
 void common_hal_storage_umount_object(mp_obj_t vfs_obj) {
@@ -155,6 +157,8 @@ void common_hal_storage_umount_object(mp_obj_t vfs_obj) {
 
     // call the underlying object to do any unmounting operation
     mp_vfs_proxy_call(vfs, MP_QSTR_umount, 0, NULL);
+
+    mp_vfs_import_cache_clear();
 }
 
 static mp_obj_t storage_object_from_path(const char *mount_path) {
@@ -193,6 +197,9 @@ void common_hal_storage_remount(const char *mount_path, bool readonly, bool disa
     filesystem_set_concurrent_write_protection(fs_usermount, !disable_concurrent_write_protection);
     blockdev_unlock(fs_usermount);
 
+    // The host may have changed files while it had write access.
+    mp_vfs_import_cache_clear();
+
     #if CIRCUITPY_USB_DEVICE && CIRCUITPY_USB_MSC
     usb_msc_remount(fs_usermount);
     #endif
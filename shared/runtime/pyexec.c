@@ -89,6 +89,9 @@ static int parse_compile_execute(const void *source, mp_parse_input_kind_t input
     if (nlr_push(&nlr) == 0) {
         // CIRCUITPY-CHANGE
         mp_obj_t module_fun = mp_const_none;
+        #if MICROPY_PARSE_STREAMING
+        mp_lexer_t *stream_lex = NULL;
+        #endif
         // CIRCUITPY-CHANGE
         #if CIRCUITPY_ATEXIT
         if (!(exec_flags & EXEC_FLAG_SOURCE_IS_ATEXIT))
@@ -127,8 +130,16 @@ static int parse_compile_execute(const void *source, mp_parse_input_kind_t input
                 }
                 #endif
 
-                mp_parse_tree_t parse_tree = mp_parse(lex, input_kind);
-                module_fun = mp_compile(&parse_tree, source_name, exec_flags & EXEC_FLAG_IS_REPL);
+                #if MICROPY_PARSE_STREAMING
+                if (input_kind == MP_PARSE_FILE_INPUT) {
+                    // the script is parsed and compiled as it executes, below
+                    stream_lex = lex;
+                } else
+                #endif
+                {
+                    mp_parse_tree_t parse_tree = mp_parse(lex, input_kind);
+                    module_fun = mp_compile(&parse_tree, source_name, exec_flags & EXEC_FLAG_IS_REPL);
+                }
                 #else
                 mp_raise_msg(&mp_type_RuntimeError, MP_ERROR_TEXT("script compilation not supported"));
                 #endif
@@ -154,6 +165,11 @@ static int parse_compile_execute(const void *source, mp_parse_input_kind_t input
             mp_call_function_n_kw(callback->func, callback->n_pos, callback->n_kw, callback->args);
         } else
         #endif
+        #if MICROPY_PARSE_STREAMING
+        if (stream_lex != NULL) {
+            mp_compile_execute_file_streaming(stream_lex);
+        } else
+        #endif
         // CIRCUITPY-CHANGE
         if (module_fun != mp_const_none) {
             mp_call_function_0(module_fun);
@@ -60,6 +60,9 @@ static int background_prevention_count;
 
 void PLACE_IN_ITCM(background_callback_run_all)(void) {
     port_background_task();
+    #if MICROPY_GC_INCREMENTAL_SWEEP
+    gc_sweep_step();
+    #endif
     if (!background_callback_pending()) {
         return;
     }
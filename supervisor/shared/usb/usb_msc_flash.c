@@ -306,6 +306,10 @@ int32_t tud_msc_write10_cb(uint8_t lun, uint32_t lba, uint32_t offset, uint8_t *
 void tud_msc_write10_complete_cb(uint8_t lun) {
     (void)lun;
 
+    // The host may have added or removed files, so forget any cached
+    // directory listings used by import.
+    mp_vfs_import_cache_clear();
+
     // This write is complete; initiate an autoreload.
     autoreload_resume(AUTORELOAD_SUSPEND_USB);
     autoreload_trigger();
@@ -0,0 +1,133 @@
+# test opcode pairs that the bytecode emitter may fuse into a single opcode:
+# local 0 followed by an attribute access, and a small int followed by a binary
+# op or a subscript
+
+
+class A:
+    def __init__(self, x):
+        self.x = x
+
+    def get(self):
+        return self.x
+
+    def set(self, x):
+        self.x = x
+
+    def call(self):
+        return self.get() + 1
+
+    def delete(self):
+        del self.x
+
+    def cond(self, c):
+        return self.x if c else self.get()
+
+    def gen(self):
+        for i in range(3):
+            yield self.x + i
+
+
+a = A(1)
+print(a.get(), a.call())
+a.set(5)
+print(a.x, a.get(), a.cond(True), a.cond(False), list(a.gen()))
+a.delete()
+print(hasattr(a, "x"))
+
+
+# local 0 that is not yet assigned
+def f():
+    if False:
+        o = None
+    return o.x
+
+
+try:
+    f()
+except NameError:
+    print("NameError")
+
+
+# an attribute that does not exist
+def g(o):
+    return o.y
+
+
+try:
+    g(a)
+except AttributeError:
+    print("AttributeError")
+
+
+# binary ops with a small int on the right
+def ops(x):
+    return (x + 1, x - 2, x * 3, x // 4, x % 5, x << 2, x >> 1, x & 3, x | 4, x ^ 5)
+
+
+def cmps(x):
+    return (x < 6, x > 7, x == 8, x <= 9, x >= 10, x != 11)
+
+
+for x in (0, 8, -13, 2**40):
+    print(ops(x), cmps(x))
+print(cmps(True), cmps(False))
+
+
+# results that no longer fit in a small int
+x = 0x3FFFFFFF
+print(x + 1, x + 0xFFFF, -x - 1 - 0xFFFF)
+x = 0x3FFFFFFFFFFFFFFF
+print(x + 1, -x - 1 - 1)
+
+# other types on the left
+print("ab" * 3, [1] * 2, (1, 2) * 2, b"x" * 4, 0.5 + 1, 2.5 < 3)
+
+
+# in-place ops dispatch to the left operand
+class B:
+    def __init__(self):
+        self.v = 0
+
+    def __iadd__(self, n):
+        self.v += n * 10
+        return self
+
+    def __add__(self, n):
+        return "add %d" % n
+
+
+b = B()
+b += 2
+print(b.v, b + 3)
+i = 0
+for _ in range(5):
+    i += 1
+    i -= 2
+print(i)
+
+
+# subscripts with a small int index
+class C(list):
+    def __getitem__(self, i):
+        return "C" + str(i)
+
+
+def sub(o):
+    return o[0], o[1]
+
+
+for o in ((1, 2), [3, 4], "ab", b"cd", bytearray(b"ef"), {0: 5, 1: 6}, range(2), C()):
+    print(sub(o))
+for o in ((), [7], "a"):
+    try:
+        sub(o)
+    except IndexError:
+        print("IndexError")
+try:
+    sub({})
+except KeyError:
+    print("KeyError")
+try:
+    sub(None)
+except TypeError:
+    print("TypeError")
@@ -0,0 +1,85 @@
+# test that repeated attribute/method/global lookups at the same site see
+# changes to instances, classes and globals
+
+
+class A:
+    def __init__(self):
+        self.x = 1
+
+    def f(self):
+        return "A.f"
+
+
+class B:
+    def __init__(self):
+        self.y = 0
+        self.x = 2
+
+    def f(self):
+        return "B.f"
+
+
+class C(A):
+    pass
+
+
+def get(objs):
+    return [(o.x, o.f()) for o in objs]
+
+
+# polymorphic site
+objs = [A(), B(), C(), A(), B()]
+print(get(objs))
+
+# instance member shadows class method
+a = A()
+print(get([a]))
+a.f = lambda: "inst"
+print(get([a]))
+del a.f
+print(get([a]))
+
+# class method replaced after the site has been used
+A.f = lambda self: "new"
+print(get([A(), C()]))
+
+# members map grows and changes layout
+a = A()
+print(get([a]))
+for i in range(20):
+    setattr(a, "a%d" % i, i)
+print(get([a]))
+a.x = 3
+print(get([a]))
+
+# instance attribute added over a class attribute
+A.x = "class"
+a = A()
+del a.x
+print(a.x)
+a.x = "inst"
+print(a.x)
+
+# global replaced, deleted, and falling back to a builtin
+len = lambda x: -1
+
+
+def glen(x):
+    return len(x)
+
+
+print(glen([1, 2]))
+del len
+print(glen([1, 2]))
+g = 1
+
+
+def getg():
+    return g
+
+
+print(getg())
+for i in range(20):
+    globals()["g%d" % i] = i
+g = 2
+print(getg())
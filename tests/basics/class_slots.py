@@ -0,0 +1,141 @@
+# test classes with __slots__
+
+try:
+
+    class Test:
+        __slots__ = ("a",)
+
+    Test.a
+except AttributeError:
+    print("SKIP")
+    raise SystemExit
+
+
+class Point:
+    __slots__ = ("x", "y")
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+    def norm2(self):
+        return self.x * self.x + self.y * self.y
+
+
+p = Point(3, 4)
+print(p.x, p.y, p.norm2())
+p.x = 5
+print(p.x, p.norm2())
+print(getattr(p, "y"), hasattr(p, "y"))
+setattr(p, "y", 6)
+print(p.y)
+
+# unset and deleted slots
+class Pair:
+    __slots__ = ("x", "y")
+
+
+q = Pair()
+print(hasattr(q, "x"))
+q.x = 1
+print(q.x)
+del q.x
+try:
+    q.x
+except AttributeError:
+    print("AttributeError")
+try:
+    del q.x
+except AttributeError:
+    print("AttributeError")
+
+# slots are independent between instances
+a = Point(1, 2)
+b = Point(3, 4)
+a.x = 10
+print(a.x, a.y, b.x, b.y)
+
+# a single string names one slot
+class One:
+    __slots__ = "v"
+
+
+o = One()
+o.v = [1]
+print(o.v)
+
+
+# subclass adding more slots
+class Point3(Point):
+    __slots__ = ("z",)
+
+    def __init__(self, x, y, z):
+        super().__init__(x, y)
+        self.z = z
+
+    def norm2(self):
+        return super().norm2() + self.z * self.z
+
+
+p3 = Point3(1, 2, 3)
+print(p3.x, p3.y, p3.z, p3.norm2())
+p3.y = 4
+print(p3.norm2())
+print(isinstance(p3, Point))
+
+
+# subclass without __slots__ keeps the inherited slots
+class Tagged(Point):
+    pass
+
+
+t = Tagged(7, 8)
+t.tag = "t"
+print(t.x, t.y, t.tag)
+
+
+# class attributes, methods and properties alongside slots
+class Counter:
+    __slots__ = ("n",)
+    step = 2
+
+    def __init__(self):
+        self.n = 0
+
+    def incr(self):
+        self.n += self.step
+        return self
+
+    @property
+    def double(self):
+        return self.n * 2
+
+
+c = Counter()
+c.incr().incr()
+print(c.n, c.double, c.step)
+
+
+# __getattr__ is consulted for an unset slot
+class Lazy:
+    __slots__ = ("v",)
+
+    def __getattr__(self, attr):
+        return "default " + attr
+
+
+lz = Lazy()
+print(lz.v)
+lz.v = 1
+print(lz.v)
+
+
+# a slot name can't also be a class attribute
+try:
+
+    class Bad:
+        __slots__ = ("x",)
+        x = 1
+
+except ValueError:
+    print("ValueError")
@@ -0,0 +1,38 @@
+# test that collections keep everything reachable from objects too wide or
+# too deep for the mark stack to hold all at once
+
+try:
+    import gc
+except ImportError:
+    print("SKIP")
+    raise SystemExit
+
+
+def check(table, chain, tree):
+    total = sum(r[0] + r[1][0] + len(r[1][1]) + len(r[2]) for r in table)
+    n = 0
+    while chain is not None:
+        chain, item = chain
+        n += item[0]
+    t = sum(v["a"][0] + v["b"][0] + v["c"]["d"] for v in tree.values())
+    return total, n, t
+
+
+def build(n):
+    table = [[i, (i, str(i)), bytearray(1 + i % 24)] for i in range(n)]
+    chain = None
+    for i in range(n):
+        chain = (chain, [i])
+    tree = {}
+    for i in range(n // 4):
+        tree[i] = {"a": [i], "b": (i,), "c": {"d": i}}
+    return table, chain, tree
+
+
+data = build(600)
+print(check(*data))
+for i in range(4):
+    gc.collect()
+    # reuse any memory that was wrongly freed
+    garbage = [[j, (j, str(-j)), bytearray(1 + j % 24)] for j in range(600)]
+    print(check(*data))
@@ -0,0 +1,44 @@
+# test multiplication, pow and string conversion of very large integers,
+# which may use different algorithms to smaller ones
+
+P = 1000000007
+
+
+def lcg_int(seed, ndigits):
+    # build a deterministic large integer from 30-bit chunks
+    x = 0
+    for _ in range(ndigits):
+        seed = (seed * 1103515245 + 12345) & 0x3FFFFFFF
+        x = x << 30 | seed
+    return x
+
+
+# balanced and unbalanced operands, of either sign
+for na, nb in ((40, 40), (70, 75), (200, 30), (150, 149), (400, 390), (700, 50)):
+    a = lcg_int(na, na)
+    b = lcg_int(nb + 1, nb)
+    for sa, sb in ((1, 1), (-1, 1), (1, -1)):
+        r = (sa * a) * (sb * b)
+        print(na, nb, r % P, r.bit_length(), r // b == sa * sb * a)
+    print((a * a) % P, (a * a) // a == a)
+
+# operands with long runs of zero and all-ones digits
+a = (1 << 9000) - 1
+b = (1 << 7000) + 1
+print((a * b) % P, hex(a * a)[-40:], hex(a * b)[:40])
+
+# 3-argument pow with odd, even and negative moduli
+m = lcg_int(3, 70) | 1
+x = lcg_int(4, 80)
+for e in (1, 2, 3, 255, 256, lcg_int(5, 3), lcg_int(6, 40)):
+    print(pow(x, e, m) % P, pow(-x, e, m) % P, pow(x, e, m - 1) % P, pow(x, e, -m) % P)
+print(pow(2, m - 1, m) % P, pow(m, 5, m), pow(0, 5, m), pow(x, 0, m))
+
+# string conversion in bases with and without a power of 2
+a = lcg_int(7, 100)
+for v in (a, -a, a * a + 1, 10**1000, -(2**3000)):
+    s = str(v)
+    print(len(s), s[:30], s[-30:], int(s) == v)
+    print(hex(v)[:30], oct(v)[-30:], bin(v)[:30], int(hex(v), 16) == v)
+print("{:,}".format(10**60 + 1))
+print(int("12345" * 300) % P, int("zz" * 400, 36) % P, int("7" * 500, 8) % P)
@@ -0,0 +1,62 @@
+# test OrderedDict operations on maps large enough to be hash indexed
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    print("SKIP")
+    raise SystemExit
+
+N = 100
+d = OrderedDict()
+for i in range(N):
+    d["k%d" % i] = i
+print(len(d), list(d.keys())[:3], list(d.keys())[-3:])
+
+# lookup with freshly created (non-interned) keys
+print(all(d["k%d" % i] == i for i in range(N)))
+print("k%d" % N in d, "k%d" % (N - 1) in d)
+
+# overwrite keeps the position
+d["k5"] = -5
+print(list(d.items())[5])
+
+# deletion keeps the order of the rest
+for i in range(0, N, 2):
+    del d["k%d" % i]
+print(len(d), list(d.keys())[:3])
+print(all(d["k%d" % i] == (-5 if i == 5 else i) for i in range(1, N, 2)))
+print("k0" in d, d.get("k2"))
+
+# reinsertion goes at the end
+for i in range(0, N, 2):
+    d["k%d" % i] = i
+print(len(d), list(d.keys())[-3:])
+print(all("k%d" % i in d for i in range(N)))
+
+# popitem
+print(d.popitem(), d.popitem(), len(d))
+print("k98" in d, "k96" in d, "k1" in d)
+
+# pop and setdefault
+print(d.pop("k50"), d.pop("k50", None), d.setdefault("k50", 50), list(d.keys())[-1])
+
+# move_to_end
+d.move_to_end("k3")
+d.move_to_end("k97", last=False)
+print(list(d.keys())[:2], list(d.keys())[-1], d["k3"], d["k97"])
+
+# copy and equality
+c = d.copy()
+print(c == d, list(c.keys()) == list(d.keys()), c["k77"])
+c["new"] = 1
+print("new" in c, "new" in d)
+
+# non-string keys
+e = OrderedDict((i * 7, i) for i in range(200))
+del e[70]
+print(len(e), e[1393], 70 in e, list(e)[9:11])
+
+# clear then reuse
+d.clear()
+d["a"] = 1
+print(list(d.items()))
@@ -0,0 +1,50 @@
+# tests constant folding of str, bytes and tuple operations, comparisons,
+# len() and constant conditions
+
+print("ab" + "cd", b"ab" + b"cd", (1, 2) + (3,), () + ())
+print("ab" * 3, 2 * b"x", (1,) * 4, "a" * 0, (1, 2) * -1)
+print("x" * 300 == "x" * 300, len("y" * 1000))
+
+print(1 < 2, 1 > 2, 1 == 1, 1 <= 0, 2 >= 2, 1 != 1)
+print(1 < 2 < 3, 1 < 3 < 2, 3 > 2 > 1 > 0)
+print("a" < "b", b"b" < b"a", "abc" == "abc", "a" == 1, (1, 2) == (1, 2))
+print(None == None, True == 1, False != 0, None != False)
+print(2 in (1, 2, 3), 4 in (1, 2, 3), "b" in "abc", b"z" in b"abc", () in ((),))
+print(1 not in (1, 2), 3 not in (1, 2))
+
+# these must still raise at run time
+for code in ('"a" + 1', '"a" < 1', "(1,) < ('a',)", '1 in "abc"', "1 // 0", "1 % 0", "1 << -1"):
+    try:
+        eval(code)
+    except (TypeError, ZeroDivisionError, ValueError) as e:
+        print(code, type(e).__name__)
+
+# len() of constants
+print(len("abc"), len(b"ab"), len(()), len((1, 2, 3)), len(""))
+
+
+def f():
+    return len("hello") + len((1, 2))
+
+
+print(f())
+
+
+# len() that is not the builtin
+def g(len):
+    return len("abc")
+
+
+print(g(lambda x: x * 2))
+exec("len = lambda x: 42\nprint(len('abc'))", {})
+exec("def h():\n    global len\n    len = lambda x: 43\nh()\nprint(len('abc'))", {})
+exec("class A:\n    len = 44\nprint(len('abc'))", {})
+
+# constant conditions
+print(1 if True else foo, foo if 0 else 2, 3 if "x" else foo)
+assert True
+assert "x"
+try:
+    assert ()
+except AssertionError:
+    print("AssertionError")
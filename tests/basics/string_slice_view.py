@@ -0,0 +1,64 @@
+# test that long slices of str and bytes are independent of the original object
+
+try:
+    import gc, struct
+except ImportError:
+    print("SKIP")
+    raise SystemExit
+
+
+def make(c):
+    return c * 40 + "0123456789" * 8 + c * 40
+
+
+# slices that outlive the object they were taken from
+def slices(n):
+    s = make("a")
+    b = bytes(s, "ascii")
+    return [s[n:], s[30:120], s[35:45], s[1:-1]], [b[n:], b[30:120], b[35:45], b[1:-1]]
+
+
+for n in (0, 10):
+    ss, bs = slices(n)
+    gc.collect()
+    garbage = [make("x") for _ in range(20)]
+    garbage = [bytes(make("y"), "ascii") for _ in range(20)]
+    for x in ss + bs:
+        print(len(x), x[:12], x[-12:])
+
+# slices of slices
+s = make("b")
+t = s
+for i in range(8):
+    s = s[i : len(s) - i]
+    gc.collect()
+    print(len(s), s[:12], s[-12:], s == t[i * (i + 1) // 2 : len(t) - i * (i + 1) // 2])
+t = None
+gc.collect()
+print(s)
+
+# comparison, hashing and use as a dict key
+s = make("c")
+t = make("c")
+print(s[5:90] == t[5:90], s[5:90] < t[6:90], hash(s[5:90]) == hash(t[5:90]))
+d = {s[20:80]: 1}
+print(d[t[20:80]], t[20:80] in d, t[21:80] in d)
+print(hash(b"0123456789" * 3) == hash(make("c").encode()[40:70]))
+
+# conversion between str and bytes
+s = make("d")
+b = bytes(s[10:90], "ascii")
+s = None
+gc.collect()
+print(b, str(b[25:70], "ascii"))
+
+# operations on a slice
+s = make("e")
+t = s[30:70]
+print(t.upper(), t.find("9"), t.split("5"), t + "!", repr(t[:20]))
+print(int(make("1")[20:100]))
+
+# a slice passed where a null-terminated string is needed
+fmt = "<IIIIIIIIIIHHHHHHHHHH"
+print(struct.calcsize(fmt[:11]), struct.calcsize(fmt[11:]))
+print(struct.unpack(fmt[:11], bytes(range(40))))
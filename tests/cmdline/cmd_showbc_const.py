@@ -54,14 +54,13 @@ b = _SMALLINT and _STR
 if b == _STR:
     print("Kept")
 
-# The compiler is also unable to optimise these expressions, even though the arguments are const,
-# so these also contain JUMP_IF
+# Comparisons of constants are evaluated at compile time, so these contain no JUMP_IF
 
 if (_EMPTY_TUPLE or _STR) == _STR:
     print("Kept")
 
 if (_EMPTY_TUPLE and _STR) == _STR:
-    print("Not Eliminated")
+    print("Eliminated")
 
 if (not _STR) == _FALSE:
     print("Kept")
@@ -0,0 +1,10 @@
+# cmdline: -v -v
+# test printing of bytecode superinstructions
+
+
+def f(self, x, a):
+    self.y = self.x
+    self.m()
+    x += 1
+    x -= 2
+    return a[0] + (x < 3) + (x > 4) + (x == 5) + (x + 6) + (x - 7)
@@ -0,0 +1,18 @@
+"""
+categories: Core,Classes
+description: Instances of a class with ``__slots__`` accept attributes that aren't listed in ``__slots__``
+cause: Such attributes are stored in the instance's members map, which every instance has.
+workaround: Don't rely on ``__slots__`` to reject unknown attributes.
+"""
+
+
+class A:
+    __slots__ = ("x",)
+
+
+a = A()
+try:
+    a.y = 1
+    print(a.y)
+except AttributeError:
+    print("AttributeError")
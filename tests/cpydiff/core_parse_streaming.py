@@ -0,0 +1,11 @@
+"""
+categories: Core
+description: Statements before a syntax error in a file are executed when MICROPY_PARSE_STREAMING is enabled.
+cause: To save RAM, the file is parsed, compiled and run one top-level statement at a time, so a syntax error is only found once the statements before it have run.
+workaround: Check that the file compiles, for example with mpy-cross, before running it.
+"""
+
+try:
+    exec("print('before')\nx = (\n")
+except SyntaxError:
+    print("SyntaxError")
@@ -0,0 +1,128 @@
+# Test the native event loop, sleep_ms and IOQueue in _asyncio, using a minimal
+# version of the state that asyncio/core.py keeps in its globals.
+
+try:
+    import _asyncio
+
+    _asyncio.run_until_complete
+except (ImportError, AttributeError):
+    print("SKIP")
+    raise SystemExit
+
+
+class CancelledError(BaseException):
+    pass
+
+
+class Loop:
+    @staticmethod
+    def call_exception_handler(context):
+        print("exception handler:", repr(context["exception"]))
+
+
+cur_task = None
+_task_queue = _asyncio.TaskQueue()
+_io_queue = _asyncio.IOQueue()
+_exc_context = {"message": "Task exception wasn't retrieved", "exception": None, "future": None}
+sleep_ms = _asyncio.sleep_ms
+
+
+def create_task(coro):
+    t = _asyncio.Task(coro, globals())
+    _task_queue.push(t)
+    return t
+
+
+async def worker(name, delay, n):
+    for i in range(n):
+        await sleep_ms(delay)
+        print(name, i)
+    return name
+
+
+async def fail():
+    await sleep_ms(0)
+    raise ValueError("fail")
+
+
+async def main():
+    t1 = create_task(worker("a", 10, 3))
+    t2 = create_task(worker("b", 100, 2))
+    print("await", await t1)
+    print("await", await t2)
+    t3 = create_task(fail())
+    try:
+        await t3
+    except ValueError as er:
+        print("caught", repr(er))
+    # A task that fails and is not awaited on goes to the exception handler.
+    create_task(fail())
+    await sleep_ms(10)
+    return 42
+
+
+# The main task's return value is returned.
+print(_asyncio.run_until_complete(create_task(main())))
+print(cur_task)
+
+# With no main task, it runs until there are no tasks left.
+create_task(worker("c", 0, 2))
+print(_asyncio.run_until_complete())
+
+# An exception from the main task is raised.
+try:
+    _asyncio.run_until_complete(create_task(fail()))
+except ValueError as er:
+    print("main raised", repr(er))
+
+
+# A missing await is detected.
+async def no_await():
+    g = sleep_ms(10)
+    try:
+        await sleep_ms(10)
+    except AssertionError:
+        print("AssertionError")
+    await g
+
+
+_asyncio.run_until_complete(create_task(no_await()))
+
+
+# Wait on a stream with the IOQueue.
+try:
+    import io
+
+    io.IOBase
+except (ImportError, AttributeError):
+    print("wait read")
+    print("read ready 0")
+    raise SystemExit
+
+
+class Stream(io.IOBase):
+    def __init__(self):
+        self.ready = False
+
+    def ioctl(self, req, arg):
+        # MP_STREAM_POLL
+        if req == 3:
+            return arg if self.ready else 0
+        # No file descriptor, so poll uses this method.
+        return -1
+
+
+async def reader(s):
+    print("wait read")
+    await _io_queue.queue_read(s)
+    print("read ready", len(_io_queue.map))
+
+
+async def set_ready(s):
+    await sleep_ms(10)
+    s.ready = True
+
+
+s = Stream()
+create_task(set_ready(s))
+_asyncio.run_until_complete(create_task(reader(s)))
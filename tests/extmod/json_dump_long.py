@@ -0,0 +1,58 @@
+# test json.dump and json.dumps with output longer than the internal buffer
+
+try:
+    import io, json
+except ImportError:
+    print("SKIP")
+    raise SystemExit
+
+if not hasattr(io, "IOBase"):
+    print("SKIP")
+    raise SystemExit
+
+
+class S(io.IOBase):
+    def __init__(self):
+        self.buf = ""
+
+    def write(self, buf):
+        if type(buf) == bytearray:
+            # uPy passes a bytearray, CPython passes a str
+            buf = str(buf, "ascii")
+        self.buf += buf
+        return len(buf)
+
+
+def check(obj, **kw):
+    s = S()
+    json.dump(obj, s, **kw)
+    out = json.dumps(obj, **kw)
+    print(len(out), s.buf == out, json.loads(out) == obj)
+    return out
+
+
+# strings with escapes that straddle the buffer boundary
+for n in (250, 255, 256, 257, 300, 1000):
+    out = check("x" * n + '"\\\n\r\t\x01\x1f' + "y" * n)
+    print(out[n - 2 : n + 24])
+
+# many small items
+check(list(range(-500, 500)))
+check([{"key": [True, False, None, "value"]}] * 100)
+check([{"key": [True, False, None, "value"]}] * 100, separators=(",", ":"))
+check(("a" * 100, ("b" * 200, ["c" * 300]), {"d": "e" * 400}))
+
+# small int limits
+print(json.dumps([0, -1, 1, 2**30 - 1, -(2**30)]))
+
+# big ints and floats are mixed in with the rest
+print(json.dumps(["a", 2**100, -(2**100), 1.5, -2.0, "b"]))
+
+# nested dict with non-str keys
+print(json.dumps({"a": {1: {None: [{}]}}}))
+
+# an object that can't be serialized, part way through
+try:
+    json.dumps(["x" * 300, 1, object()])
+except TypeError:
+    print("TypeError")
@@ -0,0 +1,80 @@
+# test json.iterload, which only creates the values at a given path
+
+try:
+    import io
+    import json
+
+    json.iterload
+except (ImportError, AttributeError):
+    print("SKIP")
+    raise SystemExit
+
+doc = """{
+    "city": {"name": "X", "id": 5},
+    "list": [
+        {"dt": 1, "main": {"temp": 1.5}, "weather": [{"id": 800}]},
+        {"dt": 2, "main": {"temp": -2e1}, "note": "a\\"]}\\u0041", "x": null}
+    ],
+    "cnt": 2
+}"""
+
+
+def iterload(path):
+    return list(json.iterload(io.StringIO(doc), path=path))
+
+
+# The whole document.
+print(list(json.iterload(io.StringIO(doc))) == [json.loads(doc)])
+
+# Paths of keys, indices and wildcards.
+print([sorted(d.items()) for d in iterload(("list", None))])
+print(iterload(("list", None, "main", "temp")))
+print(iterload(("list", 1, "dt")))
+print(iterload(("list", 1, "note")))
+print(iterload(("list", None, "weather", 0, "id")))
+print(iterload(("city", None)))
+print(iterload(["cnt"]))
+
+# Paths that don't match anything.
+print(iterload(("nope",)))
+print(iterload(("list", 2)))
+print(iterload(("cnt", 0)))
+print(iterload(("list", "dt")))
+
+# Top-level arrays and primitives.
+print(list(json.iterload(io.StringIO("[1, [2, 3], {}, []]"), path=(None,))))
+print(list(json.iterload(io.StringIO("[1, [2, 3], {}, []]"), path=(1, None))))
+print(list(json.iterload(io.StringIO("true"))))
+print(list(json.iterload(io.StringIO("true"), path=(0,))))
+
+# The iterator can be used part way, and stops after the first value.
+it = json.iterload(io.StringIO('[1, 2, 3] "more"'), path=(None,))
+print(next(it))
+print(list(it))
+
+
+# From an object with readinto, in chunks that split the tokens.
+class Buffer:
+    def __init__(self, data):
+        self._data = data
+        self._i = 0
+
+    def readinto(self, buf):
+        l = min(len(buf), len(self._data) - self._i, 5)
+        buf[:l] = self._data[self._i : self._i + l]
+        self._i += l
+        return l
+
+
+print(list(json.iterload(Buffer(doc.encode()), path=("list", None, "dt"))))
+
+# Invalid input.
+for s in ("", "[1, 2", '{"a": }', '{"a" 1, 2: 3}', "[1, tr]", "]"):
+    try:
+        print(list(json.iterload(io.StringIO(s), path=(None,))))
+    except ValueError:
+        print("ValueError")
+try:
+    json.iterload(io.StringIO("[]"), path=(1.5,))
+except TypeError:
+    print("TypeError")
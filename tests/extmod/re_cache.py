@@ -0,0 +1,38 @@
+# test that compiled patterns are reused, and that results are unaffected
+
+try:
+    import re
+except ImportError:
+    print("SKIP")
+    raise SystemExit
+
+# skip if compiled patterns aren't kept
+if re.compile("a") is not re.compile("a"):
+    print("SKIP")
+    raise SystemExit
+
+# the same pattern gives the same object
+print(re.compile("a+b") is re.compile("a+b"))
+print(re.compile("a+b") is re.compile(b"a+b"))
+print(re.compile("a" + "+b") is re.compile("a+b"))
+
+# more patterns than are kept, used through the module-level functions
+patterns = ["(%s)+x" % c for c in "abcdefghijklmnopqrstuvwxyz"]
+for _ in range(3):
+    for i, p in enumerate(patterns):
+        m = re.match(p, "abcdefghijklmnopqrstuvwxyz"[i] * 3 + "x")
+        print(m and m.group(0), end=" ")
+    print()
+for p in reversed(patterns):
+    print(re.search(p, "--" + p[1] * 2 + "x--").group(1), end=" ")
+print()
+
+# str and bytes patterns are kept apart
+print(re.match("a", "a").group(0), re.match(b"a", b"a").group(0))
+
+# a pattern that fails to compile is still an error the second time
+for _ in range(2):
+    try:
+        re.compile("(")
+    except Exception:
+        print("Exception")
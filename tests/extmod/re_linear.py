@@ -0,0 +1,45 @@
+# test the re.LINEAR flag, which matches without backtracking
+
+try:
+    import re
+
+    re.LINEAR
+except (ImportError, AttributeError):
+    print("SKIP")
+    raise SystemExit
+
+
+def test(pattern, string):
+    r = re.compile(pattern, re.LINEAR)
+    for f in (r.match, r.search):
+        m = f(string)
+        print(m and [m.group(i) for i in range(pattern.count("(") + 1)])
+
+
+# priority of alternatives and greedy/non-greedy repeats is kept
+test("a|ab", "ab")
+test("ab|a", "ab")
+test("(a+)(a*)", "aaa")
+test("(a+?)(a*)", "aaa")
+test("(a*?)b", "xaab")
+test("(a|b)*c", "abbac")
+test("([^,]*),([^,]*)", "one,two,three")
+test("^(\\w+)\\s*=\\s*(\\d+)$", "value = 42")
+test("(\\d+)$", "abc123")
+test("b$", "abc")
+test("(x)?y", "y")
+test("", "")
+
+# the flag is part of what identifies a compiled pattern
+print(re.compile("a", re.LINEAR) is re.compile("a"))
+
+# split and sub use the same matcher
+r = re.compile("[,;] *", re.LINEAR)
+print(r.split("a, b;c,   d"))
+print(r.sub("|", "a, b;c,   d"))
+
+# patterns that backtracking takes exponential time or unbounded stack for
+print(re.compile("(a*)*b", re.LINEAR).match("a" * 40))
+print(re.compile("(a|aa)*c", re.LINEAR).match("a" * 40 + "c").group(0) == "a" * 40 + "c")
+print(re.compile("(a*)*", re.LINEAR).match("aaa").group(0))
+print(len(re.compile(".*x", re.LINEAR).match("y" * 20000 + "x").group(0)))
@@ -0,0 +1,84 @@
+# Test the results of select.poll with objects that become ready and stop being
+# ready, and that are unregistered part way through ipoll().
+
+try:
+    import io
+    import select
+
+    io.IOBase
+except (ImportError, AttributeError):
+    print("SKIP")
+    raise SystemExit
+
+
+class Stream(io.IOBase):
+    def __init__(self, name):
+        self.name = name
+        self.ready = 0
+
+    def __repr__(self):
+        return self.name
+
+    def ioctl(self, req, arg):
+        # MP_STREAM_POLL
+        if req == 3:
+            return self.ready & (arg | select.POLLERR | select.POLLHUP)
+        # No file descriptor.
+        return -1
+
+
+def show(res):
+    print(sorted((repr(obj), ev) for obj, ev in res))
+
+
+streams = [Stream("s%d" % i) for i in range(5)]
+poller = select.poll()
+for s in streams:
+    poller.register(s, select.POLLIN)
+
+show(poller.poll(0))
+streams[1].ready = select.POLLIN
+streams[3].ready = select.POLLIN | select.POLLOUT
+show(poller.poll(0))
+show(poller.ipoll(0))
+
+# Results are only for the objects that are ready at the last poll.
+streams[1].ready = 0
+show(poller.poll(0))
+streams[3].ready = 0
+show(poller.poll(0))
+
+# Events that weren't asked for aren't returned, apart from errors.
+streams[0].ready = select.POLLOUT
+show(poller.poll(0))
+poller.modify(streams[0], select.POLLOUT)
+show(poller.poll(0))
+streams[0].ready = select.POLLERR
+show(poller.poll(0))
+streams[0].ready = 0
+
+# One-shot mode clears the event mask of the objects that are returned.
+streams[2].ready = select.POLLIN
+streams[4].ready = select.POLLIN
+show(poller.ipoll(0, 1))
+show(poller.poll(0))
+poller.modify(streams[2], select.POLLIN)
+show(poller.poll(0))
+poller.modify(streams[4], select.POLLIN)
+
+# Unregister objects while iterating over the results.
+streams[1].ready = select.POLLIN
+n = 0
+for obj, ev in poller.ipoll(0):
+    n += 1
+    for s in (streams[1], streams[2], streams[4]):
+        poller.unregister(s)
+print(n)
+show(poller.poll(0))
+poller.unregister(streams[0])
+poller.unregister(streams[3])
+print(poller.poll(0))
+
+# Registering again after unregistering.
+poller.register(streams[2], select.POLLIN)
+show(poller.poll(0))
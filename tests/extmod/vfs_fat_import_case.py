@@ -0,0 +1,77 @@
+# Test that modules on a FAT filesystem can be imported with a name that differs
+# in case from the name on disk, because FAT looks up names without case.
+
+import sys
+
+try:
+    import os
+
+    os.VfsFat
+except (ImportError, AttributeError):
+    print("SKIP")
+    raise SystemExit
+
+
+class RAMFS:
+    SEC_SIZE = 512
+
+    def __init__(self, blocks):
+        self.data = bytearray(blocks * self.SEC_SIZE)
+
+    def readblocks(self, n, buf):
+        for i in range(len(buf)):
+            buf[i] = self.data[n * self.SEC_SIZE + i]
+        return 0
+
+    def writeblocks(self, n, buf):
+        for i in range(len(buf)):
+            self.data[n * self.SEC_SIZE + i] = buf[i]
+        return 0
+
+    def ioctl(self, op, arg):
+        if op == 4:  # MP_BLOCKDEV_IOCTL_BLOCK_COUNT
+            return len(self.data) // self.SEC_SIZE
+        if op == 5:  # MP_BLOCKDEV_IOCTL_BLOCK_SIZE
+            return self.SEC_SIZE
+
+
+try:
+    bdev = RAMFS(50)
+except MemoryError:
+    print("SKIP")
+    raise SystemExit
+
+os.VfsFat.mkfs(bdev)
+vfs = os.VfsFat(bdev)
+os.mount(vfs, "/ramdisk")
+
+with open("/ramdisk/CaseMod.py", "w") as f:
+    f.write("value = 'mod'\n")
+os.mkdir("/ramdisk/CasePkg")
+with open("/ramdisk/CasePkg/__init__.py", "w") as f:
+    f.write("value = 'pkg'\n")
+
+sys.path.insert(0, "/ramdisk")
+
+
+def try_import(name):
+    sys.modules.pop(name, None)
+    try:
+        __import__(name)
+        print(name, sys.modules[name].value)
+    except ImportError:
+        print(name, "ImportError")
+
+
+# the name as on disk, then in other cases
+try_import("CaseMod")
+try_import("casemod")
+try_import("CASEMOD")
+try_import("casepkg")
+
+# names that aren't there in any case
+try_import("casemod2")
+try_import("nocase")
+
+sys.path.pop(0)
+os.umount("/ramdisk")
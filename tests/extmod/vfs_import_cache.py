@@ -0,0 +1,72 @@
+# Test that imports see changes made to the filesystem through the os and open
+# functions, which matters when directory listings used by import are cached.
+
+import sys
+
+try:
+    import os
+
+    os.mkdir, os.rename, os.rmdir
+except (ImportError, AttributeError):
+    print("SKIP")
+    raise SystemExit
+
+# We need a directory for testing that doesn't already exist.
+# Skip the test if it does exist.
+temp_dir = "micropy_import_cache_dir"
+try:
+    os.stat(temp_dir)
+    print("SKIP")
+    raise SystemExit
+except OSError:
+    pass
+
+
+def write(path, data):
+    with open(temp_dir + "/" + path, "w") as f:
+        f.write(data)
+
+
+def try_import(name):
+    sys.modules.pop(name, None)
+    try:
+        __import__(name)
+        print(sys.modules[name].value)
+    except ImportError:
+        print(name, "ImportError")
+
+
+# a sys.path entry that doesn't exist yet
+sys.path.insert(0, temp_dir)
+try_import("cache_mod1")
+os.mkdir(temp_dir)
+
+# a module created with open()
+try_import("cache_mod1")
+write("cache_mod1.py", "value = 1\n")
+try_import("cache_mod1")
+
+# rename and remove
+try_import("cache_mod2")
+os.rename(temp_dir + "/cache_mod1.py", temp_dir + "/cache_mod2.py")
+try_import("cache_mod1")
+try_import("cache_mod2")
+os.remove(temp_dir + "/cache_mod2.py")
+try_import("cache_mod2")
+
+# a package created with mkdir
+try_import("cache_pkg")
+os.mkdir(temp_dir + "/cache_pkg")
+write("cache_pkg/__init__.py", "value = 'pkg'\n")
+try_import("cache_pkg")
+write("cache_pkg/sub.py", "value = 'sub'\n")
+try_import("cache_pkg.sub")
+os.remove(temp_dir + "/cache_pkg/sub.py")
+try_import("cache_pkg.sub")
+os.remove(temp_dir + "/cache_pkg/__init__.py")
+os.rmdir(temp_dir + "/cache_pkg")
+try_import("cache_pkg")
+
+# clean up
+sys.path.pop(0)
+os.rmdir(temp_dir)
@@ -0,0 +1,116 @@
+# Test that imports see changes made to the filesystem by calling the methods of
+# VFS objects directly, rather than through the os and open functions, which
+# matters when directory listings used by import are cached.
+
+import sys
+
+try:
+    import os
+
+    os.VfsFat, os.VfsPosix
+except (ImportError, AttributeError):
+    print("SKIP")
+    raise SystemExit
+
+
+class RAMFS:
+    SEC_SIZE = 512
+
+    def __init__(self, blocks):
+        self.data = bytearray(blocks * self.SEC_SIZE)
+
+    def readblocks(self, n, buf):
+        for i in range(len(buf)):
+            buf[i] = self.data[n * self.SEC_SIZE + i]
+        return 0
+
+    def writeblocks(self, n, buf):
+        for i in range(len(buf)):
+            self.data[n * self.SEC_SIZE + i] = buf[i]
+        return 0
+
+    def ioctl(self, op, arg):
+        if op == 4:  # MP_BLOCKDEV_IOCTL_BLOCK_COUNT
+            return len(self.data) // self.SEC_SIZE
+        if op == 5:  # MP_BLOCKDEV_IOCTL_BLOCK_SIZE
+            return self.SEC_SIZE
+
+
+# We need a directory for testing that doesn't already exist.
+# Skip the test if it does exist.
+temp_dir = "micropy_import_cache_direct_dir"
+try:
+    os.stat(temp_dir)
+    print("SKIP")
+    raise SystemExit
+except OSError:
+    pass
+
+try:
+    bdev = RAMFS(50)
+except MemoryError:
+    print("SKIP")
+    raise SystemExit
+
+
+def write(fs, path, data):
+    with fs.open(path, "w") as f:
+        f.write(data)
+
+
+def try_import(name):
+    sys.modules.pop(name, None)
+    try:
+        __import__(name)
+        print(sys.modules[name].value)
+    except ImportError:
+        print(name, "ImportError")
+
+
+# A FAT filesystem, changed through its VfsFat object.
+os.VfsFat.mkfs(bdev)
+fs = os.VfsFat(bdev)
+os.mount(fs, "/ramdisk")
+sys.path.insert(0, "/ramdisk")
+
+try_import("direct_mod1")
+write(fs, "direct_mod1.py", "value = 'fat'\n")
+try_import("direct_mod1")
+try_import("direct_pkg")
+fs.mkdir("direct_pkg")
+write(fs, "direct_pkg/__init__.py", "value = 'fat pkg'\n")
+try_import("direct_pkg")
+fs.rename("direct_mod1.py", "direct_mod2.py")
+try_import("direct_mod1")
+try_import("direct_mod2")
+fs.remove("direct_mod2.py")
+try_import("direct_mod2")
+
+sys.path.pop(0)
+os.umount("/ramdisk")
+
+# A directory on the host filesystem, changed through a VfsPosix object that
+# isn't mounted.
+os.mkdir(temp_dir)
+fs = os.VfsPosix()
+sys.path.insert(0, temp_dir)
+
+try_import("direct_mod3")
+write(fs, temp_dir + "/direct_mod3.py", "value = 'posix'\n")
+try_import("direct_mod3")
+fs.rename(temp_dir + "/direct_mod3.py", temp_dir + "/direct_mod4.py")
+try_import("direct_mod3")
+try_import("direct_mod4")
+fs.remove(temp_dir + "/direct_mod4.py")
+try_import("direct_mod4")
+try_import("direct_pkg2")
+fs.mkdir(temp_dir + "/direct_pkg2")
+write(fs, temp_dir + "/direct_pkg2/__init__.py", "value = 'posix pkg'\n")
+try_import("direct_pkg2")
+fs.remove(temp_dir + "/direct_pkg2/__init__.py")
+fs.rmdir(temp_dir + "/direct_pkg2")
+try_import("direct_pkg2")
+
+# clean up
+sys.path.pop(0)
+os.rmdir(temp_dir)
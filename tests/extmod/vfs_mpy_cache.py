@@ -0,0 +1,104 @@
+# Test the cache of .mpy files compiled from imported .py files.
+
+import sys
+
+try:
+    import os
+
+    os.mount, os.umount, os.VfsPosix
+except (ImportError, AttributeError):
+    print("SKIP")
+    raise SystemExit
+
+# We need a directory for testing that doesn't already exist.
+# Skip the test if it does exist.
+temp_dir = "micropy_mpy_cache_dir"
+try:
+    os.stat(temp_dir)
+    print("SKIP")
+    raise SystemExit
+except OSError:
+    pass
+
+os.mkdir(temp_dir)
+os.mkdir(temp_dir + "/src")
+os.mkdir(temp_dir + "/cache")
+os.mount(os.VfsPosix(temp_dir + "/cache"), "/.mpy_cache")
+sys.path.insert(0, temp_dir + "/src")
+
+
+def write(path, data):
+    with open(path, "w") as f:
+        f.write(data)
+
+
+def try_import(name):
+    sys.modules.pop(name, None)
+    try:
+        __import__(name)
+        print(sys.modules[name].value)
+    except Exception as e:
+        print(type(e).__name__)
+
+
+def clean_up():
+    sys.path.pop(0)
+    os.umount("/.mpy_cache")
+    for d in ("/cache", "/src"):
+        for name in os.listdir(temp_dir + d):
+            os.remove(temp_dir + d + "/" + name)
+        os.rmdir(temp_dir + d)
+    os.rmdir(temp_dir)
+
+
+# the first import compiles the module and adds it to the cache
+write(temp_dir + "/src/cache_mod.py", "def f():\n    return 1\nvalue = f()\n")
+import cache_mod
+
+cache_files = os.listdir("/.mpy_cache")
+if len(cache_files) != 1:
+    # the cache is not enabled
+    clean_up()
+    print("SKIP")
+    raise SystemExit
+cache_file = "/.mpy_cache/" + cache_files[0]
+print(cache_mod.value)
+
+# later imports use the cache
+try_import("cache_mod")
+try_import("cache_mod")
+
+# a change to the source that keeps its size is seen
+write(temp_dir + "/src/cache_mod.py", "def f():\n    return 2\nvalue = f()\n")
+try_import("cache_mod")
+try_import("cache_mod")
+
+# a truncated or corrupt cache file is replaced
+with open(cache_file, "rb") as f:
+    data = f.read()
+for bad in (data[: len(data) // 2], b"", b"x" * len(data), b"C\x01" + data[2:]):
+    with open(cache_file, "wb") as f:
+        f.write(bad)
+    try_import("cache_mod")
+    with open(cache_file, "rb") as f:
+        print(f.read() == data)
+
+# an error in the source is still raised, and the cache entry is kept
+write(temp_dir + "/src/cache_mod.py", "value = (\n")
+try_import("cache_mod")
+with open(cache_file, "rb") as f:
+    print(f.read() == data)
+
+# packages and submodules are cached too
+os.mkdir(temp_dir + "/src/cache_pkg")
+write(temp_dir + "/src/cache_pkg/__init__.py", "value = 'pkg'\n")
+write(temp_dir + "/src/cache_pkg/sub.py", "value = 'sub'\n")
+try_import("cache_pkg.sub")
+try_import("cache_pkg.sub")
+print(sys.modules["cache_pkg"].value)
+print(len(os.listdir("/.mpy_cache")))
+os.remove(temp_dir + "/src/cache_pkg/__init__.py")
+os.remove(temp_dir + "/src/cache_pkg/sub.py")
+os.rmdir(temp_dir + "/src/cache_pkg")
+
+clean_up()
@@ -0,0 +1,91 @@
+# Test that .mpy files imported from a VfsRom filesystem are loaded in place.
+
+try:
+    import gc, os, sys
+
+    os.VfsRom
+except (ImportError, AttributeError):
+    print("SKIP")
+    raise SystemExit
+
+BIG_LEN = 8000
+
+
+def encode_uint(value):
+    encoded = [value & 0x7F]
+    value >>= 7
+    while value != 0:
+        encoded.insert(0, 0x80 | (value & 0x7F))
+        value >>= 7
+    return bytes(encoded)
+
+
+def pack(kind, payload):
+    return encode_uint(kind) + encode_uint(len(payload)) + payload
+
+
+# Make a ROMFS image with the given files in its root directory.
+def make_romfs(files):
+    data = b""
+    for filename, contents in files:
+        payload = encode_uint(len(filename)) + bytes(filename, "ascii")
+        payload += pack(2, contents)  # ROMFS_RECORD_KIND_DATA_VERBATIM
+        data += pack(5, payload)  # ROMFS_RECORD_KIND_FILE
+    header = b"\xd2\xcd\x31"
+    encoded_len = encode_uint(len(data))
+    if (len(header) + len(encoded_len) + len(data)) % 2 == 1:
+        encoded_len = b"\x80" + encoded_len
+    return header + encoded_len + data
+
+
+# An mpy file with a large bytes object, a str object and a small int.
+test_mpy = (
+    # header
+    b"C\x06\x00\x1f"  # mpy file header
+    b"\x05"  # n_qstr
+    b"\x02"  # n_obj
+    # qstrs
+    b"\x0etest.py\x00"  # qstr0 = "test.py"
+    b"\x0f"  # qstr1 = "<module>"
+    b"\x12bytes_obj\x00"  # qstr2 = "bytes_obj"
+    b"\x0estr_obj\x00"  # qstr3 = "str_obj"
+    b"\x0eint_obj\x00"  # qstr4 = "int_obj"
+    # objects
+    b"\x06" + encode_uint(BIG_LEN) + b"\xa5" * BIG_LEN + b"\x00"
+    b"\x05\x14this is a str object\x00"
+    # bytecode
+    b"\x81\x00"  # 16 bytes, no children, bytecode
+    b"\x00\x02"  # prelude
+    b"\x01"  # simple name (<module>)
+    b"\x23\x00"  # LOAD_CONST_OBJ(0)
+    b"\x16\x02"  # STORE_NAME(bytes_obj)
+    b"\x23\x01"  # LOAD_CONST_OBJ(1)
+    b"\x16\x03"  # STORE_NAME(str_obj)
+    b"\x8a"  # LOAD_CONST_SMALL_INT(10)
+    b"\x16\x04"  # STORE_NAME(int_obj)
+    b"\x51"  # LOAD_CONST_NONE
+    b"\x63"  # RETURN_VALUE
+)
+
+romfs = make_romfs((("test_rom_mpy.mpy", test_mpy), ("test_rom_py.py", b"x = 1\n")))
+os.mount(os.VfsRom(romfs), "/test_rom")
+sys.path.insert(0, "/test_rom")
+
+# Import the .mpy and check that its constants were not copied into the heap.
+gc.collect()
+alloc = gc.mem_alloc()
+import test_rom_mpy
+
+alloc = gc.mem_alloc() - alloc
+print(test_rom_mpy.__file__)
+print(len(test_rom_mpy.bytes_obj), test_rom_mpy.bytes_obj[:4], test_rom_mpy.bytes_obj[-1])
+print(test_rom_mpy.str_obj, test_rom_mpy.int_obj)
+print(alloc < BIG_LEN // 2)
+
+# .py files are still compiled as usual.
+import test_rom_py
+
+print(test_rom_py.__file__, test_rom_py.x)
+
+sys.path.pop(0)
+os.umount("/test_rom")
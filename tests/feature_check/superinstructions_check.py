@@ -0,0 +1,4 @@
+# cmdline: -v -v
+# check whether the bytecode compiler emits superinstructions
+def f(self):
+    return self.x
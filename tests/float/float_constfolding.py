@@ -0,0 +1,17 @@
+# tests constant folding of float expressions
+
+print(1.5 + 2, 2 - 0.25, 1.5 * 4, 1.0 / 4, 7 // 2.0, 7.5 % 2, 2.0**3, 4**0.5)
+print(-1.5, +2.5, -(1.5 * 2), 1.5 * 2 + 3 * 0.5 - 1)
+print(1.5 < 2, 2.5 == 2.5, 1.0 == 1, 0.5 + 0.25 == 0.75, 3 > 2.5 > 2)
+print(1 / 2 if 1.5 > 1 else None)
+
+# 0.0 and -0.0 are distinct constants
+x = (0.0, -0.0)
+print(x, -0.0, 0.0)
+
+# these must still raise at run time
+for code in ("1.0 / 0", "1.0 // 0.0", "2.5 % 0", "0.0 ** -1", "~1.5", "1.5 << 1"):
+    try:
+        eval(code)
+    except (TypeError, ZeroDivisionError) as e:
+        print(code, type(e).__name__)
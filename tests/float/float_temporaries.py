@@ -0,0 +1,92 @@
+# test that float results used directly by another op are not shared
+# with anything that refers to them
+
+
+def keep(x):
+    global kept
+    kept = x
+    return x
+
+
+a = 1.5
+b = 2.5
+
+# temporaries as right and left operands
+print(a * b + a * b)
+print(a * b * 2)
+print(a * b * 0.5)
+print(a * b + 1)
+print(2 - a * b)
+print(a * a + b * b + a * b)
+print(-(a * b) / 2)
+
+# a float that is stored is not a temporary
+x = a * b
+y = x + 1.0
+z = x * 2
+print(x, y, z)
+
+# nor one that was passed to a function
+print(keep(a * b) + 1.0, kept)
+print(keep(a * b) * 2, kept)
+
+# nor one bound by augmented assignment
+t = a * b
+u = t
+t += a * b
+print(t, u)
+t = a * b
+u = t
+t *= 2
+print(t, u)
+
+# a jump to an op just after a float op
+for i in range(3):
+    v = (x if i % 2 else a * b) + 1.0
+    print(v, x)
+for i in range(3):
+    v = (a * b if i % 2 else x) * 2
+    print(v, x)
+
+
+class R:
+    def __radd__(self, other):
+        return other
+
+
+def f():
+    x = 3.75
+    for w in (R(), 1.0):
+        v = (x if w == 1.0 else a * b) + w
+        print(v, x)
+
+
+f()
+
+# results that aren't floats
+print(a * b < a * b + 1)
+print(type((-a * b) ** 0.5))
+print((a * b - (-a * b) ** 0.5).real)
+
+# errors part way through an expression
+try:
+    print(a * b / (a * 0.0))
+except ZeroDivisionError:
+    print("ZeroDivisionError")
+try:
+    print(a * b + None)
+except TypeError:
+    print("TypeError")
+
+
+# a temporary kept across a yield
+def gen():
+    print(a * b + (yield))
+
+
+g = gen()
+next(g)
+try:
+    g.send(1.0)
+except StopIteration:
+    pass
@@ -0,0 +1,67 @@
+# test compacting the heap with gc.compact()
+
+import gc
+
+try:
+    gc.compact
+except AttributeError:
+    print("SKIP")
+    raise SystemExit
+
+
+# Leave holes in the heap between the buffers that are kept.
+def fragment(n):
+    kept = []
+    dropped = []
+    for i in range(n):
+        kept.append(bytearray([i]) * (16 + i))
+        dropped.append(bytearray(100))
+        kept.append([i] * (4 + i % 8))
+        dropped.append([None] * 30)
+        kept.append(str(i) * (20 + i))
+        dropped.append(str(i) * 100)
+        kept.append(bytes([i]) * (20 + i))
+    return kept
+
+
+def check(kept):
+    n = len(kept) // 4
+    for i in range(n):
+        assert kept[4 * i] == bytearray([i]) * (16 + i)
+        assert kept[4 * i + 1] == [i] * (4 + i % 8)
+        assert kept[4 * i + 2] == str(i) * (20 + i)
+        assert kept[4 * i + 3] == bytes([i]) * (20 + i)
+
+
+kept = fragment(50)
+ids = [id(x) for x in kept]
+d = {s: i for i, s in enumerate(kept[2::4])}
+
+before, after = gc.compact()
+print(before > 0, after >= before)
+
+# Contents and object identities are the same.
+check(kept)
+print([id(x) for x in kept] == ids)
+print(all(d[s] == i for i, s in enumerate(kept[2::4])))
+
+# The moved buffers can still be used and grown.
+for i in range(0, len(kept), 4):
+    kept[i].extend(b"xyz")
+    kept[i + 1].append(i)
+print(kept[0][-3:], kept[1][-1], kept[4][-4:], kept[5][-1])
+
+# A buffer with another reference to it isn't moved.
+b = bytearray(64)
+m = memoryview(b)
+del kept
+gc.compact()
+m[0] = 42
+print(b[0])
+
+# Compacting an already compacted heap.
+kept = fragment(10)
+gc.compact()
+gc.compact()
+check(kept)
+print("done")
@@ -0,0 +1,23 @@
+# Passing long slices of a str where a null-terminated string is needed should
+# not allocate, nor change the slices.
+try:
+    import micropython
+    import struct
+
+    micropython.heap_lock
+except (ImportError, AttributeError):
+    print("SKIP")
+    raise SystemExit
+
+fmt = "<" + "I" * 40 + "H" * 40
+head = fmt[:41]
+tail = fmt[41:]
+n_head = n_tail = 0
+
+micropython.heap_lock()
+n_head = struct.calcsize(head)
+n_tail = struct.calcsize(tail)
+micropython.heap_unlock()
+
+print(n_head, n_tail)
+print(head == "<" + "I" * 40, tail == "H" * 40, len(head), len(tail))
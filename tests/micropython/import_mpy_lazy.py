@@ -0,0 +1,164 @@
+# Test importing an .mpy file whose functions may have their bytecode read in
+# on first use (when MICROPY_PERSISTENT_CODE_LOAD_LAZY is enabled).
+
+import sys
+
+try:
+    import micropython
+    import os
+
+    os.chdir, os.mkdir, os.remove, os.rmdir
+except (ImportError, AttributeError):
+    print("SKIP")
+    raise SystemExit
+
+# We need a directory for testing that doesn't already exist.
+# Skip the test if it does exist.
+temp_dir = "micropy_import_mpy_lazy_dir"
+try:
+    os.stat(temp_dir)
+    print("SKIP")
+    raise SystemExit
+except OSError:
+    pass
+
+# Compiled from the following source with mpy-cross:
+#
+# def small(x):
+#     return x + 1
+#
+#
+# def big(a, b=2, *, c=3):
+#     x = [a, b, c]
+#     for i in range(4):
+#         x.append(i * a + b - c)
+#     d = {"a": a, "b": b, "c": c}
+#     return sum(x) + len(d) + small(a)
+#
+#
+# def gen(n):
+#     for i in range(n):
+#         if i % 2:
+#             yield i * 10
+#         else:
+#             yield -i
+#     return "done"
+#
+#
+# async def coro(n):
+#     total = 0
+#     for i in range(n):
+#         total += i * i + n
+#     return total
+#
+#
+# def outer(k):
+#     def inner(v):
+#         result = []
+#         for i in range(v):
+#             result.append(i * k + v)
+#         return result
+#
+#     return inner
+#
+#
+# class A:
+#     def __init__(self, v):
+#         self.v = v
+#         self.items = [v, v + 1, v + 2]
+#
+#     def method(self, m):
+#         out = []
+#         for item in self.items:
+#             out.append(item * m + self.v)
+#         return out
+#
+#
+# def count(n, m):
+#     total = 0
+#     for i in range(n):
+#         if i % m:
+#             total += i * m
+#         elif i % 2:
+#             total -= i
+#         else:
+#             total += n - i
+#     while total > 100:
+#         total //= 2
+#     return total
+mpy = (
+    b"C\x06\x00\x1f\x1e\x00\x16lazy_mod.py\x00\x0f\x02c\x00\x02A\x00\nsmall\x00\x06big\x00y\x02a\x00\x02b\x00\x06gen\x00\x08done\x00\x08coro\x00\no"
+    b"uter\x00\x81\x15\ninner\x00#\x02v\x00\x81M\x0cmethod\x00\x02x\x00\x823\x81W\x02n\x00\x02k\x00/-5\x02m\x00\x0b\x82\x13\x83\\\x18\x1a\x01d \x8d\x08\x84\t\x84\x07\x84"
+    b"\n\x89\x0c2\x00\x16\x04\x82*\x01,\x00\x83\x10\x02b3\x01\x16\x052\x02\x16\t2\x03\x16\x0b2\x04\x16\x0cT2\x05\x10\x034\x02\x16\x032\x06\x16\rQc\x07H\x11\x06\x04\x13 \xb0\x81\xf2c\x85\x08\xd2\x89\x80\x80"
+    b"@\x14\x05\x07\x08\x02`@&%5/\xb0\xb1\xb2+\x03\xc3\x80BQW\xc4\xb3\x14\x06\xb4\xb0\xf4\xb1\xf2\xb2\xf36\x01Y\x81\xe5W\x84\xd7C*Y,\x03\xb0\x10\x07b\xb1\x10\x08b\xb2\x10\x02b\xc5\x12\x14\xb34\x01"
+    b"\x12\x15\xb54\x01\xf2\x12\x04\xb04\x01\xf2c\x82h\xa9@\x10\t\x16\x80\r&%G-\xb0\x80BTW\xc1\xb1\x82\xf8DG\xb1\x8a\xf4gYBD\xb1\xd1gY\x81\xe5XZ\xd7C'YY\x10\nc\x82H\xb9\xc0"
+    b'\x80\x80\x80@\x0e\x0b\x16\x80\x16"&1\x80\xc1\xb0\x80BLW\xc2\xb1\xb2\xb2\xf4\xb0\xf2\xe5\xc1\x81\xe5XZ\xd7C/YY\xb1c\x81\x04\x11\r\x0c\x17\x80\x1de`\x00\xb0 \x00\x01\xc1\xb1c\x01\x82PJ\x10\x0e\x1c'
+    b"\x10\x80\x1e#&5+\x00\xc2\xb1\x80BPW\xc3\xb2\x14\x06\xb3%\x00\xf4\xb1\xf26\x01Y\x81\xe5XZ\xd7C+YY\xb2c\x81L\x00\n\x03\x88'd \x11\x18\x16\x19\x10\x03\x16\x1a2\x00\x16\x0f2\x01\x16\x12Q"
+    b"c\x02\x81P*\x0c\x0f\x1d\x10\x80($\xb1\xb0\x18\x10\xb1\xb1\x81\xf2\xb1\x82\xf2+\x03\xb0\x18\x11Qc\x82(Z\x10\x12\x1d\x1b\x80,#'/+\x00\xc2\xb0\x13\x11_K\x10\xc3\xb2\x14\x06\xb3\xb1\xf4\xb0\x13\x10\xf26\x01"
+    b'YB.\xb2c\x84pB\x1c\r\x16\x1b\x803"&%(%F/"+\x80\xc2\xb0\x80BbW\xc3\xb3\xb1\xf8DH\xb2\xb3\xb1\xf4\xe5\xc2BQ\xb3\x82\xf8DF\xb2\xb3\xe6\xc2BF\xb2\xb0\xb3\xf3\xe5\xc2\x81\xe5X'
+    b'Z\xd7C\x19YYBD\xb2\x82\xe9\xc2\xb2"\x80d\xd8C5\xb2c'
+)
+
+os.mkdir(temp_dir)
+with open(temp_dir + "/lazy_mod.mpy", "wb") as f:
+    f.write(mpy)
+sys.path.insert(0, temp_dir)
+try:
+    import lazy_mod
+except ValueError:
+    # incompatible .mpy file
+    print("SKIP")
+    os.remove(temp_dir + "/lazy_mod.mpy")
+    os.rmdir(temp_dir)
+    raise SystemExit
+
+
+def local_gen():
+    yield
+
+
+# functions that haven't been called have the usual types
+print(type(lazy_mod.big) is type(lazy_mod.small), isinstance(lazy_mod.count, type(lazy_mod.small)))
+print(type(lazy_mod.gen) is type(local_gen), type(lazy_mod.A.method) is type(lazy_mod.small))
+
+# attributes of functions that haven't been called
+print(lazy_mod.big.__name__, lazy_mod.gen.__name__, lazy_mod.coro.__name__)
+
+# plain functions, with default and keyword-only args
+print(lazy_mod.small(1))
+print(lazy_mod.big(1), lazy_mod.big(2, 3), lazy_mod.big(2, c=5))
+
+# generators and coroutines
+g = lazy_mod.gen(5)
+print(list(g))
+c = lazy_mod.coro(4)
+try:
+    c.send(None)
+except StopIteration as e:
+    print(e.value)
+
+# nested functions, each made into more than one function object
+f1 = lazy_mod.outer(2)
+f2 = lazy_mod.outer(3)
+print(f1.__name__, f1(3), f2(3))
+print(lazy_mod.outer(4)(2))
+
+# classes and methods, first used after changing the current directory
+os.chdir(temp_dir)
+a = lazy_mod.A(5)
+print(a.method(2), lazy_mod.A(1).method(3))
+os.chdir("..")
+
+# a function first used with the heap locked
+n = 0
+if hasattr(micropython, "heap_lock"):
+    micropython.heap_lock()
+    n = lazy_mod.count(10, 3)
+    micropython.heap_unlock()
+else:
+    n = lazy_mod.count(10, 3)
+print(n)
+
+sys.path.pop(0)
+os.remove(temp_dir + "/lazy_mod.mpy")
+os.rmdir(temp_dir)
@@ -0,0 +1,61 @@
+# Test that firmware built without bytecode superinstructions rejects an .mpy
+# file that uses them, and still loads the same code compiled without them.
+
+import sys
+
+try:
+    import os
+
+    os.mkdir, os.remove, os.rmdir
+except (ImportError, AttributeError):
+    print("SKIP")
+    raise SystemExit
+
+# We need a directory for testing that doesn't already exist.
+# Skip the test if it does exist.
+temp_dir = "micropy_import_mpy_superinstructions_dir"
+try:
+    os.stat(temp_dir)
+    print("SKIP")
+    raise SystemExit
+except OSError:
+    pass
+
+# The same module compiled by mpy-cross without and with -msuperinstructions:
+#
+# class A:
+#     def __init__(self, x):
+#         self.x = x
+#
+#     def f(self, n):
+#         return self.x + n + 2
+mpy_plain = (
+    b"C\x06\x00\x1f\x0b\x00\x10simod.py\x00\x0f\x02A\x00#\x02x\x00\x02f\x00/-5\x82\x13\x02n\x00t\x10\x02\x01T2\x00\x10\x024\x02\x16\x02Qc\x01\x81<\x00\x06\x02(d\x11\x06\x16\x07\x10\x02\x16\x082\x00\x16\x032\x01\x16\x05Qc\x02`\x1a\x08"
+    b"\x03\t\x04@\xb1\xb0\x18\x04Qcx\x1a\n\x05\t\n`@\xb0\x13\x04\xb1\xf2\x82\xf2c"
+)
+mpy_fused = (
+    b"C\x86\x00\x1f\x0b\x00\x10simod.py\x00\x0f\x02A\x00#\x02x\x00\x02f\x00/-5\x82\x13\x02n\x00t\x10\x02\x01T2\x00\x10\x024\x02\x16\x02Qc\x01\x81<\x00\x06\x02(d\x11\x06\x16\x07\x10\x02\x16\x082\x00\x16\x032\x01\x16\x05Qc\x02X\x1a\x08"
+    b"\x03\t\x04@\xb1\x1f\x04Qcp\x1a\n\x05\t\n`@\x1d\x04\xb1\xf2=\x02c"
+)
+
+os.mkdir(temp_dir)
+for name, mpy in (("mod_plain", mpy_plain), ("mod_fused", mpy_fused)):
+    with open(temp_dir + "/" + name + ".mpy", "wb") as f:
+        f.write(mpy)
+sys.path.insert(0, temp_dir)
+
+# The plain version loads everywhere.
+import mod_plain
+
+print(mod_plain.A(1).f(3))
+
+# The version with superinstructions is rejected.
+try:
+    import mod_fused
+except ValueError as er:
+    print("ValueError", er)
+
+sys.path.pop(0)
+os.remove(temp_dir + "/mod_plain.mpy")
+os.remove(temp_dir + "/mod_fused.mpy")
+os.rmdir(temp_dir)
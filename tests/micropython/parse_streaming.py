@@ -0,0 +1,29 @@
+# Test running file input one top-level statement at a time, with
+# MICROPY_PARSE_STREAMING.  Statements before a syntax error are executed.
+
+g = {}
+try:
+    exec("print('first')\nx = 1\ny = (\nprint('after')\n", g)
+except SyntaxError:
+    print("SyntaxError")
+print(g.get("x"), g.get("y"))
+
+# a syntax error in the first statement runs nothing
+g = {}
+try:
+    exec("x = (\nprint('after')\n", g)
+except SyntaxError:
+    print("SyntaxError")
+print(g.get("x"))
+
+# an exception stops the remaining statements from running
+g = {}
+try:
+    exec("x = 1\n1 // 0\nx = 2\n", g)
+except ZeroDivisionError:
+    print("ZeroDivisionError")
+print(g.get("x"))
+
+# const() and names defined by earlier statements carry over
+g = {}
+exec("from micropython import const\nA = const(2)\ndef f():\n    return A * B\nB = 3\nprint(f())\n", g)
@@ -0,0 +1,111 @@
+# Test that functions called often enough to be recompiled with the native
+# emitter (when MICROPY_OPT_TIERED_NATIVE is enabled) behave the same as before.
+
+N = 1500
+
+
+def loop(n, step=1, *, scale=1):
+    total = 0
+    for i in range(0, n, step):
+        total += i * scale
+    k = 0
+    while k < n:
+        k += 1
+    for x in (1, 2, 3):
+        total += x
+    return total + k
+
+
+for _ in range(N):
+    loop(5)
+print(loop(10), loop(10, 3), loop(10, scale=2))
+
+
+# default arguments are shared, not copied
+def append(x, acc=[]):
+    acc.append(x)
+    return len(acc)
+
+
+for i in range(N):
+    append(i)
+print(append(None))
+
+
+# closures
+def make_adder(a):
+    def add(b):
+        return a + b
+
+    return add
+
+
+add = make_adder(10)
+for i in range(N):
+    add(i)
+print(add(5))
+
+
+# unbound and deleted local variables
+def maybe(c):
+    if c:
+        v = 1
+    return v
+
+
+def delete(c):
+    v = 1
+    if c:
+        del v
+    return v
+
+
+for _ in range(N):
+    maybe(1)
+    delete(0)
+for f in (maybe, delete):
+    try:
+        f(f is delete)
+    except NameError:
+        print(f.__name__, "NameError")
+
+
+# exceptions raised and caught within the function
+def catch(x):
+    try:
+        return 10 // x
+    except ZeroDivisionError:
+        return -1
+    finally:
+        pass
+
+
+for i in range(N):
+    catch(i % 3)
+print(catch(0), catch(3))
+
+
+# functions with the same name in different places
+class A:
+    def get(self):
+        return "A"
+
+
+class B:
+    def get(self):
+        return "B"
+
+
+a = A()
+b = B()
+for _ in range(N):
+    a.get()
+    b.get()
+print(a.get(), b.get())
+
+
+# lambdas
+double = lambda x: x * 2
+for i in range(N):
+    double(i)
+print(double(21))
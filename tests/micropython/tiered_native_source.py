@@ -0,0 +1,101 @@
+# Test that hot functions (recompiled when MICROPY_OPT_TIERED_NATIVE is enabled)
+# keep the code they were imported with if their source file is later changed,
+# removed, or no longer in the current directory.
+
+import sys
+
+try:
+    import os
+
+    os.chdir, os.mkdir, os.remove, os.rmdir
+except (ImportError, AttributeError):
+    print("SKIP")
+    raise SystemExit
+
+# We need a directory for testing that doesn't already exist.
+# Skip the test if it does exist.
+temp_dir = "micropy_tiered_native_source_dir"
+try:
+    os.stat(temp_dir)
+    print("SKIP")
+    raise SystemExit
+except OSError:
+    pass
+
+N = 1500
+
+source = """
+def const():
+    return 11
+
+
+def name(x):
+    return x + ADD
+
+
+def float_const(x):
+    return x * 1.5
+
+
+def outer(x):
+    def inner(y):
+        return y + 1
+
+    return inner(x)
+
+
+def loop(n):
+    t = 0
+    for i in range(n):
+        if i % 3:
+            t += i
+    return t
+
+
+ADD = 1
+SUB = 2
+"""
+
+# Each edit keeps the line numbers and the function signatures the same.
+edits = (
+    ("return 11", "return 99"),
+    ("x + ADD", "x + SUB"),
+    ("* 1.5", "* 2.5"),
+    ("y + 1", "y - 1"),
+    ("i % 3", "i % 2"),
+)
+
+os.mkdir(temp_dir)
+with open(temp_dir + "/tiered_mod.py", "w") as f:
+    f.write(source)
+sys.path.insert(0, temp_dir)
+import tiered_mod
+
+for old, new in edits:
+    source = source.replace(old, new)
+with open(temp_dir + "/tiered_mod.py", "w") as f:
+    f.write(source)
+
+os.chdir(temp_dir)
+for _ in range(N):
+    tiered_mod.const()
+    tiered_mod.name(1)
+    tiered_mod.float_const(2)
+    tiered_mod.outer(3)
+    tiered_mod.loop(2)
+print(tiered_mod.const(), tiered_mod.name(1), tiered_mod.float_const(2))
+print(tiered_mod.outer(3), tiered_mod.loop(10))
+os.chdir("..")
+
+with open(temp_dir + "/tiered_mod2.py", "w") as f:
+    f.write("def double(x):\n    return 2 * x\n")
+import tiered_mod2
+
+os.remove(temp_dir + "/tiered_mod2.py")
+for _ in range(N):
+    tiered_mod2.double(1)
+print(tiered_mod2.double(21))
+
+sys.path.pop(0)
+os.remove(temp_dir + "/tiered_mod.py")
+os.rmdir(temp_dir)
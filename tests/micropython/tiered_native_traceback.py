@@ -0,0 +1,49 @@
+# Test that tracebacks include functions that were called often enough to be
+# recompiled with the native emitter (when MICROPY_OPT_TIERED_NATIVE is enabled).
+
+try:
+    import traceback
+except ImportError:
+    print("SKIP")
+    raise SystemExit
+
+N = 1500
+
+
+def check(x):
+    if x < 0:
+        raise ValueError(x)
+    return x
+
+
+def total(n):
+    t = 0
+    for i in range(n):
+        t += check(i)
+    return t + check(n - 3)
+
+
+def recurse(n):
+    if n == 0:
+        raise KeyError(n)
+    x = n
+    return recurse(n - 1) + x
+
+
+def catch(n):
+    try:
+        recurse(n)
+    except KeyError:
+        pass
+
+
+for i in range(N):
+    total(3)
+    catch(i % 3)
+
+for f, arg in ((total, 1), (recurse, 2)):
+    try:
+        f(arg)
+    except Exception as e:
+        # show the file name without the directory, which depends on how the test is run
+        print("".join(traceback.format_exception(e)).replace(__file__, "tiered_native_traceback.py"), end="")
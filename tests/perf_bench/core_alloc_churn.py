@@ -0,0 +1,49 @@
+# This tests gc_alloc() speed on a fragmented heap: a pool of long-lived
+# objects of mixed sizes is repeatedly replaced in a scattered order, so that
+# free space is broken into many small runs between live objects.
+
+SIZES = (8, 16, 24, 40, 64, 100, 160, 256)
+
+
+def test(nslots, niter):
+    pool = [None] * nslots
+    seed = 1
+    total = 0
+    for _ in range(niter):
+        # Simple LCG so the allocation pattern is identical on every target.
+        seed = (seed * 1103515245 + 12345) & 0x7FFFFFFF
+        slot = seed % nslots
+        size = SIZES[(seed >> 8) % len(SIZES)]
+        pool[slot] = bytearray(size)
+        # Short-lived temporaries interleaved with the long-lived pool.
+        total += len((slot, size, slot + size))
+    for buf in pool:
+        if buf is not None:
+            total += len(buf)
+    return total
+
+
+###########################################################################
+# Benchmark interface
+
+bm_params = {
+    (32, 10): (20, 500),
+    (50, 25): (40, 1000),
+    (100, 100): (100, 4000),
+    (1000, 1000): (400, 40000),
+    (5000, 1000): (1000, 100000),
+}
+
+
+def bm_setup(params):
+    nslots, niter = params
+    state = None
+
+    def run():
+        nonlocal state
+        state = test(nslots, niter)
+
+    def result():
+        return niter, state
+
+    return run, result
@@ -0,0 +1,43 @@
+# This tests arbitrary-precision integer arithmetic on operands large enough
+# for the choice of multiplication, modular exponentiation and string
+# conversion algorithm to matter.
+
+
+def test(nbits, niter):
+    a = (1 << nbits) // 3 + 12345
+    b = (1 << nbits) // 7 + 6789
+    m = (1 << (nbits // 4)) - 159
+    total = 0
+    for i in range(niter):
+        p = a * (b + i)
+        total += p.bit_length()
+        total += pow(a + i, b >> (nbits - 64), m) & 0xFFFF
+        total += len(str(p >> (nbits + nbits // 2)))
+        total += int(str(b + i)[: nbits // 16]) & 0xFFFF
+    return total
+
+
+###########################################################################
+# Benchmark interface
+
+bm_params = {
+    (32, 10): (256, 2),
+    (50, 25): (512, 4),
+    (100, 100): (2048, 4),
+    (1000, 1000): (8192, 8),
+    (5000, 1000): (16384, 8),
+}
+
+
+def bm_setup(params):
+    nbits, niter = params
+    state = None
+
+    def run():
+        nonlocal state
+        state = test(nbits, niter)
+
+    def result():
+        return niter, state
+
+    return run, result
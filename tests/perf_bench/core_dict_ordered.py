@@ -0,0 +1,51 @@
+# This tests dict and OrderedDict operations on maps large enough that a
+# linear search of the table dominates: insertion, lookup, update, deletion
+# and reinsertion, with both interned and freshly created string keys.
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    OrderedDict = dict
+
+
+def test(dict_type, nkeys, niter):
+    keys = ["k%d" % i for i in range(nkeys)]
+    d = dict_type()
+    for i, k in enumerate(keys):
+        d[k] = i
+    total = 0
+    for it in range(niter):
+        for k in keys:
+            total += d[k]
+        for i in range(it % 3, nkeys, 3):
+            del d[keys[i]]
+        for i in range(it % 3, nkeys, 3):
+            d[keys[i]] = i + it
+        total += ("k%d" % (it % nkeys)) in d
+    return total + len(d)
+
+
+###########################################################################
+# Benchmark interface
+
+bm_params = {
+    (32, 10): (20, 2),
+    (50, 25): (50, 4),
+    (100, 100): (100, 10),
+    (1000, 1000): (200, 40),
+    (5000, 1000): (500, 60),
+}
+
+
+def bm_setup(params):
+    nkeys, niter = params
+    state = None
+
+    def run():
+        nonlocal state
+        state = (test(dict, nkeys, niter), test(OrderedDict, nkeys, niter))
+
+    def result():
+        return nkeys * niter, state
+
+    return run, result
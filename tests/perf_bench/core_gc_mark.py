@@ -0,0 +1,56 @@
+# This tests the speed of a full garbage collection on a heap that is mostly
+# live: a wide table of records (which overflows the mark stack), a long
+# linked list and a tree of dicts, sized to fill a good part of the heap.
+
+import gc
+
+
+def build(nrec):
+    table = []
+    for i in range(nrec):
+        table.append([i, (i, str(i)), bytearray(8 + i % 24)])
+    chain = None
+    for i in range(nrec):
+        chain = (chain, [i])
+    tree = {}
+    for i in range(nrec // 4):
+        tree[i] = {"a": [i], "b": (i,), "c": {"d": i}}
+    return table, chain, tree
+
+
+def test(data, ncollect):
+    total = 0
+    for _ in range(ncollect):
+        gc.collect()
+        total += len(data[0]) + len(data[2])
+    return total
+
+
+###########################################################################
+# Benchmark interface
+
+# M is the heap size in kbytes, so these cover heaps of 1MB to 16MB.
+bm_params = {
+    (50, 25): (30, 5),
+    (100, 100): (120, 10),
+    (1000, 1000): (2000, 20),
+    (1000, 2000): (4000, 20),
+    (1000, 4000): (8000, 20),
+    (1000, 8000): (16000, 20),
+    (1000, 16000): (32000, 20),
+}
+
+
+def bm_setup(params):
+    nrec, ncollect = params
+    data = build(nrec)
+    state = None
+
+    def run():
+        nonlocal state
+        state = test(data, ncollect)
+
+    def result():
+        return ncollect, state
+
+    return run, result
@@ -0,0 +1,82 @@
+# Test performance of importing many distinct .py modules, each of which
+# interns its own set of names, so the number of qstrs keeps growing.
+
+import sys, io, vfs
+
+if not hasattr(io, "IOBase"):
+    print("SKIP")
+    raise SystemExit
+
+NAMES_PER_MODULE = 16
+
+
+def module_source(n):
+    lines = []
+    for i in range(NAMES_PER_MODULE):
+        lines.append("def func_%d_%d(arg_%d_%d):\n" % (n, i, n, i))
+        lines.append("    return arg_%d_%d + %d\n" % (n, i, i))
+    lines.append("result = func_%d_0(%d)\n" % (n, n))
+    return bytes("".join(lines), "ascii")
+
+
+class File(io.IOBase):
+    def __init__(self, data):
+        self.data = data
+        self.off = 0
+
+    def ioctl(self, request, arg):
+        if request == 4:  # MP_STREAM_CLOSE
+            return 0
+        return -1
+
+    def readinto(self, buf):
+        n = min(len(buf), len(self.data) - self.off)
+        buf[:n] = memoryview(self.data)[self.off : self.off + n]
+        self.off += n
+        return n
+
+
+class FS:
+    def mount(self, readonly, mkfs):
+        pass
+
+    def chdir(self, path):
+        pass
+
+    def stat(self, path):
+        if path.startswith("/mod_") and path.endswith(".py"):
+            return tuple(0 for _ in range(10))
+        else:
+            raise OSError(-2)  # ENOENT
+
+    def open(self, path, mode):
+        return File(module_source(int(path[5:-3])))
+
+
+def mount():
+    vfs.mount(FS(), "/__remote")
+    sys.path.insert(0, "/__remote")
+
+
+def test(nmod):
+    global result
+    result = 0
+    sys.modules.clear()
+    for n in range(nmod):
+        result += __import__("mod_%d" % n).result
+
+
+###########################################################################
+# Benchmark interface
+
+bm_params = {
+    (32, 10): (10,),
+    (1000, 10): (100,),
+    (5000, 10): (500,),
+}
+
+
+def bm_setup(params):
+    (nmod,) = params
+    mount()
+    return lambda: test(nmod), lambda: (nmod, result)
@@ -0,0 +1,165 @@
+# This tests switching between asyncio tasks: two tasks pass a ball back and forth
+# with events, while a third keeps yielding to the event loop with sleep_ms(0).
+#
+# It uses the _asyncio module with the minimal state that asyncio/core.py keeps in
+# its globals, so it runs without the asyncio package.  When _asyncio has the
+# native event loop it is used, otherwise a Python loop that follows core.py.
+
+try:
+    import _asyncio
+
+    _asyncio.TaskQueue
+except (ImportError, AttributeError):
+    print("SKIP")
+    raise SystemExit
+
+
+class CancelledError(BaseException):
+    pass
+
+
+cur_task = None
+_task_queue = _asyncio.TaskQueue()
+
+
+class Event:
+    def __init__(self):
+        self.state = False
+        self.waiting = _asyncio.TaskQueue()
+
+    def set(self):
+        while self.waiting.peek():
+            _task_queue.push(self.waiting.pop())
+        self.state = True
+
+    def clear(self):
+        self.state = False
+
+    async def wait(self):
+        if not self.state:
+            self.waiting.push(cur_task)
+            cur_task.data = self.waiting
+            yield
+        return True
+
+
+def create_task(coro):
+    t = _asyncio.Task(coro, globals())
+    _task_queue.push(t)
+    return t
+
+
+if hasattr(_asyncio, "run_until_complete"):
+    _io_queue = _asyncio.IOQueue()
+    _exc_context = {"message": "", "exception": None, "future": None}
+    Loop = None
+    sleep_ms = _asyncio.sleep_ms
+    run_until_complete = _asyncio.run_until_complete
+else:
+    # All sleeps here are for 0ms and there is no I/O, so these only keep the parts
+    # of core.py that this benchmark uses.
+
+    class SingletonGenerator:
+        def __init__(self):
+            self.state = None
+            self.exc = StopIteration()
+
+        def __iter__(self):
+            return self
+
+        def __await__(self):
+            return self
+
+        def __next__(self):
+            if self.state is not None:
+                _task_queue.push(cur_task)
+                self.state = None
+                return None
+            else:
+                self.exc.__traceback__ = None
+                raise self.exc
+
+    _sg = SingletonGenerator()
+
+    def sleep_ms(t):
+        _sg.state = t
+        return _sg
+
+    def run_until_complete(main_task):
+        global cur_task
+        while True:
+            t = _task_queue.pop()
+            cur_task = t
+            try:
+                t.coro.send(None)
+            except StopIteration as er:
+                if t is main_task:
+                    cur_task = None
+                    return er.value
+                if t.state:
+                    if t.state is True:
+                        t.state = None
+                    else:
+                        while t.state.peek():
+                            _task_queue.push(t.state.pop())
+                        t.state = False
+                    t.data = er
+
+
+async def player(n, wait, signal):
+    for _ in range(n):
+        await wait.wait()
+        wait.clear()
+        signal.set()
+
+
+async def spinner(n):
+    for _ in range(n):
+        await sleep_ms(0)
+
+
+async def match(n):
+    ping = Event()
+    pong = Event()
+    t1 = create_task(player(n, ping, pong))
+    t2 = create_task(player(n, pong, ping))
+    t3 = create_task(spinner(n))
+    ping.set()
+    await t1
+    await t2
+    await t3
+    return n
+
+
+def test(niter, n):
+    total = 0
+    for _ in range(niter):
+        total += run_until_complete(create_task(match(n)))
+    return total
+
+
+###########################################################################
+# Benchmark interface
+
+bm_params = {
+    (32, 10): (1, 20),
+    (50, 10): (1, 50),
+    (100, 10): (2, 100),
+    (500, 10): (4, 200),
+    (1000, 10): (8, 400),
+    (5000, 10): (20, 1000),
+}
+
+
+def bm_setup(params):
+    niter, n = params
+    state = None
+
+    def run():
+        nonlocal state
+        state = test(niter, n)
+
+    def result():
+        return niter * n, state == niter * n
+
+    return run, result
@@ -0,0 +1,60 @@
+# This tests serializing a typical document with json.dumps and json.dump
+
+import io
+import json
+
+
+def make_doc(n):
+    return {
+        "version": 3,
+        "compact": False,
+        "records": [
+            {
+                "id": i,
+                "name": "sensor %d" % i,
+                "tags": ["temp", "indoor", None],
+                "enabled": i % 3 != 0,
+                "readings": [i * 2, -i, i * i, 1000 + i],
+                "note": 'line one\nline "two"',
+            }
+            for i in range(n)
+        ],
+    }
+
+
+def test(niter, doc):
+    stream = io.StringIO()
+    for _ in range(niter):
+        out = json.dumps(doc)
+        out_compact = json.dumps(doc, separators=(",", ":"))
+        stream.seek(0)
+        json.dump(doc, stream)
+    return len(out), len(out_compact), stream.tell()
+
+
+###########################################################################
+# Benchmark interface
+
+bm_params = {
+    (32, 10): (1, 5),
+    (50, 10): (2, 5),
+    (100, 10): (2, 10),
+    (500, 10): (4, 20),
+    (1000, 10): (8, 20),
+    (5000, 10): (20, 40),
+}
+
+
+def bm_setup(params):
+    niter, n = params
+    doc = make_doc(n)
+    state = None
+
+    def run():
+        nonlocal state
+        state = test(niter, doc)
+
+    def result():
+        return niter * n, state
+
+    return run, result
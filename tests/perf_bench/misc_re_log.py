@@ -0,0 +1,53 @@
+# This tests parsing log lines with the module-level re functions
+
+import re
+
+LINES = [
+    "2024-01-15 10:23:45 INFO wifi: connected to net, rssi=-67",
+    "2024-01-15 10:23:46 DEBUG sensor: temp=21.5 humidity=40",
+    "2024-01-15 10:23:47 WARNING mqtt: reconnect attempt 3",
+    "2024-01-15 10:23:48 ERROR i2c: device 0x3c not responding",
+    "2024-01-15 10:23:49 INFO http: GET /status 200 12ms",
+]
+
+
+def test(niter):
+    levels = {}
+    total = 0
+    for _ in range(niter):
+        for line in LINES:
+            m = re.match(r"(\d+)-(\d+)-(\d+) ([\d:]+) (\w+) (\w+): (.*)", line)
+            level = m.group(5)
+            levels[level] = levels.get(level, 0) + 1
+            m = re.search(r"(\w+)=(-?[\d.]+)", m.group(7))
+            if m:
+                total += len(m.group(1))
+            total += len(re.sub(r"\d", "#", line))
+    return sorted(levels.items()), total
+
+
+###########################################################################
+# Benchmark interface
+
+bm_params = {
+    (32, 10): (2,),
+    (50, 10): (3,),
+    (100, 10): (6,),
+    (500, 10): (30,),
+    (1000, 10): (60,),
+    (5000, 10): (300,),
+}
+
+
+def bm_setup(params):
+    (niter,) = params
+    state = None
+
+    def run():
+        nonlocal state
+        state = test(niter)
+
+    def result():
+        return niter, state
+
+    return run, result
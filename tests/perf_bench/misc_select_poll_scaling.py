@@ -0,0 +1,71 @@
+# This tests select.poll with a growing number of registered sockets, only one of
+# which becomes ready each time it's polled, like a server with many idle clients.
+
+try:
+    import select
+    import socket
+
+    select.poll
+except (ImportError, AttributeError):
+    print("SKIP")
+    raise SystemExit
+
+
+def bind_active():
+    # A UDP socket that sends datagrams to itself.
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    for port in range(8400, 8500):
+        addr = socket.getaddrinfo("127.0.0.1", port)[0][-1]
+        try:
+            s.bind(addr)
+            return s, addr
+        except OSError:
+            pass
+    s.close()
+    raise OSError("no free port")
+
+
+def test(n_idle, n):
+    idle = [socket.socket(socket.AF_INET, socket.SOCK_DGRAM) for _ in range(n_idle)]
+    active, addr = bind_active()
+    poller = select.poll()
+    for s in idle:
+        poller.register(s, select.POLLIN)
+    poller.register(active, select.POLLIN)
+    count = 0
+    for _ in range(n):
+        active.sendto(b"x", addr)
+        for s, ev in poller.ipoll(1000):
+            s.recv(1)
+            count += 1
+    active.close()
+    for s in idle:
+        s.close()
+    return count
+
+
+###########################################################################
+# Benchmark interface
+
+bm_params = {
+    (32, 10): (8, 100),
+    (50, 10): (16, 200),
+    (100, 10): (32, 500),
+    (500, 10): (128, 1000),
+    (1000, 10): (256, 2000),
+    (5000, 10): (512, 5000),
+}
+
+
+def bm_setup(params):
+    n_idle, n = params
+    state = None
+
+    def run():
+        nonlocal state
+        state = test(n_idle, n)
+
+    def result():
+        return n_idle * n, state
+
+    return run, result
@@ -708,6 +708,16 @@ def run_tests(pyb, tests, args, result_dir, num_threads=1):
         if "True" not in str(t, "ascii"):
             skip_tests.add("cmdline/repl_words_move.py")
 
+        # Check if the bytecode has superinstructions, which change the output of
+        # cmd_showbc and decide whether .mpy files using them can be imported
+        t = run_feature_check(pyb, args, "superinstructions_check.py")
+        if b"LOAD_FAST0_ATTR" in t:
+            skip_tests.add("cmdline/cmd_showbc.py")
+            skip_tests.add("micropython/import_mpy_superinstructions.py")
+        else:
+            skip_tests.add("cmdline/cmd_showbc_superinstructions.py")
+            skip_tests.add("micropython/import_mpy_superinstructions_load.py")
+
         upy_byteorder = run_feature_check(pyb, args, "byteorder.py")
         upy_float_precision = run_feature_check(pyb, args, "float.py")
         try:
@@ -787,6 +797,7 @@ def run_tests(pyb, tests, args, result_dir, num_threads=1):
         skip_tests.add("cmdline/cmd_parsetree.py")
         skip_tests.add("cmdline/repl_sys_ps1_ps2.py")
         skip_tests.add("extmod/ssl_poll.py")
+        skip_tests.add("micropython/parse_streaming.py")  # needs MICROPY_PARSE_STREAMING
 
     # Skip thread mutation tests on targets that don't have the GIL.
     if args.platform in PC_PLATFORMS + ("rp2",):
@@ -0,0 +1,61 @@
+# Test the heap stays consistent when objects are allocated, resized and freed
+# while the previous collection is still being swept.
+
+import gc
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    print("SKIP")
+    raise SystemExit
+
+# Collect often, so that allocations keep running into a partly swept heap.
+try:
+    gc.threshold(4096)
+except AttributeError:
+    pass
+
+d = OrderedDict()
+ref = {}
+bufs = []
+for i in range(20000):
+    # Dict items of various sizes that are inserted, deleted and reordered.
+    k = "key%d" % (i % 151)
+    v = tuple(range(i % 37))
+    d[k] = v
+    ref[k] = v
+    if i % 3 == 0:
+        k = "key%d" % (i * 7 % 151)
+        if k in d:
+            del d[k]
+            del ref[k]
+    if i % 11 == 0 and d:
+        k, v = d.popitem()
+        if ref.pop(k) != v:
+            print("popitem", i, k)
+    if i % 5 == 0 and k in d:
+        d.move_to_end(k)
+
+    # Buffers that grow in place or move, some of which are kept for a while.
+    b = bytearray(i % 50)
+    for j in range(i % 7):
+        b.extend(b"x" * (j * 9))
+    if len(b) != i % 50 + (i % 7) * (i % 7 - 1) * 9 // 2:
+        print("bytearray", i)
+    bufs.append(b)
+    if len(bufs) > 40:
+        bufs.pop(i % 40)
+
+    l = []
+    for j in range(i % 23):
+        l.append(j)
+    if sum(l) != (i % 23) * (i % 23 - 1) // 2:
+        print("list", i)
+
+print(list(d.items()) == [(k, ref[k]) for k in d])
+print(len(d) == len(ref))
+
+try:
+    gc.threshold(-1)
+except AttributeError:
+    pass
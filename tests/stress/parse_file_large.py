@@ -0,0 +1,53 @@
+# Test parsing and compiling a file with a large number of top-level statements.
+
+# Pick an N that gives a sizeable source file without running out of heap.
+try:
+    # large heap, eg unix
+    [0] * 80000
+    N = 100
+except MemoryError:
+    try:
+        # medium, eg pyboard
+        [0] * 10000
+        N = 20
+    except MemoryError:
+        # small, eg esp8266
+        N = 4
+
+stmts = ['"""module doc"""', "from micropython import const", "BASE = const(100)", "total = 0"]
+for i in range(N):
+    cls = ["class C{}:".format(i)]
+    for j in range(10):
+        cls.append("    def m{}(self, a, b={}):".format(j, j))
+        cls.append("        x = [a, b, BASE]")
+        cls.append("        for k in range({}):".format(j))
+        cls.append("            x.append(k * a + b)")
+        cls.append("        return sum(x)")
+    stmts.append("\n".join(cls))
+    stmts.append('"not a doc string"')
+    stmts.append("total += C{}().m{}(1)".format(i, i % 10))
+src = "\n".join(stmts) + "\n"
+del stmts, cls
+
+try:
+    g = {}
+    exec(src, g)
+except MemoryError:
+    print("SKIP")
+    raise SystemExit
+
+
+def expected(a, j):
+    return a + j + 100 + sum(k * a + j for k in range(j))
+
+
+print(g["total"] == sum(expected(1, i % 10) for i in range(N)))
+print(g["C0"]().m9(2) == expected(2, 9))
+print(g.get("__doc__") in (None, "module doc"))
+del g, src
+
+# A syntax error at the end of the file is still reported.
+try:
+    exec("x = 1\ny = 2\nz = (\n", {})
+except SyntaxError:
+    print("SyntaxError")
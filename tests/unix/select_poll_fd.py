@@ -0,0 +1,87 @@
+# Test select.poll with objects that have a file descriptor, using FIFOs.
+
+try:
+    import os
+    import select
+
+    select.poll
+except (ImportError, AttributeError):
+    print("SKIP")
+    raise SystemExit
+
+base = (os.getenv("TMPDIR") or "/tmp") + "/micropython_select_poll_fd_"
+names = [base + str(i) for i in range(3)]
+for name in names:
+    if os.system("rm -f " + name + " && mkfifo " + name) != 0:
+        print("SKIP")
+        raise SystemExit
+
+# Open for reading and writing, so that opening doesn't block.
+fifos = [open(name, "r+b") for name in names]
+
+
+def name(obj):
+    if isinstance(obj, int):
+        return "fd"
+    return "fifo%d" % fifos.index(obj)
+
+
+def show(res):
+    print(sorted((name(obj), ev) for obj, ev in res))
+
+
+poller = select.poll()
+for f in fifos:
+    poller.register(f, select.POLLIN)
+show(poller.poll(0))
+
+fifos[1].write(b"a")
+fifos[2].write(b"bc")
+show(poller.poll(0))
+show(poller.ipoll(0))
+fifos[1].read(1)
+show(poller.poll(0))
+fifos[2].read(2)
+show(poller.poll(0))
+
+# Waiting until the timeout.
+print(poller.poll(10))
+
+# Modify and one-shot mode.
+poller.modify(fifos[0], select.POLLOUT)
+show(poller.poll(0))
+show(poller.ipoll(0, 1))
+show(poller.poll(0))
+poller.modify(fifos[0], select.POLLIN)
+show(poller.poll(0))
+
+# A file descriptor that is registered through two objects.
+poller.register(fifos[1].fileno(), select.POLLIN)
+fifos[1].write(b"d")
+show(poller.poll(0))
+poller.unregister(fifos[1].fileno())
+fifos[1].read(1)
+
+# A regular file is always ready.
+with open(names[0] + ".txt", "w") as f:
+    poller.register(f, select.POLLOUT)
+    show(p for p in poller.poll(0) if p[0] is not f)
+    print([ev for obj, ev in poller.poll(0) if obj is f])
+    poller.unregister(f)
+show(poller.poll(0))
+
+# Unregister while iterating over the results.
+for f in fifos:
+    f.write(b"e")
+n = 0
+for obj, ev in poller.ipoll(0):
+    n += 1
+    for f in fifos:
+        poller.unregister(f)
+print(n, poller.poll(0))
+
+for f in fifos:
+    f.close()
+for name in names:
+    os.remove(name)
+os.remove(names[0] + ".txt")
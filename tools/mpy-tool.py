@@ -89,6 +89,7 @@ class FreezeError(Exception):
 class Config:
     MPY_VERSION = 6
     MPY_SUB_VERSION = 3
+    MPY_VERSION_FLAG_SUPERINSTRUCTIONS = 0x80
     MICROPY_LONGINT_IMPL_NONE = 0
     MICROPY_LONGINT_IMPL_LONGLONG = 1
     MICROPY_LONGINT_IMPL_MPZ = 2
@@ -192,9 +193,9 @@ class Opcode:
     # fmt: off
     # Load, Store, Delete, Import, Make, Build, Unpack, Call, Jump, Exception, For, sTack, Return, Yield, Op
     MP_BC_BASE_RESERVED               = (0x00) # ----------------
-    MP_BC_BASE_QSTR_O                 = (0x10) # LLLLLLSSSDDII---
+    MP_BC_BASE_QSTR_O                 = (0x10) # LLLLLLSSSDDIILLS
     MP_BC_BASE_VINT_E                 = (0x20) # MMLLLLSSDDBBBBBB
-    MP_BC_BASE_VINT_O                 = (0x30) # UUMMCCCC--------
+    MP_BC_BASE_VINT_O                 = (0x30) # UUMMCCCCO-------
     MP_BC_BASE_JUMP_E                 = (0x40) # J-JJJJJEEEEF----
     MP_BC_BASE_BYTE_O                 = (0x50) # LLLLSSDTTTTTEEFF
     MP_BC_BASE_BYTE_E                 = (0x60) # --BREEEYYI------
@@ -297,6 +298,16 @@ class Opcode:
     MP_BC_IMPORT_NAME                 = (MP_BC_BASE_QSTR_O + 0x0b) # qstr
     MP_BC_IMPORT_FROM                 = (MP_BC_BASE_QSTR_O + 0x0c) # qstr
     MP_BC_IMPORT_STAR                 = (MP_BC_BASE_BYTE_E + 0x09)
+
+    # Superinstructions, see MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS
+    MP_BC_LOAD_FAST0_ATTR             = (MP_BC_BASE_QSTR_O + 0x0d) # qstr
+    MP_BC_LOAD_FAST0_METHOD           = (MP_BC_BASE_QSTR_O + 0x0e) # qstr
+    MP_BC_STORE_FAST0_ATTR            = (MP_BC_BASE_QSTR_O + 0x0f) # qstr
+    MP_BC_BINARY_OP_SMALL_INT_MULTI   = (MP_BC_BASE_VINT_O + 0x08) # uint
+    MP_BC_LOAD_SUBSCR_SMALL_INT       = (MP_BC_BASE_VINT_O + 0x0f) # uint
+
+    # The binary op applied by each of the BINARY_OP_SMALL_INT_MULTI opcodes.
+    MP_BINARY_OP_SMALL_INT_MULTI_OPS = (0, 1, 2, 14, 15, 27, 28)
     # fmt: on
 
     # Create sets of related opcodes.
@@ -323,6 +334,9 @@ class Opcode:
         mapping[MP_BC_UNARY_OP_MULTI + i] = "UNARY_OP %d %s" % (i, mp_unary_op_method_name[i])
     for i in range(MP_BC_BINARY_OP_MULTI_NUM):
         mapping[MP_BC_BINARY_OP_MULTI + i] = "BINARY_OP %d %s" % (i, mp_binary_op_method_name[i])
+    for i, op in enumerate(MP_BINARY_OP_SMALL_INT_MULTI_OPS):
+        name = "BINARY_OP_SMALL_INT %d %s" % (op, mp_binary_op_method_name[op])
+        mapping[MP_BC_BINARY_OP_SMALL_INT_MULTI + i] = name
 
     def __init__(self, offset, fmt, opcode_byte, arg, extra_arg):
         self.offset = offset
@@ -1359,8 +1373,10 @@ def read_mpy(filename):
         # CIRCUITPY-CHANGE: "C" is used for CircuitPython
         if header[0] != ord("C"):
             raise MPYReadError(filename, "not a valid .mpy file")
-        if header[1] != config.MPY_VERSION:
+        if header[1] & ~config.MPY_VERSION_FLAG_SUPERINSTRUCTIONS != config.MPY_VERSION:
             raise MPYReadError(filename, "incompatible .mpy version")
+        if header[1] & config.MPY_VERSION_FLAG_SUPERINSTRUCTIONS:
+            config.superinstructions = True
         feature_byte = header[2]
         mpy_native_arch = feature_byte >> 2
         if mpy_native_arch != MP_NATIVE_ARCH_NONE:
@@ -1444,6 +1460,12 @@ def freeze_mpy(firmware_qstr_idents, compiled_modules):
     print("#endif")
     print()
 
+    if config.superinstructions:
+        print("#if !MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS")
+        print('#error "frozen code requires MICROPY_OPT_BYTECODE_SUPERINSTRUCTIONS"')
+        print("#endif")
+        print()
+
     if config.MICROPY_LONGINT_IMPL == config.MICROPY_LONGINT_IMPL_MPZ:
         print("#if MPZ_DIG_SIZE != %u" % config.MPZ_DIG_SIZE)
         print('#error "incompatible MPZ_DIG_SIZE"')
@@ -1712,6 +1734,8 @@ def merge_mpy(compiled_modules, output_file):
         ## CIRCUITPY-CHANGE: "C" is used for CircuitPython
         header[0] = ord("C")
         header[1] = config.MPY_VERSION
+        if config.superinstructions:
+            header[1] |= config.MPY_VERSION_FLAG_SUPERINSTRUCTIONS
         header[2] = config.native_arch << 2 | config.MPY_SUB_VERSION if config.native_arch else 0
         header[3] = config.mp_small_int_bits
         merged_mpy.extend(header)
@@ -1813,6 +1837,7 @@ def main(args=None):
     }[args.mlongint_impl]
     config.MPZ_DIG_SIZE = args.mmpz_dig_size
     config.native_arch = MP_NATIVE_ARCH_NONE
+    config.superinstructions = False
 
     # set config values for qstrs, and get the existing base set of qstrs
     # already in the firmware